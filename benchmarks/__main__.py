@@ -0,0 +1,13 @@
+# __main__.py
+"""
+Punto di ingresso della suite di microbenchmark.
+
+Esegui dalla radice del repository con `python -m benchmarks`.
+"""
+
+import sys
+
+from .run import main
+
+if __name__ == "__main__":
+    sys.exit(main())
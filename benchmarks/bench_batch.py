@@ -0,0 +1,87 @@
+# bench_batch.py
+"""
+Throughput della generazione delle mosse: generatore scalare contro generazione vettoriale.
+
+Esegui dalla radice del repository con `python -m benchmarks.bench_batch`.
+"""
+
+import argparse
+import sys
+import time
+from typing import Dict, List, Optional
+
+from chess.position import Position, random_positions
+
+from .corpus import POSITIONS
+
+# Semimosse casuali giocate a partire dalle posizioni del corpus
+_MAX_RANDOM_PLIES = 40
+# Posizioni distinte generate; oltre questo numero vengono ripetute
+_DISTINCT_POSITIONS = 400
+
+
+def sample_positions(count: int, seed: int = 0) -> List[str]:
+    """
+    Posizioni FEN varie ottenute con mosse casuali dalle posizioni del corpus (deterministiche).
+    Le partite casuali usano il generatore scalare, quindi se ne giocano al più
+    `_DISTINCT_POSITIONS` e le posizioni si ripetono fino a `count`.
+    """
+    fens = random_positions(POSITIONS, min(count, _DISTINCT_POSITIONS), seed, _MAX_RANDOM_PLIES)
+    return [fens[index % len(fens)] for index in range(count)] if fens else []
+
+
+def throughput(fens: List[str], chunk_size: Optional[int] = None, scalar_limit: int = 2000) -> Dict[str, float]:
+    """
+    Misura le posizioni al secondo dei due generatori e verifica che i conteggi coincidano.
+
+    Args:
+        fens: Le posizioni da elaborare.
+        chunk_size: Dimensione dei blocchi della generazione vettoriale (default del modulo).
+        scalar_limit: Posizioni misurate con il generatore scalare (è molto più lento).
+
+    Returns:
+        Posizioni al secondo per "scalar" e "batch" e mosse generate dalla versione vettoriale.
+
+    Raises:
+        AssertionError: Se i due generatori non concordano sul numero di mosse.
+    """
+    from chess.batch import DEFAULT_CHUNK_SIZE, batch_from_fens, legal_moves_batch
+
+    positions = [Position.from_fen(fen) for fen in fens[:scalar_limit]]
+    start = time.perf_counter()
+    scalar_counts = [len(position.legal_moves()) for position in positions]
+    scalar_elapsed = time.perf_counter() - start
+
+    batch = batch_from_fens(fens)
+    start = time.perf_counter()
+    result = legal_moves_batch(batch, chunk_size or DEFAULT_CHUNK_SIZE)
+    batch_elapsed = time.perf_counter() - start
+
+    mismatches = [fen for fen, expected, got in zip(fens, scalar_counts, result.counts) if expected != got]
+    assert not mismatches, f"conteggi diversi per {mismatches[:3]}"
+    return {
+        "scalar": len(positions) / scalar_elapsed if scalar_elapsed > 0 else 0.0,
+        "batch": len(fens) / batch_elapsed if batch_elapsed > 0 else 0.0,
+        "moves": float(result.counts.sum()),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Esegue la misura da riga di comando e stampa le posizioni al secondo."""
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_batch",
+                                     description="Throughput della generazione vettoriale delle mosse.")
+    parser.add_argument("--positions", type=int, default=20000, help="Posizioni generate per la misura.")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Posizioni per blocco vettoriale.")
+    parser.add_argument("--seed", type=int, default=0, help="Seme delle mosse casuali.")
+    args = parser.parse_args(argv)
+
+    fens = sample_positions(args.positions, args.seed)
+    rates = throughput(fens, args.chunk_size)
+    print(f"{'scalare':<12} {rates['scalar']:>14,.0f} posizioni/s")
+    print(f"{'vettoriale':<12} {rates['batch']:>14,.0f} posizioni/s  (x{rates['batch'] / rates['scalar']:.1f})")
+    print(f"{'mosse':<12} {rates['moves']:>14,.0f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+# bench_core.py
+"""Microbenchmark delle operazioni principali: scacchiera, generazione mosse, parsing e rendering."""
+
+from contextlib import redirect_stdout
+from typing import Callable, Dict
+
+from chess.board import Board
+from chess.constants import Color
+from chess.position import Position
+from chess.ui import UI
+from chess.utils import algebraic_to_coords, parse_move
+
+from .corpus import POSITIONS, SQUARE_NAMES, PAWN_MOVES
+
+
+class _NullOutput:
+    """Flusso di uscita che scarta tutto, per misurare il rendering senza il costo del terminale."""
+
+    def write(self, text: str) -> int:
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def bench_board_init() -> Callable[[], None]:
+    """Costruzione di una Board nella posizione iniziale."""
+    def run():
+        Board()
+    return run
+
+
+def bench_get_piece() -> Callable[[], None]:
+    """Lettura di tutte le 64 case di una scacchiera di mediogioco."""
+    board = Position.from_fen(POSITIONS[3]).board
+    squares = [(row, col) for row in range(8) for col in range(8)]
+
+    def run():
+        for square in squares:
+            board.get_piece(square)
+    return run
+
+
+def bench_move_piece() -> Callable[[], None]:
+    """Spostamento di un pezzo avanti e indietro (due chiamate a move_piece)."""
+    board = Board()
+
+    def run():
+        board.move_piece((0, 6), (2, 5))
+        board.move_piece((2, 5), (0, 6))
+    return run
+
+
+def bench_legal_moves() -> Callable[[], None]:
+    """Generazione delle mosse legali per ogni posizione del corpus."""
+    positions = [Position.from_fen(fen) for fen in POSITIONS]
+
+    def run():
+        for position in positions:
+            position.legal_moves()
+    return run
+
+
+def bench_pseudo_legal_moves() -> Callable[[], None]:
+    """Generazione delle mosse pseudo-legali (basata su Piece.get_valid_moves) per il corpus."""
+    positions = [Position.from_fen(fen) for fen in POSITIONS]
+
+    def run():
+        for position in positions:
+            position.pseudo_legal_moves()
+    return run
+
+
+def bench_batch_legal_moves() -> Callable[[], None]:
+    """Generazione vettoriale delle mosse legali per il corpus ripetuto 32 volte (256 posizioni)."""
+    from chess.batch import batch_from_fens, legal_moves_batch
+    batch = batch_from_fens(POSITIONS * 32)
+
+    def run():
+        legal_moves_batch(batch)
+    return run
+
+
+def bench_parse_move() -> Callable[[], None]:
+    """utils.parse_move sulle 16 mosse di pedone dalla posizione iniziale."""
+    board = Board()
+
+    def run():
+        for move in PAWN_MOVES:
+            parse_move(move, board, Color.WHITE)
+    return run
+
+
+def bench_algebraic_to_coords() -> Callable[[], None]:
+    """Conversione delle 64 case da notazione algebrica a coordinate."""
+    def run():
+        for name in SQUARE_NAMES:
+            algebraic_to_coords(name)
+    return run
+
+
+def bench_display_board() -> Callable[[], None]:
+    """Rendering di UI.display_board su un output nullo."""
+    ui = UI()
+    board = Position.from_fen(POSITIONS[3]).board
+    null_output = _NullOutput()
+
+    def run():
+        with redirect_stdout(null_output):  # type: ignore[type-var]
+            ui.display_board(board, Color.WHITE)
+    return run
+
+
+# Registro dei benchmark: nome -> fabbrica che prepara i dati e restituisce la funzione da misurare
+BENCHMARKS: Dict[str, Callable[[], Callable[[], None]]] = {
+    "board_init": bench_board_init,
+    "get_piece_x64": bench_get_piece,
+    "move_piece_x2": bench_move_piece,
+    "legal_moves_corpus": bench_legal_moves,
+    "pseudo_legal_moves_corpus": bench_pseudo_legal_moves,
+    "batch_legal_moves_x256": bench_batch_legal_moves,
+    "parse_move_x16": bench_parse_move,
+    "algebraic_to_coords_x64": bench_algebraic_to_coords,
+    "display_board": bench_display_board,
+}
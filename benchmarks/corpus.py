@@ -0,0 +1,22 @@
+# corpus.py
+"""Corpora fissi di posizioni e notazioni usati dai benchmark (non modificarli: i baseline ne dipendono)."""
+
+from chess.constants import BOARD_SIZE, IDX_TO_COL
+
+# Posizioni FEN rappresentative: apertura, mediogioco tattico, finali
+POSITIONS = [
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+    "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1",
+    "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+    "8/8/8/4k3/8/8/4P3/4K3 w - - 0 1",
+]
+
+# Tutte le case in notazione algebrica, per i benchmark di conversione
+SQUARE_NAMES = [f"{IDX_TO_COL[col]}{row + 1}" for row in range(BOARD_SIZE) for col in range(BOARD_SIZE)]
+
+# Mosse abbreviate di pedone per parse_move dalla posizione iniziale (Bianco al tratto)
+PAWN_MOVES = ["a3", "a4", "b3", "b4", "c3", "c4", "d3", "d4", "e3", "e4", "f3", "f4", "g3", "g4", "h3", "h4"]
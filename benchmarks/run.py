@@ -0,0 +1,151 @@
+# run.py
+"""Esecuzione dei benchmark, salvataggio dei baseline in JSON e confronto con soglia di rallentamento."""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .bench_core import BENCHMARKS
+
+# Percorso predefinito del baseline
+DEFAULT_BASELINE = "benchmarks/baseline.json"
+# Rallentamento massimo tollerato rispetto al baseline (0.25 = +25%)
+DEFAULT_MAX_SLOWDOWN = 0.25
+
+
+def measure(func: Callable[[], None], repeats: int = 5, min_time: float = 0.05) -> float:
+    """
+    Misura il tempo per chiamata di `func` in nanosecondi.
+    Il numero di iterazioni per ripetizione viene calibrato finché una ripetizione
+    dura almeno `min_time`; si riporta il minimo tra le ripetizioni, il valore
+    meno disturbato dal rumore del sistema.
+
+    Args:
+        func: La funzione da misurare (senza argomenti).
+        repeats: Numero di ripetizioni.
+        min_time: Durata minima in secondi di una ripetizione.
+
+    Returns:
+        Nanosecondi per chiamata.
+    """
+    loops = 1
+    while True:
+        start = time.perf_counter_ns()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter_ns() - start
+        if elapsed >= min_time * 1e9:
+            break
+        loops *= 2 if elapsed == 0 else max(2, min(10, int(min_time * 1e9 / elapsed) + 1))
+
+    best = elapsed / loops
+    for _ in range(repeats - 1):
+        start = time.perf_counter_ns()
+        for _ in range(loops):
+            func()
+        best = min(best, (time.perf_counter_ns() - start) / loops)
+    return best
+
+
+def run_benchmarks(names: Optional[List[str]] = None, repeats: int = 5, min_time: float = 0.05) -> Dict[str, float]:
+    """Esegue i benchmark indicati (tutti se None) e restituisce i nanosecondi per chiamata."""
+    results = {}
+    for name, factory in BENCHMARKS.items():
+        if names and name not in names:
+            continue
+        results[name] = measure(factory(), repeats, min_time)
+    return results
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float],
+            max_slowdown: float) -> List[Tuple[str, float, float, bool]]:
+    """
+    Confronta i risultati con il baseline.
+
+    Returns:
+        Per ogni benchmark presente in entrambi: (nome, ns attuali, rapporto attuale/baseline, regressione).
+    """
+    rows = []
+    for name, current in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        ratio = current / reference
+        rows.append((name, current, ratio, ratio > 1.0 + max_slowdown))
+    return rows
+
+
+def load_baseline(path: str) -> Dict[str, float]:
+    """Legge un baseline salvato con --save."""
+    with open(path, encoding="utf-8") as handle:
+        data = json.load(handle)
+    return {name: entry["ns_per_op"] for name, entry in data["benchmarks"].items()}
+
+
+def save_baseline(path: str, results: Dict[str, float]):
+    """Salva i risultati come baseline, insieme alle informazioni sull'interprete."""
+    data = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "benchmarks": {name: {"ns_per_op": round(value, 1)} for name, value in results.items()},
+    }
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump(data, handle, indent=2)
+        handle.write("\n")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Esegue la suite da riga di comando.
+
+    Returns:
+        0 se non ci sono regressioni, 1 se almeno un benchmark supera la soglia.
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Microbenchmark di Scacchi.")
+    parser.add_argument("names", nargs="*", help=f"Benchmark da eseguire (default: tutti). Disponibili: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="File JSON del baseline.")
+    parser.add_argument("--save", action="store_true", help="Salva i risultati come nuovo baseline.")
+    parser.add_argument("--max-slowdown", type=float, default=DEFAULT_MAX_SLOWDOWN,
+                        help="Rallentamento tollerato (0.25 = +25%%).")
+    parser.add_argument("--repeats", type=int, default=5, help="Ripetizioni per benchmark.")
+    parser.add_argument("--min-time", type=float, default=0.05, help="Secondi minimi per ripetizione.")
+    args = parser.parse_args(argv)
+
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"benchmark sconosciuti: {', '.join(unknown)}")
+
+    results = run_benchmarks(args.names, args.repeats, args.min_time)
+
+    if args.save:
+        save_baseline(args.baseline, results)
+        for name, value in results.items():
+            print(f"{name:<28} {value / 1000:>12.2f} µs")
+        print(f"Baseline salvato in {args.baseline}")
+        return 0
+
+    try:
+        baseline = load_baseline(args.baseline)
+    except FileNotFoundError:
+        baseline = {}
+        print(f"Nessun baseline in {args.baseline}: usa --save per crearlo.")
+
+    rows = {name: (ratio, regressed) for name, _, ratio, regressed in compare(results, baseline, args.max_slowdown)}
+    regressions = 0
+    for name, value in results.items():
+        if name in rows:
+            ratio, regressed = rows[name]
+            regressions += regressed
+            flag = "  REGRESSIONE" if regressed else ""
+            print(f"{name:<28} {value / 1000:>12.2f} µs  x{ratio:.2f}{flag}")
+        else:
+            print(f"{name:<28} {value / 1000:>12.2f} µs")
+
+    if regressions:
+        print(f"{regressions} benchmark oltre la soglia di +{args.max_slowdown:.0%}.", file=sys.stderr)
+        return 1
+    return 0
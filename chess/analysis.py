@@ -0,0 +1,171 @@
+# analysis.py
+"""
+Analisi in background della posizione mentre il giocatore pensa.
+
+La ricerca gira in un processo separato, così non contende il GIL al ciclo di
+input. Ogni richiesta di analisi ha un numero di generazione: il processo
+principale lo incrementa in memoria condivisa prima di inviare una nuova
+posizione, e la ricerca in corso si interrompe appena vede un numero diverso dal
+proprio. I risultati tornano su una pipe e vengono letti senza attese.
+"""
+
+import multiprocessing
+from typing import List, NamedTuple, Optional, Tuple
+
+from .engine import Searcher, SearchLimits, SearchInfo, MATE_SCORE, MAX_DEPTH
+from .position import Move, Position
+from .pgn import move_to_san
+
+# Secondi concessi al processo di analisi per terminare prima di forzarne la chiusura
+SHUTDOWN_TIMEOUT = 1.0
+
+
+class AnalysisInfo(NamedTuple):
+    """Miglior linea trovata finora per la posizione analizzata."""
+    fen: str
+    depth: int
+    score: int  # centipedoni dal punto di vista del giocatore al tratto
+    nodes: int
+    pv: List[str]  # linea principale in notazione UCI
+
+    def san_line(self) -> List[str]:
+        """Converte la linea principale in SAN a partire dalla posizione analizzata."""
+        position = Position.from_fen(self.fen)
+        line = []
+        for uci in self.pv:
+            move = position.parse_uci(uci)
+            if move is None:
+                break
+            line.append(move_to_san(position, move))
+            position.make_move(move)
+        return line
+
+
+class _GenerationStop:
+    """Adatta il contatore condiviso all'interfaccia `is_set()` attesa da Searcher."""
+
+    def __init__(self, shared_generation, generation: int):
+        self._shared = shared_generation
+        self._generation = generation
+
+    def is_set(self) -> bool:
+        return self._shared.value != self._generation
+
+
+def _analysis_loop(requests, results, shared_generation, max_depth: Optional[int]):
+    """Corpo del processo di analisi: una ricerca per richiesta finché non arriva None."""
+    searcher = Searcher()
+    while True:
+        request = requests.recv()
+        if request is None:
+            return
+        generation, fen, root_uci = request
+        if shared_generation.value != generation:
+            continue  # già superata da una richiesta più recente
+        position = Position.from_fen(fen)
+        root_moves = None if root_uci is None else [position.parse_uci(uci) for uci in root_uci]
+
+        def report(info: SearchInfo, generation=generation, fen=fen):
+            results.send((generation, AnalysisInfo(fen, info.depth, info.score, info.nodes,
+                                                   [move.uci() for move in info.pv])))
+
+        searcher.search(position, SearchLimits(depth=max_depth, root_moves=root_moves),
+                        _GenerationStop(shared_generation, generation), report)
+
+
+class AnalysisWorker:
+    """Gestisce il processo di analisi e conserva l'ultima linea ricevuta."""
+
+    def __init__(self, max_depth: Optional[int] = None):
+        """
+        Args:
+            max_depth: Profondità massima di ogni analisi (None = fino alla mossa successiva).
+        """
+        self.max_depth = max_depth
+        self._generation = 0
+        self._request: Optional[Tuple[str, Optional[Tuple[str, ...]]]] = None
+        self._latest: Optional[AnalysisInfo] = None
+        self._shared_generation = None
+        self._process = None
+        self._requests = None
+        self._results = None
+
+    def _ensure_started(self):
+        if self._process is not None:
+            return
+        # Niente fork: il processo può partire dopo altri thread (es. la trasmissione)
+        # e un fork ne erediterebbe i lock nello stato in cui si trovano
+        context = multiprocessing.get_context("spawn")
+        self._shared_generation = context.Value("q", 0, lock=False)
+        child_requests, self._requests = context.Pipe(duplex=False)
+        self._results, child_results = context.Pipe(duplex=False)
+        self._process = context.Process(target=_analysis_loop, name="scacchi-analisi", daemon=True,
+                                        args=(child_requests, child_results, self._shared_generation,
+                                              self.max_depth))
+        self._process.start()
+        child_requests.close()
+        child_results.close()
+
+    def analyse(self, position: Position, root_moves: Optional[List[Move]] = None):
+        """
+        Avvia l'analisi della posizione, interrompendo quella precedente.
+        Se la posizione è già in analisi non fa nulla, così i comandi che non
+        cambiano la scacchiera non fanno ripartire la ricerca.
+
+        Args:
+            position: La posizione da analizzare (ne viene inviata la FEN).
+            root_moves: Mosse da considerare alla radice (None = tutte le mosse legali).
+        """
+        root_uci = None if root_moves is None else tuple(move.uci() for move in root_moves)
+        request = (position.to_fen(), root_uci)
+        if request == self._request:
+            return
+        self._ensure_started()
+        self.latest()  # svuota la pipe dai risultati della posizione precedente
+        self._generation += 1
+        self._request = request
+        self._latest = None
+        self._shared_generation.value = self._generation
+        self._requests.send((self._generation,) + request)
+
+    def cancel(self):
+        """Interrompe l'analisi in corso (senza attendere il processo)."""
+        if self._process is not None and self._request is not None:
+            self._generation += 1
+            self._shared_generation.value = self._generation
+        self._request = None
+        self._latest = None
+
+    def latest(self) -> Optional[AnalysisInfo]:
+        """Restituisce la linea più profonda ricevuta per la posizione corrente, senza bloccare."""
+        if self._results is not None:
+            while self._results.poll():
+                generation, info = self._results.recv()
+                if generation == self._generation:
+                    self._latest = info
+        return self._latest
+
+    def close(self):
+        """Ferma la ricerca e termina il processo di analisi."""
+        if self._process is None:
+            return
+        self.cancel()
+        try:
+            self._requests.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self._process.join(SHUTDOWN_TIMEOUT)
+        if self._process.is_alive():
+            self._process.terminate()
+            self._process.join()
+        self._requests.close()
+        self._results.close()
+        self._process = None
+
+
+def format_evaluation(score: int) -> str:
+    """Valutazione leggibile: pedoni con segno (es. "+0.35") o distanza dal matto."""
+    if abs(score) >= MATE_SCORE - MAX_DEPTH:
+        moves = (MATE_SCORE - abs(score) + 1) // 2
+        return f"matto in {moves}" if score > 0 else f"subisce matto in {moves}"
+    return f"{score / 100:+.2f}"
@@ -0,0 +1,213 @@
+# annotate.py
+"""
+Annotazione automatica di raccolte PGN su un pool di processi.
+
+Ogni semimossa di ogni partita viene valutata con il motore di ricerca; le mosse
+che peggiorano la valutazione oltre una soglia ricevono i simboli "?" (errore) o
+"??" (svista) e un commento con la mossa migliore. Le partite vengono lette in
+streaming e inviate ai processi tenendo in volo solo una finestra limitata, e il
+file di uscita le riporta nell'ordine di ingresso. Ogni processo ha la propria
+tabella delle trasposizioni: la ricerca di una semimossa riusa il lavoro di
+quella precedente, e la tabella viene svuotata a ogni partita così il risultato
+non dipende da come le partite sono distribuite tra i processi.
+"""
+
+import argparse
+import collections
+import contextlib
+import sys
+import time
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO
+
+from .engine import MATE_SCORE, MAX_DEPTH, SearchLimits, Searcher, TranspositionTable, DEFAULT_TT_ENTRIES
+from .constants import Color
+from .pgn import PGNGame, format_game, game_start_position, move_to_san, read_games, san_to_move
+from .pool import pool_map
+
+DEFAULT_ANNOTATION_DEPTH = 3
+# Perdita di valutazione (centipedoni, dal punto di vista di chi muove) per errori e sviste
+MISTAKE_THRESHOLD = 100
+BLUNDER_THRESHOLD = 300
+# Oltre questo vantaggio le valutazioni vengono saturate prima di calcolare la perdita,
+# così una vittoria più lenta ma sicura non viene segnalata come errore
+EVALUATION_CAP = 1000
+ANNOTATOR = "Scacchi"
+
+
+class PlyAnnotation(NamedTuple):
+    """Valutazione di una semimossa giocata."""
+    san: str
+    evaluation: int  # centipedoni dal punto di vista del Bianco, dopo la mossa
+    loss: int  # centipedoni persi da chi ha mosso rispetto alla mossa migliore
+    best_san: Optional[str]  # mossa migliore secondo il motore, prima della mossa giocata
+    nag: str  # "", "?" o "??"
+
+
+class AnnotatedGame(NamedTuple):
+    """Una partita annotata, pronta per la scrittura."""
+    index: int
+    game: PGNGame
+    plies: List[PlyAnnotation]
+    unannotated: List[str]  # mosse successive a una mossa illegale, riportate così come sono
+    nodes: int
+
+    def to_pgn(self, depth: int) -> str:
+        """Il testo PGN della partita con valutazioni ([%eval]), simboli e commenti."""
+        tokens = [format_annotation(ply) for ply in self.plies] + self.unannotated
+        headers = dict(self.game.headers)
+        headers["Annotator"] = f"{ANNOTATOR} (profondità {depth})"
+        start_fen = headers.pop("FEN", None)  # Lo reinserisce format_game insieme a SetUp
+        return format_game(headers, tokens, self.game.result, start_fen)
+
+
+def format_evaluation_tag(score: int) -> str:
+    """Formatta una valutazione dal punto di vista del Bianco come comando PGN [%eval]."""
+    if abs(score) >= MATE_SCORE - MAX_DEPTH:
+        moves = (MATE_SCORE - abs(score) + 1) // 2
+        return f"[%eval #{moves if score > 0 else -moves}]"
+    return f"[%eval {score / 100:.2f}]"
+
+
+def format_annotation(ply: PlyAnnotation) -> str:
+    """La mossa in SAN con simbolo e commento (es. "Qxb7?? {[%eval -3.10] Migliore: Nf3}")."""
+    comment = format_evaluation_tag(ply.evaluation)
+    if ply.nag and ply.best_san:
+        comment += f" Migliore: {ply.best_san}"
+    return f"{ply.san}{ply.nag} {{{comment}}}"
+
+
+def classify_loss(loss: int) -> str:
+    """Simbolo per una perdita di valutazione: "??" per le sviste, "?" per gli errori."""
+    if loss >= BLUNDER_THRESHOLD:
+        return "??"
+    if loss >= MISTAKE_THRESHOLD:
+        return "?"
+    return ""
+
+
+def _capped(score: int) -> int:
+    return max(-EVALUATION_CAP, min(EVALUATION_CAP, score))
+
+
+def annotate_game(game: PGNGame, depth: int, searcher: Searcher, index: int = 0) -> AnnotatedGame:
+    """
+    Valuta ogni posizione della partita una volta sola: la perdita di una mossa è la
+    differenza tra la valutazione prima e dopo, dal punto di vista di chi ha mosso.
+
+    Args:
+        game: La partita.
+        depth: Profondità della ricerca per ogni posizione.
+        searcher: Il motore (con la sua eventuale tabella delle trasposizioni).
+        index: Posizione della partita nel file, riportata nel risultato.
+
+    Returns:
+        L'AnnotatedGame; le mosse dopo una mossa illegale o un tag FEN non valido restano senza annotazioni.
+    """
+    limits = SearchLimits(depth=depth)
+    plies: List[PlyAnnotation] = []
+    nodes = 0
+    try:
+        position = game_start_position(game)
+    except ValueError:
+        return AnnotatedGame(index, game, [], list(game.moves), 0)
+
+    result = searcher.search(position, limits)
+    nodes += result.nodes
+    for number, san in enumerate(game.moves):
+        try:
+            move = san_to_move(position, san)
+        except ValueError:
+            return AnnotatedGame(index, game, plies, list(game.moves[number:]), nodes)
+        mover_sign = 1 if position.side_to_move == Color.WHITE else -1
+        best_before = result.score
+        best_san = move_to_san(position, result.best_move) if result.best_move is not None else None
+        played_san = move_to_san(position, move)
+        position.make_move(move)
+        result = searcher.search(position, limits)
+        nodes += result.nodes
+        # result.score è dal punto di vista del giocatore ora al tratto, cioè l'avversario
+        loss = 0 if played_san == best_san else max(_capped(best_before) - _capped(-result.score), 0)
+        plies.append(PlyAnnotation(played_san, -mover_sign * result.score, loss, best_san, classify_loss(loss)))
+    return AnnotatedGame(index, game, plies, [], nodes)
+
+
+# --- Pool di processi ---
+
+class AnnotationTask(NamedTuple):
+    """Una partita da annotare in un processo del pool."""
+    index: int
+    game: PGNGame
+    depth: int
+    tt_entries: int
+
+
+# Motori del processo per dimensione della tabella, svuotata (non riallocata) a ogni partita
+_SEARCHER_CACHE: Dict[int, Searcher] = {}
+
+
+def annotate_task(task: AnnotationTask) -> AnnotatedGame:
+    """Annota una partita con il motore del processo, svuotandone la tabella a inizio partita."""
+    searcher = _SEARCHER_CACHE.get(task.tt_entries)
+    if searcher is None:
+        searcher = _SEARCHER_CACHE[task.tt_entries] = Searcher(table=TranspositionTable(task.tt_entries))
+    searcher.table.clear()
+    return annotate_game(task.game, task.depth, searcher, task.index)
+
+
+def iter_annotated(tasks: Iterable[AnnotationTask], jobs: int) -> Iterator[AnnotatedGame]:
+    """Annota le partite (in parallelo se jobs > 1) restituendole nell'ordine di ingresso."""
+    return pool_map(annotate_task, tasks, jobs)
+
+
+def run_annotate(argv: Optional[List[str]] = None, output: TextIO = sys.stdout, report: TextIO = sys.stderr) -> int:
+    """
+    Annota un file PGN da riga di comando e riporta le partite al minuto su `report`.
+
+    Returns:
+        0 al termine, 2 per argomenti non validi o file illeggibili.
+    """
+    parser = argparse.ArgumentParser(prog="python -m chess annotate",
+                                     description="Annota le partite di un file PGN con valutazioni ed errori.")
+    parser.add_argument("input", help="File PGN da annotare.")
+    parser.add_argument("output", help="File PGN annotato ('-' per lo standard output).")
+    parser.add_argument("--depth", type=int, default=DEFAULT_ANNOTATION_DEPTH,
+                        help=f"Profondità di ricerca per semimossa (default: {DEFAULT_ANNOTATION_DEPTH}).")
+    parser.add_argument("--jobs", type=int, default=1, help="Processi paralleli.")
+    parser.add_argument("--tt-size", type=int, default=DEFAULT_TT_ENTRIES,
+                        help=f"Voci della tabella delle trasposizioni per processo (default: {DEFAULT_TT_ENTRIES}).")
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return int(e.code or 0)
+    if not 1 <= args.depth <= MAX_DEPTH or args.tt_size <= 0:
+        report.write(f"Errore: --depth deve essere tra 1 e {MAX_DEPTH} e --tt-size positivo\n")
+        return 2
+
+    games = plies = nodes = 0
+    flagged = collections.Counter()
+    with contextlib.ExitStack() as files:
+        try:
+            source = files.enter_context(open(args.input, "rb"))
+            destination = (output if args.output == "-"
+                           else files.enter_context(open(args.output, "w", encoding="utf-8")))
+        except OSError as e:
+            report.write(f"Errore: {e}\n")
+            return 2
+
+        start_time = time.monotonic()
+        tasks = (AnnotationTask(index, game, args.depth, args.tt_size)
+                 for index, game in enumerate(read_games(source)))
+        for annotated in iter_annotated(tasks, args.jobs):
+            destination.write(annotated.to_pgn(args.depth))
+            destination.flush()
+            games += 1
+            plies += len(annotated.plies)
+            nodes += annotated.nodes
+            flagged.update(ply.nag for ply in annotated.plies if ply.nag)
+
+    elapsed = time.monotonic() - start_time
+    per_minute = games * 60 / elapsed if elapsed > 0 else 0.0
+    report.write(f"{games} partite, {plies} semimosse, {nodes} nodi in {elapsed:.1f}s "
+                 f"({per_minute:.1f} partite/minuto con {args.jobs} processi): "
+                 f"{flagged['??']} sviste, {flagged['?']} errori\n")
+    return 0
@@ -0,0 +1,500 @@
+# archive.py
+"""
+Archivio binario compatto di partite, con accesso diretto alla singola partita.
+
+Ogni mossa è scritta come il suo rango nella lista ordinata delle mosse della
+posizione: i pezzi del giocatore al tratto sono ordinati per casa e le mosse di
+ciascun pezzo per codice (`position.encode_move`), quindi l'ordine non dipende
+dalla storia della partita. Il codice di una mossa è `rango_mossa << 4 | rango_pezzo`
+in un varint (LEB128): un byte quando il pezzo ha meno di otto mosse prima di
+quella giocata, due negli altri casi. La decodifica genera le mosse di un solo
+pezzo, senza interpretare la SAN né verificare la legalità di tutta la posizione.
+
+Le partite sono raccolte in blocchi compressi con zlib (`block_games` partite
+ciascuno); un indice in fondo al file riporta posizione e lunghezza di ogni
+blocco, così leggere la partita N richiede di decomprimere un solo blocco.
+
+Formato del file:
+    intestazione: magic, versione, partite per blocco, partite, posizione dell'indice
+    blocchi:      zlib(record...), ogni record preceduto dalla sua lunghezza (varint)
+    indice:       per ogni blocco posizione e lunghezza in byte
+Record di una partita: risultato (1 byte), numero di tag, tag come coppie di stringhe
+UTF-8 precedute dalla lunghezza, numero di mosse e codici delle mosse.
+"""
+
+import argparse
+import os
+import struct
+import sys
+import time
+import zlib
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+from .pgn import PGNGame, format_game, move_to_san, read_games, san_to_move
+from .pieces import Piece
+from .position import Move, Position, RESULT_CODES, encode_move
+
+# Intestazione: magic, versione, partite per blocco, partite, posizione dell'indice
+_HEADER = struct.Struct("<4sHIQQ")
+_MAGIC = b"SCAR"
+_VERSION = 1
+# Voce dell'indice: posizione e lunghezza del blocco compresso
+_INDEX_ENTRY = struct.Struct("<QI")
+
+# Partite per blocco: più grandi comprimono meglio, più piccoli rendono più rapido l'accesso diretto
+DEFAULT_BLOCK_GAMES = 64
+_PIECE_BITS = 4  # al più 16 pezzi per colore
+_PIECE_MASK = (1 << _PIECE_BITS) - 1
+_RESULTS_BY_CODE = {code: text for text, code in RESULT_CODES.items()}
+
+
+# --- Varint ---
+
+def write_varint(buffer: bytearray, value: int):
+    """Accoda un intero non negativo in formato LEB128 (7 bit per byte, il bit alto indica il seguito)."""
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def read_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    """
+    Legge un varint LEB128.
+
+    Returns:
+        Il valore e la posizione del byte successivo.
+
+    Raises:
+        ValueError: Se i dati terminano a metà del numero.
+    """
+    value = shift = 0
+    while True:
+        if offset >= len(data):
+            raise ValueError("Varint troncato")
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+# --- Codifica delle mosse per rango ---
+
+def _ranked_pieces(position: Position) -> List[Piece]:
+    pieces = position.board.get_pieces_by_color(position.side_to_move)
+    pieces.sort(key=lambda piece: piece.position)
+    return pieces
+
+
+def _ranked_moves(position: Position, piece: Piece) -> List[Move]:
+    moves = position.piece_moves(piece)
+    moves.sort(key=encode_move)
+    return moves
+
+
+def encode_ranked_move(position: Position, move: Move) -> int:
+    """
+    Codifica una mossa come rango del pezzo (per casa) e rango della mossa tra quelle del pezzo.
+
+    Raises:
+        ValueError: Se la mossa non è tra le mosse pseudo-legali della posizione o se il
+            pezzo ha rango oltre `_PIECE_MASK` (più di 16 pezzi per colore, come da FEN arbitrarie).
+    """
+    for piece_rank, piece in enumerate(_ranked_pieces(position)):
+        if piece.position == move.start:
+            if piece_rank > _PIECE_MASK:
+                raise ValueError(f"Troppi pezzi per colore per codificare la mossa {move.uci()} "
+                                 f"nella posizione {position.to_fen()}")
+            try:
+                return _ranked_moves(position, piece).index(move) << _PIECE_BITS | piece_rank
+            except ValueError:
+                break
+    raise ValueError(f"Mossa {move.uci()} non valida nella posizione {position.to_fen()}")
+
+
+def decode_ranked_move(position: Position, code: int) -> Move:
+    """
+    Inverso di `encode_ranked_move`.
+
+    Raises:
+        ValueError: Se il codice non corrisponde a nessuna mossa della posizione.
+    """
+    pieces = _ranked_pieces(position)
+    piece_rank = code & _PIECE_MASK
+    move_rank = code >> _PIECE_BITS
+    if piece_rank < len(pieces):
+        moves = _ranked_moves(position, pieces[piece_rank])
+        if move_rank < len(moves):
+            return moves[move_rank]
+    raise ValueError(f"Codice di mossa {code} non valido nella posizione {position.to_fen()}")
+
+
+# --- Partite ---
+
+class ArchiveGame(NamedTuple):
+    """Una partita letta dall'archivio."""
+    headers: Dict[str, str]
+    moves: List[Move]
+    result: str
+
+    def start_position(self) -> Position:
+        """La posizione di partenza (tag FEN o posizione iniziale)."""
+        fen = self.headers.get("FEN")
+        return Position.from_fen(fen) if fen else Position()
+
+    def san_moves(self) -> List[str]:
+        """Le mosse della partita in SAN."""
+        position = self.start_position()
+        sans = []
+        for move in self.moves:
+            sans.append(move_to_san(position, move))
+            position.make_move(move)
+        return sans
+
+    def to_pgn(self) -> str:
+        """Il testo PGN della partita."""
+        headers = dict(self.headers)
+        start_fen = headers.pop("FEN", None)  # Lo reinserisce format_game insieme a SetUp
+        return format_game(headers, self.san_moves(), self.result, start_fen)
+
+
+def _write_string(buffer: bytearray, text: str):
+    data = text.encode("utf-8")
+    write_varint(buffer, len(data))
+    buffer += data
+
+
+def _read_string(data: bytes, offset: int) -> Tuple[str, int]:
+    length, offset = read_varint(data, offset)
+    if offset + length > len(data):
+        raise ValueError("Stringa troncata")
+    return bytes(data[offset:offset + length]).decode("utf-8"), offset + length
+
+
+def encode_game(headers: Dict[str, str], moves: List[Move], result: str = "*") -> bytes:
+    """
+    Codifica una partita come record dell'archivio, verificando la legalità delle mosse.
+
+    Args:
+        headers: I tag della partita; un tag FEN indica la posizione di partenza.
+        moves: Le mosse giocate.
+        result: Il risultato ("1-0", "0-1", "1/2-1/2" o "*").
+
+    Raises:
+        ValueError: Per un risultato sconosciuto, una FEN non valida o una mossa illegale.
+    """
+    if result not in RESULT_CODES:
+        raise ValueError(f"Risultato '{result}' sconosciuto")
+    record = bytearray([RESULT_CODES[result]])
+    write_varint(record, len(headers))
+    for name, value in headers.items():
+        _write_string(record, name)
+        _write_string(record, value)
+    fen = headers.get("FEN")
+    position = Position.from_fen(fen) if fen else Position()
+    write_varint(record, len(moves))
+    for move in moves:
+        code = encode_ranked_move(position, move)
+        if not position.is_legal(move):
+            raise ValueError(f"Mossa {move.uci()} illegale nella posizione {position.to_fen()}")
+        write_varint(record, code)
+        position.make_move(move)
+    return bytes(record)
+
+
+def decode_game(record: bytes) -> ArchiveGame:
+    """
+    Inverso di `encode_game`.
+
+    Raises:
+        ValueError: Se il record è troncato o contiene una mossa non valida.
+    """
+    result = _RESULTS_BY_CODE.get(record[0]) if record else None
+    if result is None:
+        raise ValueError("Record di partita non valido")
+    count, offset = read_varint(record, 1)
+    headers: Dict[str, str] = {}
+    for _ in range(count):
+        name, offset = _read_string(record, offset)
+        headers[name], offset = _read_string(record, offset)
+    fen = headers.get("FEN")
+    position = Position.from_fen(fen) if fen else Position()
+    count, offset = read_varint(record, offset)
+    moves: List[Move] = []
+    for _ in range(count):
+        code, offset = read_varint(record, offset)
+        move = decode_ranked_move(position, code)
+        position.make_move(move)
+        moves.append(move)
+    return ArchiveGame(headers, moves, result)
+
+
+def pgn_game_moves(game: PGNGame) -> List[Move]:
+    """
+    Converte le mosse SAN di una partita PGN.
+
+    Raises:
+        ValueError: Se il tag FEN non è valido o una mossa è illegale o ambigua.
+    """
+    fen = game.headers.get("FEN")
+    position = Position.from_fen(fen) if fen else Position()
+    moves = []
+    for san in game.moves:
+        move = san_to_move(position, san)
+        position.make_move(move)
+        moves.append(move)
+    return moves
+
+
+# --- Scrittura e lettura ---
+
+class ArchiveWriter:
+    """
+    Scrive un archivio di partite. Il file è valido solo dopo `close` (o all'uscita
+    dal blocco `with`), che scrive l'ultimo blocco, l'indice e l'intestazione definitiva.
+    """
+
+    def __init__(self, path: str, block_games: int = DEFAULT_BLOCK_GAMES):
+        """
+        Args:
+            path: Il file da creare (sovrascritto se esiste).
+            block_games: Partite per blocco compresso.
+
+        Raises:
+            ValueError: Se block_games non è positivo.
+        """
+        if block_games <= 0:
+            raise ValueError("Il numero di partite per blocco deve essere positivo")
+        self.block_games = block_games
+        self.games = 0
+        self._handle: Optional[BinaryIO] = open(path, "wb")
+        self._handle.write(_HEADER.pack(_MAGIC, _VERSION, block_games, 0, 0))
+        self._block = bytearray()
+        self._index: List[Tuple[int, int]] = []
+
+    def add_game(self, headers: Dict[str, str], moves: List[Move], result: str = "*"):
+        """
+        Aggiunge una partita (vedi `encode_game`).
+
+        Raises:
+            ValueError: Se la partita non è valida; in tal caso l'archivio resta invariato.
+        """
+        record = encode_game(headers, moves, result)
+        write_varint(self._block, len(record))
+        self._block += record
+        self.games += 1
+        if self.games % self.block_games == 0:
+            self._flush_block()
+
+    def add_pgn_game(self, game: PGNGame):
+        """
+        Aggiunge una partita letta da un file PGN.
+
+        Raises:
+            ValueError: Se il tag FEN non è valido o una mossa è illegale o ambigua.
+        """
+        self.add_game(game.headers, pgn_game_moves(game), game.result)
+
+    def _flush_block(self):
+        data = zlib.compress(bytes(self._block), 9)
+        self._index.append((self._handle.tell(), len(data)))
+        self._handle.write(data)
+        self._block = bytearray()
+
+    def close(self):
+        """Completa il file: ultimo blocco, indice dei blocchi e intestazione."""
+        if self._handle is None:
+            return
+        if self._block:
+            self._flush_block()
+        index_offset = self._handle.tell()
+        for offset, length in self._index:
+            self._handle.write(_INDEX_ENTRY.pack(offset, length))
+        self._handle.seek(0)
+        self._handle.write(_HEADER.pack(_MAGIC, _VERSION, self.block_games, self.games, index_offset))
+        self._handle.close()
+        self._handle = None
+
+    def __enter__(self) -> 'ArchiveWriter':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class ArchiveReader:
+    """
+    Legge un archivio di partite: accesso diretto con `reader[n]` o lettura
+    sequenziale iterando. L'ultimo blocco decompresso resta in memoria, quindi le
+    letture ravvicinate nello stesso blocco non lo decomprimono di nuovo.
+    """
+
+    def __init__(self, path: str):
+        """
+        Raises:
+            ValueError: Se il file non è un archivio valido o non è stato completato.
+        """
+        self.path = path
+        self._handle = open(path, "rb")
+        try:
+            self._read_index()
+        except ValueError:
+            self._handle.close()
+            raise
+        self._cached_block = -1
+        self._cached_records: List[bytes] = []
+
+    def _read_index(self):
+        header = self._handle.read(_HEADER.size)
+        if len(header) < _HEADER.size:
+            raise ValueError(f"'{self.path}' non è un archivio di partite valido")
+        magic, version, self.block_games, self.games, index_offset = _HEADER.unpack(header)
+        if magic != _MAGIC or version != _VERSION or self.block_games == 0:
+            raise ValueError(f"'{self.path}' non è un archivio di partite valido")
+        if index_offset == 0:
+            raise ValueError(f"L'archivio '{self.path}' è incompleto (scrittura non terminata)")
+        blocks = -(-self.games // self.block_games)
+        self._handle.seek(index_offset)
+        data = self._handle.read(blocks * _INDEX_ENTRY.size)
+        if len(data) < blocks * _INDEX_ENTRY.size:
+            raise ValueError(f"Indice dell'archivio '{self.path}' troncato")
+        self._index = list(_INDEX_ENTRY.iter_unpack(data))
+
+    def __len__(self) -> int:
+        return self.games
+
+    def _block_records(self, block: int) -> List[bytes]:
+        if block != self._cached_block:
+            offset, length = self._index[block]
+            self._handle.seek(offset)
+            try:
+                data = zlib.decompress(self._handle.read(length))
+            except zlib.error:
+                raise ValueError(f"Blocco {block} dell'archivio '{self.path}' danneggiato") from None
+            records = []
+            position = 0
+            while position < len(data):
+                length, position = read_varint(data, position)
+                records.append(data[position:position + length])
+                position += length
+            self._cached_block, self._cached_records = block, records
+        return self._cached_records
+
+    def __getitem__(self, index: int) -> ArchiveGame:
+        """
+        La partita numero `index` (da 0; gli indici negativi contano dalla fine).
+
+        Raises:
+            IndexError: Se l'indice è fuori dall'archivio.
+            ValueError: Se il blocco è danneggiato.
+        """
+        if index < 0:
+            index += self.games
+        if not 0 <= index < self.games:
+            raise IndexError(f"Partita {index} fuori dall'archivio ({self.games} partite)")
+        block, number = divmod(index, self.block_games)
+        records = self._block_records(block)
+        if number >= len(records):
+            raise ValueError(f"Blocco {block} dell'archivio '{self.path}' danneggiato")
+        return decode_game(records[number])
+
+    def __iter__(self) -> Iterator[ArchiveGame]:
+        for block in range(len(self._index)):
+            for record in self._block_records(block):
+                yield decode_game(record)
+
+    def close(self):
+        self._handle.close()
+
+    def __enter__(self) -> 'ArchiveReader':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def convert_pgn(source: BinaryIO, writer: ArchiveWriter) -> Tuple[int, int]:
+    """
+    Converte le partite di un file PGN aperto in binario.
+
+    Returns:
+        Le partite archiviate e quelle scartate (FEN non valida o mosse illegali).
+    """
+    written = skipped = 0
+    for game in read_games(source):
+        try:
+            writer.add_pgn_game(game)
+        except ValueError:
+            skipped += 1
+            continue
+        written += 1
+    return written, skipped
+
+
+def run_archive(argv: Optional[List[str]] = None, output: TextIO = sys.stdout, report: TextIO = sys.stderr) -> int:
+    """
+    Converte un file PGN in archivio o, con --to-pgn, un archivio (o una sua partita) in PGN.
+
+    Returns:
+        0 al termine, 2 per argomenti non validi o file illeggibili.
+    """
+    parser = argparse.ArgumentParser(prog="python -m chess archive",
+                                     description="Converte tra file PGN e archivi compatti di partite.")
+    parser.add_argument("input", help="File PGN da convertire (o archivio con --to-pgn).")
+    parser.add_argument("output", help="Archivio da creare (o file PGN con --to-pgn, '-' per lo standard output).")
+    parser.add_argument("--to-pgn", action="store_true", help="Estrae le partite dell'archivio in formato PGN.")
+    parser.add_argument("--game", type=int, help="Con --to-pgn, estrae solo la partita indicata (da 1).")
+    parser.add_argument("--block-games", type=int, default=DEFAULT_BLOCK_GAMES,
+                        help=f"Partite per blocco compresso (default: {DEFAULT_BLOCK_GAMES}).")
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return int(e.code or 0)
+    if args.block_games <= 0 or (args.game is not None and (not args.to_pgn or args.game < 1)):
+        report.write("Errore: --block-games deve essere positivo e --game (da 1) richiede --to-pgn\n")
+        return 2
+
+    start_time = time.monotonic()
+    if not args.to_pgn:
+        try:
+            with open(args.input, "rb") as source, ArchiveWriter(args.output, args.block_games) as writer:
+                written, skipped = convert_pgn(source, writer)
+            pgn_size, archive_size = os.path.getsize(args.input), os.path.getsize(args.output)
+        except OSError as e:
+            report.write(f"Errore: {e}\n")
+            return 2
+        ratio = pgn_size / archive_size if archive_size else 0.0
+        report.write(f"{written} partite archiviate ({skipped} scartate) in {time.monotonic() - start_time:.1f}s: "
+                     f"{pgn_size} byte PGN, {archive_size} byte di archivio ({ratio:.1f} volte più piccolo)\n")
+        return 0
+
+    try:
+        reader = ArchiveReader(args.input)
+        destination = output if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    except (OSError, ValueError) as e:
+        report.write(f"Errore: {e}\n")
+        return 2
+    games = plies = 0
+    try:
+        if args.game is not None:
+            if args.game > len(reader):
+                report.write(f"Errore: l'archivio contiene {len(reader)} partite\n")
+                return 2
+            selected = [reader[args.game - 1]]
+        else:
+            selected = reader
+        for game in selected:
+            destination.write(game.to_pgn())
+            games += 1
+            plies += len(game.moves)
+    except ValueError as e:
+        report.write(f"Errore: {e}\n")
+        return 2
+    finally:
+        reader.close()
+        if destination is not output:
+            destination.close()
+    report.write(f"{games} partite, {plies} semimosse estratte in {time.monotonic() - start_time:.1f}s\n")
+    return 0
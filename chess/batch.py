@@ -0,0 +1,397 @@
+# batch.py
+"""
+Generazione vettoriale delle mosse per molte posizioni insieme.
+
+Le posizioni sono rappresentate come array NumPy di bitboard `uint64` (bit = riga * 8 +
+colonna, riga 0 = traversa 1) e tutte le operazioni sono scorrimenti e maschere
+applicati all'intero lotto: i pezzi a lungo raggio usano il riempimento Kogge-Stone,
+che non richiede tabelle né cicli sulle case. Il risultato coincide con
+`Position.legal_moves`, il generatore scalare usato dalla partita, dal motore e
+dagli strumenti di analisi.
+
+Le bitboard non memorizzano `has_moved`: la spinta doppia è ammessa dalla traversa
+iniziale, come fa `Position.from_fen`.
+"""
+
+from typing import List, NamedTuple, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    raise ImportError("La generazione vettoriale delle mosse richiede NumPy: pip install numpy") from None
+
+from .constants import Color
+from .pieces import Pawn, Knight, Bishop, Rook, Queen, King
+from .position import Move, Position, decode_move
+
+# Ordine dei tipi di pezzo sul terzo asse di `PositionBatch.pieces`
+PIECE_TYPES = (Pawn, Knight, Bishop, Rook, Queen, King)
+PAWN, KNIGHT, BISHOP, ROOK, QUEEN, KING = range(len(PIECE_TYPES))
+# Indice del colore sul secondo asse di `PositionBatch.pieces`
+COLOR_INDEX = {Color.WHITE: 0, Color.BLACK: 1}
+# Bit dei diritti di arrocco in `PositionBatch.castling`
+CASTLING_BITS = {'K': 1, 'Q': 2, 'k': 4, 'q': 8}
+# Codici di promozione nelle mosse impacchettate (stessi di `position.encode_move`)
+PROMOTION_CODES = (1, 2, 3, 4)  # Cavallo, Alfiere, Torre, Donna
+# Posizioni elaborate per blocco: limita la memoria delle matrici intermedie
+DEFAULT_CHUNK_SIZE = 8192
+
+_U64 = np.uint64
+_ONE = _U64(1)
+_ZERO = _U64(0)
+_FILE_A = _U64(0x0101010101010101)
+_FILE_B = _FILE_A << _U64(1)
+_FILE_G = _FILE_A << _U64(6)
+_FILE_H = _FILE_A << _U64(7)
+_ALL = _U64(0xFFFFFFFFFFFFFFFF)
+_NOT_A = ~_FILE_A
+_NOT_H = ~_FILE_H
+_NOT_AB = ~(_FILE_A | _FILE_B)
+_NOT_GH = ~(_FILE_G | _FILE_H)
+_RANKS = tuple(_U64(0xFF << (8 * rank)) for rank in range(8))
+
+# Direzioni: (spostamento dell'indice di casa, maschera che elimina l'avvolgimento tra colonne)
+_NORTH, _SOUTH, _EAST, _WEST = (8, _ALL), (-8, _ALL), (1, _NOT_A), (-1, _NOT_H)
+_NORTH_EAST, _NORTH_WEST, _SOUTH_EAST, _SOUTH_WEST = (9, _NOT_A), (7, _NOT_H), (-7, _NOT_A), (-9, _NOT_H)
+_ROOK_DIRECTIONS = (_NORTH, _SOUTH, _EAST, _WEST)
+_BISHOP_DIRECTIONS = (_NORTH_EAST, _NORTH_WEST, _SOUTH_EAST, _SOUTH_WEST)
+_KING_DIRECTIONS = _ROOK_DIRECTIONS + _BISHOP_DIRECTIONS
+_KNIGHT_JUMPS = ((17, _NOT_A), (15, _NOT_H), (10, _NOT_AB), (6, _NOT_GH),
+                 (-6, _NOT_AB), (-10, _NOT_GH), (-15, _NOT_A), (-17, _NOT_H))
+
+# Arrocchi: (diritto, colore, Re da, Re a, Torre da, case da liberare, case che non devono essere attaccate)
+_CASTLING = (
+    ('K', 0, 4, 6, 7, (5, 6), (4, 5, 6)),
+    ('Q', 0, 4, 2, 0, (1, 2, 3), (4, 3, 2)),
+    ('k', 1, 60, 62, 63, (61, 62), (60, 61, 62)),
+    ('q', 1, 60, 58, 56, (57, 58, 59), (60, 59, 58)),
+)
+
+
+class PositionBatch(NamedTuple):
+    """Un lotto di N posizioni come array NumPy."""
+    pieces: np.ndarray  # (N, 2, 6) uint64: colore (0 = Bianco), tipo nell'ordine di PIECE_TYPES
+    side_to_move: np.ndarray  # (N,) uint8: 0 = Bianco, 1 = Nero
+    castling: np.ndarray  # (N,) uint8: somma dei CASTLING_BITS
+    ep_square: np.ndarray  # (N,) int8: indice della casa en passant, -1 se assente
+
+    def __len__(self) -> int:
+        return len(self.side_to_move)
+
+    def slice(self, start: int, stop: int) -> 'PositionBatch':
+        """Sotto-lotto delle posizioni [start, stop)."""
+        return PositionBatch(self.pieces[start:stop], self.side_to_move[start:stop],
+                             self.castling[start:stop], self.ep_square[start:stop])
+
+
+class BatchMoves(NamedTuple):
+    """Mosse legali di un lotto, impacchettate in un unico array."""
+    counts: np.ndarray  # (N,) int32: numero di mosse legali per posizione
+    offsets: np.ndarray  # (N + 1,) int64: le mosse della posizione i sono moves[offsets[i]:offsets[i + 1]]
+    moves: np.ndarray  # (M,) uint16: partenza | arrivo << 6 | promozione << 12, ordinate per posizione e codice
+
+    def moves_for(self, index: int) -> List[Move]:
+        """Decodifica le mosse della posizione `index`."""
+        codes = self.moves[self.offsets[index]:self.offsets[index + 1]]
+        return [decode_move(int(code)) for code in codes]
+
+
+def positions_to_batch(positions: Sequence[Position]) -> PositionBatch:
+    """Converte una sequenza di Position in un lotto di bitboard."""
+    count = len(positions)
+    pieces = np.zeros((count, 2, len(PIECE_TYPES)), dtype=np.uint64)
+    side_to_move = np.zeros(count, dtype=np.uint8)
+    castling = np.zeros(count, dtype=np.uint8)
+    ep_square = np.full(count, -1, dtype=np.int8)
+    type_index = {piece_type: index for index, piece_type in enumerate(PIECE_TYPES)}
+    for index, position in enumerate(positions):
+        boards = [[0] * len(PIECE_TYPES) for _ in range(2)]
+        for piece in position.board.get_all_pieces():
+            row, col = piece.position
+            boards[COLOR_INDEX[piece.color]][type_index[type(piece)]] |= 1 << (row * 8 + col)
+        pieces[index] = boards
+        side_to_move[index] = COLOR_INDEX[position.side_to_move]
+        castling[index] = sum(CASTLING_BITS[right] for right in position.castling)
+        if position.ep_square is not None:
+            ep_square[index] = position.ep_square[0] * 8 + position.ep_square[1]
+    return PositionBatch(pieces, side_to_move, castling, ep_square)
+
+
+def batch_from_fens(fens: Sequence[str]) -> PositionBatch:
+    """Costruisce un lotto da una sequenza di stringhe FEN."""
+    return positions_to_batch([Position.from_fen(fen) for fen in fens])
+
+
+# --- Attacchi insiemistici ---
+
+def _shift(bitboards, delta: int):
+    return bitboards << _U64(delta) if delta > 0 else bitboards >> _U64(-delta)
+
+
+def _step(bitboards, direction):
+    delta, mask = direction
+    return _shift(bitboards, delta) & mask
+
+
+def _slide(bitboards, empty, direction):
+    """Case raggiunte lungo una direzione fino al primo ostacolo incluso (Kogge-Stone)."""
+    delta, mask = direction
+    propagate = empty & mask
+    generated = bitboards | (propagate & _shift(bitboards, delta))
+    propagate = propagate & _shift(propagate, delta)
+    generated = generated | (propagate & _shift(generated, 2 * delta))
+    propagate = propagate & _shift(propagate, 2 * delta)
+    generated = generated | (propagate & _shift(generated, 4 * delta))
+    return _shift(generated, delta) & mask
+
+
+def _knight_attacks(bitboards):
+    attacks = np.zeros_like(bitboards)
+    for jump in _KNIGHT_JUMPS:
+        attacks |= _step(bitboards, jump)
+    return attacks
+
+
+def _king_attacks(bitboards):
+    attacks = np.zeros_like(bitboards)
+    for direction in _KING_DIRECTIONS:
+        attacks |= _step(bitboards, direction)
+    return attacks
+
+
+def _pawn_attacks(bitboards, white):
+    """Case attaccate dai pedoni; `white` indica per ogni elemento se sono pedoni bianchi."""
+    return np.where(white,
+                    _step(bitboards, _NORTH_EAST) | _step(bitboards, _NORTH_WEST),
+                    _step(bitboards, _SOUTH_EAST) | _step(bitboards, _SOUTH_WEST))
+
+
+def _slider_attacks(bitboards, empty, directions):
+    attacks = np.zeros_like(bitboards)
+    for direction in directions:
+        attacks |= _slide(bitboards, empty, direction)
+    return attacks
+
+
+def _attacks_of(pieces, white, occupied):
+    """Unione delle case attaccate dai pezzi (array (N, 6)) di un colore."""
+    empty = ~occupied
+    queens = pieces[:, QUEEN]
+    return (_pawn_attacks(pieces[:, PAWN], white)
+            | _knight_attacks(pieces[:, KNIGHT])
+            | _king_attacks(pieces[:, KING])
+            | _slider_attacks(pieces[:, ROOK] | queens, empty, _ROOK_DIRECTIONS)
+            | _slider_attacks(pieces[:, BISHOP] | queens, empty, _BISHOP_DIRECTIONS))
+
+
+def _is_attacked(targets, attackers, attackers_white, occupied):
+    """Indica, elemento per elemento, se la casa `targets` è attaccata dai pezzi `attackers` (M, 6)."""
+    empty = ~occupied
+    queens = attackers[:, QUEEN]
+    hits = ((_pawn_attacks(targets, ~attackers_white) & attackers[:, PAWN])
+            | (_knight_attacks(targets) & attackers[:, KNIGHT])
+            | (_king_attacks(targets) & attackers[:, KING])
+            | (_slider_attacks(targets, empty, _ROOK_DIRECTIONS) & (attackers[:, ROOK] | queens))
+            | (_slider_attacks(targets, empty, _BISHOP_DIRECTIONS) & (attackers[:, BISHOP] | queens)))
+    return hits != 0
+
+
+def _occupancy(pieces):
+    return np.bitwise_or.reduce(pieces, axis=-1)
+
+
+def _bit_squares(bitboards) -> Tuple[np.ndarray, np.ndarray]:
+    """Scompone un array di bitboard in coppie (indice dell'elemento, casa) per ogni bit acceso."""
+    as_bytes = np.ascontiguousarray(bitboards, dtype='<u8').view(np.uint8).reshape(-1, 8)
+    bits = np.unpackbits(as_bytes, axis=1, bitorder='little')
+    owners, squares = np.nonzero(bits)
+    return owners, squares.astype(np.int64)
+
+
+def attack_sets(batch: PositionBatch, colors: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Case attaccate da un colore in ogni posizione del lotto.
+
+    Args:
+        batch: Il lotto di posizioni.
+        colors: Colore degli attaccanti per ogni posizione (0 = Bianco, 1 = Nero);
+            di default il giocatore al tratto.
+
+    Returns:
+        Array (N,) di bitboard uint64.
+    """
+    if colors is None:
+        colors = batch.side_to_move
+    colors = np.asarray(colors, dtype=np.intp)
+    rows = np.arange(len(batch))
+    return _attacks_of(batch.pieces[rows, colors], colors == 0, _occupancy(_occupancy(batch.pieces)))
+
+
+# --- Generazione ---
+
+class _Candidates(NamedTuple):
+    """Mosse pseudo-legali di un lotto, una per elemento."""
+    position: np.ndarray
+    start: np.ndarray
+    end: np.ndarray
+    promotion: np.ndarray
+    kind: np.ndarray
+    en_passant: np.ndarray
+
+
+def _pseudo_legal(batch: PositionBatch) -> _Candidates:
+    """Genera le mosse pseudo-legali con la stessa semantica di `Position.pseudo_legal_moves`."""
+    count = len(batch)
+    rows = np.arange(count)
+    us = batch.side_to_move.astype(np.intp)
+    white = us == 0
+    own = batch.pieces[rows, us]
+    enemy = batch.pieces[rows, 1 - us]
+    own_occupied = _occupancy(own)
+    enemy_occupied = _occupancy(enemy)
+    occupied = own_occupied | enemy_occupied
+    empty = ~occupied
+    has_ep = batch.ep_square >= 0
+    ep_bits = np.where(has_ep, _ONE << batch.ep_square.clip(0).astype(np.uint64), _ZERO)
+
+    # Un elemento per pezzo del giocatore al tratto
+    flat, squares = _bit_squares(own.reshape(-1))
+    owner, kind = np.divmod(flat, len(PIECE_TYPES))
+    bits = _ONE << squares.astype(np.uint64)
+    piece_white = white[owner]
+    piece_empty = empty[owner]
+    targets = np.zeros_like(bits)
+
+    pawns = kind == PAWN
+    if pawns.any():
+        pawn_bits, pawn_empty, pawn_white = bits[pawns], piece_empty[pawns], piece_white[pawns]
+        single = np.where(pawn_white, pawn_bits << _U64(8), pawn_bits >> _U64(8)) & pawn_empty
+        double = (np.where(pawn_white, single << _U64(8), single >> _U64(8)) & pawn_empty
+                  & np.where(pawn_white, _RANKS[3], _RANKS[4]))
+        captures = _pawn_attacks(pawn_bits, pawn_white) & (enemy_occupied[owner[pawns]] | ep_bits[owner[pawns]])
+        targets[pawns] = single | double | captures
+    for piece_kind, attacks in ((KNIGHT, _knight_attacks), (KING, _king_attacks)):
+        selected = kind == piece_kind
+        targets[selected] = attacks(bits[selected])
+    for piece_kind, directions in ((BISHOP, _BISHOP_DIRECTIONS), (ROOK, _ROOK_DIRECTIONS),
+                                   (QUEEN, _KING_DIRECTIONS)):
+        selected = kind == piece_kind
+        targets[selected] = _slider_attacks(bits[selected], piece_empty[selected], directions)
+    targets &= ~own_occupied[owner]
+
+    # Un elemento per mossa
+    moving, end = _bit_squares(targets)
+    position, start, move_kind = owner[moving], squares[moving], kind[moving]
+    en_passant = (move_kind == PAWN) & has_ep[position] & (end == batch.ep_square[position])
+    en_passant &= ((enemy_occupied[position] >> end.astype(np.uint64)) & _ONE) == 0
+    last_rank = np.where(white[position], 7, 0)
+    promoting = (move_kind == PAWN) & (end // 8 == last_rank)
+    promotion = np.zeros(len(end), dtype=np.int64)
+    if promoting.any():
+        # Ogni promozione diventa quattro mosse consecutive, una per pezzo
+        repeats = np.where(promoting, len(PROMOTION_CODES), 1)
+        position, start, end, move_kind, en_passant, promoting = (
+            np.repeat(array, repeats) for array in (position, start, end, move_kind, en_passant, promoting))
+        first_copy = np.repeat(np.cumsum(repeats) - repeats, repeats)
+        promotion = np.where(promoting, np.arange(len(end)) - first_copy + 1, 0)
+
+    # Arrocchi: Re e Torre nelle case iniziali, case intermedie libere e non attaccate
+    castle_rows, castle_from, castle_to = [], [], []
+    if batch.castling.any():
+        kings = batch.pieces[:, 0, KING] | batch.pieces[:, 1, KING]
+        enemy_attacks = _attacks_of(enemy, ~white, occupied)
+        for right, color, king_from, king_to, rook_from, must_be_empty, must_be_safe in _CASTLING:
+            allowed = (us == color) & ((batch.castling & CASTLING_BITS[right]) != 0)
+            allowed &= ((kings >> _U64(king_from)) & _ONE) != 0
+            allowed &= ((own[:, ROOK] >> _U64(rook_from)) & _ONE) != 0
+            allowed &= (occupied & _U64(sum(1 << square for square in must_be_empty))) == 0
+            allowed &= (enemy_attacks & _U64(sum(1 << square for square in must_be_safe))) == 0
+            selected = np.nonzero(allowed)[0]
+            castle_rows.append(selected)
+            castle_from.append(np.full(len(selected), king_from))
+            castle_to.append(np.full(len(selected), king_to))
+    if castle_rows:
+        castled = np.concatenate(castle_rows)
+        position = np.concatenate([position, castled])
+        start = np.concatenate([start] + castle_from)
+        end = np.concatenate([end] + castle_to)
+        promotion = np.concatenate([promotion, np.zeros(len(castled), dtype=np.int64)])
+        move_kind = np.concatenate([move_kind, np.full(len(castled), KING)])
+        en_passant = np.concatenate([en_passant, np.zeros(len(castled), dtype=bool)])
+    return _Candidates(position, start, end, promotion, move_kind, en_passant)
+
+
+def _legal_mask(batch: PositionBatch, candidates: _Candidates) -> np.ndarray:
+    """Indica quali mosse candidate non lasciano il proprio Re sotto scacco."""
+    position, start, end = candidates.position, candidates.start, candidates.end
+    us = batch.side_to_move[position].astype(np.intp)
+    own = batch.pieces[position, us]
+    enemy = batch.pieces[position, 1 - us].copy()
+    start_bits = _ONE << start.astype(np.uint64)
+    end_bits = _ONE << end.astype(np.uint64)
+
+    enemy &= ~end_bits[:, None]
+    captured_ep = np.where(us == 0, end - 8, end + 8).clip(0, 63).astype(np.uint64)
+    enemy[:, PAWN] &= ~np.where(candidates.en_passant, _ONE << captured_ep, _ZERO)
+
+    own_occupied = (_occupancy(own) & ~start_bits) | end_bits
+    castling = (candidates.kind == KING) & (np.abs(end - start) == 2)
+    if castling.any():
+        rook_from = np.where(end > start, start + 3, start - 4).astype(np.uint64)
+        rook_to = ((start + end) // 2).astype(np.uint64)
+        rook_delta = np.where(castling, (_ONE << rook_from) | (_ONE << rook_to), _ZERO)
+        own_occupied ^= rook_delta
+
+    king = np.where(candidates.kind == KING, end_bits, own[:, KING])
+    occupied = own_occupied | _occupancy(enemy)
+    return ~_is_attacked(king, enemy, us == 1, occupied)
+
+
+def _legal_moves_chunk(batch: PositionBatch) -> Tuple[np.ndarray, np.ndarray]:
+    candidates = _pseudo_legal(batch)
+    legal = _legal_mask(batch, candidates)
+    position = candidates.position[legal]
+    codes = (candidates.start[legal] | (candidates.end[legal] << 6)
+             | (candidates.promotion[legal] << 12)).astype(np.uint16)
+    order = np.lexsort((codes, position))
+    counts = np.bincount(position, minlength=len(batch)).astype(np.int32)
+    return counts, codes[order]
+
+
+def legal_moves_batch(batch: PositionBatch, chunk_size: int = DEFAULT_CHUNK_SIZE) -> BatchMoves:
+    """
+    Genera le mosse legali di tutte le posizioni del lotto.
+
+    Args:
+        batch: Il lotto di posizioni.
+        chunk_size: Posizioni elaborate insieme; blocchi più grandi sono più veloci
+            ma richiedono più memoria per le matrici intermedie.
+
+    Returns:
+        Conteggi, offset e mosse impacchettate (vedi `BatchMoves`).
+    """
+    all_counts, all_moves = [], []
+    for start in range(0, len(batch), chunk_size):
+        counts, moves = _legal_moves_chunk(batch.slice(start, start + chunk_size))
+        all_counts.append(counts)
+        all_moves.append(moves)
+    counts = np.concatenate(all_counts) if all_counts else np.zeros(0, dtype=np.int32)
+    moves = np.concatenate(all_moves) if all_moves else np.zeros(0, dtype=np.uint16)
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return BatchMoves(counts, offsets, moves)
+
+
+def move_masks(batch: PositionBatch) -> np.ndarray:
+    """
+    Maschere delle mosse pseudo-legali per casa di partenza.
+
+    Returns:
+        Array (N, 64) di bitboard uint64: per ogni posizione e casa, le case di arrivo
+        del pezzo del giocatore al tratto che la occupa (arrocco ed en passant inclusi,
+        le quattro promozioni contano come un solo arrivo).
+    """
+    candidates = _pseudo_legal(batch)
+    masks = np.zeros((len(batch), 64), dtype=np.uint64)
+    np.bitwise_or.at(masks, (candidates.position, candidates.start), _ONE << candidates.end.astype(np.uint64))
+    return masks
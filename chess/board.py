@@ -1,11 +1,38 @@
 # board.py
 """Definisce la classe Board per rappresentare la scacchiera."""
 
+import random
 from typing import List, Tuple, Optional, Dict
 
 from .constants import Color, BOARD_SIZE, IDX_TO_COL
 from .pieces import Piece, Pawn, Rook, Knight, Bishop, Queen, King
 
+# Codifica compatta di una casa in un byte: 3 bit di tipo, 1 bit di colore, 1 bit "già mosso"
+PIECE_TYPE_CODES = {Pawn: 1, Knight: 2, Bishop: 3, Rook: 4, Queen: 5, King: 6}
+PIECE_TYPES_BY_CODE = {code: piece_type for piece_type, code in PIECE_TYPE_CODES.items()}
+_TYPE_MASK = 0x07
+_BLACK_FLAG = 0x08
+_MOVED_FLAG = 0x10
+# Dimensione in byte della scacchiera codificata (un byte per casa, a1 = 0, h8 = 63)
+PACKED_BOARD_SIZE = BOARD_SIZE * BOARD_SIZE
+
+# Chiavi Zobrist a 64 bit per (colore, tipo di pezzo, casa), generate con un seme fisso
+# così che gli hash restino stabili tra esecuzioni (servono negli indici su disco)
+_ZOBRIST_RANDOM = random.Random(0x5CACC41)  # nosec B311 - hashing, non crittografia
+ZOBRIST_PIECE_KEYS: Dict[Tuple[Color, type], List[int]] = {
+    (color, piece_type): [_ZOBRIST_RANDOM.getrandbits(64) for _ in range(PACKED_BOARD_SIZE)]
+    for color in (Color.WHITE, Color.BLACK) for piece_type in PIECE_TYPE_CODES
+}
+# Chiavi per lo stato non contenuto nella Board, combinate da Position.zobrist_key
+ZOBRIST_BLACK_TO_MOVE_KEY = _ZOBRIST_RANDOM.getrandbits(64)
+ZOBRIST_CASTLING_KEYS = {right: _ZOBRIST_RANDOM.getrandbits(64) for right in "KQkq"}
+ZOBRIST_EP_FILE_KEYS = [_ZOBRIST_RANDOM.getrandbits(64) for _ in range(BOARD_SIZE)]
+
+
+def zobrist_piece_key(piece: Piece, position: Tuple[int, int]) -> int:
+    """Chiave Zobrist di un pezzo in una casa."""
+    return ZOBRIST_PIECE_KEYS[(piece.color, type(piece))][position[0] * BOARD_SIZE + position[1]]
+
 
 class Board:
     """Rappresenta la scacchiera e gestisce i pezzi."""
@@ -13,6 +40,8 @@ class Board:
     def __init__(self):
         """Inizializza una scacchiera e imposta i pezzi nella posizione iniziale."""
         self._grid: Dict[Tuple[int, int], Piece] = {}
+        self.zobrist_key = 0  # XOR delle chiavi dei pezzi presenti, aggiornato a ogni modifica
+        self.pawn_key = 0  # XOR delle chiavi dei soli pedoni, per la tabella della struttura pedonale
         self.setup_pieces()
 
     def setup_pieces(self):
@@ -43,6 +72,18 @@ class Board:
         self._grid[(7, 5)] = Bishop(Color.BLACK, (7, 5))
         self._grid[(7, 3)] = Queen(Color.BLACK, (7, 3))
         self._grid[(7, 4)] = King(Color.BLACK, (7, 4))
+        self._recompute_keys()
+
+    def _recompute_keys(self):
+        """Ricalcola da zero la chiave Zobrist e quella dei soli pedoni."""
+        key = pawn_key = 0
+        for position, piece in self._grid.items():
+            piece_key = zobrist_piece_key(piece, position)
+            key ^= piece_key
+            if type(piece) is Pawn:
+                pawn_key ^= piece_key
+        self.zobrist_key = key
+        self.pawn_key = pawn_key
 
     def get_piece(self, position: Tuple[int, int]) -> Optional[Piece]:
         """
@@ -84,8 +125,66 @@ class Board:
         piece_to_move.position = end_pos
         self._grid[end_pos] = piece_to_move
 
+        move_key = zobrist_piece_key(piece_to_move, start_pos) ^ zobrist_piece_key(piece_to_move, end_pos)
+        self.zobrist_key ^= move_key
+        if type(piece_to_move) is Pawn:
+            self.pawn_key ^= move_key
+        if captured_piece is not None:
+            captured_key = zobrist_piece_key(captured_piece, end_pos)
+            self.zobrist_key ^= captured_key
+            if type(captured_piece) is Pawn:
+                self.pawn_key ^= captured_key
+
         return captured_piece
 
+    def place_piece(self, piece: Piece, position: Tuple[int, int]):
+        """
+        Colloca un pezzo sulla scacchiera senza alterarne lo stato di movimento.
+        Usato per ricostruire posizioni (es. da FEN) e per annullare le mosse.
+
+        Args:
+            piece: Il pezzo da collocare.
+            position: La posizione (riga, colonna) di destinazione.
+        """
+        replaced = self._grid.get(position)
+        if replaced is not None:
+            replaced_key = zobrist_piece_key(replaced, position)
+            self.zobrist_key ^= replaced_key
+            if type(replaced) is Pawn:
+                self.pawn_key ^= replaced_key
+        has_moved = piece.has_moved
+        piece.position = position
+        piece.has_moved = has_moved
+        self._grid[position] = piece
+        piece_key = zobrist_piece_key(piece, position)
+        self.zobrist_key ^= piece_key
+        if type(piece) is Pawn:
+            self.pawn_key ^= piece_key
+
+    def remove_piece(self, position: Tuple[int, int]) -> Optional[Piece]:
+        """
+        Rimuove il pezzo alla posizione specificata.
+
+        Args:
+            position: La posizione (riga, colonna) da liberare.
+
+        Returns:
+            Il pezzo rimosso, se presente, altrimenti None.
+        """
+        piece = self._grid.pop(position, None)
+        if piece is not None:
+            piece_key = zobrist_piece_key(piece, position)
+            self.zobrist_key ^= piece_key
+            if type(piece) is Pawn:
+                self.pawn_key ^= piece_key
+        return piece
+
+    def clear(self):
+        """Rimuove tutti i pezzi dalla scacchiera."""
+        self._grid = {}
+        self.zobrist_key = 0
+        self.pawn_key = 0
+
     def is_within_bounds(self, position: Tuple[int, int]) -> bool:
         """
         Controlla se una posizione è all'interno dei limiti della scacchiera.
@@ -107,6 +206,52 @@ class Board:
         """Restituisce una lista di tutti i pezzi di un dato colore."""
         return [piece for piece in self._grid.values() if piece.color == color]
 
+    def to_bytes(self) -> bytes:
+        """
+        Codifica la scacchiera in 64 byte, uno per casa (indice riga * 8 + colonna).
+        Ogni byte contiene tipo, colore e stato di movimento del pezzo; 0 indica una casa vuota.
+        """
+        packed = bytearray(PACKED_BOARD_SIZE)
+        for (row, col), piece in self._grid.items():
+            code = PIECE_TYPE_CODES[type(piece)]
+            if piece.color == Color.BLACK:
+                code |= _BLACK_FLAG
+            if piece.has_moved:
+                code |= _MOVED_FLAG
+            packed[row * BOARD_SIZE + col] = code
+        return bytes(packed)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Board':
+        """
+        Ricostruisce una scacchiera codificata con `to_bytes`.
+
+        Args:
+            data: I 64 byte della scacchiera.
+
+        Returns:
+            La nuova Board.
+
+        Raises:
+            ValueError: Se i dati non hanno la lunghezza attesa o contengono codici sconosciuti.
+        """
+        if len(data) != PACKED_BOARD_SIZE:
+            raise ValueError(f"Scacchiera codificata di {len(data)} byte, attesi {PACKED_BOARD_SIZE}")
+        board = cls.__new__(cls)
+        board._grid = {}
+        for index, code in enumerate(data):
+            if code == 0:
+                continue
+            piece_type = PIECE_TYPES_BY_CODE.get(code & _TYPE_MASK)
+            if piece_type is None:
+                raise ValueError(f"Codice pezzo {code} non valido nella casa {index}")
+            position = (index // BOARD_SIZE, index % BOARD_SIZE)
+            piece = piece_type(Color.BLACK if code & _BLACK_FLAG else Color.WHITE, position)
+            piece.has_moved = bool(code & _MOVED_FLAG)
+            board._grid[position] = piece
+        board._recompute_keys()
+        return board
+
     def __str__(self) -> str:
         """Restituisce una rappresentazione testuale semplice della scacchiera (per debug)."""
         board_str_list = []
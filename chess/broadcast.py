@@ -0,0 +1,452 @@
+# broadcast.py
+"""
+Trasmissione di una partita in corso a molti spettatori su un socket locale.
+
+Ogni mossa viene codificata una sola volta come delta compatto (codice della
+mossa, case cambiate, hash Zobrist e orologi) e passata a un thread di I/O che
+la inoltra a tutti gli iscritti con socket non bloccanti: il ciclo delle mosse
+non aspetta mai la rete. Periodicamente viene trasmesso un keyframe con la
+scacchiera completa; chi si collega in ritardo riceve l'ultimo keyframe seguito
+dai delta successivi, e uno spettatore che perde la sincronia (hash diverso o
+numero di sequenza mancante) si riallinea al keyframe seguente.
+"""
+
+import argparse
+import collections
+import selectors
+import socket
+import struct
+import sys
+import threading
+from typing import Any, Deque, Dict, Iterator, List, Optional, TextIO, Tuple
+
+from .board import Board, PACKED_BOARD_SIZE
+from .constants import Color
+from .position import Move, Position, castling_rights_from_board, encode_move, decode_move
+from .ui import UI
+
+DEFAULT_BROADCAST_HOST = "127.0.0.1"
+DEFAULT_BROADCAST_PORT = 8765
+# Mosse tra due keyframe completi
+DEFAULT_KEYFRAME_INTERVAL = 16
+# Byte in attesa oltre i quali uno spettatore troppo lento viene disconnesso
+DEFAULT_MAX_PENDING = 256 * 1024
+
+FRAME_KEYFRAME = 1
+FRAME_DELTA = 2
+
+# Intestazione di ogni frame: tipo, lunghezza del contenuto
+_FRAME_HEADER = struct.Struct("<BH")
+# Keyframe: sequenza, semimossa, tratto, hash, orologi (ms, -1 = assente), poi i 64 byte della scacchiera
+_KEYFRAME = struct.Struct("<IHBQii")
+# Delta: sequenza, semimossa, mossa, tratto, hash, orologi, numero di case cambiate, poi coppie (casa, codice)
+_DELTA = struct.Struct("<IHHBQiiB")
+
+_SIDE_CODES = {Color.WHITE: 0, Color.BLACK: 1}
+_SIDES_BY_CODE = {code: color for color, code in _SIDE_CODES.items()}
+
+
+def parse_address(text: str) -> Tuple[str, int]:
+    """
+    Interpreta un indirizzo "host:porta" (l'host è opzionale, es. ":8765").
+
+    Raises:
+        ValueError: Se la porta manca o non è un numero valido.
+    """
+    host, _, port = text.rpartition(":")
+    if not port.isdigit() or not 0 <= int(port) <= 65535:
+        raise ValueError(f"Indirizzo '{text}' non valido: atteso host:porta")
+    return host or DEFAULT_BROADCAST_HOST, int(port)
+
+
+def position_hash(board: Board, side_to_move: Color) -> int:
+    """Hash Zobrist della posizione trasmessa (arrocchi dedotti dalla scacchiera)."""
+    return Position(board, side_to_move, castling_rights_from_board(board)).zobrist_key()
+
+
+def _clock_ms(clocks: Optional[Tuple[float, float]]) -> Tuple[int, int]:
+    if clocks is None:
+        return -1, -1
+    return int(clocks[0] * 1000), int(clocks[1] * 1000)
+
+
+def encode_keyframe(sequence: int, ply: int, board: Board, side_to_move: Color,
+                    clocks: Optional[Tuple[float, float]] = None) -> bytes:
+    """Codifica un keyframe con la scacchiera completa."""
+    payload = _KEYFRAME.pack(sequence, ply, _SIDE_CODES[side_to_move], position_hash(board, side_to_move),
+                             *_clock_ms(clocks)) + board.to_bytes()
+    return _FRAME_HEADER.pack(FRAME_KEYFRAME, len(payload)) + payload
+
+
+def encode_delta(sequence: int, ply: int, move: Move, before: bytes, board: Board, side_to_move: Color,
+                 clocks: Optional[Tuple[float, float]] = None) -> bytes:
+    """
+    Codifica una mossa come delta rispetto alla scacchiera precedente.
+
+    Args:
+        sequence: Numero di sequenza del frame.
+        ply: Semimosse giocate dopo la mossa.
+        move: La mossa giocata.
+        before: La scacchiera prima della mossa, codificata con `Board.to_bytes`.
+        board: La scacchiera dopo la mossa.
+        side_to_move: Il giocatore al tratto dopo la mossa.
+        clocks: Secondi residui di Bianco e Nero, se la partita ha gli orologi.
+    """
+    after = board.to_bytes()
+    changes = bytearray()
+    for square in range(PACKED_BOARD_SIZE):
+        if before[square] != after[square]:
+            changes += bytes((square, after[square]))
+    payload = _DELTA.pack(sequence, ply, encode_move(move), _SIDE_CODES[side_to_move],
+                          position_hash(board, side_to_move), *_clock_ms(clocks), len(changes) // 2) + changes
+    return _FRAME_HEADER.pack(FRAME_DELTA, len(payload)) + payload
+
+
+class _Subscriber:
+    """Stato di uno spettatore collegato, usato solo dal thread di I/O."""
+
+    __slots__ = ("sock", "pending", "writing")
+
+    def __init__(self, sock: socket.socket, pending: bytearray):
+        self.sock = sock
+        self.pending = pending
+        self.writing = False
+
+
+class BroadcastServer:
+    """
+    Server di trasmissione: `publish_keyframe` e `publish_move` vengono chiamati dal
+    ciclo della partita e si limitano a codificare il frame e accodarlo; un thread
+    di I/O con `selectors` accetta gli spettatori e inoltra i frame a ciascuno.
+    """
+
+    def __init__(self, host: str = DEFAULT_BROADCAST_HOST, port: int = DEFAULT_BROADCAST_PORT,
+                 keyframe_interval: int = DEFAULT_KEYFRAME_INTERVAL, max_pending: int = DEFAULT_MAX_PENDING):
+        """
+        Args:
+            host: Indirizzo di ascolto.
+            port: Porta di ascolto (0 = scelta dal sistema operativo).
+            keyframe_interval: Mosse tra due keyframe completi.
+            max_pending: Byte in attesa oltre i quali uno spettatore viene disconnesso.
+
+        Raises:
+            OSError: Se non è possibile aprire il socket di ascolto.
+            ValueError: Se `keyframe_interval` non è positivo.
+        """
+        if keyframe_interval <= 0:
+            raise ValueError("L'intervallo tra i keyframe deve essere positivo")
+        self.keyframe_interval = keyframe_interval
+        self.max_pending = max_pending
+        self._listener = socket.create_server((host, port))
+        self._listener.setblocking(False)
+        self.address: Tuple[str, int] = self._listener.getsockname()[:2]
+        self._wake_reader, self._wake_writer = socket.socketpair()
+        self._wake_reader.setblocking(False)
+        self._wake_writer.setblocking(False)
+
+        # Stato del thread della partita
+        self._sequence = 0
+        self._last_board = b""
+        self._moves_since_keyframe = 0
+        # Coda verso il thread di I/O: (è un keyframe, frame)
+        self._outbox: Deque[Tuple[bool, bytes]] = collections.deque()
+
+        # Stato del thread di I/O
+        self._selector = selectors.DefaultSelector()
+        self._subscribers: Dict[socket.socket, _Subscriber] = {}
+        self._keyframe = b""
+        self._backlog: List[bytes] = []
+        self.frames = 0
+        self.bytes_sent = 0
+        self.dropped = 0
+        self.max_subscribers = 0
+
+        self._closed = threading.Event()
+        self._thread = threading.Thread(target=self._serve, name="broadcast", daemon=True)
+        self._thread.start()
+
+    # --- Lato partita ---
+
+    def publish_keyframe(self, board: Board, side_to_move: Color, ply: int,
+                         clocks: Optional[Tuple[float, float]] = None):
+        """Trasmette la scacchiera completa (inizio o ripresa di una partita)."""
+        self._sequence += 1
+        self._last_board = board.to_bytes()
+        self._moves_since_keyframe = 0
+        self._enqueue(True, encode_keyframe(self._sequence, ply, board, side_to_move, clocks))
+
+    def publish_move(self, move: Move, board: Board, side_to_move: Color, ply: int,
+                     clocks: Optional[Tuple[float, float]] = None):
+        """Trasmette una mossa già giocata su `board`; ogni `keyframe_interval` mosse segue un keyframe."""
+        if not self._last_board:
+            self.publish_keyframe(board, side_to_move, ply, clocks)
+            return
+        self._sequence += 1
+        frame = encode_delta(self._sequence, ply, move, self._last_board, board, side_to_move, clocks)
+        self._last_board = board.to_bytes()
+        self._moves_since_keyframe += 1
+        self._enqueue(False, frame)
+        if self._moves_since_keyframe >= self.keyframe_interval:
+            self.publish_keyframe(board, side_to_move, ply, clocks)
+
+    def _enqueue(self, keyframe: bool, frame: bytes):
+        self._outbox.append((keyframe, frame))
+        try:
+            self._wake_writer.send(b"\0")
+        except (BlockingIOError, OSError):
+            pass  # Il thread di I/O ha già risvegli in sospeso (o il server è chiuso)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistiche per i report di profilazione."""
+        return {
+            "subscribers": len(self._subscribers),
+            "max_subscribers": self.max_subscribers,
+            "frames": self.frames,
+            "bytes_sent": self.bytes_sent,
+            "dropped": self.dropped,
+        }
+
+    def close(self):
+        """Ferma il thread di I/O e chiude tutte le connessioni."""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._enqueue(False, b"")
+        self._thread.join()
+        for subscriber in list(self._subscribers.values()):
+            subscriber.sock.close()
+        self._subscribers.clear()
+        self._selector.close()
+        self._listener.close()
+        self._wake_reader.close()
+        self._wake_writer.close()
+
+    def __enter__(self) -> 'BroadcastServer':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # --- Thread di I/O ---
+
+    def _serve(self):
+        self._selector.register(self._listener, selectors.EVENT_READ)
+        self._selector.register(self._wake_reader, selectors.EVENT_READ)
+        while not self._closed.is_set():
+            for key, events in self._selector.select(timeout=1.0):
+                if key.fileobj is self._listener:
+                    self._accept()
+                elif key.fileobj is self._wake_reader:
+                    self._drain_wakeups()
+                else:
+                    subscriber = self._subscribers.get(key.fileobj)
+                    if subscriber is None:
+                        continue
+                    if events & selectors.EVENT_READ and not self._check_alive(subscriber):
+                        continue
+                    if events & selectors.EVENT_WRITE:
+                        self._flush(subscriber)
+            self._dispatch_outbox()
+
+    def _accept(self):
+        while True:
+            try:
+                sock, _ = self._listener.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            sock.setblocking(False)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            # Il nuovo spettatore parte dall'ultimo keyframe e dai delta successivi
+            subscriber = _Subscriber(sock, bytearray(self._keyframe + b"".join(self._backlog)))
+            self._subscribers[sock] = subscriber
+            self._selector.register(sock, selectors.EVENT_READ)
+            self.max_subscribers = max(self.max_subscribers, len(self._subscribers))
+            self._flush(subscriber)
+
+    def _drain_wakeups(self):
+        try:
+            while self._wake_reader.recv(4096):
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+
+    def _dispatch_outbox(self):
+        while self._outbox:
+            keyframe, frame = self._outbox.popleft()
+            if not frame:
+                continue
+            if keyframe:
+                self._keyframe = frame
+                self._backlog = []
+            else:
+                self._backlog.append(frame)
+            self.frames += 1
+            for subscriber in list(self._subscribers.values()):
+                subscriber.pending += frame
+                self._flush(subscriber)
+
+    def _flush(self, subscriber: _Subscriber):
+        """Invia quanto possibile senza bloccare; il resto attende che il socket sia scrivibile."""
+        if subscriber.pending:
+            try:
+                sent = subscriber.sock.send(subscriber.pending)
+            except (BlockingIOError, InterruptedError):
+                sent = 0
+            except OSError:
+                self._drop(subscriber)
+                return
+            del subscriber.pending[:sent]
+            self.bytes_sent += sent
+        if len(subscriber.pending) > self.max_pending:
+            self._drop(subscriber)
+            return
+        writing = bool(subscriber.pending)
+        if writing != subscriber.writing:
+            subscriber.writing = writing
+            events = selectors.EVENT_READ | (selectors.EVENT_WRITE if writing else 0)
+            self._selector.modify(subscriber.sock, events)
+
+    def _check_alive(self, subscriber: _Subscriber) -> bool:
+        """Gli spettatori non inviano dati: una lettura vuota o un errore indicano la disconnessione."""
+        try:
+            if subscriber.sock.recv(4096):
+                return True
+        except (BlockingIOError, InterruptedError):
+            return True
+        except OSError:
+            pass
+        self._drop(subscriber, counted=False)
+        return False
+
+    def _drop(self, subscriber: _Subscriber, counted: bool = True):
+        self._subscribers.pop(subscriber.sock, None)
+        self._selector.unregister(subscriber.sock)
+        subscriber.sock.close()
+        if counted:
+            self.dropped += 1
+
+
+# --- Spettatore ---
+
+class BroadcastViewer:
+    """
+    Client di uno spettatore: legge i frame dal server e ricostruisce la scacchiera
+    in locale, verificando l'hash dopo ogni delta.
+    """
+
+    def __init__(self):
+        self._packed = bytearray(PACKED_BOARD_SIZE)
+        self.board: Optional[Board] = None
+        self.side_to_move = Color.WHITE
+        self.ply = 0
+        self.sequence = 0
+        self.clocks: Optional[Tuple[float, float]] = None
+        self.last_move: Optional[Move] = None
+        self.synced = False
+        self.desyncs = 0
+
+    def _set_state(self, sequence: int, ply: int, side_code: int, white_ms: int, black_ms: int):
+        self.sequence = sequence
+        self.ply = ply
+        self.side_to_move = _SIDES_BY_CODE[side_code]
+        self.clocks = None if white_ms < 0 else (white_ms / 1000, black_ms / 1000)
+        self.board = Board.from_bytes(bytes(self._packed))
+
+    def apply(self, frame_type: int, payload: bytes) -> bool:
+        """
+        Applica un frame allo stato locale.
+
+        Returns:
+            True se la scacchiera è stata aggiornata, False se il frame è stato
+            ignorato perché lo spettatore attende un keyframe per riallinearsi.
+
+        Raises:
+            ValueError: Se il frame è di un tipo sconosciuto.
+        """
+        if frame_type == FRAME_KEYFRAME:
+            sequence, ply, side_code, key, white_ms, black_ms = _KEYFRAME.unpack_from(payload)
+            self._packed[:] = payload[_KEYFRAME.size:_KEYFRAME.size + PACKED_BOARD_SIZE]
+            self.last_move = None
+        elif frame_type == FRAME_DELTA:
+            sequence, ply, move_code, side_code, key, white_ms, black_ms, count = _DELTA.unpack_from(payload)
+            if not self.synced or sequence != self.sequence + 1:
+                self._lose_sync()
+                return False
+            for offset in range(_DELTA.size, _DELTA.size + 2 * count, 2):
+                self._packed[payload[offset]] = payload[offset + 1]
+            self.last_move = decode_move(move_code)
+        else:
+            raise ValueError(f"Frame di tipo {frame_type} sconosciuto")
+        self._set_state(sequence, ply, side_code, white_ms, black_ms)
+        if position_hash(self.board, self.side_to_move) != key:
+            self._lose_sync()
+            return False
+        self.synced = True
+        return True
+
+    def _lose_sync(self):
+        if self.synced:
+            self.desyncs += 1
+        self.synced = False
+
+
+def read_frames(sock: socket.socket) -> Iterator[Tuple[int, bytes]]:
+    """Legge i frame (tipo, contenuto) da un socket bloccante fino alla chiusura della connessione."""
+    buffer = bytearray()
+    while True:
+        while len(buffer) >= _FRAME_HEADER.size:
+            frame_type, length = _FRAME_HEADER.unpack_from(buffer)
+            end = _FRAME_HEADER.size + length
+            if len(buffer) < end:
+                break
+            yield frame_type, bytes(buffer[_FRAME_HEADER.size:end])
+            del buffer[:end]
+        data = sock.recv(65536)
+        if not data:
+            return
+        buffer += data
+
+
+def run_watch(argv: Optional[List[str]] = None, output: TextIO = sys.stdout) -> int:
+    """
+    Segue da spettatore una partita trasmessa con --broadcast.
+
+    Returns:
+        0 quando il server chiude la connessione, 1 se non è raggiungibile, 2 per argomenti non validi.
+    """
+    parser = argparse.ArgumentParser(prog="python -m chess watch",
+                                     description="Segue da spettatore una partita trasmessa.")
+    parser.add_argument("address", nargs="?", default=f"{DEFAULT_BROADCAST_HOST}:{DEFAULT_BROADCAST_PORT}",
+                        help="Indirizzo host:porta del server (default: %(default)s).")
+    try:
+        args = parser.parse_args(argv)
+        address = parse_address(args.address)
+    except SystemExit as e:
+        return int(e.code or 0)
+    except ValueError as e:
+        output.write(f"Errore: {e}\n")
+        return 2
+
+    try:
+        sock = socket.create_connection(address)
+    except OSError as e:
+        output.write(f"Impossibile collegarsi a {args.address}: {e}\n")
+        return 1
+    ui = UI()
+    viewer = BroadcastViewer()
+    with sock:
+        for frame_type, payload in read_frames(sock):
+            was_synced = viewer.synced
+            if viewer.apply(frame_type, payload):
+                ui.display_board(viewer.board, viewer.side_to_move)
+                if viewer.clocks is not None:
+                    white, black = viewer.clocks
+                    ui.display_message(f"Orologi: Bianco {white:.1f}s, Nero {black:.1f}s", level="info")
+            elif was_synced:
+                ui.display_message("Sincronia persa: in attesa del prossimo keyframe.", level="warning")
+    ui.display_message("Trasmissione terminata.", level="info")
+    return 0
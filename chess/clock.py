@@ -0,0 +1,155 @@
+# clock.py
+"""
+Orologi di gioco con controllo di tempo base + incremento (Fischer o Bronstein).
+
+Il tempo è misurato con `time.monotonic`, quindi non risente delle correzioni
+dell'orologio di sistema. L'orologio non ha thread propri: chi lo usa chiede il
+tempo residuo e quanto manca alla bandierina, e ne ricava il timeout della
+propria attesa, così la caduta viene rilevata con precisione al millisecondo.
+"""
+
+import time
+from typing import Callable, Dict, NamedTuple, Optional, Tuple
+
+from .constants import Color
+
+INCREMENT_FISCHER = "fischer"
+INCREMENT_BRONSTEIN = "bronstein"
+INCREMENT_MODES = (INCREMENT_FISCHER, INCREMENT_BRONSTEIN)
+
+# Sotto questa soglia (secondi) l'orologio mostra anche i decimi
+TENTHS_THRESHOLD = 10.0
+
+
+class TimeControl(NamedTuple):
+    """Controllo di tempo: secondi iniziali, incremento per mossa e modalità dell'incremento."""
+    base: float
+    increment: float = 0.0
+    mode: str = INCREMENT_FISCHER
+
+
+def parse_time_control(text: str, mode: str = INCREMENT_FISCHER) -> TimeControl:
+    """
+    Interpreta un controllo di tempo "base+incremento" in secondi (es. "300+2" o "10+0.1").
+
+    Raises:
+        ValueError: Se il testo non è valido, i valori sono negativi o la modalità è sconosciuta.
+    """
+    base, _, increment = text.partition("+")
+    try:
+        control = TimeControl(float(base), float(increment or 0), mode)
+    except ValueError:
+        raise ValueError(f"Controllo di tempo '{text}' non valido: atteso base+incremento in secondi") from None
+    if control.base <= 0 or control.increment < 0:
+        raise ValueError(f"Controllo di tempo '{text}' non valido: la base deve essere positiva")
+    if mode not in INCREMENT_MODES:
+        raise ValueError(f"Modalità di incremento '{mode}' sconosciuta (attese: {', '.join(INCREMENT_MODES)})")
+    return control
+
+
+def format_clock(seconds: float) -> str:
+    """Formatta il tempo residuo come "m:ss", con i decimi sotto i dieci secondi (troncati, mai arrotondati per eccesso)."""
+    seconds = max(seconds, 0.0)
+    if seconds < TENTHS_THRESHOLD:
+        tenths = int(seconds * 10)
+        return f"0:{tenths // 10:02d}.{tenths % 10}"
+    whole = int(seconds)
+    return f"{whole // 60}:{whole % 60:02d}"
+
+
+def _other(color: Color) -> Color:
+    return Color.BLACK if color == Color.WHITE else Color.WHITE
+
+
+class ChessClock:
+    """
+    Orologio a due facce: scorre solo il tempo del giocatore attivo.
+    `press` chiude il turno di chi ha mosso, applica l'incremento e avvia l'avversario.
+    """
+
+    def __init__(self, control: TimeControl, now: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            control: Il controllo di tempo.
+            now: Sorgente del tempo in secondi (sostituibile nei test).
+        """
+        self.control = control
+        self._now = now
+        self._remaining: Dict[Color, float] = {}
+        self.active: Optional[Color] = None
+        self._turn_start = 0.0
+        self.reset()
+
+    def reset(self):
+        """Riporta entrambi i giocatori al tempo iniziale, con l'orologio fermo."""
+        self._remaining = {Color.WHITE: self.control.base, Color.BLACK: self.control.base}
+        self.active = None
+
+    def start(self, color: Color = Color.WHITE):
+        """Avvia il tempo del giocatore indicato."""
+        self.active = color
+        self._turn_start = self._now()
+
+    def stop(self):
+        """Ferma l'orologio, addebitando al giocatore attivo il tempo trascorso."""
+        if self.active is not None:
+            self._remaining[self.active] -= self._now() - self._turn_start
+            self.active = None
+
+    def time_left(self, color: Color) -> float:
+        """Secondi residui del giocatore (negativi dopo la caduta della bandierina)."""
+        remaining = self._remaining[color]
+        if color == self.active:
+            remaining -= self._now() - self._turn_start
+        return remaining
+
+    def snapshot(self) -> Tuple[float, float]:
+        """Secondi residui di Bianco e Nero in questo istante."""
+        return self.time_left(Color.WHITE), self.time_left(Color.BLACK)
+
+    def flagged(self) -> Optional[Color]:
+        """Il giocatore attivo se il suo tempo è esaurito, altrimenti None."""
+        if self.active is not None and self.time_left(self.active) <= 0:
+            return self.active
+        return None
+
+    def seconds_until_flag(self) -> Optional[float]:
+        """Secondi alla caduta della bandierina del giocatore attivo (None se l'orologio è fermo)."""
+        if self.active is None:
+            return None
+        return max(self.time_left(self.active), 0.0)
+
+    def seconds_until_display_change(self) -> Optional[float]:
+        """Secondi al prossimo cambiamento di `format_clock` per il giocatore attivo."""
+        remaining = self.seconds_until_flag()
+        if remaining is None:
+            return None
+        step = 0.1 if remaining < TENTHS_THRESHOLD else 1.0
+        return remaining % step or step
+
+    def press(self) -> Color:
+        """
+        Chiude il turno del giocatore attivo e avvia l'avversario.
+        Con Fischer l'incremento si aggiunge sempre; con Bronstein si restituisce il
+        tempo usato nella mossa, fino al valore dell'incremento.
+
+        Returns:
+            Il giocatore ora al tratto.
+
+        Raises:
+            RuntimeError: Se l'orologio è fermo.
+        """
+        if self.active is None:
+            raise RuntimeError("L'orologio non è in funzione")
+        now = self._now()
+        used = now - self._turn_start
+        mover = self.active
+        self._remaining[mover] -= used
+        if self._remaining[mover] > 0:
+            if self.control.mode == INCREMENT_BRONSTEIN:
+                self._remaining[mover] += min(self.control.increment, used)
+            else:
+                self._remaining[mover] += self.control.increment
+        self.active = _other(mover)
+        self._turn_start = now
+        return self.active
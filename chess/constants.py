@@ -34,9 +34,30 @@ COMMANDS = {
     "/abbandona": "Abbandona la partita corrente.",
     "/patta": "Proponi una patta all'avversario.",
     "/mosse": "Mostra l'elenco delle mosse giocate.",
+    "/riprendi": "Riprende l'ultima partita salvata (anche dopo un'interruzione).",
+    "/vai": "Mostra la scacchiera a una semimossa (es. /vai 10).",
+    "/avanti": "Mostra la semimossa successiva a quella visualizzata.",
+    "/indietro": "Mostra la semimossa precedente a quella visualizzata.",
+    "/catture": "Elenca le catture disponibili e se sono sicure (scambio statico).",
+    "/suggerisci": "Suggerisce una mossa dall'analisi in background (richiede --analysis).",
+    "/esplora": "Mostra le mosse giocate dalla posizione nelle partite indicizzate.",
+    "/orologio": "Mostra il tempo residuo dei giocatori (richiede --tc).",
     "/esci": "Esci dal gioco.",
 }
 
+# Modalità alternative avviabili da riga di comando (python -m chess <modalità>)
+CLI_MODES = {
+    "uci": "Avvia il motore in modalità protocollo UCI per interfacce grafiche e tornei.",
+    "match": "Gioca un torneo tra due motori (--engine-a, --engine-b, --games, --jobs).",
+    "tablebase": "Genera le tablebase di finale (KQK, KRK, KPK, KBNK) o interroga una FEN (--probe).",
+    "index": "Indicizza le posizioni di un file PGN per /esplora (index partite.pgn --jobs N).",
+    "nnue": "Esporta i pesi iniziali della rete (--export FILE) o misura le valutazioni al secondo.",
+    "mate": "Dimostra o confuta i matti di un file di problemi (--fen-file F --max-depth N --jobs K).",
+    "watch": "Segue da spettatore una partita avviata con --broadcast (watch HOST:PORTA).",
+    "annotate": "Annota un file PGN con valutazioni, errori e sviste (annotate in.pgn out.pgn --depth D --jobs N).",
+    "archive": "Converte un file PGN in archivio compatto o lo estrae in PGN (archive in.pgn out.scar, --to-pgn).",
+}
+
 # Usato da UI.set_accent_color per validare i colori
 RICH_COLORS: set[str] = {
     "black", "red", "green", "yellow", "blue", "magenta", "cyan", "white",
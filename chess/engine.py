@@ -0,0 +1,362 @@
+# engine.py
+"""Motore di ricerca: approfondimento iterativo con alpha-beta in forma negamax e quiescenza."""
+
+import threading
+import time
+from array import array
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from .pieces import Queen
+from .position import Move, Position
+from .evaluation import PIECE_VALUES, ClassicEvaluator
+from .see import see
+
+# Punteggio di matto (a cui si sottrae la distanza in semimosse) e limite superiore
+MATE_SCORE = 100000
+INFINITY = 1000000
+MAX_DEPTH = 64
+
+
+class SearchLimits:
+    """Limiti di una ricerca; se nessun limite è impostato la ricerca prosegue fino a `stop`."""
+
+    def __init__(self,
+                 depth: Optional[int] = None,
+                 nodes: Optional[int] = None,
+                 movetime: Optional[float] = None,
+                 root_moves: Optional[List[Move]] = None):
+        """
+        Args:
+            depth: Profondità massima in semimosse.
+            nodes: Numero massimo di nodi visitati.
+            movetime: Tempo massimo in secondi.
+            root_moves: Mosse da esaminare alla radice, nell'ordine dato (None = tutte le
+                mosse legali); a parità di punteggio viene scelta la prima.
+        """
+        self.depth = depth
+        self.nodes = nodes
+        self.movetime = movetime
+        self.root_moves = root_moves
+
+
+class SearchInfo(NamedTuple):
+    """Resoconto di un'iterazione completata dell'approfondimento iterativo."""
+    depth: int
+    score: int
+    nodes: int
+    elapsed: float
+    pv: List[Move]
+
+
+class SearchResult(NamedTuple):
+    """Risultato finale di una ricerca."""
+    best_move: Optional[Move]
+    score: int
+    depth: int
+    nodes: int
+    pv: List[Move]
+
+
+class _SearchAborted(Exception):
+    """Sollevata internamente quando un limite o una richiesta di stop interrompe la ricerca."""
+
+
+# Voci predefinite della tabella delle trasposizioni (circa 4,5 MB più le mosse)
+DEFAULT_TT_ENTRIES = 1 << 18
+# Tipo di punteggio memorizzato: esatto, limite inferiore (taglio beta), limite superiore (nessuna mossa sopra alpha)
+TT_EXACT = 0
+TT_LOWER = 1
+TT_UPPER = 2
+
+
+class TranspositionTable:
+    """
+    Tabella a dimensione fissa dei risultati della ricerca, indicizzata dai bit bassi
+    dello Zobrist; a parità di slot si conserva la voce più profonda, salvo che la
+    nuova riguardi la stessa posizione. Tenuta tra una ricerca e l'altra, rende
+    quasi gratuite le posizioni già viste (es. le semimosse successive di una partita).
+    """
+
+    def __init__(self, entries: int = DEFAULT_TT_ENTRIES):
+        """
+        Args:
+            entries: Numero di voci, arrotondato alla potenza di due superiore.
+
+        Raises:
+            ValueError: Se `entries` non è positivo.
+        """
+        if entries <= 0:
+            raise ValueError("La tabella delle trasposizioni deve avere almeno una voce")
+        size = 1 << (entries - 1).bit_length()
+        self._mask = size - 1
+        self._keys = array("Q", bytes(8 * size))
+        self._depths = array("b", bytes(size))
+        self._flags = array("B", bytes(size))
+        self._scores = array("i", bytes(4 * size))
+        self._filled = bytearray(size)
+        self._moves: List[Optional[Move]] = [None] * size
+        self.probes = 0
+        self.hits = 0
+
+    def __len__(self) -> int:
+        return self._mask + 1
+
+    def get(self, key: int) -> Optional[Tuple[int, int, int, Optional[Move]]]:
+        """Restituisce (profondità, tipo, punteggio, mossa migliore) per la chiave, o None se assente."""
+        self.probes += 1
+        slot = key & self._mask
+        if not self._filled[slot] or self._keys[slot] != key:
+            return None
+        self.hits += 1
+        return self._depths[slot], self._flags[slot], self._scores[slot], self._moves[slot]
+
+    def store(self, key: int, depth: int, flag: int, score: int, move: Optional[Move]):
+        """Memorizza un risultato; una voce più profonda di un'altra posizione viene conservata."""
+        slot = key & self._mask
+        if self._filled[slot] and self._keys[slot] != key and self._depths[slot] > depth:
+            return
+        self._filled[slot] = 1
+        self._keys[slot] = key
+        self._depths[slot] = depth
+        self._flags[slot] = flag
+        self._scores[slot] = score
+        self._moves[slot] = move
+
+    def clear(self):
+        """Svuota la tabella e azzera le statistiche."""
+        self._filled = bytearray(len(self))
+        self._moves = [None] * len(self)
+        self.probes = self.hits = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistiche di utilizzo della tabella."""
+        return {
+            "entries": len(self),
+            "probes": self.probes,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.probes, 4) if self.probes else 0.0,
+        }
+
+
+def _score_to_table(score: int, ply: int) -> int:
+    """I punteggi di matto si memorizzano come distanza dal nodo, non dalla radice."""
+    if score >= MATE_SCORE - MAX_DEPTH:
+        return score + ply
+    if score <= -MATE_SCORE + MAX_DEPTH:
+        return score - ply
+    return score
+
+
+def _score_from_table(score: int, ply: int) -> int:
+    if score >= MATE_SCORE - MAX_DEPTH:
+        return score - ply
+    if score <= -MATE_SCORE + MAX_DEPTH:
+        return score + ply
+    return score
+
+
+class Searcher:
+    """
+    Ricerca alpha-beta con approfondimento iterativo su una `Position`.
+    La posizione viene modificata con make/unmake e restituita intatta al termine,
+    anche se la ricerca viene interrotta.
+    """
+
+    def __init__(self, evaluate_fn: Optional[Callable[[Position], int]] = None, quiescence: bool = True,
+                 table: Optional[TranspositionTable] = None):
+        """
+        Args:
+            evaluate_fn: Funzione di valutazione statica dal punto di vista del giocatore al tratto
+                (None = valutazione classica con una tabella dei pedoni propria).
+            quiescence: Se True, alle foglie prosegue con le sole catture che non perdono materiale.
+            table: Tabella delle trasposizioni condivisa tra le ricerche (None = nessuna).
+        """
+        self.evaluate = evaluate_fn if evaluate_fn is not None else ClassicEvaluator()
+        self.quiescence = quiescence
+        self.table = table
+        self.nodes = 0
+        self._limits = SearchLimits()
+        self._stop_event: Optional[threading.Event] = None
+        self._deadline: Optional[float] = None
+        self._pv_moves: List[Move] = []
+        self._root_moves: List[Move] = []
+
+    def search(self,
+               position: Position,
+               limits: SearchLimits,
+               stop_event: Optional[threading.Event] = None,
+               on_info: Optional[Callable[[SearchInfo], None]] = None) -> SearchResult:
+        """
+        Cerca la mossa migliore per il giocatore al tratto.
+
+        Args:
+            position: La posizione da analizzare.
+            limits: I limiti di profondità, nodi e tempo.
+            stop_event: Evento che, se impostato, interrompe la ricerca al più presto.
+            on_info: Callback invocata al termine di ogni iterazione.
+
+        Returns:
+            Il SearchResult dell'ultima iterazione completata.
+        """
+        start_time = time.monotonic()
+        self.nodes = 0
+        self._limits = limits
+        self._stop_event = stop_event
+        self._deadline = start_time + limits.movetime if limits.movetime is not None else None
+        self._pv_moves = []
+
+        all_legal = position.legal_moves()
+        legal_moves = all_legal
+        if limits.root_moves is not None:
+            legal_moves = [move for move in limits.root_moves if move in all_legal]
+        if not legal_moves:
+            score = -MATE_SCORE if not all_legal and position.in_check() else 0
+            return SearchResult(None, score, 0, 0, [])
+        self._root_moves = legal_moves
+
+        result = SearchResult(legal_moves[0], 0, 0, 0, [legal_moves[0]])
+        root_ply = position.ply
+        max_depth = min(limits.depth or MAX_DEPTH, MAX_DEPTH)
+
+        for depth in range(1, max_depth + 1):
+            try:
+                score, pv = self._negamax(position, depth, -INFINITY, INFINITY, 0)
+            except _SearchAborted:
+                while position.ply > root_ply:
+                    position.unmake_move()
+                break
+            self._pv_moves = pv
+            result = SearchResult(pv[0] if pv else result.best_move, score, depth, self.nodes, pv)
+            if on_info is not None:
+                on_info(SearchInfo(depth, score, self.nodes, time.monotonic() - start_time, pv))
+            if abs(score) >= MATE_SCORE - MAX_DEPTH:
+                break  # Matto trovato: approfondire non cambia la mossa
+
+        return result._replace(nodes=self.nodes)
+
+    def _check_limits(self):
+        """Interrompe la ricerca se è stato richiesto lo stop o se un limite è stato raggiunto."""
+        if self._stop_event is not None and self._stop_event.is_set():
+            raise _SearchAborted()
+        if self._limits.nodes is not None and self.nodes >= self._limits.nodes:
+            raise _SearchAborted()
+        if self._deadline is not None and time.monotonic() >= self._deadline:
+            raise _SearchAborted()
+
+    def _order_moves(self, position: Position, moves: List[Move], ply: int,
+                     table_move: Optional[Move] = None) -> List[Move]:
+        """Ordina le mosse: prima quella della variante principale, poi quella della tabella, poi le catture (MVV-LVA)."""
+        pv_move = self._pv_moves[ply] if ply < len(self._pv_moves) else None
+
+        def move_key(move: Move) -> int:
+            if move == pv_move:
+                return -INFINITY
+            if move == table_move:
+                return -INFINITY + 1
+            victim = position.board.get_piece(move.end)
+            if victim is None:
+                return 0 if move.promotion is None else -PIECE_VALUES[Queen]
+            attacker = position.board.get_piece(move.start)
+            return -(10 * PIECE_VALUES[type(victim)] - PIECE_VALUES[type(attacker)] // 10)
+
+        return sorted(moves, key=move_key)
+
+    def _negamax(self, position: Position, depth: int, alpha: int, beta: int, ply: int):
+        """Ricerca alpha-beta; restituisce (punteggio, variante principale)."""
+        self.nodes += 1
+        self._check_limits()
+
+        if depth == 0:
+            if self.quiescence:
+                return self._quiescence(position, alpha, beta, ply)
+            return self.evaluate(position), []
+
+        table_move = None
+        key = 0
+        original_alpha = alpha
+        if self.table is not None:
+            key = position.zobrist_key()
+            entry = self.table.get(key)
+            if entry is not None:
+                entry_depth, flag, entry_score, table_move = entry
+                entry_score = _score_from_table(entry_score, ply)
+                if ply > 0 and entry_depth >= depth and (
+                        flag == TT_EXACT
+                        or (flag == TT_LOWER and entry_score >= beta)
+                        or (flag == TT_UPPER and entry_score <= alpha)):
+                    return entry_score, [table_move] if table_move is not None else []
+
+        color = position.side_to_move
+        best_score = -INFINITY
+        best_pv: List[Move] = []
+        legal_count = 0
+
+        moves = self._root_moves if ply == 0 else position.pseudo_legal_moves()
+        for move in self._order_moves(position, moves, ply, table_move):
+            position.make_move(move)
+            if position.in_check(color):
+                position.unmake_move()
+                continue
+            legal_count += 1
+            score, child_pv = self._negamax(position, depth - 1, -beta, -alpha, ply + 1)
+            score = -score
+            position.unmake_move()
+
+            if score > best_score:
+                best_score = score
+                best_pv = [move] + child_pv
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                break
+
+        if legal_count == 0:
+            return (-MATE_SCORE + ply if position.in_check(color) else 0), []
+        # Con le mosse alla radice limitate il punteggio della radice non vale per la posizione
+        if self.table is not None and (ply > 0 or self._limits.root_moves is None):
+            if best_score >= beta:
+                flag = TT_LOWER
+            elif best_score > original_alpha:
+                flag = TT_EXACT
+            else:
+                flag = TT_UPPER
+            self.table.store(key, depth, flag, _score_to_table(best_score, ply), best_pv[0] if best_pv else None)
+        return best_score, best_pv
+
+    def _quiescence(self, position: Position, alpha: int, beta: int, ply: int):
+        """
+        Ricerca di quiescenza: la valutazione statica fa da soglia ("stand pat") e si
+        esplorano solo catture e promozioni a Donna, scartando quelle con SEE negativa.
+        Restituisce (punteggio, variante principale).
+        """
+        self.nodes += 1
+        self._check_limits()
+
+        stand_pat = self.evaluate(position)
+        if stand_pat >= beta or ply >= MAX_DEPTH:
+            return stand_pat, []
+        alpha = max(alpha, stand_pat)
+        best_score, best_pv = stand_pat, []
+        color = position.side_to_move
+
+        captures = [move for move in position.pseudo_legal_moves()
+                    if move.promotion == "q" or (move.promotion is None and position.is_capture(move))]
+        for move in self._order_moves(position, captures, ply):
+            if see(position, move) < 0:
+                continue
+            position.make_move(move)
+            if position.in_check(color):
+                position.unmake_move()
+                continue
+            score, child_pv = self._quiescence(position, -beta, -alpha, ply + 1)
+            score = -score
+            position.unmake_move()
+
+            if score > best_score:
+                best_score = score
+                best_pv = [move] + child_pv
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                break
+        return best_score, best_pv
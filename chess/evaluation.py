@@ -0,0 +1,387 @@
+# evaluation.py
+"""
+Valutazione statica classica di una posizione: materiale, tabelle pezzo-casa e
+struttura pedonale. I termini dei pedoni dipendono solo dalla loro disposizione,
+che cambia di rado tra una mossa e l'altra, e sono conservati in una tabella
+indicizzata dalla chiave Zobrist dei soli pedoni (`Board.pawn_key`).
+"""
+
+import weakref
+from array import array
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Type
+
+from .constants import Color, BOARD_SIZE
+from .pieces import Piece, Pawn, Rook, Knight, Bishop, Queen, King
+from .position import Position
+from .profiling import PROFILER
+
+# Funzioni di valutazione selezionabili con --eval
+EVALUATORS = ("classic", "nnue")
+
+# Valori del materiale in centipedoni
+PIECE_VALUES: Dict[Type[Piece], int] = {
+    Pawn: 100, Knight: 320, Bishop: 330, Rook: 500, Queen: 900, King: 0,
+}
+
+# Tabelle pezzo-casa dal punto di vista del Bianco: la prima riga è la traversa 1
+_PAWN_TABLE = [
+    [0, 0, 0, 0, 0, 0, 0, 0],
+    [5, 10, 10, -20, -20, 10, 10, 5],
+    [5, -5, -10, 0, 0, -10, -5, 5],
+    [0, 0, 0, 20, 20, 0, 0, 0],
+    [5, 5, 10, 25, 25, 10, 5, 5],
+    [10, 10, 20, 30, 30, 20, 10, 10],
+    [50, 50, 50, 50, 50, 50, 50, 50],
+    [0, 0, 0, 0, 0, 0, 0, 0],
+]
+_KNIGHT_TABLE = [
+    [-50, -40, -30, -30, -30, -30, -40, -50],
+    [-40, -20, 0, 5, 5, 0, -20, -40],
+    [-30, 5, 10, 15, 15, 10, 5, -30],
+    [-30, 0, 15, 20, 20, 15, 0, -30],
+    [-30, 5, 15, 20, 20, 15, 5, -30],
+    [-30, 0, 10, 15, 15, 10, 0, -30],
+    [-40, -20, 0, 0, 0, 0, -20, -40],
+    [-50, -40, -30, -30, -30, -30, -40, -50],
+]
+_BISHOP_TABLE = [
+    [-20, -10, -10, -10, -10, -10, -10, -20],
+    [-10, 5, 0, 0, 0, 0, 5, -10],
+    [-10, 10, 10, 10, 10, 10, 10, -10],
+    [-10, 0, 10, 10, 10, 10, 0, -10],
+    [-10, 5, 5, 10, 10, 5, 5, -10],
+    [-10, 0, 5, 10, 10, 5, 0, -10],
+    [-10, 0, 0, 0, 0, 0, 0, -10],
+    [-20, -10, -10, -10, -10, -10, -10, -20],
+]
+_ROOK_TABLE = [
+    [0, 0, 0, 5, 5, 0, 0, 0],
+    [-5, 0, 0, 0, 0, 0, 0, -5],
+    [-5, 0, 0, 0, 0, 0, 0, -5],
+    [-5, 0, 0, 0, 0, 0, 0, -5],
+    [-5, 0, 0, 0, 0, 0, 0, -5],
+    [-5, 0, 0, 0, 0, 0, 0, -5],
+    [5, 10, 10, 10, 10, 10, 10, 5],
+    [0, 0, 0, 0, 0, 0, 0, 0],
+]
+_QUEEN_TABLE = [
+    [-20, -10, -10, -5, -5, -10, -10, -20],
+    [-10, 0, 5, 0, 0, 0, 0, -10],
+    [-10, 5, 5, 5, 5, 5, 0, -10],
+    [0, 0, 5, 5, 5, 5, 0, -5],
+    [-5, 0, 5, 5, 5, 5, 0, -5],
+    [-10, 0, 5, 5, 5, 5, 0, -10],
+    [-10, 0, 0, 0, 0, 0, 0, -10],
+    [-20, -10, -10, -5, -5, -10, -10, -20],
+]
+_KING_TABLE = [
+    [20, 30, 10, 0, 0, 10, 30, 20],
+    [20, 20, 0, 0, 0, 0, 20, 20],
+    [-10, -20, -20, -20, -20, -20, -20, -10],
+    [-20, -30, -30, -40, -40, -30, -30, -20],
+    [-30, -40, -40, -50, -50, -40, -40, -30],
+    [-30, -40, -40, -50, -50, -40, -40, -30],
+    [-30, -40, -40, -50, -50, -40, -40, -30],
+    [-30, -40, -40, -50, -50, -40, -40, -30],
+]
+
+PIECE_SQUARE_TABLES: Dict[Type[Piece], List[List[int]]] = {
+    Pawn: _PAWN_TABLE, Knight: _KNIGHT_TABLE, Bishop: _BISHOP_TABLE,
+    Rook: _ROOK_TABLE, Queen: _QUEEN_TABLE, King: _KING_TABLE,
+}
+
+
+def piece_square_value(piece: Piece) -> int:
+    """
+    Restituisce il valore (materiale + posizione) di un pezzo dal punto di vista del suo colore.
+
+    Args:
+        piece: Il pezzo da valutare.
+
+    Returns:
+        Il valore in centipedoni.
+    """
+    row, col = piece.position
+    piece_type = type(piece)
+    table_row = row if piece.color == Color.WHITE else BOARD_SIZE - 1 - row
+    return PIECE_VALUES[piece_type] + PIECE_SQUARE_TABLES[piece_type][table_row][col]
+
+
+# --- Struttura pedonale ---
+
+# Penalità per ogni pedone in più sulla stessa colonna e per ogni pedone isolato
+DOUBLED_PAWN_PENALTY = 15
+ISOLATED_PAWN_PENALTY = 12
+# Bonus del pedone passato per traversa relativa (0 = traversa iniziale del colore)
+PASSED_PAWN_BONUS = (0, 5, 10, 20, 35, 60, 100, 0)
+# Bonus per i pedoni davanti al Re arroccato: una e due traverse più avanti
+PAWN_SHIELD_NEAR = 10
+PAWN_SHIELD_FAR = 5
+# Il Re è considerato al riparo dei pedoni solo sulle prime due traverse del suo colore
+_SHIELD_KING_ROWS = 2
+
+
+class PawnEntry(NamedTuple):
+    """Termini della struttura pedonale di una disposizione dei pedoni."""
+    structure: Tuple[int, int]  # pedoni doppiati, isolati e passati: (Bianco, Nero)
+    shields: Tuple[Tuple[int, ...], Tuple[int, ...]]  # scudo per ogni colonna del Re: (Bianco, Nero)
+
+
+def _relative_row(color: Color, row: int) -> int:
+    return row if color == Color.WHITE else BOARD_SIZE - 1 - row
+
+
+def pawn_structure(white_pawns: Sequence[Tuple[int, int]], black_pawns: Sequence[Tuple[int, int]]) -> PawnEntry:
+    """
+    Calcola i termini della struttura pedonale per entrambi i colori.
+
+    Args:
+        white_pawns: Case (riga, colonna) dei pedoni bianchi.
+        black_pawns: Case dei pedoni neri.
+
+    Returns:
+        Il PawnEntry con i punteggi in centipedoni dal punto di vista di ciascun colore.
+    """
+    structure = []
+    shields = []
+    for color, own, enemy in ((Color.WHITE, white_pawns, black_pawns), (Color.BLACK, black_pawns, white_pawns)):
+        files = [0] * BOARD_SIZE
+        for _, col in own:
+            files[col] += 1
+        score = 0
+        for count in files:
+            if count > 1:
+                score -= DOUBLED_PAWN_PENALTY * (count - 1)
+        for row, col in own:
+            if (col == 0 or not files[col - 1]) and (col == BOARD_SIZE - 1 or not files[col + 1]):
+                score -= ISOLATED_PAWN_PENALTY
+            # Passato: nessun pedone avversario davanti su questa colonna o su quelle vicine,
+            # e nessun pedone proprio davanti (del pedone doppiato conta solo quello avanzato)
+            rank = _relative_row(color, row)
+            if (not any(abs(enemy_col - col) <= 1 and _relative_row(color, enemy_row) > rank
+                        for enemy_row, enemy_col in enemy)
+                    and not any(own_col == col and _relative_row(color, own_row) > rank for own_row, own_col in own)):
+                score += PASSED_PAWN_BONUS[rank]
+        structure.append(score)
+
+        shield_squares = {(_relative_row(color, row), col) for row, col in own}
+        color_shields = []
+        for king_col in range(BOARD_SIZE):
+            shield = 0
+            for col in range(max(king_col - 1, 0), min(king_col + 2, BOARD_SIZE)):
+                if (1, col) in shield_squares:
+                    shield += PAWN_SHIELD_NEAR
+                elif (2, col) in shield_squares:
+                    shield += PAWN_SHIELD_FAR
+            color_shields.append(shield)
+        shields.append(tuple(color_shields))
+    return PawnEntry((structure[0], structure[1]), (shields[0], shields[1]))
+
+
+# Voci predefinite della tabella dei pedoni (potenza di due)
+DEFAULT_PAWN_HASH_ENTRIES = 1 << 14
+
+
+class PawnHashTable:
+    """
+    Tabella a dimensione fissa dei termini della struttura pedonale, indicizzata dai
+    bit bassi della chiave dei pedoni; in caso di collisione la voce nuova sostituisce
+    la vecchia. I dati sono in array compatti, quindi la memoria occupata è nota.
+    """
+
+    def __init__(self, entries: int = DEFAULT_PAWN_HASH_ENTRIES):
+        """
+        Args:
+            entries: Numero di voci, arrotondato alla potenza di due superiore.
+
+        Raises:
+            ValueError: Se `entries` non è positivo.
+        """
+        if entries <= 0:
+            raise ValueError("La tabella dei pedoni deve avere almeno una voce")
+        size = 1 << (entries - 1).bit_length()
+        self._mask = size - 1
+        self._keys = array("Q", bytes(8 * size))
+        self._filled = bytearray(size)
+        self._structure = array("h", bytes(2 * 2 * size))
+        self._shields = array("h", bytes(2 * 2 * BOARD_SIZE * size))
+        self.probes = 0
+        self.hits = 0
+        self.overwrites = 0
+
+    def __len__(self) -> int:
+        return self._mask + 1
+
+    def get(self, key: int) -> Optional[PawnEntry]:
+        """Restituisce la voce per la chiave, o None se assente (conta l'accesso nelle statistiche)."""
+        self.probes += 1
+        slot = key & self._mask
+        if not self._filled[slot] or self._keys[slot] != key:
+            return None
+        self.hits += 1
+        shields = self._shields[slot * 2 * BOARD_SIZE:(slot + 1) * 2 * BOARD_SIZE]
+        return PawnEntry((self._structure[2 * slot], self._structure[2 * slot + 1]),
+                         (tuple(shields[:BOARD_SIZE]), tuple(shields[BOARD_SIZE:])))
+
+    def store(self, key: int, entry: PawnEntry):
+        """Memorizza una voce, sostituendo quella eventualmente presente nello stesso slot."""
+        slot = key & self._mask
+        if self._filled[slot] and self._keys[slot] != key:
+            self.overwrites += 1
+        self._filled[slot] = 1
+        self._keys[slot] = key
+        self._structure[2 * slot] = entry.structure[0]
+        self._structure[2 * slot + 1] = entry.structure[1]
+        self._shields[slot * 2 * BOARD_SIZE:(slot + 1) * 2 * BOARD_SIZE] = array("h", entry.shields[0] + entry.shields[1])
+
+    def clear(self):
+        """Svuota la tabella e azzera le statistiche."""
+        self._filled = bytearray(len(self))
+        self.probes = self.hits = self.overwrites = 0
+
+    def memory_bytes(self) -> int:
+        """Memoria occupata dai dati della tabella, in byte."""
+        return (self._keys.itemsize * len(self._keys) + len(self._filled)
+                + self._structure.itemsize * len(self._structure) + self._shields.itemsize * len(self._shields))
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistiche per i report di profilazione."""
+        return {
+            "entries": len(self),
+            "memory_kb": round(self.memory_bytes() / 1024, 1),
+            "probes": self.probes,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.probes, 4) if self.probes else 0.0,
+            "overwrites": self.overwrites,
+        }
+
+
+# Tabella predefinita di `evaluate`, senza lock: va usata da un solo thread. Le ricerche
+# usano ciascuna la propria tabella (`ClassicEvaluator`)
+PAWN_HASH = PawnHashTable()
+# Tabelle in uso (quella predefinita e quelle dei ClassicEvaluator), riassunte nel report di --profile
+_REPORTED_PAWN_TABLES: "weakref.WeakSet[PawnHashTable]" = weakref.WeakSet([PAWN_HASH])
+
+
+def pawn_hash_stats() -> Dict[str, Any]:
+    """Statistiche complessive delle tabelle dei pedoni in uso, per i report di profilazione."""
+    tables = list(_REPORTED_PAWN_TABLES)
+    probes = sum(table.probes for table in tables)
+    hits = sum(table.hits for table in tables)
+    return {
+        "tables": len(tables),
+        "entries": sum(len(table) for table in tables),
+        "memory_kb": round(sum(table.memory_bytes() for table in tables) / 1024, 1),
+        "probes": probes,
+        "hits": hits,
+        "hit_rate": round(hits / probes, 4) if probes else 0.0,
+        "overwrites": sum(table.overwrites for table in tables),
+    }
+
+
+PROFILER.add_report_source("pawn_hash", pawn_hash_stats)
+
+
+def pawn_score(position: Position, white_pawns: Sequence[Tuple[int, int]],
+               black_pawns: Sequence[Tuple[int, int]], table: Optional[PawnHashTable] = PAWN_HASH) -> int:
+    """
+    Punteggio della struttura pedonale dal punto di vista del Bianco, letto dalla
+    tabella quando possibile. Lo scudo dipende dalla colonna del Re, che non fa
+    parte della chiave: la voce conserva lo scudo per ogni colonna.
+
+    Args:
+        position: La posizione (fornisce la chiave dei pedoni e le case dei Re).
+        white_pawns: Case dei pedoni bianchi.
+        black_pawns: Case dei pedoni neri.
+        table: La tabella da usare (None = calcola sempre).
+    """
+    entry = table.get(position.board.pawn_key) if table is not None else None
+    if entry is None:
+        entry = pawn_structure(white_pawns, black_pawns)
+        if table is not None:
+            table.store(position.board.pawn_key, entry)
+    score = entry.structure[0] - entry.structure[1]
+    for index, color in enumerate((Color.WHITE, Color.BLACK)):
+        king = position.king_square(color)
+        if king is not None and _relative_row(color, king[0]) < _SHIELD_KING_ROWS:
+            shield = entry.shields[index][king[1]]
+            score += shield if color == Color.WHITE else -shield
+    return score
+
+
+def evaluate_pieces(position: Position) -> int:
+    """Materiale e tabelle pezzo-casa, dal punto di vista del giocatore al tratto."""
+    score = 0
+    for piece in position.board.get_all_pieces():
+        value = piece_square_value(piece)
+        score += value if piece.color == Color.WHITE else -value
+    return score if position.side_to_move == Color.WHITE else -score
+
+
+def evaluate(position: Position, pawn_table: Optional[PawnHashTable] = PAWN_HASH) -> int:
+    """
+    Valuta staticamente la posizione.
+
+    Args:
+        position: La posizione da valutare.
+        pawn_table: La tabella dei pedoni da usare (None = calcola sempre).
+
+    Returns:
+        Il punteggio in centipedoni dal punto di vista del giocatore al tratto.
+    """
+    score = 0
+    white_pawns: List[Tuple[int, int]] = []
+    black_pawns: List[Tuple[int, int]] = []
+    for piece in position.board.get_all_pieces():
+        value = piece_square_value(piece)
+        if piece.color == Color.WHITE:
+            score += value
+            if type(piece) is Pawn:
+                white_pawns.append(piece.position)
+        else:
+            score -= value
+            if type(piece) is Pawn:
+                black_pawns.append(piece.position)
+    score += pawn_score(position, white_pawns, black_pawns, pawn_table)
+    return score if position.side_to_move == Color.WHITE else -score
+
+
+class ClassicEvaluator:
+    """
+    Valutazione classica con una tabella dei pedoni propria. Ogni `Searcher` ne crea
+    una, così ricerche su thread diversi (es. quella UCI e il thread principale) non
+    scrivono nella stessa tabella.
+    """
+
+    def __init__(self, pawn_entries: int = DEFAULT_PAWN_HASH_ENTRIES):
+        """
+        Args:
+            pawn_entries: Voci della tabella dei pedoni.
+        """
+        self.pawn_table = PawnHashTable(pawn_entries)
+        _REPORTED_PAWN_TABLES.add(self.pawn_table)
+
+    def __call__(self, position: Position) -> int:
+        return evaluate(position, self.pawn_table)
+
+
+def create_evaluator(name: str = "classic", weights_path: Optional[str] = None) -> Callable[[Position], int]:
+    """
+    Crea la funzione di valutazione indicata, da passare a `Searcher`.
+
+    Args:
+        name: "classic" (materiale e tabelle pezzo-casa) o "nnue" (rete neurale, richiede NumPy).
+        weights_path: File dei pesi della rete; senza, la rete iniziale derivata dalla valutazione classica.
+
+    Returns:
+        La funzione di valutazione.
+
+    Raises:
+        ValueError: Se il nome non è tra EVALUATORS o il file dei pesi non è valido.
+    """
+    if name == "classic":
+        return ClassicEvaluator()
+    if name == "nnue":
+        from .nnue import NNUEEvaluator, load_weights
+        return NNUEEvaluator(load_weights(weights_path) if weights_path else None)
+    raise ValueError(f"Valutazione sconosciuta '{name}': scegli tra {', '.join(EVALUATORS)}")
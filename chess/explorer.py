@@ -0,0 +1,359 @@
+# explorer.py
+"""
+Indice su disco delle posizioni di una raccolta PGN, per l'esploratore di aperture.
+
+Per ogni semimossa di ogni partita l'indice contiene un record di 16 byte:
+hash Zobrist della posizione (8 byte, big-endian), posizione in byte della partita
+nel PGN (5 byte), mossa giocata da quella posizione (2 byte) e risultato (1 byte).
+I record sono ordinati per hash, quindi una ricerca è una ricerca binaria sul file
+mappato in memoria, senza caricarlo.
+"""
+
+import argparse
+import heapq
+import mmap
+import os
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from .position import (Move, Position, WHITE_WINS, BLACK_WINS, DRAW, RESULT_CODES,
+                       encode_move, decode_move)
+from .pgn import read_games, san_to_move, game_start_position, move_to_san
+
+RECORD_SIZE = 16
+_RECORD = struct.Struct(">8s5sHB")
+# Intestazione: magic, versione, lunghezza del percorso del PGN, record, partite
+_HEADER = struct.Struct("<4sHHQQ")
+_MAGIC = b"SCIX"
+_VERSION = 1
+
+# Risultati per codice nei record; la mossa è codificata con `encode_move` (None a fine partita)
+_RESULTS_BY_CODE = {code: text for text, code in RESULT_CODES.items()}
+# Colonna di MoveStatistics (dopo la mossa, la SAN e il totale) per ogni risultato
+_RESULT_COLUMNS = {WHITE_WINS: 1, DRAW: 2, BLACK_WINS: 3}
+
+# Partite per blocco di lavoro: abbastanza per ammortizzare l'avvio, abbastanza pochi per bilanciare
+DEFAULT_CHUNK_GAMES = 2000
+RUN_BUFFER_SIZE = 1 << 16
+# File parziali aperti insieme in una fusione: oltre si fonde a più passate
+MERGE_FANOUT = 64
+
+
+def encode_record(key: int, offset: int, move: Optional[Move], result: str) -> bytes:
+    """Codifica un record dell'indice."""
+    return _RECORD.pack(key.to_bytes(8, "big"), offset.to_bytes(5, "big"), encode_move(move),
+                        RESULT_CODES.get(result, 0))
+
+
+class IndexEntry(NamedTuple):
+    """Un record dell'indice decodificato."""
+    key: int
+    offset: int
+    move: Optional[Move]
+    result: str
+
+
+def decode_record(data: bytes) -> IndexEntry:
+    """Decodifica un record di RECORD_SIZE byte."""
+    key, offset, move, result = _RECORD.unpack(data)
+    return IndexEntry(int.from_bytes(key, "big"), int.from_bytes(offset, "big"), decode_move(move),
+                      _RESULTS_BY_CODE.get(result, "*"))
+
+
+class MoveStatistics(NamedTuple):
+    """Statistiche di una mossa giocata da una posizione."""
+    move: Move
+    san: str
+    games: int
+    white_wins: int
+    draws: int
+    black_wins: int
+
+
+# --- Costruzione ---
+
+def find_game_offsets(pgn_path: str) -> List[int]:
+    """Restituisce la posizione in byte dell'inizio di ogni partita del file, leggendolo in streaming."""
+    offsets = []
+    in_movetext = True
+    offset = 0
+    with open(pgn_path, "rb") as handle:
+        for line in handle:
+            stripped = line.strip()
+            if stripped.startswith(b"["):
+                if in_movetext:
+                    offsets.append(offset)
+                in_movetext = False
+            elif stripped and not stripped.startswith(b"%"):
+                if in_movetext and not offsets:
+                    offsets.append(offset)  # partita senza tag in testa al file
+                in_movetext = True
+            offset += len(line)
+    return offsets
+
+
+def _index_chunk(task: Tuple[str, int, Optional[int], str]) -> Tuple[int, int, int]:
+    """
+    Indicizza le partite tra due posizioni del PGN e scrive i record ordinati in un file parziale.
+
+    Returns:
+        Partite lette, record scritti, partite interrotte da una mossa non valida.
+    """
+    pgn_path, start, end, run_path = task
+    records: List[bytes] = []
+    games = errors = 0
+    with open(pgn_path, "rb") as handle:
+        for game in read_games(handle, start, end):
+            games += 1
+            try:
+                position = game_start_position(game)
+            except ValueError:
+                errors += 1
+                continue
+            for san in game.moves:
+                try:
+                    move = san_to_move(position, san)
+                except ValueError:
+                    errors += 1
+                    break
+                records.append(encode_record(position.zobrist_key(), game.offset, move, game.result))
+                position.make_move(move)
+            records.append(encode_record(position.zobrist_key(), game.offset, None, game.result))
+    records.sort()
+    with open(run_path, "wb") as run:
+        run.write(b"".join(records))
+    return games, len(records), errors
+
+
+def _iter_run(path: str) -> Iterator[bytes]:
+    with open(path, "rb") as handle:
+        while True:
+            block = handle.read(RUN_BUFFER_SIZE * RECORD_SIZE)
+            if not block:
+                return
+            for offset in range(0, len(block), RECORD_SIZE):
+                yield block[offset:offset + RECORD_SIZE]
+
+
+def _write_merged(run_paths: List[str], output: BinaryIO) -> None:
+    """Fonde in ordine i record dei file parziali e li scrive a blocchi."""
+    buffer: List[bytes] = []
+    for record in heapq.merge(*(_iter_run(path) for path in run_paths)):
+        buffer.append(record)
+        if len(buffer) >= RUN_BUFFER_SIZE:
+            output.write(b"".join(buffer))
+            buffer = []
+    output.write(b"".join(buffer))
+
+
+def _reduce_runs(run_paths: List[str], index_path: str, fanout: int, temporary: List[str]) -> List[str]:
+    """
+    Fonde i file parziali a gruppi di al massimo `fanout` finché ne restano al più
+    `fanout`, così nessuna fusione tiene aperti più file di così.
+
+    Args:
+        run_paths: I file parziali ordinati.
+        index_path: L'indice da creare, usato come prefisso dei file intermedi.
+        fanout: File fusi al massimo in una volta.
+        temporary: Lista a cui aggiungere i file intermedi creati, da rimuovere alla fine.
+
+    Returns:
+        I file parziali rimasti.
+    """
+    merge_pass = 0
+    while len(run_paths) > fanout:
+        merged = []
+        for number in range(0, len(run_paths), fanout):
+            group = run_paths[number:number + fanout]
+            if len(group) == 1:
+                merged.append(group[0])
+                continue
+            path = f"{index_path}.merge{merge_pass}_{number // fanout}"
+            temporary.append(path)
+            with open(path, "wb") as output:
+                _write_merged(group, output)
+            for run_path in group:
+                os.remove(run_path)
+            merged.append(path)
+        run_paths = merged
+        merge_pass += 1
+    return run_paths
+
+
+def build_index(pgn_path: str, index_path: str, jobs: int = 1,
+                chunk_games: int = DEFAULT_CHUNK_GAMES, merge_fanout: int = MERGE_FANOUT) -> Dict[str, int]:
+    """
+    Costruisce l'indice di un file PGN. Le partite vengono divise in blocchi analizzati
+    in parallelo, ognuno produce un file parziale ordinato e i file parziali vengono
+    fusi in streaming nel file finale, a più passate se sono più di `merge_fanout`.
+
+    Args:
+        pgn_path: Il file PGN da indicizzare.
+        index_path: Il file dell'indice da creare.
+        jobs: Processi paralleli.
+        chunk_games: Partite per blocco di lavoro.
+        merge_fanout: File parziali fusi al massimo in una volta.
+
+    Returns:
+        Un riassunto con il numero di partite, record ed errori.
+
+    Raises:
+        ValueError: Se `merge_fanout` è minore di 2.
+    """
+    if merge_fanout < 2:
+        raise ValueError("merge_fanout deve essere almeno 2")
+    offsets = find_game_offsets(pgn_path)
+    bounds = offsets[::max(chunk_games, 1)]
+    tasks = []
+    for number, start in enumerate(bounds):
+        end = bounds[number + 1] if number + 1 < len(bounds) else None
+        tasks.append((pgn_path, start, end, f"{index_path}.run{number}"))
+
+    temporary = [task[3] for task in tasks]
+    games = records = errors = 0
+    try:
+        if jobs > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                results = list(pool.map(_index_chunk, tasks))
+        else:
+            results = [_index_chunk(task) for task in tasks]
+        for chunk_games_read, chunk_records, chunk_errors in results:
+            games += chunk_games_read
+            records += chunk_records
+            errors += chunk_errors
+
+        path_bytes = os.path.abspath(pgn_path).encode("utf-8")
+        temp_path = index_path + ".tmp"
+        with open(temp_path, "wb") as output:
+            output.write(_HEADER.pack(_MAGIC, _VERSION, len(path_bytes), records, games))
+            output.write(path_bytes)
+            _write_merged(_reduce_runs(temporary[:], index_path, merge_fanout, temporary), output)
+        os.replace(temp_path, index_path)
+    finally:
+        for path in temporary:
+            if os.path.exists(path):
+                os.remove(path)
+    return {"games": games, "records": records, "errors": errors}
+
+
+# --- Interrogazione ---
+
+class PositionIndex:
+    """Indice mappato in memoria; ogni ricerca costa O(log n) letture di 8 byte."""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Il file dell'indice.
+
+        Raises:
+            OSError: Se il file non può essere aperto.
+            ValueError: Se il file non è un indice valido.
+        """
+        self.path = path
+        with open(path, "rb") as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < _HEADER.size:
+            self._map.close()
+            raise ValueError(f"Indice '{path}' troncato")
+        magic, version, path_length, self.record_count, self.game_count = _HEADER.unpack_from(self._map)
+        self._data_offset = _HEADER.size + path_length
+        if (magic != _MAGIC or version != _VERSION
+                or len(self._map) != self._data_offset + self.record_count * RECORD_SIZE):
+            self._map.close()
+            raise ValueError(f"Indice '{path}' non valido")
+        self.pgn_path = self._map[_HEADER.size:self._data_offset].decode("utf-8")
+
+    def __len__(self) -> int:
+        return self.record_count
+
+    def _key_at(self, index: int) -> bytes:
+        offset = self._data_offset + index * RECORD_SIZE
+        return self._map[offset:offset + 8]
+
+    def lookup(self, key: int) -> List[IndexEntry]:
+        """Restituisce tutti i record con l'hash dato."""
+        target = key.to_bytes(8, "big")
+        low, high = 0, self.record_count
+        while low < high:
+            middle = (low + high) // 2
+            if self._key_at(middle) < target:
+                low = middle + 1
+            else:
+                high = middle
+        entries = []
+        while low < self.record_count and self._key_at(low) == target:
+            offset = self._data_offset + low * RECORD_SIZE
+            entries.append(decode_record(self._map[offset:offset + RECORD_SIZE]))
+            low += 1
+        return entries
+
+    def move_statistics(self, position: Position) -> Tuple[int, List[MoveStatistics]]:
+        """
+        Statistiche delle mosse giocate dalla posizione nelle partite indicizzate.
+
+        Returns:
+            Il numero di partite che hanno raggiunto la posizione e le statistiche
+            per mossa, dalla più giocata.
+        """
+        entries = self.lookup(position.zobrist_key())
+        games = len({entry.offset for entry in entries})
+        totals: Dict[Move, List[int]] = {}
+        for entry in entries:
+            if entry.move is None:
+                continue
+            counts = totals.setdefault(entry.move, [0, 0, 0, 0])
+            counts[0] += 1
+            if entry.result in _RESULT_COLUMNS:
+                counts[_RESULT_COLUMNS[entry.result]] += 1
+        legal = set(position.legal_moves())
+        statistics = [MoveStatistics(move, move_to_san(position, move), *counts)
+                      for move, counts in totals.items() if move in legal]  # scarta le collisioni di hash
+        statistics.sort(key=lambda stats: (-stats.games, stats.san))
+        return games, statistics
+
+    def game_headers(self, offset: int) -> Dict[str, str]:
+        """Legge i tag della partita che inizia alla posizione data del PGN indicizzato."""
+        with open(self.pgn_path, "rb") as handle:
+            for game in read_games(handle, offset):
+                return game.headers
+        return {}
+
+    def close(self):
+        """Chiude la mappa del file."""
+        self._map.close()
+
+
+def run_index(argv: Optional[List[str]] = None) -> int:
+    """
+    Riga di comando: costruisce l'indice delle posizioni di un file PGN.
+
+    Returns:
+        Il codice di uscita del processo.
+    """
+    parser = argparse.ArgumentParser(prog="python -m chess index",
+                                     description="Indicizza le posizioni di un file PGN per /esplora.")
+    parser.add_argument("pgn", help="Il file PGN da indicizzare.")
+    parser.add_argument("-o", "--output", help="File dell'indice (default: stesso nome con estensione .idx).")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Processi paralleli.")
+    parser.add_argument("--chunk-games", type=int, default=DEFAULT_CHUNK_GAMES, help="Partite per blocco.")
+    args = parser.parse_args(argv)
+
+    output = args.output or os.path.splitext(args.pgn)[0] + ".idx"
+    start_time = time.monotonic()
+    try:
+        summary = build_index(args.pgn, output, args.jobs, args.chunk_games)
+    except OSError as e:
+        print(f"Errore: {e}", file=sys.stderr)
+        return 1
+    elapsed = time.monotonic() - start_time
+    print(f"Indicizzate {summary['games']} partite ({summary['records']} posizioni) in {elapsed:.1f}s "
+          f"-> {output}")
+    if summary["errors"]:
+        print(f"Attenzione: {summary['errors']} partite interrotte da mosse non valide.", file=sys.stderr)
+    return 0
+
+
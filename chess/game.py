@@ -4,18 +4,40 @@
 from typing import List, Optional, Tuple
 
 from .constants import Color
-from .board import Board
 from .ui import UI
 from .utils import parse_move as parse_algebraic_abbreviated, coords_to_algebraic, algebraic_to_coords
-from .pieces import Piece, Pawn
+from .pieces import Piece, Pawn, King
+from .journal import GameJournal, GameSnapshot
+from .history import PositionHistory, DEFAULT_CHECKPOINT_INTERVAL
+from .explorer import PositionIndex
+from .analysis import AnalysisWorker, format_evaluation
+from .position import Move, Position
+from .pgn import move_to_san, san_to_move
+from .see import see
+from .broadcast import BroadcastServer
+from .clock import ChessClock, format_clock
 
 
 class Game:
     """Gestisce lo stato e la logica di una partita di scacchi."""
 
-    def __init__(self, ui: UI):
-        self.board = Board()
+    def __init__(self, ui: UI, journal: Optional[GameJournal] = None,
+                 checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+                 explorer: Optional[PositionIndex] = None,
+                 analysis: Optional[AnalysisWorker] = None,
+                 broadcaster: Optional[BroadcastServer] = None,
+                 clock: Optional[ChessClock] = None):
+        # La Position condivide la Board e tiene diritti di arrocco, casa en passant e contatori reali
+        self.position = Position()
+        self.board = self.position.board
         self.ui = ui
+        self.journal = journal
+        self.explorer = explorer
+        self.analysis = analysis
+        self.broadcaster = broadcaster
+        self.clock = clock
+        self.history = PositionHistory(checkpoint_interval)
+        self._view_ply: Optional[int] = None  # Semimossa mostrata da /vai, /avanti, /indietro
         self.current_player = Color.WHITE
         self.move_history: List[str] = []
         self.game_started = False
@@ -26,15 +48,156 @@ class Game:
         if self.game_started and not self.game_over:
             self.ui.display_message("Una partita è già in corso. Usa /abbandona per terminarla prima.", level="warning")
             return
-        self.board = Board()
+        self.position = Position()
+        self.board = self.position.board
+        self.history = PositionHistory(self.history.interval, max_checkpoints=self.history.max_checkpoints)
+        self._view_ply = None
         self.current_player = Color.WHITE
         self.move_history = []
         self.game_started = True
         self.game_over = False
         self.winner = None
+        if self.clock is not None:
+            self.clock.reset()
+            self.clock.start(Color.WHITE)
+        self._save_snapshot()
+        self._broadcast_keyframe()
         self.ui.display_message("Nuova partita iniziata. Tocca al Bianco.", level="success")
         self.ui.display_board(self.board, self.current_player)
 
+    def _snapshot(self) -> GameSnapshot:
+        """Restituisce lo stato corrente della partita come snapshot."""
+        return GameSnapshot(len(self.move_history), self.board, self.current_player,
+                            list(self.move_history), self.game_started, self.game_over, self.winner,
+                            self.history.moves_bytes(), self.position.castling, self.position.ep_square,
+                            self.position.halfmove_clock, self.position.fullmove_number)
+
+    def _save_snapshot(self):
+        """Salva uno snapshot nel giornale, se attivo, segnalando eventuali errori di I/O."""
+        if self.journal is None:
+            return
+        try:
+            self.journal.write_snapshot(self._snapshot())
+        except OSError as e:
+            self.ui.display_message(f"Impossibile salvare la partita: {e}", level="warning")
+
+    def _journal_move(self, start_pos: Tuple[int, int], end_pos: Tuple[int, int]):
+        """Registra una mossa nel giornale e, quando dovuto, salva uno snapshot."""
+        if self.journal is None:
+            return
+        try:
+            self.journal.record_move(len(self.move_history), start_pos, end_pos)
+        except OSError as e:
+            self.ui.display_message(f"Impossibile registrare la mossa: {e}", level="warning")
+            return
+        if self.journal.needs_snapshot():
+            self._save_snapshot()
+
+    def _broadcast_keyframe(self):
+        """Trasmette la scacchiera completa agli spettatori, se la trasmissione è attiva."""
+        if self.broadcaster is not None:
+            self.broadcaster.publish_keyframe(self.board, self.current_player, len(self.move_history),
+                                              self._clock_snapshot())
+
+    def _broadcast_move(self, start_pos: Tuple[int, int], end_pos: Tuple[int, int]):
+        """Trasmette agli spettatori la mossa appena giocata come delta."""
+        if self.broadcaster is not None:
+            self.broadcaster.publish_move(Move(start_pos, end_pos), self.board, self.current_player,
+                                          len(self.move_history), self._clock_snapshot())
+
+    def _clock_snapshot(self) -> Optional[Tuple[float, float]]:
+        return self.clock.snapshot() if self.clock is not None else None
+
+    def _show_clock(self, refresh: bool = False):
+        """Mostra gli orologi (riscrivendo la riga esistente con `refresh`)."""
+        if self.clock is None:
+            return
+        white, black = self.clock.snapshot()
+        self.ui.display_clock(format_clock(white), format_clock(black), self.clock.active, refresh)
+
+    def _check_flag(self) -> bool:
+        """
+        Termina la partita se è caduta la bandierina del giocatore al tratto: vince
+        l'avversario, salvo che gli resti il solo Re (patta).
+
+        Returns:
+            True se la partita è appena terminata per il tempo.
+        """
+        if self.clock is None or not self.game_started or self.game_over:
+            return False
+        loser = self.clock.flagged()
+        if loser is None:
+            return False
+        self.clock.stop()
+        self.game_over = True
+        opponent_color = Color.BLACK if loser == Color.WHITE else Color.WHITE
+        if len(self.board.get_pieces_by_color(opponent_color)) == 1:
+            self.winner = None
+            message = (f"Tempo scaduto per il {loser.name.capitalize()}, ma al "
+                       f"{opponent_color.name.capitalize()} resta solo il Re: patta.")
+        else:
+            self.winner = opponent_color
+            message = f"Tempo scaduto per il {loser.name.capitalize()}! {self.winner.name.capitalize()} vince per tempo."
+        self._save_snapshot()
+        self.ui.display_message(message, level="warning")
+        return True
+
+    def resume_game(self) -> bool:
+        """
+        Riprende l'ultima partita salvata: carica lo snapshot più recente e riapplica
+        le mosse registrate nel giornale dopo di esso.
+
+        Returns:
+            True se la partita è stata ripristinata, False altrimenti.
+        """
+        if self.journal is None:
+            self.ui.display_message("Il salvataggio delle partite è disattivato.", level="warning")
+            return False
+        if self.game_started and not self.game_over:
+            self.ui.display_message("Una partita è già in corso. Usa /abbandona per terminarla prima.", level="warning")
+            return False
+        try:
+            snapshot, tail = self.journal.load()
+        except FileNotFoundError:
+            self.ui.display_message("Nessuna partita salvata da riprendere.", level="info")
+            return False
+        except (OSError, ValueError) as e:
+            self.ui.display_message(f"Impossibile riprendere la partita: {e}", level="error")
+            return False
+
+        self.current_player = snapshot.current_player
+        self.move_history = snapshot.move_history
+        self.game_started = snapshot.game_started
+        self.game_over = snapshot.game_over
+        self.winner = snapshot.winner
+        self.history = PositionHistory(self.history.interval, max_checkpoints=self.history.max_checkpoints)
+        self.history.load_moves(snapshot.moves)
+        self.position = Position(snapshot.board, snapshot.current_player, snapshot.castling, snapshot.ep_square,
+                                 snapshot.halfmove_clock, snapshot.fullmove_number)
+        self.board = self.position.board
+        self._view_ply = None
+        if self.clock is not None:
+            self.clock.reset()  # I tempi non sono nel giornale: la partita ripresa riparte dalla base
+
+        # Le mosse del giornale sono già state validate quando sono state giocate
+        for record in tail:
+            piece = self.board.get_piece(record.start)
+            if piece is None:
+                break
+            captured_piece = self.board.get_piece(record.end)
+            self.position.make_move(Move(record.start, record.end))
+            self._add_move_to_history(record.start, record.end, piece, captured_piece)
+            self.history.record(record.start, record.end, self.board)
+            self._switch_player()
+
+        self.ui.display_message(f"Partita ripresa dopo {len(self.move_history)} semimosse.", level="success")
+        if self.clock is not None and self.game_started and not self.game_over:
+            self.clock.start(self.current_player)
+        if self.game_started:
+            self._broadcast_keyframe()
+            self.ui.display_board(self.board, self.current_player)
+        return True
+
     def _switch_player(self):
         self.current_player = Color.BLACK if self.current_player == Color.WHITE else Color.WHITE
 
@@ -42,7 +205,9 @@ class Game:
                              piece: Piece, captured_piece: Optional[Piece]):
         if isinstance(piece, Pawn):
             algebraic_move = coords_to_algebraic(end_pos)
-            if algebraic_move:
+            if algebraic_move and captured_piece:
+                self.move_history.append(f"{coords_to_algebraic(start_pos)[0]}x{algebraic_move}")
+            elif algebraic_move:
                 self.move_history.append(algebraic_move)
             else:
                 self.move_history.append(f"{coords_to_algebraic(start_pos)}-{coords_to_algebraic(end_pos)}")
@@ -58,7 +223,8 @@ class Game:
     def _parse_user_move_input(self, move_string: str) -> Optional[Tuple[Tuple[int, int], Tuple[int, int]]]:
         """
         Tenta di parsare l'input dell'utente in coordinate di mossa.
-        Prova prima il formato abbreviato (es. "e4"), poi il formato completo (es. "e2e4").
+        Prova prima il formato abbreviato (es. "e4"), poi la SAN (es. "Nf3", "exd5")
+        e infine il formato completo (es. "e2e4").
         Restituisce (start_coords, end_coords) o None.
         """
         # Tenta prima il parsing abbreviato (es. "e4")
@@ -66,6 +232,14 @@ class Game:
         if parsed_coords:
             return parsed_coords
 
+        # Poi la SAN, la stessa notazione mostrata da /catture e /suggerisci
+        try:
+            move = san_to_move(self.position, move_string)
+        except ValueError:
+            pass
+        else:
+            return (move.start, move.end)
+
         # Se fallisce, tenta il formato "e2e4"
         if len(move_string) == 4 and move_string[:2].isalnum() and move_string[2:].isalnum():
             start_alg, end_alg = move_string[:2], move_string[2:]
@@ -82,8 +256,9 @@ class Game:
 
     def _validate_piece_and_move(self, piece_to_move: Optional[Piece], start_pos: Tuple[int, int], end_pos: Tuple[int, int]) -> bool:
         """
-        Valida se il pezzo esiste, appartiene al giocatore corrente, e se la mossa è valida.
-        Per lo Sprint 1, gestisce solo pedoni e le loro mosse di avanzamento.
+        Valida se il pezzo esiste, appartiene al giocatore corrente, e se la mossa è legale
+        secondo Position (catture comprese, il proprio Re non può restare sotto scacco).
+        Per lo Sprint 1 arrocco, en passant e promozione non sono ancora accettati.
         Restituisce True se valido, False altrimenti (e stampa messaggi di errore).
         """
         if piece_to_move is None:
@@ -94,21 +269,19 @@ class Game:
             self.ui.display_message(f"Non è il tuo turno di muovere il pezzo in {coords_to_algebraic(start_pos)} ({piece_to_move.color.name}). È il turno di {self.current_player.name}.", level="error")
             return False
 
-        if isinstance(piece_to_move, Pawn):
-            valid_pawn_moves = piece_to_move.get_valid_moves(self.board)
-            target_piece_at_end = self.board.get_piece(end_pos)
-
-            if end_pos not in valid_pawn_moves:
-                moves_alg = [coords_to_algebraic(m) for m in valid_pawn_moves if m is not None]
-                self.ui.display_message(f"Mossa non valida per il pedone da {coords_to_algebraic(start_pos)} a {coords_to_algebraic(end_pos)}. Mosse possibili: {moves_alg}.", level="error")
-                return False
-            if target_piece_at_end is not None:
-                self.ui.display_message("I pedoni non possono muovere su una casa occupata (le catture non sono implementate).", level="error")
-                return False
-        else:
-            self.ui.display_message("Solo le mosse dei pedoni sono implementate in questo sprint.", level="error")
+        candidates = [move for move in self.position.piece_moves(piece_to_move) if move.end == end_pos]
+        if not candidates:
+            moves_alg = sorted({coords_to_algebraic(move.end) for move in self.playable_moves()
+                                if move.start == start_pos})
+            self.ui.display_message(f"Mossa non valida per il pezzo da {coords_to_algebraic(start_pos)} a {coords_to_algebraic(end_pos)}. Mosse possibili: {moves_alg}.", level="error")
             return False
-        
+        if self._is_special_move(candidates[0]):
+            self.ui.display_message("Arrocco, en passant e promozione non sono ancora implementati.", level="error")
+            return False
+        if not self.position.is_legal(candidates[0]):
+            self.ui.display_message("Mossa non valida: lascerebbe il tuo Re sotto scacco.", level="error")
+            return False
+
         return True
 
     def make_move(self, move_string: str) -> bool:
@@ -116,6 +289,8 @@ class Game:
         if not self.game_started or self.game_over:
             self.ui.display_message("La partita non è attiva. Usa /gioca per iniziare.", level="warning")
             return False
+        if self._check_flag():
+            return False
 
         parsed_coords = self._parse_user_move_input(move_string)
         if not parsed_coords:
@@ -131,21 +306,161 @@ class Game:
         assert piece_to_move is not None 
 
         try:
-            captured_piece = self.board.move_piece(start_pos, end_pos)
-            if captured_piece: # Non dovrebbe accadere per pedoni Sprint 1
-                 self.ui.display_message(f"Pezzo catturato: {captured_piece.get_symbol()} a {coords_to_algebraic(end_pos)} (Logica imprevista per Sprint 1)", level="warning")
+            captured_piece = self.board.get_piece(end_pos)
+            self.position.make_move(Move(start_pos, end_pos))
+            if captured_piece:
+                self.ui.display_message(f"Pezzo catturato: {captured_piece.get_symbol()} a {coords_to_algebraic(end_pos)}", level="info")
         except ValueError as e:
             self.ui.display_message(f"Errore durante l'esecuzione della mossa: {e}", level="error")
             return False
 
         self._add_move_to_history(start_pos, end_pos, piece_to_move, captured_piece)
+        self.history.record(start_pos, end_pos, self.board)
+        self._view_ply = None
         self._switch_player()
+        if self.clock is not None:
+            self.clock.press()
+        self._journal_move(start_pos, end_pos)
+        self._broadcast_move(start_pos, end_pos)
         self.ui.display_board(self.board, self.current_player)
         # TODO: Controllare scacco, scacco matto, stallo
         return True
 
-    def handle_command(self, command: str):
+    def show_ply(self, ply: int):
+        """
+        Mostra la scacchiera dopo `ply` semimosse, ricostruita dal checkpoint più vicino.
+
+        Args:
+            ply: La semimossa da mostrare (0 = posizione iniziale).
+        """
+        if not self.game_started:
+            self.ui.display_message("Nessuna partita in corso. Usa /gioca per iniziare.", level="info")
+            return
+        total = len(self.history)
+        if not 0 <= ply <= total:
+            self.ui.display_message(f"Semimossa {ply} non valida: scegli un numero tra 0 e {total}.", level="error")
+            return
+        self._view_ply = ply
+        player_to_move = Color.WHITE if ply % 2 == 0 else Color.BLACK
+        self.ui.display_board(self.history.board_at(ply), player_to_move)
+        last_move = f" (ultima mossa: {self.move_history[ply - 1]})" if 0 < ply <= len(self.move_history) else ""
+        self.ui.display_message(f"Semimossa {ply} di {total}{last_move}.", level="info")
+
+    def _handle_goto(self, args: List[str]):
+        """Gestisce '/vai K'."""
+        if not args or not args[0].isdigit():
+            self.ui.display_message("Uso: /vai <semimossa> (es. /vai 10).", level="warning")
+            return
+        self.show_ply(int(args[0]))
+
+    def _handle_step(self, step: int):
+        """Gestisce '/avanti' e '/indietro' a partire dalla semimossa mostrata."""
+        current = self._view_ply if self._view_ply is not None else len(self.history)
+        target = current + step
+        if not 0 <= target <= len(self.history):
+            limit = "finale" if step > 0 else "iniziale"
+            self.ui.display_message(f"Sei già alla posizione {limit}.", level="info")
+            return
+        self.show_ply(target)
+
+    def _handle_explore(self):
+        """Gestisce '/esplora': statistiche delle mosse dalla posizione mostrata."""
+        if self.explorer is None:
+            self.ui.display_message("Nessun indice caricato. Avvia con --explorer-index FILE "
+                                    "(creato da 'python -m chess index partite.pgn').", level="warning")
+            return
+        if self.game_started and self._view_ply is not None:
+            position = self._position_at(self._view_ply)
+        else:
+            position = self.position if self.game_started else Position()
+        games, statistics = self.explorer.move_statistics(position)
+        self.ui.display_move_statistics(games, [(stats.san, stats.games, stats.white_wins, stats.draws,
+                                                 stats.black_wins) for stats in statistics])
+
+    def _position_at(self, ply: int) -> Position:
+        """
+        Ricostruisce la Position dopo `ply` semimosse rigiocando dall'inizio le mosse
+        registrate, così diritti di arrocco e casa en passant sono quelli della partita.
+        """
+        position = Position()
+        for number in range(1, ply + 1):
+            position.make_move(Move(*self.history.move_at(number)))
+        return position
+
+    def _is_special_move(self, move: Move) -> bool:
+        """
+        Arrocco, en passant e promozione: giornale e cronologia registrano solo partenza
+        e arrivo e le rigiocano spostando un pezzo, quindi non sanno ancora riprodurli.
+        """
+        piece = self.board.get_piece(move.start)
+        return (move.promotion is not None
+                or (isinstance(piece, King) and abs(move.end[1] - move.start[1]) == 2)
+                or (isinstance(piece, Pawn) and move.end == self.position.ep_square))
+
+    def playable_moves(self) -> List[Move]:
+        """Mosse legali del giocatore al tratto che la partita accetta (esclusi arrocco, en passant e promozione)."""
+        return [move for move in self.position.legal_moves() if not self._is_special_move(move)]
+
+    def capture_hints(self) -> List[Tuple[str, int]]:
+        """
+        Catture giocabili dal giocatore al tratto con il saldo dello scambio statico (SEE).
+
+        Returns:
+            Coppie (mossa in SAN, saldo in centipedoni), dalla più vantaggiosa;
+            un saldo negativo indica una cattura che perde materiale.
+        """
+        position = self.position
+        hints = [(move_to_san(position, move), see(position, move))
+                 for move in self.playable_moves() if position.is_capture(move)]
+        hints.sort(key=lambda hint: (-hint[1], hint[0]))
+        return hints
+
+    def _handle_capture_hints(self):
+        """Gestisce '/catture'."""
+        if not self.game_started or self.game_over:
+            self.ui.display_message("Nessuna partita in corso.", level="info")
+            return
+        hints = self.capture_hints()
+        if not hints:
+            self.ui.display_message("Nessuna cattura disponibile.", level="info")
+            return
+        for san, balance in hints:
+            verdict = "sicura" if balance >= 0 else "perde materiale"
+            self.ui.display_message(f"{san}: {verdict} (scambio {balance / 100:+.2f})",
+                                    level="success" if balance >= 0 else "warning")
+
+    def _update_analysis(self):
+        """Allinea l'analisi in background alla posizione corrente (riparte solo se è cambiata)."""
+        if self.analysis is None:
+            return
+        if self.game_started and not self.game_over:
+            self.analysis.analyse(self.position, self.playable_moves())
+        else:
+            self.analysis.cancel()
+
+    def _handle_suggest(self):
+        """Gestisce '/suggerisci' leggendo l'ultima linea dell'analisi in background."""
+        if self.analysis is None:
+            self.ui.display_message("Analisi in background non attiva. Avvia con --analysis.", level="warning")
+            return
+        if not self.game_started or self.game_over:
+            self.ui.display_message("Nessuna partita in corso da analizzare.", level="info")
+            return
+        if not self.playable_moves():
+            self.ui.display_message("Nessuna mossa giocabile da suggerire.", level="info")
+            return
+        info = self.analysis.latest()
+        if info is None:
+            self.ui.display_message("Analisi appena avviata, riprova tra un istante.", level="info")
+            return
+        line = info.san_line()
+        self.ui.display_message(f"Suggerimento: {line[0] if line else '-'} "
+                                f"(valutazione {format_evaluation(info.score)}, profondità {info.depth}, "
+                                f"{info.nodes} nodi). Linea: {' '.join(line)}", level="info")
+
+    def handle_command(self, command: str, args: Optional[List[str]] = None):
         """Gestisce i comandi dell'utente (che iniziano con '/')."""
+        args = args or []
         if command == "/help":
             self.ui.display_help()
         elif command == "/gioca": 
@@ -161,6 +476,26 @@ class Game:
             self._handle_draw_offer()
         elif command == "/mosse": 
             self.ui.display_moves(self.move_history)
+        elif command == "/riprendi":
+            self.resume_game()
+        elif command == "/vai":
+            self._handle_goto(args)
+        elif command == "/avanti":
+            self._handle_step(1)
+        elif command == "/indietro":
+            self._handle_step(-1)
+        elif command == "/catture":
+            self._handle_capture_hints()
+        elif command == "/suggerisci":
+            self._handle_suggest()
+        elif command == "/esplora":
+            self._handle_explore()
+        elif command == "/orologio":
+            if self.clock is None:
+                self.ui.display_message("Partita senza orologio. Avvia con --tc BASE+INCREMENTO.", level="info")
+            else:
+                self._check_flag()
+                self._show_clock()
         elif command == "/esci": 
             pass # Gestito da _process_user_input nel loop run
         else:
@@ -173,6 +508,8 @@ class Game:
         if self.ui.get_confirmation("Sei sicuro di voler abbandonare la partita?"):
             self.game_over = True
             self.winner = Color.BLACK if self.current_player == Color.WHITE else Color.WHITE
+            self._stop_clock()
+            self._save_snapshot()
             self.ui.display_message(f"Partita terminata. {self.winner.name.capitalize()} vince per abbandono!", level="success")
         else:
             self.ui.display_message("Abbandono annullato.", level="info")
@@ -186,10 +523,16 @@ class Game:
         if self.ui.get_confirmation(f"Giocatore {opponent_color.name.capitalize()}, accetti la patta?"):
             self.game_over = True
             self.winner = None
+            self._stop_clock()
+            self._save_snapshot()
             self.ui.display_message("Patta accettata! La partita termina in pareggio.", level="success")
         else:
             self.ui.display_message("Proposta di patta rifiutata. Il gioco continua.", level="info")
 
+    def _stop_clock(self):
+        if self.clock is not None:
+            self.clock.stop()
+
     def _request_exit(self) -> bool:
         """Chiede conferma per uscire e restituisce True se l'utente conferma."""
         if self.ui.get_confirmation("Sei sicuro di voler uscire dal gioco?"):
@@ -207,11 +550,11 @@ class Game:
             return False # Continua il loop
 
         if user_input.startswith('/'):
-            command = user_input.split()[0]
+            command, *args = user_input.split()
             if command == "/esci":
                 return self._request_exit() # Potrebbe terminare il gioco
             else:
-                self.handle_command(command)
+                self.handle_command(command, args)
         elif self.game_started and not self.game_over:
             self.make_move(user_input)
         elif not self.game_started:
@@ -230,6 +573,30 @@ class Game:
         while not should_exit:
             player_name_display = self.current_player.name.capitalize()
             prompt = f"{player_name_display} > " if self.game_started and not self.game_over else "Scacchi > "
-            user_input = self.ui.get_user_input(prompt).strip()
-            
-            should_exit = self._process_user_input(user_input)
\ No newline at end of file
+            self._update_analysis()
+            try:
+                user_input = self._read_input(prompt)
+            except EOFError:
+                break  # Input terminato (es. Ctrl-D o file esaurito)
+
+            should_exit = self._process_user_input(user_input)
+
+    def _read_input(self, prompt: str) -> str:
+        """
+        Attende l'input dell'utente. Con l'orologio in funzione l'attesa ha come
+        timeout il prossimo cambio del tempo mostrato: a ogni risveglio la riga degli
+        orologi viene aggiornata e la caduta della bandierina chiude la partita
+        senza aspettare che l'utente prema Invio.
+        """
+        clock_running = self.clock is not None and self.clock.active is not None
+        if clock_running:
+            self._show_clock()
+        self.ui.show_prompt(prompt)
+        while True:
+            timeout = self.clock.seconds_until_display_change() if clock_running else None
+            line = self.ui.wait_for_input(timeout)
+            if line is not None:
+                return line
+            if self._check_flag():
+                return ""
+            self._show_clock(refresh=True)
\ No newline at end of file
@@ -0,0 +1,135 @@
+# history.py
+"""Cronologia delle posizioni di una partita con checkpoint periodici per la navigazione."""
+
+from typing import List, Optional, Tuple
+
+from .constants import BOARD_SIZE
+from .board import Board
+
+DEFAULT_CHECKPOINT_INTERVAL = 16
+# Checkpoint in memoria oltre i quali se ne scarta uno su due (256 * 64 byte = 16 KB)
+DEFAULT_MAX_CHECKPOINTS = 256
+# Byte per semimossa nella lista compatta delle mosse: casa di partenza e casa di arrivo
+MOVE_RECORD_SIZE = 2
+
+
+class PositionHistory:
+    """
+    Memorizza le mosse di una partita come array compatto (2 byte per semimossa)
+    e una scacchiera codificata (64 byte) ogni `interval` semimosse.
+
+    La scacchiera a una semimossa qualsiasi si ricostruisce dal checkpoint
+    precedente applicando al più `spacing - 1` mosse. I checkpoint mancanti
+    (es. dopo aver caricato solo la lista delle mosse) vengono generati su richiesta.
+
+    I checkpoint sono al più `max_checkpoints`: quando la partita li supera se ne
+    scarta uno su due e la distanza tra i rimanenti (`spacing`, inizialmente
+    `interval`) raddoppia. La memoria è quindi di 2 byte per semimossa più al
+    più `max_checkpoints * 64` byte, e una ricostruzione applica al più
+    `max(interval, 2 * semimosse / max_checkpoints)` mosse.
+    """
+
+    def __init__(self, interval: int = DEFAULT_CHECKPOINT_INTERVAL, initial_board: Optional[Board] = None,
+                 max_checkpoints: int = DEFAULT_MAX_CHECKPOINTS):
+        """
+        Args:
+            interval: Semimosse tra due checkpoint.
+            initial_board: La scacchiera alla semimossa 0 (default: posizione iniziale).
+            max_checkpoints: Numero massimo di checkpoint in memoria (incluso quello iniziale).
+
+        Raises:
+            ValueError: Se l'intervallo non è positivo o max_checkpoints è minore di 2.
+        """
+        if interval < 1:
+            raise ValueError("L'intervallo tra i checkpoint deve essere almeno 1")
+        if max_checkpoints < 2:
+            raise ValueError("Servono almeno 2 checkpoint")
+        self.interval = interval
+        self.max_checkpoints = max_checkpoints
+        self.spacing = interval
+        self._moves = bytearray()
+        self._checkpoints: List[bytes] = [(initial_board or Board()).to_bytes()]
+
+    def __len__(self) -> int:
+        """Numero di semimosse registrate."""
+        return len(self._moves) // MOVE_RECORD_SIZE
+
+    @property
+    def checkpoint_count(self) -> int:
+        """Numero di checkpoint attualmente in memoria (incluso quello iniziale)."""
+        return len(self._checkpoints)
+
+    def record(self, start: Tuple[int, int], end: Tuple[int, int], board_after: Board):
+        """
+        Registra una mossa appena giocata.
+
+        Args:
+            start: Casa di partenza.
+            end: Casa di arrivo.
+            board_after: La scacchiera dopo la mossa, salvata se cade un checkpoint.
+        """
+        self._moves.append(start[0] * BOARD_SIZE + start[1])
+        self._moves.append(end[0] * BOARD_SIZE + end[1])
+        ply = len(self)
+        if ply % self.spacing == 0 and len(self._checkpoints) == ply // self.spacing:
+            self._checkpoints.append(board_after.to_bytes())
+            if len(self._checkpoints) > self.max_checkpoints:
+                self._thin_out()
+
+    def _thin_out(self):
+        """Scarta un checkpoint su due (tenendo quello iniziale) e raddoppia la distanza."""
+        self._checkpoints = self._checkpoints[::2]
+        self.spacing *= 2
+
+    def moves_bytes(self) -> bytes:
+        """Restituisce la lista compatta delle mosse (2 byte per semimossa)."""
+        return bytes(self._moves)
+
+    def load_moves(self, moves: bytes):
+        """
+        Sostituisce le mosse registrate, mantenendo la scacchiera iniziale.
+        I checkpoint verranno ricostruiti alla prima richiesta.
+
+        Raises:
+            ValueError: Se la lunghezza dei dati non è multipla di MOVE_RECORD_SIZE.
+        """
+        if len(moves) % MOVE_RECORD_SIZE:
+            raise ValueError("Lista di mosse compatta di lunghezza non valida")
+        self._moves = bytearray(moves)
+        self._checkpoints = self._checkpoints[:1]
+        self.spacing = self.interval
+        while len(self) // self.spacing + 1 > self.max_checkpoints:
+            self.spacing *= 2
+
+    def move_at(self, ply: int) -> Tuple[Tuple[int, int], Tuple[int, int]]:
+        """Restituisce (partenza, arrivo) della mossa che porta alla semimossa `ply` (1-based)."""
+        offset = (ply - 1) * MOVE_RECORD_SIZE
+        start_index, end_index = self._moves[offset], self._moves[offset + 1]
+        return divmod(start_index, BOARD_SIZE), divmod(end_index, BOARD_SIZE)
+
+    def _replay(self, board: Board, from_ply: int, to_ply: int):
+        for ply in range(from_ply + 1, to_ply + 1):
+            start, end = self.move_at(ply)
+            board.move_piece(start, end)
+
+    def _ensure_checkpoint(self, index: int):
+        while len(self._checkpoints) <= index:
+            last = len(self._checkpoints) - 1
+            board = Board.from_bytes(self._checkpoints[last])
+            self._replay(board, last * self.spacing, (last + 1) * self.spacing)
+            self._checkpoints.append(board.to_bytes())
+
+    def board_at(self, ply: int) -> Board:
+        """
+        Ricostruisce la scacchiera dopo `ply` semimosse (0 = posizione iniziale).
+
+        Raises:
+            ValueError: Se la semimossa è fuori dall'intervallo registrato.
+        """
+        if not 0 <= ply <= len(self):
+            raise ValueError(f"Semimossa {ply} fuori dall'intervallo 0-{len(self)}")
+        index = ply // self.spacing
+        self._ensure_checkpoint(index)
+        board = Board.from_bytes(self._checkpoints[index])
+        self._replay(board, index * self.spacing, ply)
+        return board
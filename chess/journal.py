@@ -0,0 +1,267 @@
+# journal.py
+"""
+Giornale append-only delle mosse e snapshot binari compatti per riprendere una
+partita dopo un'interruzione del processo.
+
+Ogni mossa viene aggiunta al giornale come record binario di dimensione fissa.
+Ogni `snapshot_interval` mosse lo stato completo viene salvato in uno snapshot
+(scritto in modo atomico) e il giornale viene svuotato: la ripresa legge
+l'ultimo snapshot e riapplica al più `snapshot_interval` mosse.
+"""
+
+import os
+import struct
+import zlib
+from typing import List, NamedTuple, Optional, Tuple
+
+from .constants import Color, BOARD_SIZE
+from .board import Board, PACKED_BOARD_SIZE
+
+# Politiche di fsync: dopo ogni mossa, solo agli snapshot, mai (decide il sistema operativo)
+FSYNC_ALWAYS = "always"
+FSYNC_SNAPSHOT = "snapshot"
+FSYNC_NEVER = "never"
+FSYNC_POLICIES = (FSYNC_ALWAYS, FSYNC_SNAPSHOT, FSYNC_NEVER)
+
+DEFAULT_SNAPSHOT_INTERVAL = 16
+JOURNAL_FILENAME = "partita.journal"
+SNAPSHOT_FILENAME = "partita.snapshot"
+
+# Record del giornale: semimossa, casa di partenza, casa di arrivo, promozione, riservato, CRC32
+_RECORD = struct.Struct("<IBBBBI")
+RECORD_SIZE = _RECORD.size
+# Intestazione dello snapshot: magic, versione, semimossa, giocatore, partita iniziata/finita, vincitore
+_SNAPSHOT_MAGIC = b"SCSN"
+_SNAPSHOT_VERSION = 3
+_SNAPSHOT_HEADER = struct.Struct("<4sHIBBBB")
+# Stato della posizione non contenuto nella scacchiera: diritti di arrocco (bit), casa en
+# passant (0xFF se assente), contatore delle semimosse e numero della mossa
+_POSITION_STATE = struct.Struct("<BBHI")
+_CASTLING_RIGHTS = "KQkq"
+_NO_EP_SQUARE = 0xFF
+_CRC = struct.Struct("<I")
+
+_PLAYER_CODES = {Color.WHITE: 0, Color.BLACK: 1}
+_WINNER_CODES = {None: 0, Color.WHITE: 1, Color.BLACK: 2}
+
+
+class JournalRecord(NamedTuple):
+    """Una mossa registrata nel giornale (case come coordinate (riga, colonna))."""
+    ply: int
+    start: Tuple[int, int]
+    end: Tuple[int, int]
+
+
+class GameSnapshot(NamedTuple):
+    """Stato completo di una partita in un dato momento."""
+    ply: int
+    board: Board
+    current_player: Color
+    move_history: List[str]
+    game_started: bool
+    game_over: bool
+    winner: Optional[Color]
+    moves: bytes = b""  # Mosse compatte di PositionHistory, per navigare anche prima dello snapshot
+    castling: str = "KQkq"
+    ep_square: Optional[Tuple[int, int]] = None
+    halfmove_clock: int = 0
+    fullmove_number: int = 1
+
+
+def encode_record(ply: int, start: Tuple[int, int], end: Tuple[int, int]) -> bytes:
+    """Codifica una mossa come record di `RECORD_SIZE` byte con checksum."""
+    start_index = start[0] * BOARD_SIZE + start[1]
+    end_index = end[0] * BOARD_SIZE + end[1]
+    body = _RECORD.pack(ply, start_index, end_index, 0, 0, 0)[:-_CRC.size]
+    return body + _CRC.pack(zlib.crc32(body))
+
+
+def decode_records(data: bytes) -> List[JournalRecord]:
+    """
+    Decodifica i record di un giornale, fermandosi al primo record troncato o
+    corrotto (tipico di una scrittura interrotta da un crash).
+    """
+    records = []
+    for offset in range(0, len(data) - RECORD_SIZE + 1, RECORD_SIZE):
+        chunk = data[offset:offset + RECORD_SIZE]
+        ply, start_index, end_index, _, _, crc = _RECORD.unpack(chunk)
+        if zlib.crc32(chunk[:-_CRC.size]) != crc:
+            break
+        records.append(JournalRecord(ply, divmod(start_index, BOARD_SIZE), divmod(end_index, BOARD_SIZE)))
+    return records
+
+
+def encode_snapshot(snapshot: GameSnapshot) -> bytes:
+    """
+    Codifica uno snapshot: intestazione, 64 byte di scacchiera, stato della posizione
+    (arrocco, en passant, contatori), cronologia UTF-8, mosse compatte e CRC32.
+    """
+    history = "\n".join(snapshot.move_history).encode("utf-8")
+    header = _SNAPSHOT_HEADER.pack(_SNAPSHOT_MAGIC, _SNAPSHOT_VERSION, snapshot.ply,
+                                   _PLAYER_CODES[snapshot.current_player],
+                                   int(snapshot.game_started), int(snapshot.game_over),
+                                   _WINNER_CODES[snapshot.winner])
+    castling_bits = sum(1 << index for index, right in enumerate(_CASTLING_RIGHTS) if right in snapshot.castling)
+    ep_index = (_NO_EP_SQUARE if snapshot.ep_square is None
+                else snapshot.ep_square[0] * BOARD_SIZE + snapshot.ep_square[1])
+    state = _POSITION_STATE.pack(castling_bits, ep_index, snapshot.halfmove_clock, snapshot.fullmove_number)
+    body = (header + snapshot.board.to_bytes() + state + _CRC.pack(len(history)) + history
+            + _CRC.pack(len(snapshot.moves)) + snapshot.moves)
+    return body + _CRC.pack(zlib.crc32(body))
+
+
+def decode_snapshot(data: bytes) -> GameSnapshot:
+    """
+    Decodifica uno snapshot prodotto da `encode_snapshot`.
+
+    Raises:
+        ValueError: Se i dati sono troncati, corrotti o di una versione sconosciuta.
+    """
+    minimum = _SNAPSHOT_HEADER.size + PACKED_BOARD_SIZE + _POSITION_STATE.size + 3 * _CRC.size
+    if len(data) < minimum:
+        raise ValueError("Snapshot troncato")
+    body, (crc,) = data[:-_CRC.size], _CRC.unpack(data[-_CRC.size:])
+    if zlib.crc32(body) != crc:
+        raise ValueError("Snapshot corrotto (checksum errato)")
+    magic, version, ply, player, started, over, winner = _SNAPSHOT_HEADER.unpack_from(body)
+    if magic != _SNAPSHOT_MAGIC or version != _SNAPSHOT_VERSION:
+        raise ValueError("Formato di snapshot sconosciuto")
+    offset = _SNAPSHOT_HEADER.size
+    board = Board.from_bytes(body[offset:offset + PACKED_BOARD_SIZE])
+    offset += PACKED_BOARD_SIZE
+    castling_bits, ep_index, halfmove_clock, fullmove_number = _POSITION_STATE.unpack_from(body, offset)
+    offset += _POSITION_STATE.size
+    castling = "".join(right for index, right in enumerate(_CASTLING_RIGHTS) if castling_bits >> index & 1)
+    ep_square = None if ep_index == _NO_EP_SQUARE else divmod(ep_index, BOARD_SIZE)
+    (history_length,) = _CRC.unpack_from(body, offset)
+    offset += _CRC.size
+    history_text = body[offset:offset + history_length].decode("utf-8")
+    offset += history_length
+    (moves_length,) = _CRC.unpack_from(body, offset)
+    offset += _CRC.size
+    moves = body[offset:offset + moves_length]
+    move_history = history_text.split("\n") if history_text else []
+    players = {code: color for color, code in _PLAYER_CODES.items()}
+    winners = {code: color for color, code in _WINNER_CODES.items()}
+    return GameSnapshot(ply, board, players[player], move_history, bool(started), bool(over), winners[winner], moves,
+                        castling, ep_square, halfmove_clock, fullmove_number)
+
+
+class GameJournal:
+    """Gestisce giornale e snapshot di una partita in una directory."""
+
+    def __init__(self, directory: str,
+                 snapshot_interval: int = DEFAULT_SNAPSHOT_INTERVAL,
+                 fsync_policy: str = FSYNC_SNAPSHOT):
+        """
+        Args:
+            directory: Directory in cui salvare giornale e snapshot (creata se manca).
+            snapshot_interval: Mosse tra uno snapshot e il successivo.
+            fsync_policy: Una tra FSYNC_ALWAYS, FSYNC_SNAPSHOT, FSYNC_NEVER.
+
+        Raises:
+            ValueError: Se la politica di fsync o l'intervallo non sono validi.
+        """
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"Politica di fsync '{fsync_policy}' non valida, usa una tra {FSYNC_POLICIES}")
+        if snapshot_interval < 1:
+            raise ValueError("L'intervallo tra gli snapshot deve essere almeno 1")
+        self.directory = directory
+        self.snapshot_interval = snapshot_interval
+        self.fsync_policy = fsync_policy
+        self.journal_path = os.path.join(directory, JOURNAL_FILENAME)
+        self.snapshot_path = os.path.join(directory, SNAPSHOT_FILENAME)
+        self._fd: Optional[int] = None
+        self._records_since_snapshot = 0
+
+    def _open(self):
+        if self._fd is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._fd = os.open(self.journal_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+
+    def record_move(self, ply: int, start: Tuple[int, int], end: Tuple[int, int]):
+        """
+        Aggiunge una mossa al giornale (una sola write di `RECORD_SIZE` byte).
+
+        Args:
+            ply: Numero della semimossa appena giocata (la prima è 1).
+            start: Casa di partenza.
+            end: Casa di arrivo.
+        """
+        self._open()
+        assert self._fd is not None
+        os.write(self._fd, encode_record(ply, start, end))
+        if self.fsync_policy == FSYNC_ALWAYS:
+            os.fsync(self._fd)
+        self._records_since_snapshot += 1
+
+    def needs_snapshot(self) -> bool:
+        """Indica se sono state registrate abbastanza mosse da richiedere uno snapshot."""
+        return self._records_since_snapshot >= self.snapshot_interval
+
+    def write_snapshot(self, snapshot: GameSnapshot):
+        """
+        Salva lo snapshot in modo atomico (file temporaneo + rename) e svuota il giornale.
+        Se il processo si interrompe a metà, resta valido il vecchio snapshot e i record
+        già coperti da quello nuovo vengono ignorati alla ripresa.
+        """
+        self._open()
+        assert self._fd is not None
+        durable = self.fsync_policy != FSYNC_NEVER
+        if durable:
+            os.fsync(self._fd)
+        temp_path = self.snapshot_path + ".tmp"
+        with open(temp_path, "wb") as handle:
+            handle.write(encode_snapshot(snapshot))
+            if durable:
+                handle.flush()
+                os.fsync(handle.fileno())
+        os.replace(temp_path, self.snapshot_path)
+        os.ftruncate(self._fd, 0)
+        self._records_since_snapshot = 0
+
+    def has_saved_game(self) -> bool:
+        """Indica se esiste uno snapshot da cui riprendere."""
+        return os.path.exists(self.snapshot_path)
+
+    def load(self) -> Tuple[GameSnapshot, List[JournalRecord]]:
+        """
+        Legge l'ultimo snapshot e le mosse del giornale successive a esso.
+
+        Returns:
+            Lo snapshot e la coda di mosse da riapplicare, in ordine.
+
+        Raises:
+            FileNotFoundError: Se non esiste uno snapshot.
+            ValueError: Se lo snapshot è corrotto.
+        """
+        with open(self.snapshot_path, "rb") as handle:
+            snapshot = decode_snapshot(handle.read())
+        try:
+            with open(self.journal_path, "rb") as handle:
+                data = handle.read()
+        except FileNotFoundError:
+            data = b""
+
+        tail = []
+        consumed = 0
+        expected_ply = snapshot.ply + 1
+        for record in decode_records(data):
+            if record.ply > expected_ply:
+                break  # Buco nella sequenza: il resto non è affidabile
+            if record.ply == expected_ply:
+                tail.append(record)
+                expected_ply += 1
+            consumed += 1
+
+        # Scarta l'eventuale coda troncata o inaffidabile, così i nuovi record restano allineati
+        if consumed * RECORD_SIZE < len(data):
+            os.truncate(self.journal_path, consumed * RECORD_SIZE)
+        self._records_since_snapshot = len(tail)
+        return snapshot, tail
+
+    def close(self):
+        """Chiude il file del giornale."""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
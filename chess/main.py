@@ -3,11 +3,56 @@
 
 import sys
 import argparse
+import cProfile
+import os
 import traceback
 
-from .ui import UI
+from .ui import UI, LineReader
 from .game import Game
-from .constants import COMMANDS
+from .uci import run_uci
+from .match import run_match
+from .tablebase import run_tablebase
+from .explorer import PositionIndex, run_index
+from .mate import run_mate
+from .annotate import run_annotate
+from .archive import run_archive
+from .broadcast import BroadcastServer, DEFAULT_KEYFRAME_INTERVAL, parse_address, run_watch
+from .analysis import AnalysisWorker
+from .constants import COMMANDS, CLI_MODES
+from .profiling import PROFILER
+from .journal import GameJournal, FSYNC_POLICIES, FSYNC_SNAPSHOT, DEFAULT_SNAPSHOT_INTERVAL
+from .history import DEFAULT_CHECKPOINT_INTERVAL
+from .clock import ChessClock, INCREMENT_MODES, INCREMENT_FISCHER, parse_time_control
+
+# File predefinito per il report JSON di --profile
+DEFAULT_PROFILE_JSON = "scacchi_profile.json"
+# Directory predefinita per giornale e snapshot della partita
+DEFAULT_JOURNAL_DIR = os.path.join(os.path.expanduser("~"), ".scacchi")
+
+
+def run_nnue(argv):
+    """Avvia gli strumenti della rete NNUE (importati solo qui: richiedono NumPy)."""
+    try:
+        from .nnue import run_nnue as run
+    except ImportError as error:
+        print(error, file=sys.stderr)
+        return 1
+    return run(argv)
+
+
+# Funzioni di avvio delle modalità da riga di comando: ricevono gli argomenti restanti
+# e restituiscono il codice di uscita del processo.
+CLI_MODE_RUNNERS = {
+    "uci": run_uci,
+    "match": run_match,
+    "tablebase": run_tablebase,
+    "index": run_index,
+    "nnue": run_nnue,
+    "mate": run_mate,
+    "watch": run_watch,
+    "annotate": run_annotate,
+    "archive": run_archive,
+}
 
 
 def display_help_from_args():
@@ -15,6 +60,25 @@ def display_help_from_args():
     print("Scacchi Terminal Edition - Un semplice gioco di scacchi nel terminale.")
     print("\nOpzioni riga di comando:")
     print("  -h, --help-args     Mostra questo messaggio di aiuto ed esci.")
+    print("  --profile           Misura i tempi delle fasi e la latenza dei comandi; report all'uscita.")
+    print(f"  --profile-json FILE Percorso del report JSON (default: {DEFAULT_PROFILE_JSON}).")
+    print("  --cprofile FILE     Salva anche una cattura cProfile (leggibile con pstats).")
+    print("  --resume            Riprende l'ultima partita salvata all'avvio.")
+    print(f"  --journal-dir DIR   Directory di giornale e snapshot (default: {DEFAULT_JOURNAL_DIR}).")
+    print("  --no-journal        Non salvare la partita su disco.")
+    print(f"  --fsync POLITICA    Quando forzare la scrittura su disco: {', '.join(FSYNC_POLICIES)}.")
+    print(f"  --snapshot-interval N  Semimosse tra due snapshot (default: {DEFAULT_SNAPSHOT_INTERVAL}).")
+    print(f"  --checkpoint-interval N  Semimosse tra due checkpoint per /vai (default: {DEFAULT_CHECKPOINT_INTERVAL}).")
+    print("  --explorer-index FILE  Indice delle posizioni (python -m chess index) usato da /esplora.")
+    print("  --analysis          Analizza la posizione in background mentre pensi (/suggerisci).")
+    print("  --analysis-depth N  Profondità massima dell'analisi in background (default: illimitata).")
+    print("  --broadcast HOST:PORTA  Trasmette la partita agli spettatori (python -m chess watch HOST:PORTA).")
+    print("  --tc BASE+INC       Orologi di gioco in secondi, es. 300+2 (default: senza orologio).")
+    print(f"  --tc-mode MODO      Incremento {' o '.join(INCREMENT_MODES)} (default: {INCREMENT_FISCHER}).")
+    print(f"  --keyframe-interval N  Mosse tra due keyframe completi della trasmissione (default: {DEFAULT_KEYFRAME_INTERVAL}).")
+    print("\nModalità (primo argomento):")
+    for mode, description in CLI_MODES.items():
+        print(f"  {mode:<15} {description}")
     print("\nComandi disponibili all'interno del gioco (iniziano con '/'):")
     for command, description in COMMANDS.items():
         print(f"  {command:<15} {description}")
@@ -28,6 +92,11 @@ def display_help_from_args():
 def run_game():
     """Avvia e gestisce il gioco degli scacchi."""
 
+    # Le modalità alternative (es. 'uci') hanno un proprio parser degli argomenti
+    cli_args = sys.argv[1:]
+    if cli_args and cli_args[0] in CLI_MODE_RUNNERS:
+        sys.exit(CLI_MODE_RUNNERS[cli_args[0]](cli_args[1:]))
+
     # Parser per gli argomenti specifici dell'applicazione, prima di avviare l'UI del gioco
     parser = argparse.ArgumentParser(description="Scacchi Terminal Edition", add_help=False)
     parser.add_argument(
@@ -35,6 +104,38 @@ def run_game():
         action='store_true',
         help='Mostra aiuto per argomenti da linea di comando ed esci.'
     )
+    parser.add_argument('--profile', action='store_true',
+                        help='Attiva la strumentazione dei punti caldi e stampa un report all\'uscita.')
+    parser.add_argument('--profile-json', default=DEFAULT_PROFILE_JSON,
+                        help='Percorso del report JSON prodotto con --profile.')
+    parser.add_argument('--cprofile', metavar='FILE',
+                        help='Salva una cattura cProfile della sessione in FILE.')
+    parser.add_argument('--resume', action='store_true',
+                        help='Riprende l\'ultima partita salvata all\'avvio.')
+    parser.add_argument('--journal-dir', default=DEFAULT_JOURNAL_DIR,
+                        help='Directory di giornale e snapshot della partita.')
+    parser.add_argument('--no-journal', action='store_true',
+                        help='Disattiva il salvataggio della partita su disco.')
+    parser.add_argument('--fsync', choices=FSYNC_POLICIES, default=FSYNC_SNAPSHOT,
+                        help='Politica di fsync del giornale.')
+    parser.add_argument('--snapshot-interval', type=int, default=DEFAULT_SNAPSHOT_INTERVAL,
+                        help='Semimosse tra due snapshot.')
+    parser.add_argument('--checkpoint-interval', type=int, default=DEFAULT_CHECKPOINT_INTERVAL,
+                        help='Semimosse tra due checkpoint della cronologia (/vai, /avanti, /indietro).')
+    parser.add_argument('--explorer-index', metavar='FILE',
+                        help='Indice delle posizioni di una raccolta PGN, interrogato da /esplora.')
+    parser.add_argument('--analysis', action='store_true',
+                        help='Analizza la posizione in un processo separato durante l\'input (/suggerisci).')
+    parser.add_argument('--analysis-depth', type=int,
+                        help='Profondità massima dell\'analisi in background.')
+    parser.add_argument('--tc', metavar='BASE+INC',
+                        help='Controllo di tempo della partita in secondi (es. 300+2).')
+    parser.add_argument('--tc-mode', choices=INCREMENT_MODES, default=INCREMENT_FISCHER,
+                        help='Modalità dell\'incremento.')
+    parser.add_argument('--broadcast', metavar='HOST:PORTA',
+                        help='Trasmette la partita agli spettatori su un socket locale.')
+    parser.add_argument('--keyframe-interval', type=int, default=DEFAULT_KEYFRAME_INTERVAL,
+                        help='Mosse tra due keyframe completi della trasmissione.')
 
     args, unknown_args = parser.parse_known_args()
 
@@ -49,9 +150,42 @@ def run_game():
 
 
     ui = UI()
-    game = Game(ui)
+    journal = None
+    if not args.no_journal:
+        try:
+            journal = GameJournal(args.journal_dir, args.snapshot_interval, args.fsync)
+        except ValueError as e:
+            print(f"Errore: {e}")
+            sys.exit(1)
+    explorer = None
+    broadcaster = None
+    clock = None
+    analysis = AnalysisWorker(args.analysis_depth) if args.analysis else None
+    try:
+        if args.explorer_index:
+            explorer = PositionIndex(args.explorer_index)
+        if args.broadcast:
+            broadcaster = BroadcastServer(*parse_address(args.broadcast), keyframe_interval=args.keyframe_interval)
+            PROFILER.add_report_source("broadcast", broadcaster.stats)
+        if args.tc:
+            clock = ChessClock(parse_time_control(args.tc, args.tc_mode))
+        game = Game(ui, journal, args.checkpoint_interval, explorer, analysis, broadcaster, clock)
+    except (OSError, ValueError) as e:
+        print(f"Errore: {e}")
+        sys.exit(1)
+
+    # L'input non bloccante permette agli orologi di scorrere mentre si attende una mossa
+    ui.input_reader = LineReader.for_stdin()
+
+    if args.profile:
+        PROFILER.enable()
+    session_profile = cProfile.Profile() if args.cprofile else None
+    if session_profile is not None:
+        session_profile.enable()
 
     try:
+        if args.resume:
+            game.resume_game()
         game.run()
     except KeyboardInterrupt:
         ui.display_message("\nUscita forzata rilevata. Arrivederci!", level="warning")
@@ -59,6 +193,26 @@ def run_game():
         ui.display_message(f"\nErrore inaspettato: {e}", level="error")
         ui.display_message("Consultare il traceback qui sotto per dettagli:", level="error")
         traceback.print_exc()
+    finally:
+        if journal is not None:
+            journal.close()
+        if explorer is not None:
+            explorer.close()
+        if analysis is not None:
+            analysis.close()
+        if broadcaster is not None:
+            broadcaster.close()
+        if ui.input_reader is not None:
+            ui.input_reader.close()
+        if session_profile is not None:
+            session_profile.disable()
+            session_profile.dump_stats(args.cprofile)
+            print(f"Cattura cProfile salvata in {args.cprofile}")
+        if args.profile:
+            PROFILER.disable()
+            print(PROFILER.format_text())
+            PROFILER.write_json(args.profile_json)
+            print(f"Report JSON salvato in {args.profile_json}")
 
 
 if __name__ == "__main__":
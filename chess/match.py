@@ -0,0 +1,564 @@
+# match.py
+"""Torneo di self-play tra due motori su un pool di processi, con stima Elo e SPRT."""
+
+import argparse
+import contextlib
+import math
+import multiprocessing.util
+import queue
+import random
+import shlex
+import subprocess  # nosec B404 - avvia solo i motori indicati dall'utente
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+from .clock import parse_time_control
+from .constants import Color
+from .engine import SearchLimits, Searcher
+from .evaluation import create_evaluator
+from .pgn import format_game, move_to_san
+from .pool import pool_map
+from .position import Move, Position, STARTING_FEN, WHITE_WINS, BLACK_WINS, DRAW, opponent
+from .tablebase import Tablebase
+from .uci import compute_move_time
+
+# Nome del motore interno nelle specifiche --engine-a/--engine-b
+BUILTIN_ENGINE = "builtin"
+# Semimosse oltre le quali la partita viene aggiudicata patta
+DEFAULT_MAX_PLIES = 400
+# Secondi concessi a un motore UCI oltre il tempo della mossa prima di considerarlo bloccato
+UCI_RESPONSE_MARGIN = 2.0
+# Attesa massima per l'avvio e per le mosse senza limite di tempo (solo profondità o nodi)
+UCI_DEFAULT_TIMEOUT = 60.0
+
+
+class MatchLimits(NamedTuple):
+    """Limiti per mossa comuni a entrambi i motori (None = non impostato)."""
+    depth: Optional[int] = None
+    nodes: Optional[int] = None
+    movetime: Optional[float] = None  # secondi per mossa
+    base_time: Optional[float] = None  # secondi iniziali sull'orologio
+    increment: float = 0.0  # secondi aggiunti dopo ogni mossa
+
+
+class GameTask(NamedTuple):
+    """Descrizione di una partita da giocare in un processo del pool."""
+    index: int
+    opening_fen: str
+    white_spec: str
+    black_spec: str
+    a_is_white: bool
+    limits: MatchLimits
+    max_plies: int
+    seed: int
+    tablebase: Optional[str] = None  # directory delle tablebase per l'aggiudicazione
+
+
+class GameRecord(NamedTuple):
+    """Esito di una partita giocata."""
+    index: int
+    white_spec: str
+    black_spec: str
+    a_is_white: bool
+    opening_fen: str
+    san_moves: List[str]
+    result: str
+    reason: str
+    plies: int
+    nodes: int
+    elapsed: float
+
+    def score_for_a(self) -> float:
+        """Punteggio (1, 0.5, 0) del motore A in questa partita."""
+        if self.result == DRAW:
+            return 0.5
+        a_won = (self.result == WHITE_WINS) == self.a_is_white
+        return 1.0 if a_won else 0.0
+
+
+class Player(ABC):
+    """Interfaccia comune dei motori che partecipano al torneo."""
+
+    def new_game(self, seed: int):
+        """Prepara il motore per una nuova partita; il seme rende riproducibili le scelte casuali."""
+
+    @abstractmethod
+    def choose_move(self, position: Position, start_fen: str, moves: List[Move],
+                    limits: SearchLimits, clocks: Optional[Tuple[float, float]],
+                    increment: float) -> Tuple[Optional[Move], int]:
+        """
+        Sceglie la mossa da giocare.
+
+        Args:
+            position: La posizione corrente (va restituita intatta).
+            start_fen: La posizione di partenza della partita.
+            moves: Le mosse giocate dalla posizione di partenza.
+            limits: I limiti di ricerca per questa mossa.
+            clocks: Tempo residuo (bianco, nero) in secondi, se la partita ha un orologio.
+            increment: Incremento per mossa in secondi.
+
+        Returns:
+            La mossa scelta (None se il motore non risponde) e i nodi visitati.
+        """
+
+    def is_alive(self) -> bool:
+        """False se il motore non è più utilizzabile e va ricreato per la prossima partita."""
+        return True
+
+    def close(self):
+        """Libera le risorse del motore."""
+
+
+class BuiltinPlayer(Player):
+    """
+    Il motore interno (`Searcher`) eseguito nello stesso processo.
+    Opzioni: "eval" (classic o nnue) e "weights" (file dei pesi della rete).
+    Il seme della partita rimescola l'ordine delle mosse alla radice: a parità di
+    punteggio la scelta cambia da un seme all'altro, ma a parità di seme la partita si ripete.
+    """
+
+    def __init__(self, options: Dict[str, str]):
+        self._searcher = Searcher(create_evaluator(options.get("eval", "classic"), options.get("weights")))
+        self._options = options
+        self._rng = random.Random(0)
+
+    def new_game(self, seed: int):
+        self._rng = random.Random(seed)
+
+    def choose_move(self, position, start_fen, moves, limits, clocks, increment):
+        root_moves = position.legal_moves()
+        self._rng.shuffle(root_moves)
+        limits.root_moves = root_moves
+        result = self._searcher.search(position, limits)
+        return result.best_move, result.nodes
+
+
+class UCIPlayer(Player):
+    """
+    Un motore esterno che parla il protocollo UCI su stdin/stdout.
+    Le risposte vengono lette da un thread dedicato, così ogni attesa ha una scadenza:
+    un motore che non risponde in tempo viene terminato e perde la partita.
+    """
+
+    def __init__(self, command: str):
+        self._process = subprocess.Popen(  # nosec B603 - comando scelto dall'utente
+            shlex.split(command), stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL, text=True, bufsize=1,
+        )
+        self._lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        threading.Thread(target=self._read_lines, name="uci-reader", daemon=True).start()
+        self._send("uci")
+        self._wait_for("uciok", UCI_DEFAULT_TIMEOUT)
+
+    def _read_lines(self):
+        """Inoltra le righe del motore alla coda; None segnala la fine dell'output."""
+        assert self._process.stdout is not None
+        for line in self._process.stdout:
+            self._lines.put(line)
+        self._lines.put(None)
+
+    def _send(self, line: str):
+        assert self._process.stdin is not None
+        self._process.stdin.write(line + "\n")
+        self._process.stdin.flush()
+
+    def _wait_for(self, prefix: str, timeout: float) -> Optional[str]:
+        """
+        Legge righe finché una inizia con `prefix`.
+
+        Returns:
+            La riga trovata; None se il motore termina o non risponde entro `timeout`
+            secondi, nel qual caso il processo viene terminato.
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                line = self._lines.get(timeout=max(deadline - time.monotonic(), 0.0))
+            except queue.Empty:
+                self._process.kill()
+                self._process.wait()
+                return None
+            if line is None:
+                return None
+            if line.startswith(prefix):
+                return line.strip()
+
+    def is_alive(self) -> bool:
+        return self._process.poll() is None
+
+    def new_game(self, seed: int):
+        self._send("ucinewgame")
+        self._send("isready")
+        self._wait_for("readyok", UCI_DEFAULT_TIMEOUT)
+
+    def choose_move(self, position, start_fen, moves, limits, clocks, increment):
+        moves_text = " ".join(move.uci() for move in moves)
+        go = ["go"]
+        if limits.depth is not None:
+            go.append(f"depth {limits.depth}")
+        if limits.nodes is not None:
+            go.append(f"nodes {limits.nodes}")
+        if clocks is not None:
+            inc_ms = int(increment * 1000)
+            go.append(f"wtime {int(clocks[0] * 1000)} btime {int(clocks[1] * 1000)} winc {inc_ms} binc {inc_ms}")
+        elif limits.movetime is not None:
+            go.append(f"movetime {int(limits.movetime * 1000)}")
+        try:
+            self._send(f"position fen {start_fen}" + (f" moves {moves_text}" if moves_text else ""))
+            self._send(" ".join(go))
+        except OSError:  # Il motore è già terminato
+            return None, 0
+        # Con l'orologio il motore può spendere tutto il tempo residuo, non solo il budget stimato
+        if clocks is not None:
+            timeout = clocks[0 if position.side_to_move == Color.WHITE else 1] + UCI_RESPONSE_MARGIN
+        elif limits.movetime is not None:
+            timeout = limits.movetime + UCI_RESPONSE_MARGIN
+        else:
+            timeout = UCI_DEFAULT_TIMEOUT
+        line = self._wait_for("bestmove", timeout)
+        if line is None or len(line.split()) < 2:
+            return None, 0
+        return position.parse_uci(line.split()[1]), 0
+
+    def close(self):
+        try:
+            if self.is_alive():
+                self._send("quit")
+                self._process.wait(timeout=2)
+        except (OSError, subprocess.TimeoutExpired):
+            self._process.kill()
+        assert self._process.stdin is not None
+        with contextlib.suppress(OSError):  # Scarta i comandi rimasti nel buffer di un motore terminato
+            self._process.stdin.close()
+
+
+def create_player(spec: str) -> Player:
+    """
+    Crea un motore a partire dalla sua specifica.
+
+    Args:
+        spec: "builtin" (eventualmente "builtin:chiave=valore,...") per il motore
+            interno, altrimenti la riga di comando di un motore UCI esterno.
+
+    Returns:
+        Il Player corrispondente.
+    """
+    name, _, option_text = spec.partition(":")
+    if name == BUILTIN_ENGINE:
+        options = dict(item.split("=", 1) for item in option_text.split(",") if "=" in item)
+        return BuiltinPlayer(options)
+    return UCIPlayer(spec)
+
+
+# Motori già avviati nel processo corrente, riusati tra una partita e l'altra
+_PLAYER_CACHE: Dict[str, Player] = {}
+_TABLEBASE_CACHE: Dict[str, Tablebase] = {}
+
+
+def _get_player(spec: str) -> Player:
+    player = _PLAYER_CACHE.get(spec)
+    if player is not None and not player.is_alive():
+        player.close()
+        player = None
+    if player is None:
+        player = _PLAYER_CACHE[spec] = create_player(spec)
+    return player
+
+
+def _get_tablebase(directory: str) -> Tablebase:
+    tablebase = _TABLEBASE_CACHE.get(directory)
+    if tablebase is None:
+        tablebase = _TABLEBASE_CACHE[directory] = Tablebase(directory)
+    return tablebase
+
+
+def close_players():
+    """Chiude i motori e le tablebase avviati nel processo corrente (i motori UCI ricevono 'quit')."""
+    for player in _PLAYER_CACHE.values():
+        player.close()
+    _PLAYER_CACHE.clear()
+    for tablebase in _TABLEBASE_CACHE.values():
+        tablebase.close()
+    _TABLEBASE_CACHE.clear()
+
+
+def _init_worker():
+    """Inizializza un processo del pool registrando la chiusura dei suoi motori all'uscita."""
+    # Finalize e non atexit: con l'avvio per fork i processi del pool terminano senza eseguire gli handler atexit
+    multiprocessing.util.Finalize(None, close_players, exitpriority=10)
+
+
+def play_game(task: GameTask) -> GameRecord:
+    """
+    Gioca una partita completa con aggiudicazione automatica.
+
+    Args:
+        task: La descrizione della partita.
+
+    Returns:
+        Il GameRecord con mosse e risultato.
+    """
+    start_time = time.monotonic()
+    position = Position.from_fen(task.opening_fen)
+    players = {Color.WHITE: _get_player(task.white_spec), Color.BLACK: _get_player(task.black_spec)}
+    for player in players.values():
+        player.new_game(task.seed)
+
+    limits = task.limits
+    clocks = None
+    if limits.base_time is not None:
+        clocks = {Color.WHITE: limits.base_time, Color.BLACK: limits.base_time}
+
+    moves: List[Move] = []
+    san_moves: List[str] = []
+    repetitions: Dict[str, int] = {position.repetition_key(): 1}
+    total_nodes = 0
+    result, reason = DRAW, "limite di semimosse"
+    tablebase = _get_tablebase(task.tablebase) if task.tablebase else None
+
+    while len(moves) < task.max_plies:
+        outcome = position.outcome()
+        if outcome is not None:
+            result, reason = outcome
+            break
+        if tablebase is not None:
+            probe = tablebase.probe(position)
+            if probe is not None:
+                if probe.wdl == 0:
+                    result = DRAW
+                else:
+                    winner = position.side_to_move if probe.wdl > 0 else opponent(position.side_to_move)
+                    result = WHITE_WINS if winner == Color.WHITE else BLACK_WINS
+                reason = "tablebase"
+                break
+
+        color = position.side_to_move
+        search_limits = SearchLimits(depth=limits.depth, nodes=limits.nodes, movetime=limits.movetime)
+        clock_pair = None
+        if clocks is not None:
+            clock_pair = (clocks[Color.WHITE], clocks[Color.BLACK])
+            budget = compute_move_time(int(clocks[color] * 1000), int(limits.increment * 1000))
+            search_limits.movetime = min(budget, limits.movetime or budget)
+
+        move_start = time.monotonic()
+        move, nodes = players[color].choose_move(position, task.opening_fen, moves, search_limits,
+                                                 clock_pair, limits.increment)
+        total_nodes += nodes
+        if clocks is not None:
+            clocks[color] -= time.monotonic() - move_start
+            if clocks[color] < 0:
+                result = BLACK_WINS if color == Color.WHITE else WHITE_WINS
+                reason = "tempo scaduto"
+                break
+            clocks[color] += limits.increment
+
+        if move is None or move not in position.legal_moves():
+            result = BLACK_WINS if color == Color.WHITE else WHITE_WINS
+            reason = "mossa illegale o motore non risponde"
+            break
+
+        san_moves.append(move_to_san(position, move))
+        position.make_move(move)
+        moves.append(move)
+
+        key = position.repetition_key()
+        repetitions[key] = repetitions.get(key, 0) + 1
+        if repetitions[key] >= 3:
+            result, reason = DRAW, "triplice ripetizione"
+            break
+
+    return GameRecord(task.index, task.white_spec, task.black_spec, task.a_is_white, task.opening_fen,
+                      san_moves, result, reason, len(moves), total_nodes, time.monotonic() - start_time)
+
+
+# --- Statistiche ---
+
+def elo_from_score(score: float) -> float:
+    """Converte una percentuale di punti (0-1, estremi esclusi) in differenza Elo."""
+    score = min(max(score, 1e-6), 1 - 1e-6)
+    return 400.0 * math.log10(score / (1.0 - score))
+
+
+def score_from_elo(elo: float) -> float:
+    """Percentuale di punti attesa per una differenza Elo."""
+    return 1.0 / (1.0 + 10.0 ** (-elo / 400.0))
+
+
+def _score_mean_and_variance(wins: int, draws: int, losses: int) -> Tuple[float, float]:
+    games = wins + draws + losses
+    mean = (wins + 0.5 * draws) / games
+    variance = (wins * (1 - mean) ** 2 + draws * (0.5 - mean) ** 2 + losses * mean ** 2) / games
+    return mean, variance
+
+
+def elo_estimate(wins: int, draws: int, losses: int) -> Tuple[float, float]:
+    """
+    Stima la differenza Elo con il relativo margine d'errore al 95%.
+
+    Returns:
+        La coppia (elo, margine); (0, inf) se non ci sono partite.
+    """
+    games = wins + draws + losses
+    if games == 0:
+        return 0.0, math.inf
+    mean, variance = _score_mean_and_variance(wins, draws, losses)
+    deviation = 1.96 * math.sqrt(variance / games)
+    margin = (elo_from_score(mean + deviation) - elo_from_score(mean - deviation)) / 2
+    return elo_from_score(mean), margin
+
+
+def sprt_llr(wins: int, draws: int, losses: int, elo0: float, elo1: float) -> float:
+    """
+    Log-likelihood ratio dello SPRT tra H0 (elo = elo0) e H1 (elo = elo1),
+    con l'approssimazione normale sul punteggio medio per partita.
+    """
+    games = wins + draws + losses
+    if games == 0:
+        return 0.0
+    mean, variance = _score_mean_and_variance(wins, draws, losses)
+    if variance == 0:
+        return 0.0
+    score0, score1 = score_from_elo(elo0), score_from_elo(elo1)
+    return games * (score1 - score0) * (2 * mean - score0 - score1) / (2 * variance)
+
+
+def sprt_status(llr: float, alpha: float, beta: float) -> str:
+    """Restituisce "PASS" (H1 accettata), "FAIL" (H0 accettata) o "IN CORSO"."""
+    lower = math.log(beta / (1 - alpha))
+    upper = math.log((1 - beta) / alpha)
+    if llr >= upper:
+        return "PASS"
+    if llr <= lower:
+        return "FAIL"
+    return "IN CORSO"
+
+
+# --- Riga di comando ---
+
+def load_openings(path: Optional[str]) -> List[str]:
+    """Legge le FEN di apertura (una per riga, '#' per i commenti); senza file usa la posizione iniziale."""
+    if path is None:
+        return [STARTING_FEN]
+    openings = []
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            line = line.split("#", 1)[0].strip()
+            if line:
+                Position.from_fen(line)  # Valida subito, prima di avviare il pool
+                openings.append(line)
+    if not openings:
+        raise ValueError(f"Nessuna apertura trovata in '{path}'")
+    return openings
+
+
+def build_tasks(args: argparse.Namespace, openings: List[str], limits: MatchLimits) -> List[GameTask]:
+    """
+    Prepara le partite: ogni apertura viene giocata due volte a colori invertiti.
+    L'ordine delle aperture dipende solo dal seme, quindi la partita i è riproducibile.
+    """
+    rng = random.Random(args.seed)
+    shuffled = openings[:]
+    rng.shuffle(shuffled)
+    tasks = []
+    for index in range(args.games):
+        opening = shuffled[(index // 2) % len(shuffled)]
+        a_is_white = index % 2 == 0
+        white, black = (args.engine_a, args.engine_b) if a_is_white else (args.engine_b, args.engine_a)
+        tasks.append(GameTask(index, opening, white, black, a_is_white, limits, args.max_plies, args.seed + index,
+                              args.tablebase))
+    return tasks
+
+
+def _iter_results(tasks: List[GameTask], jobs: int) -> Iterator[GameRecord]:
+    """
+    Gioca le partite (in parallelo se jobs > 1) restituendole man mano che terminano.
+    Con più processi l'ordine è quello di fine partita, non quello dei task: una partita
+    lunga non blocca il PGN né il conteggio dei risultati (il tag Round resta l'indice).
+    """
+    return pool_map(play_game, tasks, jobs, ordered=False, initializer=_init_worker)
+
+
+def run_match(argv: Optional[List[str]] = None, output: TextIO = sys.stdout, report: TextIO = sys.stderr) -> int:
+    """
+    Avvia un torneo tra due motori da riga di comando.
+    Il PGN viene scritto in streaming su `output` (o su --pgn), il riepilogo su `report`.
+
+    Returns:
+        0 al termine del torneo, 2 per argomenti non validi.
+    """
+    parser = argparse.ArgumentParser(prog="python -m chess match",
+                                     description="Torneo di self-play tra due motori.")
+    parser.add_argument("--engine-a", default=BUILTIN_ENGINE, help="Motore A: 'builtin' (es. 'builtin:eval=nnue') o comando UCI.")
+    parser.add_argument("--engine-b", default=BUILTIN_ENGINE, help="Motore B: 'builtin' (es. 'builtin:eval=nnue') o comando UCI.")
+    parser.add_argument("--games", type=int, default=2, help="Numero di partite.")
+    parser.add_argument("--jobs", type=int, default=1, help="Processi paralleli.")
+    parser.add_argument("--openings", help="File con una FEN di apertura per riga.")
+    parser.add_argument("--seed", type=int, default=0, help="Seme per l'ordine delle aperture.")
+    parser.add_argument("--depth", type=int, help="Profondità massima per mossa.")
+    parser.add_argument("--nodes", type=int, help="Nodi massimi per mossa.")
+    parser.add_argument("--movetime", type=float, help="Secondi per mossa.")
+    parser.add_argument("--tc", help="Controllo di tempo 'base+incremento' in secondi.")
+    parser.add_argument("--max-plies", type=int, default=DEFAULT_MAX_PLIES, help="Semimosse prima della patta d'ufficio.")
+    parser.add_argument("--tablebase", help="Directory delle tablebase per aggiudicare i finali.")
+    parser.add_argument("--pgn", help="File PGN di uscita (default: stdout).")
+    parser.add_argument("--elo0", type=float, default=0.0, help="Ipotesi H0 dello SPRT.")
+    parser.add_argument("--elo1", type=float, default=5.0, help="Ipotesi H1 dello SPRT.")
+    parser.add_argument("--alpha", type=float, default=0.05, help="Errore di primo tipo dello SPRT.")
+    parser.add_argument("--beta", type=float, default=0.05, help="Errore di secondo tipo dello SPRT.")
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return int(e.code or 0)
+
+    base_time, increment = (None, 0.0)
+    if args.tc:
+        try:
+            control = parse_time_control(args.tc)
+        except ValueError as e:
+            report.write(f"Errore: {e}\n")
+            return 2
+        base_time, increment = control.base, control.increment
+    if args.depth is None and args.nodes is None and args.movetime is None and base_time is None:
+        args.depth = 3  # Senza limiti le partite non terminerebbero
+    limits = MatchLimits(args.depth, args.nodes, args.movetime, base_time, increment)
+
+    try:
+        openings = load_openings(args.openings)
+    except (OSError, ValueError) as e:
+        report.write(f"Errore: {e}\n")
+        return 2
+
+    pgn_stream = open(args.pgn, "w", encoding="utf-8") if args.pgn else output
+    wins = draws = losses = 0
+    total_nodes = 0
+    start_time = time.monotonic()
+    try:
+        for record in _iter_results(build_tasks(args, openings, limits), args.jobs):
+            headers = {"Event": "Match", "Site": "Chess-TUI", "Round": str(record.index + 1),
+                       "White": record.white_spec, "Black": record.black_spec,
+                       "Termination": record.reason}
+            pgn_stream.write(format_game(headers, record.san_moves, record.result, record.opening_fen))
+            pgn_stream.flush()
+            score = record.score_for_a()
+            wins += score == 1.0
+            draws += score == 0.5
+            losses += score == 0.0
+            total_nodes += record.nodes
+    finally:
+        if pgn_stream is not output:
+            pgn_stream.close()
+        close_players()
+
+    elapsed = time.monotonic() - start_time
+    elo, margin = elo_estimate(wins, draws, losses)
+    llr = sprt_llr(wins, draws, losses, args.elo0, args.elo1)
+    games = wins + draws + losses
+    report.write(f"Partite: {games}  A: +{wins} ={draws} -{losses}\n")
+    report.write(f"Elo A-B: {elo:+.1f} +/- {margin:.1f}\n")
+    report.write(f"SPRT [{args.elo0}, {args.elo1}] LLR {llr:.2f}: {sprt_status(llr, args.alpha, args.beta)}\n")
+    per_core = games / elapsed / max(args.jobs, 1) if elapsed > 0 else 0.0
+    report.write(f"Tempo: {elapsed:.1f}s  partite/s per processo: {per_core:.2f}  nodi: {total_nodes}\n")
+    return 0
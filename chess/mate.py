@@ -0,0 +1,437 @@
+# mate.py
+"""
+Risolutore di matti forzati con proof-number search in profondità (df-pn) e
+modalità batch per validare file di problemi su un pool di processi.
+"""
+
+import argparse
+import random
+import sys
+import time
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, TextIO, Tuple
+
+from .pool import pool_map
+from .position import Move, Position
+
+# Valore "infinito" dei numeri di prova/confutazione (sta in un intero a 32 bit senza segno)
+PN_INFINITY = 1 << 30
+# Voci predefinite della tabella delle trasposizioni (circa 17 MB)
+DEFAULT_MATE_TT_ENTRIES = 1 << 20
+# Lunghezza massima predefinita del matto cercato, in mosse dell'attaccante
+DEFAULT_MATE_DEPTH = 5
+
+# Esiti riportati nella modalità batch, uno per riga di uscita
+STATUS_MATE = "matto"
+STATUS_NO_MATE = "nessun_matto"
+STATUS_UNSOLVED = "non_risolto"
+STATUS_ERROR = "errore"
+
+# Chiavi per le semimosse residue, combinate con lo Zobrist della posizione: la stessa
+# posizione con un orizzonte diverso è un nodo diverso del grafo di ricerca
+_PLY_RANDOM = random.Random(0xDF9)  # nosec B311 - hashing, non crittografia
+_PLY_KEYS = [_PLY_RANDOM.getrandbits(64) for _ in range(256)]
+
+
+class _NodeLimitReached(Exception):
+    """Interrompe la ricerca quando si supera il limite di nodi."""
+
+
+class MateResult(NamedTuple):
+    """Esito della ricerca di un matto forzato."""
+    mate_in: Optional[int]  # mosse dell'attaccante fino al matto; None se non trovato
+    pv: List[Move]  # variante principale, dalla prima mossa dell'attaccante al matto
+    nodes: int
+    elapsed: float  # secondi
+    solved: bool  # False se il limite di nodi ha interrotto la ricerca
+
+
+class ProofTable:
+    """
+    Tabella a dimensione fissa dei numeri di prova e confutazione, indicizzata da
+    Zobrist e semimosse residue; in caso di collisione la voce nuova sostituisce la
+    vecchia, così la memoria resta limitata anche su ricerche di milioni di nodi.
+    """
+
+    def __init__(self, entries: int = DEFAULT_MATE_TT_ENTRIES):
+        """
+        Args:
+            entries: Numero di voci, arrotondato alla potenza di due superiore.
+
+        Raises:
+            ValueError: Se `entries` non è positivo.
+        """
+        if entries <= 0:
+            raise ValueError("La tabella delle trasposizioni deve avere almeno una voce")
+        size = 1 << (entries - 1).bit_length()
+        self._mask = size - 1
+        self._keys = array("Q", bytes(8 * size))
+        self._filled = bytearray(size)
+        self._proof = array("I", bytes(4 * size))
+        self._disproof = array("I", bytes(4 * size))
+        self.probes = 0
+        self.hits = 0
+        self.overwrites = 0
+
+    def __len__(self) -> int:
+        return self._mask + 1
+
+    def get(self, key: int, plies: int) -> Optional[Tuple[int, int]]:
+        """Restituisce la coppia (prova, confutazione) del nodo, o None se assente."""
+        self.probes += 1
+        tag = key ^ _PLY_KEYS[plies]
+        slot = tag & self._mask
+        if not self._filled[slot] or self._keys[slot] != tag:
+            return None
+        self.hits += 1
+        return self._proof[slot], self._disproof[slot]
+
+    def store(self, key: int, plies: int, proof: int, disproof: int):
+        """Memorizza i numeri del nodo, sostituendo la voce eventualmente presente nello slot."""
+        tag = key ^ _PLY_KEYS[plies]
+        slot = tag & self._mask
+        if self._filled[slot] and self._keys[slot] != tag:
+            self.overwrites += 1
+        self._filled[slot] = 1
+        self._keys[slot] = tag
+        self._proof[slot] = proof
+        self._disproof[slot] = disproof
+
+    def clear(self):
+        """Svuota la tabella e azzera le statistiche."""
+        self._filled = bytearray(len(self))
+        self.probes = self.hits = self.overwrites = 0
+
+    def memory_bytes(self) -> int:
+        """Memoria occupata dai dati della tabella, in byte."""
+        return (self._keys.itemsize * len(self._keys) + len(self._filled)
+                + self._proof.itemsize * len(self._proof) + self._disproof.itemsize * len(self._disproof))
+
+    def stats(self) -> Dict[str, Any]:
+        """Statistiche di utilizzo della tabella."""
+        return {
+            "entries": len(self),
+            "memory_kb": round(self.memory_bytes() / 1024, 1),
+            "probes": self.probes,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.probes, 4) if self.probes else 0.0,
+            "overwrites": self.overwrites,
+        }
+
+
+def _has_legal_move(position: Position) -> bool:
+    """Indica se il giocatore al tratto ha almeno una mossa legale (si ferma alla prima)."""
+    return any(position.is_legal(move) for move in position.pseudo_legal_moves())
+
+
+class MateSolver:
+    """
+    Dimostra o confuta un matto forzato per il giocatore al tratto con df-pn:
+    i nodi OR sono le mosse dell'attaccante, i nodi AND le risposte del difensore.
+    L'orizzonte cresce di una mossa alla volta, quindi il primo matto dimostrato è
+    il più corto; la tabella resta valida tra un orizzonte e il successivo.
+    """
+
+    def __init__(self, tt_entries: int = DEFAULT_MATE_TT_ENTRIES, max_nodes: Optional[int] = None):
+        """
+        Args:
+            tt_entries: Voci della tabella delle trasposizioni.
+            max_nodes: Nodi massimi per problema (None = nessun limite).
+        """
+        self.table = ProofTable(tt_entries)
+        self.max_nodes = max_nodes
+        self.nodes = 0
+
+    def solve(self, position: Position, max_moves: int = DEFAULT_MATE_DEPTH) -> MateResult:
+        """
+        Cerca il matto più corto entro `max_moves` mosse dell'attaccante.
+        La posizione viene riportata allo stato iniziale al termine.
+
+        Args:
+            position: La posizione; l'attaccante è il giocatore al tratto.
+            max_moves: Lunghezza massima del matto, in mosse dell'attaccante.
+
+        Returns:
+            Il MateResult con lunghezza e variante principale del matto, se esiste.
+        """
+        self.table.clear()
+        self.nodes = 0
+        root_ply = position.ply
+        start_time = time.perf_counter()
+        try:
+            for moves in range(1, max_moves + 1):
+                plies = 2 * moves - 1
+                proof, _ = self._mid(position, plies, True, PN_INFINITY, PN_INFINITY)
+                if proof == 0:
+                    pv = self._principal_variation(position, plies)
+                    return MateResult(moves, pv, self.nodes, time.perf_counter() - start_time, True)
+        except _NodeLimitReached:
+            while position.ply > root_ply:
+                position.unmake_move()
+            return MateResult(None, [], self.nodes, time.perf_counter() - start_time, False)
+        return MateResult(None, [], self.nodes, time.perf_counter() - start_time, True)
+
+    def _mid(self, position: Position, plies: int, or_node: bool, proof_threshold: int,
+             disproof_threshold: int) -> Tuple[int, int]:
+        """
+        Espande il nodo finché uno dei suoi numeri non raggiunge la soglia (Nagai, 2002).
+
+        Returns:
+            I numeri (prova, confutazione) del nodo, salvati anche nella tabella.
+        """
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise _NodeLimitReached()
+        key = position.zobrist_key()
+
+        if or_node and plies == 1:
+            # All'ultima mossa può dare matto solo uno scacco: le altre sono escluse subito
+            moves = []
+            for move in position.legal_moves():
+                position.make_move(move)
+                if position.in_check():
+                    moves.append(move)
+                position.unmake_move()
+        elif plies == 0:
+            moves = []
+        else:
+            moves = position.legal_moves()
+
+        if not moves:
+            if or_node:
+                numbers = (PN_INFINITY, 0)
+            elif position.in_check() and (plies > 0 or not _has_legal_move(position)):
+                numbers = (0, PN_INFINITY)
+            else:
+                numbers = (PN_INFINITY, 0)
+            self.table.store(key, plies, *numbers)
+            return numbers
+
+        children: List[List[Any]] = []
+        for move in moves:
+            position.make_move(move)
+            child_key = position.zobrist_key()
+            entry = self.table.get(child_key, plies - 1)
+            if entry is None:
+                # Dal lato dell'attaccante gli scacchi sono i candidati più promettenti
+                entry = (1 if not or_node or position.in_check() else 2, 1)
+            position.unmake_move()
+            children.append([move, entry[0], entry[1]])
+
+        while True:
+            if or_node:
+                proof = min(child[1] for child in children)
+                disproof = min(PN_INFINITY, sum(child[2] for child in children))
+            else:
+                proof = min(PN_INFINITY, sum(child[1] for child in children))
+                disproof = min(child[2] for child in children)
+            if proof >= proof_threshold or disproof >= disproof_threshold:
+                break
+
+            # Figlio più promettente e secondo miglior valore, per le soglie del figlio
+            index = 1 if or_node else 2
+            best = second = None
+            for child in children:
+                if best is None or child[index] < best[index]:
+                    second = best
+                    best = child
+                elif second is None or child[index] < second[index]:
+                    second = child
+            second_value = second[index] if second is not None else PN_INFINITY
+            if or_node:
+                child_proof_threshold = min(proof_threshold, second_value + 1)
+                child_disproof_threshold = min(PN_INFINITY, disproof_threshold - disproof + best[2])
+            else:
+                child_proof_threshold = min(PN_INFINITY, proof_threshold - proof + best[1])
+                child_disproof_threshold = min(disproof_threshold, second_value + 1)
+
+            position.make_move(best[0])
+            best[1], best[2] = self._mid(position, plies - 1, not or_node,
+                                         child_proof_threshold, child_disproof_threshold)
+            position.unmake_move()
+
+        self.table.store(key, plies, proof, disproof)
+        return proof, disproof
+
+    def _proves(self, position: Position, plies: int, or_node: bool) -> bool:
+        """Indica se il nodo è dimostrato, consultando la tabella o ricercandolo di nuovo."""
+        entry = self.table.get(position.zobrist_key(), plies)
+        if entry is None or entry[0] != 0 and entry[1] != 0:
+            entry = self._mid(position, plies, or_node, PN_INFINITY, PN_INFINITY)
+        return entry[0] == 0
+
+    def _principal_variation(self, position: Position, plies: int) -> List[Move]:
+        """
+        Ricostruisce la variante di un nodo radice dimostrato: l'attaccante gioca una
+        mossa dimostrata, il difensore la risposta che rimanda più a lungo il matto.
+        """
+        pv: List[Move] = []
+        or_node = True
+        while plies > 0:
+            chosen = None
+            if or_node:
+                for move in position.legal_moves():
+                    position.make_move(move)
+                    proven = self._proves(position, plies - 1, False)
+                    position.unmake_move()
+                    if proven:
+                        chosen = move
+                        break
+            else:
+                longest = -1
+                for move in position.legal_moves():
+                    position.make_move(move)
+                    # Orizzonte minimo con cui il matto resta dimostrato dopo questa risposta
+                    needed = next(depth for depth in range(1, plies, 2) if self._proves(position, depth, True))
+                    position.unmake_move()
+                    if needed > longest:
+                        chosen, longest = move, needed
+                plies = longest + 1
+            if chosen is None:
+                break
+            position.make_move(chosen)
+            pv.append(chosen)
+            plies -= 1
+            or_node = not or_node
+        for _ in pv:
+            position.unmake_move()
+        return pv
+
+
+def solve_mate(position: Position, max_moves: int = DEFAULT_MATE_DEPTH, max_nodes: Optional[int] = None,
+               tt_entries: int = DEFAULT_MATE_TT_ENTRIES) -> MateResult:
+    """
+    Cerca un matto forzato entro `max_moves` mosse per il giocatore al tratto.
+
+    Args:
+        position: La posizione da risolvere (non viene modificata).
+        max_moves: Lunghezza massima del matto, in mosse dell'attaccante.
+        max_nodes: Nodi massimi prima di rinunciare (None = nessun limite).
+        tt_entries: Voci della tabella delle trasposizioni.
+
+    Returns:
+        Il MateResult della ricerca.
+    """
+    return MateSolver(tt_entries, max_nodes).solve(position, max_moves)
+
+
+# --- Modalità batch ---
+
+class PuzzleTask(NamedTuple):
+    """Un problema da risolvere in un processo del pool."""
+    index: int
+    fen: str
+    max_moves: int
+    max_nodes: Optional[int]
+    tt_entries: int
+
+
+class PuzzleResult(NamedTuple):
+    """Esito di un problema, pronto per essere scritto come riga di uscita."""
+    index: int
+    fen: str
+    status: str
+    mate_in: Optional[int]
+    pv: List[str]  # mosse in notazione UCI
+    nodes: int
+    elapsed: float
+    error: str = ""
+
+    def format_line(self) -> str:
+        """Riga tabulata: indice, esito, mosse, variante, nodi, secondi, FEN (o errore)."""
+        mate_in = str(self.mate_in) if self.mate_in is not None else "-"
+        pv = " ".join(self.pv) or "-"
+        tail = self.error or self.fen
+        return f"{self.index}\t{self.status}\t{mate_in}\t{pv}\t{self.nodes}\t{self.elapsed:.3f}\t{tail}"
+
+
+# Risolutori già creati nel processo, uno per dimensione della tabella delle trasposizioni
+_SOLVER_CACHE: Dict[int, MateSolver] = {}
+
+
+def solve_puzzle(task: PuzzleTask) -> PuzzleResult:
+    """Risolve un problema del file; le FEN non valide producono un esito di errore."""
+    try:
+        position = Position.from_fen(task.fen)
+    except ValueError as e:
+        return PuzzleResult(task.index, task.fen, STATUS_ERROR, None, [], 0, 0.0, str(e))
+    solver = _SOLVER_CACHE.get(task.tt_entries)
+    if solver is None:
+        solver = _SOLVER_CACHE[task.tt_entries] = MateSolver(task.tt_entries)
+    solver.max_nodes = task.max_nodes
+    result = solver.solve(position, task.max_moves)
+    if not result.solved:
+        status = STATUS_UNSOLVED
+    else:
+        status = STATUS_MATE if result.mate_in is not None else STATUS_NO_MATE
+    return PuzzleResult(task.index, task.fen, status, result.mate_in, [move.uci() for move in result.pv],
+                        result.nodes, result.elapsed)
+
+
+def read_puzzles(lines: Iterable[str]) -> Iterator[str]:
+    """Estrae le FEN da un file di problemi (una per riga, '#' per i commenti)."""
+    for line in lines:
+        line = line.split("#", 1)[0].strip()
+        if line:
+            yield line
+
+
+def iter_puzzle_results(tasks: Iterable[PuzzleTask], jobs: int) -> Iterator[PuzzleResult]:
+    """Risolve i problemi (in parallelo se jobs > 1) restituendoli nell'ordine del file."""
+    return pool_map(solve_puzzle, tasks, jobs)
+
+
+def run_mate(argv: Optional[List[str]] = None, output: TextIO = sys.stdout, report: TextIO = sys.stderr) -> int:
+    """
+    Valida un file di problemi di matto da riga di comando.
+    Scrive una riga per problema su `output` man mano che vengono risolti e il riepilogo su `report`.
+
+    Returns:
+        0 al termine, 2 per argomenti non validi o file illeggibile.
+    """
+    parser = argparse.ArgumentParser(prog="python -m chess mate",
+                                     description="Dimostra o confuta matti forzati con la proof-number search.")
+    parser.add_argument("--fen-file", required=True, help="File con una FEN per riga ('-' per lo standard input).")
+    parser.add_argument("--max-depth", type=int, default=DEFAULT_MATE_DEPTH,
+                        help=f"Lunghezza massima del matto in mosse (default: {DEFAULT_MATE_DEPTH}).")
+    parser.add_argument("--jobs", type=int, default=1, help="Processi paralleli.")
+    parser.add_argument("--max-nodes", type=int, help="Nodi massimi per problema (default: nessun limite).")
+    parser.add_argument("--tt-size", type=int, default=DEFAULT_MATE_TT_ENTRIES,
+                        help=f"Voci della tabella delle trasposizioni per processo (default: {DEFAULT_MATE_TT_ENTRIES}).")
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return int(e.code or 0)
+    if args.max_depth < 1 or 2 * args.max_depth > len(_PLY_KEYS) or args.tt_size <= 0:
+        report.write("Errore: --max-depth deve essere tra 1 e 127 e --tt-size positivo\n")
+        return 2
+
+    try:
+        handle = sys.stdin if args.fen_file == "-" else open(args.fen_file, encoding="utf-8")
+    except OSError as e:
+        report.write(f"Errore: {e}\n")
+        return 2
+
+    counts = {STATUS_MATE: 0, STATUS_NO_MATE: 0, STATUS_UNSOLVED: 0, STATUS_ERROR: 0}
+    total_nodes = 0
+    start_time = time.monotonic()
+    try:
+        tasks = (PuzzleTask(index, fen, args.max_depth, args.max_nodes, args.tt_size)
+                 for index, fen in enumerate(read_puzzles(handle), 1))
+        output.write("# indice\tesito\tmosse\tvariante\tnodi\tsecondi\tfen\n")
+        for result in iter_puzzle_results(tasks, args.jobs):
+            output.write(result.format_line() + "\n")
+            output.flush()
+            counts[result.status] += 1
+            total_nodes += result.nodes
+    finally:
+        if handle is not sys.stdin:
+            handle.close()
+
+    elapsed = time.monotonic() - start_time
+    puzzles = sum(counts.values())
+    rate = puzzles / elapsed if elapsed > 0 else 0.0
+    report.write(f"{puzzles} problemi in {elapsed:.1f}s ({rate:.1f}/s, {total_nodes} nodi): "
+                 f"{counts[STATUS_MATE]} matti, {counts[STATUS_NO_MATE]} senza matto, "
+                 f"{counts[STATUS_UNSOLVED]} non risolti, {counts[STATUS_ERROR]} errori\n")
+    return 0
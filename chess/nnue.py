@@ -0,0 +1,379 @@
+# nnue.py
+"""
+Valutazione con una piccola rete neurale quantizzata in stile NNUE.
+
+Architettura: 768 ingressi binari (colore relativo x tipo x casa) -> accumulatore di
+H neuroni per ciascuna prospettiva -> ReLU limitata -> strato nascosto di L neuroni ->
+uscita in centipedoni. Il primo strato è una somma di colonne della matrice dei pesi,
+quindi l'accumulatore si aggiorna sottraendo e sommando le colonne dei pezzi tolti e
+aggiunti da ogni mossa invece di ricalcolarlo; gli strati successivi sono prodotti
+matrice-vettore NumPy su interi.
+
+Quantizzazione: pesi del primo strato int16 e accumulatori int32 nella scala `QA`
+(1.0 = QA), pesi dello strato nascosto int8 e dell'uscita int16 nella scala `QB`.
+Il formato del file dei pesi è descritto in `save_weights`.
+"""
+
+import argparse
+import struct
+import sys
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence, TextIO, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    raise ImportError("La valutazione NNUE richiede NumPy: pip install numpy") from None
+
+from .constants import Color, BOARD_SIZE
+from .evaluation import PIECE_SQUARE_TABLES, PIECE_VALUES, evaluate
+from .pieces import Pawn, Knight, Bishop, Rook, Queen, King
+from .position import Position
+
+# Ordine dei tipi di pezzo negli indici delle caratteristiche
+PIECE_TYPES = (Pawn, Knight, Bishop, Rook, Queen, King)
+FEATURES = 2 * len(PIECE_TYPES) * BOARD_SIZE * BOARD_SIZE
+# Valore dell'ingresso 1.0 negli accumulatori e limite superiore della ReLU
+QA = 255
+# Scala dei pesi dello strato nascosto e dell'uscita (divisione con shift)
+QB = 64
+_QB_SHIFT = 6
+DEFAULT_HIDDEN = 32
+
+# Intestazione del file dei pesi: magia, versione, ingressi, neuroni dell'accumulatore, neuroni nascosti
+_MAGIC = b"SCNN"
+_VERSION = 1
+_HEADER = struct.Struct("<4sHHHH")
+
+_TYPE_INDEX = {piece_type: index for index, piece_type in enumerate(PIECE_TYPES)}
+
+
+class NNUEWeights(NamedTuple):
+    """Pesi quantizzati della rete."""
+    feature_weights: np.ndarray  # (FEATURES, H) int16
+    feature_bias: np.ndarray  # (H,) int16
+    hidden_weights: np.ndarray  # (L, 2H) int8
+    hidden_bias: np.ndarray  # (L,) int32
+    output_weights: np.ndarray  # (L,) int16
+    output_bias: int
+
+    @property
+    def accumulator_size(self) -> int:
+        return self.feature_weights.shape[1]
+
+    @property
+    def hidden_size(self) -> int:
+        return self.hidden_weights.shape[0]
+
+
+def feature_index(perspective: Color, color: Color, piece_type: type, square: Tuple[int, int]) -> int:
+    """
+    Indice della caratteristica di un pezzo vista da una prospettiva: i pezzi della
+    prospettiva vengono prima e la scacchiera è ribaltata per il Nero, così i pesi
+    valgono per entrambi i colori.
+    """
+    row, col = square
+    if perspective == Color.BLACK:
+        row = BOARD_SIZE - 1 - row
+    relative = 0 if color == perspective else 1
+    return (relative * len(PIECE_TYPES) + _TYPE_INDEX[piece_type]) * BOARD_SIZE * BOARD_SIZE + row * BOARD_SIZE + col
+
+
+def save_weights(weights: NNUEWeights, path: str):
+    """
+    Salva i pesi in formato binario little-endian: intestazione `<4sHHHH`
+    ("SCNN", versione, ingressi, H, L) seguita da pesi e bias del primo strato (int16),
+    dello strato nascosto (int8, int32) e dell'uscita (int16, int32).
+    """
+    with open(path, "wb") as handle:
+        handle.write(_HEADER.pack(_MAGIC, _VERSION, FEATURES, weights.accumulator_size, weights.hidden_size))
+        handle.write(weights.feature_weights.astype("<i2").tobytes())
+        handle.write(weights.feature_bias.astype("<i2").tobytes())
+        handle.write(weights.hidden_weights.astype("i1").tobytes())
+        handle.write(weights.hidden_bias.astype("<i4").tobytes())
+        handle.write(weights.output_weights.astype("<i2").tobytes())
+        handle.write(struct.pack("<i", weights.output_bias))
+
+
+def load_weights(path: str) -> NNUEWeights:
+    """
+    Legge un file di pesi scritto da `save_weights`.
+
+    Raises:
+        ValueError: Se il file non è valido o ha dimensioni incoerenti.
+    """
+    with open(path, "rb") as handle:
+        data = handle.read()
+    if len(data) < _HEADER.size:
+        raise ValueError(f"File dei pesi NNUE troppo corto: {path}")
+    magic, version, features, accumulator, hidden = _HEADER.unpack_from(data)
+    if magic != _MAGIC or version != _VERSION or features != FEATURES:
+        raise ValueError(f"File dei pesi NNUE non valido o di versione diversa: {path}")
+
+    layout = (("<i2", (features, accumulator)), ("<i2", (accumulator,)), ("i1", (hidden, 2 * accumulator)),
+              ("<i4", (hidden,)), ("<i2", (hidden,)), ("<i4", (1,)))
+    arrays = []
+    offset = _HEADER.size
+    for dtype, shape in layout:
+        count = int(np.prod(shape))
+        size = count * np.dtype(dtype).itemsize
+        if offset + size > len(data):
+            raise ValueError(f"File dei pesi NNUE troncato: {path}")
+        arrays.append(np.frombuffer(data, dtype=dtype, count=count, offset=offset).reshape(shape))
+        offset += size
+    if offset != len(data):
+        raise ValueError(f"File dei pesi NNUE con dati in eccesso: {path}")
+    return NNUEWeights(arrays[0].astype(np.int16), arrays[1].astype(np.int16), arrays[2].astype(np.int8),
+                       arrays[3].astype(np.int32), arrays[4].astype(np.int16), int(arrays[5][0]))
+
+
+def classical_weights() -> NNUEWeights:
+    """
+    Rete iniziale che riproduce (a meno della quantizzazione) materiale e tabelle
+    pezzo-casa della valutazione classica (`evaluate_pieces`):
+    un neurone dell'accumulatore per tipo di pezzo somma materiale e tabelle pezzo-casa
+    dei pezzi della prospettiva, lo strato nascosto li copia per le due prospettive e
+    l'uscita ne fa la differenza. È il punto di partenza per l'addestramento e la rete
+    usata quando non si indica un file di pesi.
+    """
+    types = len(PIECE_TYPES)
+    accumulator = types
+    squares = BOARD_SIZE * BOARD_SIZE
+    feature_weights = np.zeros((FEATURES, accumulator), dtype=np.int16)
+    feature_bias = np.zeros(accumulator, dtype=np.int16)
+    output_weights = np.zeros(2 * accumulator, dtype=np.int16)
+    # Numero massimo di pezzi per tipo coperto senza saturare la ReLU
+    counts = {Pawn: 8, Knight: 2, Bishop: 2, Rook: 2, Queen: 2, King: 1}
+    for piece_type, index in _TYPE_INDEX.items():
+        values = [PIECE_VALUES[piece_type] + PIECE_SQUARE_TABLES[piece_type][row][col]
+                  for row in range(BOARD_SIZE) for col in range(BOARD_SIZE)]
+        # Valori negativi (solo il Re) traslati a zero: ogni lato ha un Re e la traslazione si annulla
+        low = min(0, min(values))
+        step = (max(values) - low) * counts[piece_type] / QA  # centipedoni per unità dell'accumulatore
+        for square, value in enumerate(values):
+            feature_weights[index * squares + square, index] = round((value - low) / step)
+        output_weights[index] = round(step * QB)
+        output_weights[accumulator + index] = -round(step * QB)
+    hidden_weights = np.zeros((2 * accumulator, 2 * accumulator), dtype=np.int8)
+    np.fill_diagonal(hidden_weights, QB)
+    return NNUEWeights(feature_weights, feature_bias, hidden_weights,
+                       np.zeros(2 * accumulator, dtype=np.int32), output_weights, 0)
+
+
+def _piece_features(position: Position) -> Tuple[List[int], List[int]]:
+    """Indici delle caratteristiche attive dalle prospettive del Bianco e del Nero."""
+    white, black = [], []
+    for piece in position.board.get_all_pieces():
+        white.append(feature_index(Color.WHITE, piece.color, type(piece), piece.position))
+        black.append(feature_index(Color.BLACK, piece.color, type(piece), piece.position))
+    return white, black
+
+
+class NNUEEvaluator:
+    """
+    Funzione di valutazione per `Searcher` basata sulla rete.
+
+    Gli accumulatori sono tenuti in una pila parallela a quella delle mosse della
+    Position: a ogni chiamata si riusano quelli delle mosse ancora presenti e si
+    aggiornano solo quelli delle mosse nuove, con le differenze fornite da
+    `Position.piece_deltas`. Una Position diversa richiede un ricalcolo completo;
+    se la scacchiera viene modificata senza `make_move` va chiamato `reset`.
+    """
+
+    def __init__(self, weights: Optional[NNUEWeights] = None):
+        """
+        Args:
+            weights: I pesi della rete (default: `classical_weights()`).
+        """
+        self.weights = weights if weights is not None else classical_weights()
+        self._feature_weights = self.weights.feature_weights.astype(np.int32)
+        self._feature_bias = self.weights.feature_bias.astype(np.int32)
+        self._hidden_weights = self.weights.hidden_weights.astype(np.int32)
+        # Strato nascosto con le metà scambiate, per gli accumulatori in ordine (Bianco, Nero) quando muove il Nero
+        accumulator_size = self.weights.accumulator_size
+        self._hidden_by_side = (self._hidden_weights,
+                                np.roll(self._hidden_weights, accumulator_size, axis=1))
+        self._hidden_bias = self.weights.hidden_bias.astype(np.int32)
+        self._output_weights = self.weights.output_weights.astype(np.int64)
+        self._output_bias = self.weights.output_bias
+        # Righe (Bianco, Nero) dell'accumulatore per ogni (colore, tipo, casa): un solo accesso per pezzo
+        self._piece_rows = {
+            (color, piece_type, (row, col)): self._feature_weights[
+                [feature_index(Color.WHITE, color, piece_type, (row, col)),
+                 feature_index(Color.BLACK, color, piece_type, (row, col))]]
+            for color in (Color.WHITE, Color.BLACK) for piece_type in PIECE_TYPES
+            for row in range(BOARD_SIZE) for col in range(BOARD_SIZE)
+        }
+        self._position: Optional[Position] = None
+        # Voci (token dell'ultima mossa, accumulatori (2, H)) per ogni semimossa dello stack
+        self._entries: List[Tuple[object, np.ndarray]] = []
+        self.evaluations = 0
+        self.refreshes = 0
+
+    def reset(self):
+        """Dimentica gli accumulatori: la prossima valutazione li ricalcola da zero."""
+        self._position = None
+        self._entries = []
+
+    def refresh(self, position: Position) -> np.ndarray:
+        """Calcola da zero gli accumulatori (Bianco, Nero) della posizione."""
+        accumulators = np.empty((2, self.weights.accumulator_size), dtype=np.int32)
+        for perspective, features in enumerate(_piece_features(position)):
+            accumulators[perspective] = self._feature_bias + self._feature_weights[features].sum(axis=0)
+        return accumulators
+
+    def accumulators(self, position: Position) -> np.ndarray:
+        """Gli accumulatori della posizione, aggiornati in modo incrementale quando possibile."""
+        ply = position.ply
+        entries = self._entries
+        if position is not self._position or not entries:
+            self._rebuild(position)
+            return self._entries[-1][1]
+
+        # La voce k corrisponde alla posizione dopo k mosse: si tiene il prefisso ancora valido
+        depth = 1
+        while depth < len(entries) and depth <= ply and position.stack_token(depth - 1) is entries[depth][0]:
+            depth += 1
+        del entries[depth:]
+        for index in range(depth - 1, ply):
+            removed, added = position.piece_deltas(index)
+            accumulators = entries[-1][1].copy()
+            for piece in removed:
+                accumulators -= self._piece_rows[piece]
+            for piece in added:
+                accumulators += self._piece_rows[piece]
+            entries.append((position.stack_token(index), accumulators))
+        return entries[-1][1]
+
+    def _rebuild(self, position: Position):
+        """
+        Ricalcola gli accumulatori della posizione e, annullando a ritroso le differenze
+        delle mosse nello stack, quelli di tutte le posizioni precedenti: così tornare
+        sotto il punto del ricalcolo (altra mossa alla radice) non richiede un nuovo ricalcolo.
+        """
+        self.refreshes += 1
+        self._position = position
+        accumulators = self.refresh(position)
+        entries = [(position.stack_token(position.ply - 1) if position.ply else None, accumulators)]
+        for index in range(position.ply - 1, -1, -1):
+            removed, added = position.piece_deltas(index)
+            accumulators = accumulators.copy()
+            for piece in added:
+                accumulators -= self._piece_rows[piece]
+            for piece in removed:
+                accumulators += self._piece_rows[piece]
+            entries.append((position.stack_token(index - 1) if index else None, accumulators))
+        entries.reverse()
+        self._entries = entries
+
+    def forward(self, us: np.ndarray, them: np.ndarray) -> np.ndarray:
+        """
+        Strati successivi al primo per uno o più accumulatori.
+
+        Args:
+            us: Accumulatori della prospettiva del giocatore al tratto, (H,) o (N, H).
+            them: Accumulatori della prospettiva avversaria, stessa forma.
+
+        Returns:
+            Le valutazioni in centipedoni dal punto di vista del giocatore al tratto.
+        """
+        inputs = np.clip(np.concatenate((us, them), axis=-1), 0, QA)
+        return self._output_layer(inputs @ self._hidden_weights.T)
+
+    def _output_layer(self, hidden: np.ndarray) -> np.ndarray:
+        hidden += self._hidden_bias
+        hidden >>= _QB_SHIFT
+        np.minimum(np.maximum(hidden, 0, out=hidden), QA, out=hidden)
+        return (hidden @ self._output_weights + self._output_bias) >> _QB_SHIFT
+
+    def __call__(self, position: Position) -> int:
+        """Valuta la posizione dal punto di vista del giocatore al tratto."""
+        self.evaluations += 1
+        accumulators = self.accumulators(position)
+        inputs = np.minimum(np.maximum(accumulators, 0), QA).ravel()
+        hidden_weights = self._hidden_by_side[0 if position.side_to_move == Color.WHITE else 1]
+        return int(self._output_layer(hidden_weights @ inputs))
+
+    def evaluate_many(self, positions: Sequence[Position]) -> np.ndarray:
+        """Valuta molte posizioni con un unico passaggio vettoriale sugli strati successivi."""
+        if not positions:
+            return np.zeros(0, dtype=np.int64)
+        accumulators = np.stack([self.refresh(position) for position in positions])
+        black = np.array([position.side_to_move == Color.BLACK for position in positions])
+        us = np.where(black[:, None], accumulators[:, 1], accumulators[:, 0])
+        them = np.where(black[:, None], accumulators[:, 0], accumulators[:, 1])
+        return self.forward(us, them)
+
+
+# --- Misura delle valutazioni al secondo ---
+
+# Posizioni su cui misurare la velocità: apertura, mediogioco, finale
+BENCH_FENS = (
+    "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1",
+    "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10",
+    "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+)
+
+
+def evaluations_per_second(evaluate_fn, fens: Sequence[str] = BENCH_FENS, min_time: float = 0.5) -> float:
+    """
+    Valutazioni al secondo nello schema d'uso della ricerca: per ogni posizione si
+    esegue ogni mossa legale, si valuta e si annulla. Conta solo il tempo di valutazione.
+    """
+    positions = [Position.from_fen(fen) for fen in fens]
+    count, elapsed = 0, 0.0
+    while elapsed < min_time:
+        for position in positions:
+            evaluate_fn(position)
+            for move in position.legal_moves():
+                position.make_move(move)
+                start = time.perf_counter()
+                evaluate_fn(position)
+                elapsed += time.perf_counter() - start
+                count += 1
+                position.unmake_move()
+    return count / elapsed if elapsed > 0 else 0.0
+
+
+def compare_evaluators(weights: Optional[NNUEWeights] = None, min_time: float = 0.5) -> Dict[str, float]:
+    """Valutazioni al secondo della valutazione classica e della rete (incrementale e da zero)."""
+    evaluator = NNUEEvaluator(weights)
+
+    def refresh_every_time(position: Position) -> int:
+        evaluator.reset()
+        return evaluator(position)
+
+    return {
+        "classic": evaluations_per_second(evaluate, min_time=min_time),
+        "nnue": evaluations_per_second(NNUEEvaluator(weights), min_time=min_time),
+        "nnue (ricalcolo completo)": evaluations_per_second(refresh_every_time, min_time=min_time),
+    }
+
+
+def run_nnue(argv: Optional[List[str]] = None, output: TextIO = sys.stdout) -> int:
+    """
+    Strumenti da riga di comando per la rete: esporta i pesi iniziali e confronta le
+    valutazioni al secondo con la valutazione classica.
+
+    Returns:
+        Il codice di uscita del processo.
+    """
+    parser = argparse.ArgumentParser(prog="python -m chess nnue", description="Valutazione NNUE.")
+    parser.add_argument("--export", metavar="FILE", help="Salva la rete iniziale derivata dalla valutazione classica.")
+    parser.add_argument("--weights", metavar="FILE", help="File dei pesi da misurare (default: rete iniziale).")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Secondi minimi di misura per valutatore.")
+    args = parser.parse_args(argv)
+
+    if args.export:
+        save_weights(classical_weights(), args.export)
+        output.write(f"Pesi salvati in {args.export}\n")
+        return 0
+    try:
+        weights = load_weights(args.weights) if args.weights else None
+    except (OSError, ValueError) as error:
+        output.write(f"{error}\n")
+        return 1
+    for name, rate in compare_evaluators(weights, args.min_time).items():
+        output.write(f"{name:<26} {rate:>12,.0f} valutazioni/s\n")
+    return 0
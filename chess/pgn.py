@@ -0,0 +1,290 @@
+# pgn.py
+"""Notazione algebrica standard (SAN), lettura e scrittura di partite in formato PGN."""
+
+import re
+from typing import BinaryIO, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from .constants import Color
+from .pieces import Pawn, Rook, Knight, Bishop, Queen, King
+from .position import Move, Position, STARTING_FEN, PROMOTION_PIECES
+from .utils import coords_to_algebraic, algebraic_to_coords
+
+# Lettere dei pezzi nella notazione PGN (in inglese, come da standard)
+SAN_PIECE_LETTERS = {Knight: "N", Bishop: "B", Rook: "R", Queen: "Q", King: "K"}
+
+# Ordine canonico dei tag obbligatori (Seven Tag Roster)
+SEVEN_TAG_ROSTER = ("Event", "Site", "Date", "Round", "White", "Black", "Result")
+
+# Risultati ammessi come terminazione della sezione mosse
+GAME_RESULTS = ("1-0", "0-1", "1/2-1/2", "*")
+
+_SAN_PATTERN = re.compile(r"^([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(?:=?([NBRQnbrq]))?$")
+_SAN_PIECE_TYPES = {letter: piece_type for piece_type, letter in SAN_PIECE_LETTERS.items()}
+_TAG_PATTERN = re.compile(r'^\[\s*(\w+)\s+"((?:[^"\\]|\\.)*)"\s*\]')
+# Commenti, NAG, parentesi delle varianti e simboli (mosse, numeri, risultati)
+_MOVETEXT_TOKEN = re.compile(r"\{[^}]*\}|;[^\n]*|\$\d+|[()]|[^\s{}();]+")
+_MOVE_NUMBER = re.compile(r"^\d+\.+")
+_TAG_ESCAPE = re.compile(r"\\(.)")
+
+
+class PGNGame(NamedTuple):
+    """Una partita letta da un file PGN."""
+    offset: int  # posizione in byte dell'inizio della partita nel file
+    headers: Dict[str, str]
+    moves: List[str]  # mosse in SAN della linea principale
+    result: str
+
+
+def move_to_san(position: Position, move: Move) -> str:
+    """
+    Converte una mossa legale nella notazione algebrica standard (es. "Nf3", "exd5", "O-O", "e8=Q+").
+
+    Args:
+        position: La posizione prima della mossa (non viene modificata).
+        move: La mossa legale da convertire.
+
+    Returns:
+        La mossa in notazione SAN, con il suffisso '+' o '#' se dà scacco o matto.
+    """
+    board = position.board
+    piece = board.get_piece(move.start)
+    if piece is None:
+        raise ValueError(f"Nessun pezzo trovato alla posizione di partenza {move.start}")
+    end_alg = coords_to_algebraic(move.end) or "??"
+
+    if isinstance(piece, King) and abs(move.end[1] - move.start[1]) == 2:
+        san = "O-O" if move.end[1] > move.start[1] else "O-O-O"
+    elif isinstance(piece, Pawn):
+        san = ""
+        if position.is_capture(move):
+            san = f"{(coords_to_algebraic(move.start) or '?')[0]}x"
+        san += end_alg
+        if move.promotion:
+            san += f"={move.promotion.upper()}"
+    else:
+        san = SAN_PIECE_LETTERS[type(piece)]
+        rivals = [other.start for other in position.legal_moves()
+                  if other.end == move.end and other.start != move.start
+                  and type(board.get_piece(other.start)) is type(piece)]
+        if rivals:
+            start_alg = coords_to_algebraic(move.start) or "??"
+            if all(start[1] != move.start[1] for start in rivals):
+                san += start_alg[0]
+            elif all(start[0] != move.start[0] for start in rivals):
+                san += start_alg[1]
+            else:
+                san += start_alg
+        if position.is_capture(move):
+            san += "x"
+        san += end_alg
+
+    position.make_move(move)
+    if position.in_check():
+        san += "#" if not position.legal_moves() else "+"
+    position.unmake_move()
+    return san
+
+
+def format_movetext(san_moves: List[str], first_fullmove: int = 1, black_first: bool = False) -> str:
+    """
+    Compone la sezione delle mosse di una partita PGN (es. "1. e4 e5 2. Nf3").
+
+    Args:
+        san_moves: Le mosse in SAN nell'ordine di gioco.
+        first_fullmove: Numero della prima mossa completa.
+        black_first: True se la prima mossa è del Nero (partita da FEN).
+
+    Returns:
+        Il testo delle mosse, senza risultato finale.
+    """
+    tokens = []
+    move_number = first_fullmove
+    white_to_move = not black_first
+    for index, san in enumerate(san_moves):
+        if white_to_move:
+            tokens.append(f"{move_number}. {san}")
+        else:
+            tokens.append(f"{move_number}... {san}" if index == 0 else san)
+            move_number += 1
+        white_to_move = not white_to_move
+    return " ".join(tokens)
+
+
+def escape_tag_value(value: str) -> str:
+    """Protegge barre rovesciate e virgolette nel valore di un tag PGN (es. un comando UCI)."""
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+
+def format_game(headers: Dict[str, str], san_moves: List[str], result: str,
+                start_fen: Optional[str] = None) -> str:
+    """
+    Compone una partita completa in formato PGN.
+
+    Args:
+        headers: I tag della partita (quelli mancanti del Seven Tag Roster valgono "?").
+        san_moves: Le mosse in SAN.
+        result: Il risultato ("1-0", "0-1", "1/2-1/2" o "*").
+        start_fen: FEN della posizione di partenza, se diversa da quella iniziale.
+
+    Returns:
+        Il testo PGN della partita, terminato da una riga vuota.
+    """
+    tags = {name: "?" for name in SEVEN_TAG_ROSTER}
+    tags.update(headers)
+    tags["Result"] = result
+    first_fullmove, black_first = 1, False
+    if start_fen and start_fen != STARTING_FEN:
+        tags["SetUp"] = "1"
+        tags["FEN"] = start_fen
+        start_position = Position.from_fen(start_fen)
+        first_fullmove = start_position.fullmove_number
+        black_first = start_position.side_to_move == Color.BLACK
+
+    lines = [f'[{name} "{escape_tag_value(value)}"]' for name, value in tags.items()]
+    movetext = format_movetext(san_moves, first_fullmove, black_first)
+    lines.append("")
+    lines.append(f"{movetext} {result}".strip())
+    return "\n".join(lines) + "\n\n"
+
+
+def san_to_move(position: Position, san: str) -> Move:
+    """
+    Interpreta una mossa in notazione SAN nella posizione data.
+
+    Args:
+        position: La posizione prima della mossa (non viene modificata).
+        san: La mossa (es. "Nf3", "exd5", "O-O", "e8=Q+"); annotazioni come "!" e "?" sono ignorate.
+
+    Returns:
+        La Move legale corrispondente.
+
+    Raises:
+        ValueError: Se la mossa non è valida, è ambigua o non è legale.
+    """
+    text = san.rstrip("+#!?")
+    color = position.side_to_move
+    if text in ("O-O", "0-0", "O-O-O", "0-0-0"):
+        king_side = text.count("-") == 1
+        for move in position.castling_moves(color):
+            if (move.end[1] > move.start[1]) == king_side and position.is_legal(move):
+                return move
+        raise ValueError(f"Arrocco '{san}' non legale")
+
+    match = _SAN_PATTERN.match(text)
+    if match is None:
+        raise ValueError(f"Mossa SAN '{san}' non valida")
+    letter, from_file, from_rank, target, promotion = match.groups()
+    piece_type = _SAN_PIECE_TYPES[letter] if letter else Pawn
+    end = algebraic_to_coords(target)
+    promotion = promotion.lower() if promotion else None
+    if promotion is not None and (piece_type is not Pawn or promotion not in PROMOTION_PIECES):
+        raise ValueError(f"Promozione non valida in '{san}'")
+
+    candidates = []
+    for piece in position.board.get_pieces_by_color(color):
+        if type(piece) is not piece_type:
+            continue
+        start = piece.position
+        if from_file is not None and start[1] != ord(from_file) - ord("a"):
+            continue
+        if from_rank is not None and start[0] != int(from_rank) - 1:
+            continue
+        reachable = end in piece.get_valid_moves(position.board)
+        if piece_type is Pawn and end == position.ep_square and start[1] != end[1]:
+            direction = 1 if color == Color.WHITE else -1
+            reachable = end[0] == start[0] + direction and abs(end[1] - start[1]) == 1
+        if reachable:
+            move = Move(start, end, promotion)
+            if position.is_legal(move):
+                candidates.append(move)
+    if len(candidates) != 1:
+        problem = "ambigua" if candidates else "non legale"
+        raise ValueError(f"Mossa SAN '{san}' {problem}")
+    last_row = 7 if color == Color.WHITE else 0
+    if piece_type is Pawn and (end[0] == last_row) != (promotion is not None):
+        raise ValueError(f"Promozione mancante o non consentita in '{san}'")
+    return candidates[0]
+
+
+def parse_movetext(text: str) -> Tuple[List[str], str]:
+    """
+    Estrae le mosse della linea principale e il risultato da una sezione mosse PGN,
+    ignorando numeri di mossa, commenti, NAG e varianti.
+
+    Returns:
+        Le mosse in SAN e il risultato ("*" se assente).
+    """
+    moves: List[str] = []
+    result = "*"
+    depth = 0
+    for token in _MOVETEXT_TOKEN.findall(text):
+        if token == "(":
+            depth += 1
+        elif token == ")":
+            depth = max(depth - 1, 0)
+        elif depth or token[0] in "{;$":
+            continue
+        elif token in GAME_RESULTS:
+            result = token
+        else:
+            token = _MOVE_NUMBER.sub("", token)
+            if token:
+                moves.append(token)
+    return moves, result
+
+
+def read_games(handle: BinaryIO, start: int = 0, end: Optional[int] = None) -> Iterator[PGNGame]:
+    """
+    Legge in streaming le partite di un file PGN aperto in modalità binaria.
+
+    Args:
+        handle: Il file PGN.
+        start: Posizione in byte da cui iniziare (deve essere l'inizio di una partita).
+        end: Le partite che iniziano a questa posizione o dopo non vengono lette.
+
+    Yields:
+        Le partite, ciascuna con la posizione in byte del suo inizio.
+    """
+    handle.seek(start)
+    offset = start
+    game_offset: Optional[int] = None
+    headers: Dict[str, str] = {}
+    movetext: List[str] = []
+
+    def finish() -> PGNGame:
+        moves, result = parse_movetext("\n".join(movetext))
+        return PGNGame(game_offset or 0, headers, moves, headers.get("Result", result) if result == "*" else result)
+
+    for raw_line in handle:
+        line_offset = offset
+        offset += len(raw_line)
+        line = raw_line.decode("utf-8", errors="replace").strip()
+        if not line or line.startswith("%"):
+            continue
+        is_tag = line.startswith("[")
+        if game_offset is not None and is_tag and movetext:
+            yield finish()
+            game_offset, headers, movetext = None, {}, []
+        if game_offset is None:
+            if end is not None and line_offset >= end:
+                return
+            game_offset = line_offset
+        if is_tag:
+            tag = _TAG_PATTERN.match(line)
+            if tag is not None:
+                headers[tag.group(1)] = _TAG_ESCAPE.sub(r"\1", tag.group(2))
+        else:
+            movetext.append(line)
+    if game_offset is not None:
+        yield finish()
+
+
+def game_start_position(game: PGNGame) -> Position:
+    """
+    Restituisce la posizione di partenza di una partita (tag FEN o posizione iniziale).
+
+    Raises:
+        ValueError: Se il tag FEN non è valido.
+    """
+    fen = game.headers.get("FEN")
+    return Position.from_fen(fen) if fen else Position()
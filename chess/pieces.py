@@ -55,12 +55,23 @@ class Piece(ABC):
         """Indica se il pezzo si è già mosso."""
         return self._has_moved
 
+    @has_moved.setter
+    def has_moved(self, value: bool):
+        """
+        Imposta esplicitamente lo stato di movimento del pezzo.
+        Serve per annullare una mossa o per ricostruire una posizione da FEN.
+
+        Args:
+            value: True se il pezzo deve risultare già mosso.
+        """
+        self._has_moved = value
+
     @abstractmethod
     def get_valid_moves(self, board: 'Board') -> List[Tuple[int, int]]:
         """
         Restituisce una lista di mosse valide per questo pezzo sulla scacchiera data.
         Questo metodo deve essere implementato dalle sottoclassi.
-        Per lo Sprint 1, per i pedoni, restituisce solo mosse di avanzamento.
+        Le mosse sono pseudo-legali: non tengono conto dello scacco al proprio Re.
 
         Args:
             board: L'oggetto scacchiera corrente.
@@ -86,6 +97,50 @@ class Piece(ABC):
         """Rappresentazione ufficiale del pezzo."""
         return f"{self.__class__.__name__}(color={self.color}, position={self.position})"
 
+    def _step_moves(self, board: 'Board', offsets: Tuple[Tuple[int, int], ...]) -> List[Tuple[int, int]]:
+        """
+        Helper per i pezzi che si muovono di un solo passo (Cavallo, Re).
+        Include le case vuote e quelle occupate da pezzi avversari.
+        """
+        valid_moves = []
+        row, col = self.position
+        for d_row, d_col in offsets:
+            target = (row + d_row, col + d_col)
+            if not board.is_within_bounds(target):
+                continue
+            target_piece = board.get_piece(target)
+            if target_piece is None or target_piece.color != self.color:
+                valid_moves.append(target)
+        return valid_moves
+
+    def _sliding_moves(self, board: 'Board', directions: Tuple[Tuple[int, int], ...]) -> List[Tuple[int, int]]:
+        """
+        Helper per i pezzi che scorrono lungo linee (Torre, Alfiere, Regina).
+        Si ferma sul primo pezzo incontrato, includendolo se avversario.
+        """
+        valid_moves = []
+        row, col = self.position
+        for d_row, d_col in directions:
+            target = (row + d_row, col + d_col)
+            while board.is_within_bounds(target):
+                target_piece = board.get_piece(target)
+                if target_piece is None:
+                    valid_moves.append(target)
+                else:
+                    if target_piece.color != self.color:
+                        valid_moves.append(target)
+                    break
+                target = (target[0] + d_row, target[1] + d_col)
+        return valid_moves
+
+
+# Direzioni di movimento condivise dai pezzi
+ROOK_DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+BISHOP_DIRECTIONS = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+QUEEN_DIRECTIONS = ROOK_DIRECTIONS + BISHOP_DIRECTIONS
+KNIGHT_OFFSETS = ((2, 1), (2, -1), (-2, 1), (-2, -1), (1, 2), (1, -2), (-1, 2), (-1, -2))
+KING_OFFSETS = QUEEN_DIRECTIONS
+
 
 class Pawn(Piece):
     """Rappresenta un pedone."""
@@ -95,17 +150,18 @@ class Pawn(Piece):
 
     def get_valid_moves(self, board: 'Board') -> List[Tuple[int, int]]:
         """
-        Calcola le mosse valide per un pedone.
-        Per lo Sprint 1:
+        Calcola le mosse valide per un pedone:
         - Movimento in avanti di una casa.
         - Movimento iniziale in avanti di due case.
-        - NON include catture (né normali né en passant).
+        - Catture diagonali di pezzi avversari.
+        La cattura en passant e la promozione dipendono dallo stato della
+        partita e sono gestite da `Position`.
 
         Args:
             board: L'oggetto scacchiera corrente.
 
         Returns:
-            Lista di posizioni (riga, colonna) di destinazione valide per l'avanzamento.
+            Lista di posizioni (riga, colonna) di destinazione valide.
         """
         valid_moves = []
         row, col = self.position
@@ -123,16 +179,13 @@ class Pawn(Piece):
                 if board.is_within_bounds(two_steps_forward) and board.get_piece(two_steps_forward) is None:
                     valid_moves.append(two_steps_forward)
 
-        # 3. Catture (NON implementate nello Sprint 1)
-        #    Le mosse di cattura (diagonali) verrebbero aggiunte qui in sprint futuri.
-        #    Esempio:
-        #    for d_col in [-1, 1]:
-        #        capture_pos = (row + direction, col + d_col)
-        #        if board.is_within_bounds(capture_pos):
-        #            target_piece = board.get_piece(capture_pos)
-        #            if target_piece and target_piece.color != self.color:
-        #                valid_moves.append(capture_pos)
-        # TODO: Implementare cattura en passant
+        # 3. Catture diagonali
+        for d_col in (-1, 1):
+            capture_pos = (row + direction, col + d_col)
+            if board.is_within_bounds(capture_pos):
+                target_piece = board.get_piece(capture_pos)
+                if target_piece and target_piece.color != self.color:
+                    valid_moves.append(capture_pos)
 
         return valid_moves
 
@@ -142,37 +195,33 @@ class Rook(Piece):
     def get_symbol(self) -> str:
         return PIECE_SYMBOLS[(self.color, self.__class__.__name__)]
     def get_valid_moves(self, board: 'Board') -> List[Tuple[int, int]]:
-        # TODO: Implementare logica movimento Torre
-        return []
+        return self._sliding_moves(board, ROOK_DIRECTIONS)
 
 class Knight(Piece):
     """Rappresenta un Cavallo."""
     def get_symbol(self) -> str:
         return PIECE_SYMBOLS[(self.color, self.__class__.__name__)]
     def get_valid_moves(self, board: 'Board') -> List[Tuple[int, int]]:
-        # TODO: Implementare logica movimento Cavallo
-        return []
+        return self._step_moves(board, KNIGHT_OFFSETS)
 
 class Bishop(Piece):
     """Rappresenta un Alfiere."""
     def get_symbol(self) -> str:
         return PIECE_SYMBOLS[(self.color, self.__class__.__name__)]
     def get_valid_moves(self, board: 'Board') -> List[Tuple[int, int]]:
-        # TODO: Implementare logica movimento Alfiere
-        return []
+        return self._sliding_moves(board, BISHOP_DIRECTIONS)
 
 class Queen(Piece):
     """Rappresenta una Regina."""
     def get_symbol(self) -> str:
         return PIECE_SYMBOLS[(self.color, self.__class__.__name__)]
     def get_valid_moves(self, board: 'Board') -> List[Tuple[int, int]]:
-        # TODO: Implementare logica movimento Regina
-        return []
+        return self._sliding_moves(board, QUEEN_DIRECTIONS)
 
 class King(Piece):
     """Rappresenta un Re."""
     def get_symbol(self) -> str:
         return PIECE_SYMBOLS[(self.color, self.__class__.__name__)]
     def get_valid_moves(self, board: 'Board') -> List[Tuple[int, int]]:
-        # TODO: Implementare logica movimento Re (incl. non muovere in scacco)
-        return []
\ No newline at end of file
+        # L'arrocco e il controllo dello scacco sono gestiti da Position
+        return self._step_moves(board, KING_OFFSETS)
@@ -0,0 +1,62 @@
+# pool.py
+"""
+Esecuzione di task indipendenti su un pool di processi con una finestra limitata.
+
+I task vengono letti dall'iterabile solo quando si libera un posto nella finestra,
+quindi sorgenti in streaming (file PGN, elenchi di FEN) non vengono mai caricate
+per intero in memoria. I processi del pool vivono per tutta l'esecuzione: le cache
+a livello di modulo dei worker (motori, risolutori, tabelle) si creano al primo
+task e vengono riusate da quelli successivi.
+"""
+
+import collections
+import itertools
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Callable, Deque, Iterable, Iterator, Optional, Set, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Task in volo per processo: abbastanza da non lasciare processi inattivi
+TASKS_IN_FLIGHT_PER_JOB = 4
+
+
+def pool_map(fn: Callable[[T], R], tasks: Iterable[T], jobs: int, ordered: bool = True,
+             initializer: Optional[Callable[[], None]] = None) -> Iterator[R]:
+    """
+    Applica `fn` a ogni task, in parallelo se jobs > 1.
+    Con più processi restano in volo al più `jobs * TASKS_IN_FLIGHT_PER_JOB` task.
+
+    Args:
+        fn: Funzione a livello di modulo (deve poter essere inviata ai processi).
+        tasks: I task, letti man mano.
+        jobs: Numero di processi; con 1 o meno i task vengono eseguiti nel processo corrente.
+        ordered: True per restituire i risultati nell'ordine dei task, False per
+            restituirli man mano che terminano (un task lento non trattiene gli altri).
+        initializer: Funzione eseguita all'avvio di ogni processo del pool.
+
+    Returns:
+        Un iteratore sui risultati.
+    """
+    if jobs <= 1:
+        for task in tasks:
+            yield fn(task)
+        return
+    window = jobs * TASKS_IN_FLIGHT_PER_JOB
+    pending = iter(tasks)
+    with ProcessPoolExecutor(max_workers=jobs, initializer=initializer) as pool:
+        if ordered:
+            in_order: Deque[Future] = collections.deque()
+            for task in pending:
+                in_order.append(pool.submit(fn, task))
+                if len(in_order) >= window:
+                    yield in_order.popleft().result()
+            while in_order:
+                yield in_order.popleft().result()
+            return
+        in_flight: Set[Future] = {pool.submit(fn, task) for task in itertools.islice(pending, window)}
+        while in_flight:
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+            in_flight.update(pool.submit(fn, task) for task in itertools.islice(pending, len(done)))
@@ -0,0 +1,644 @@
+# position.py
+"""Definisce la classe Position, lo stato completo di una posizione usato dal motore."""
+
+import random
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .constants import Color, BOARD_SIZE
+from .board import Board, ZOBRIST_BLACK_TO_MOVE_KEY, ZOBRIST_CASTLING_KEYS, ZOBRIST_EP_FILE_KEYS
+from .pieces import (
+    Piece, Pawn, Rook, Knight, Bishop, Queen, King,
+    KNIGHT_OFFSETS, KING_OFFSETS, ROOK_DIRECTIONS, BISHOP_DIRECTIONS,
+)
+from .utils import algebraic_to_coords, coords_to_algebraic
+
+# Posizione iniziale standard in notazione FEN
+STARTING_FEN = "rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1"
+
+# Risultati di una partita in notazione PGN
+WHITE_WINS = "1-0"
+BLACK_WINS = "0-1"
+DRAW = "1/2-1/2"
+# Codici compatti dei risultati, condivisi dai formati binari (indice, archivio)
+RESULT_CODES = {"*": 0, WHITE_WINS: 1, DRAW: 2, BLACK_WINS: 3}
+
+# Mappatura lettere FEN -> classi dei pezzi (minuscole, il colore è dato dal maiuscolo)
+FEN_TO_PIECE = {'p': Pawn, 'r': Rook, 'n': Knight, 'b': Bishop, 'q': Queen, 'k': King}
+PIECE_TO_FEN = {cls: letter for letter, cls in FEN_TO_PIECE.items()}
+
+# Pezzi ammessi per la promozione, nell'ordine in cui vengono generati
+PROMOTION_PIECES = {'q': Queen, 'r': Rook, 'b': Bishop, 'n': Knight}
+
+# Codifica a 16 bit delle mosse (`encode_move`): mossa assente e codici di promozione
+NO_MOVE = 0xFFFF
+_PROMOTION_CODES = {None: 0, "n": 1, "b": 2, "r": 3, "q": 4}
+_PROMOTIONS_BY_CODE = {code: letter for letter, code in _PROMOTION_CODES.items()}
+
+# Case iniziali di Re e Torri, usate per l'arrocco e i relativi diritti
+_CASTLING_RULES = {
+    # diritto: (colore, casa Re, casa arrivo Re, casa Torre, casa arrivo Torre, case da liberare)
+    'K': (Color.WHITE, (0, 4), (0, 6), (0, 7), (0, 5), ((0, 5), (0, 6))),
+    'Q': (Color.WHITE, (0, 4), (0, 2), (0, 0), (0, 3), ((0, 1), (0, 2), (0, 3))),
+    'k': (Color.BLACK, (7, 4), (7, 6), (7, 7), (7, 5), ((7, 5), (7, 6))),
+    'q': (Color.BLACK, (7, 4), (7, 2), (7, 0), (7, 3), ((7, 1), (7, 2), (7, 3))),
+}
+# Case che, se toccate da una mossa, fanno perdere i diritti di arrocco indicati
+_CASTLING_SQUARES = {(0, 4): "KQ", (0, 7): "K", (0, 0): "Q", (7, 4): "kq", (7, 7): "k", (7, 0): "q"}
+
+
+def castling_rights_from_board(board: Board) -> str:
+    """
+    Deduce i diritti di arrocco da una Board che non li memorizza: un diritto resta
+    valido finché Re e Torre corrispondenti sono nelle case iniziali e non hanno mosso.
+    """
+    rights = ""
+    for right, (row, rook_col) in (("K", (0, 7)), ("Q", (0, 0)), ("k", (7, 7)), ("q", (7, 0))):
+        color = Color.WHITE if right.isupper() else Color.BLACK
+        king, rook = board.get_piece((row, 4)), board.get_piece((row, rook_col))
+        if (isinstance(king, King) and isinstance(rook, Rook) and king.color == rook.color == color
+                and not king.has_moved and not rook.has_moved):
+            rights += right
+    return rights
+
+
+def opponent(color: Color) -> Color:
+    """Restituisce il colore avversario."""
+    return Color.BLACK if color == Color.WHITE else Color.WHITE
+
+
+class Move(NamedTuple):
+    """Una mossa come coppia di case, con l'eventuale pezzo di promozione ('q', 'r', 'b', 'n')."""
+    start: Tuple[int, int]
+    end: Tuple[int, int]
+    promotion: Optional[str] = None
+
+    def uci(self) -> str:
+        """Restituisce la mossa in notazione UCI (es. "e2e4", "e7e8q")."""
+        start_alg = coords_to_algebraic(self.start) or "??"
+        end_alg = coords_to_algebraic(self.end) or "??"
+        return f"{start_alg}{end_alg}{self.promotion or ''}"
+
+    def __str__(self) -> str:
+        return self.uci()
+
+
+def encode_move(move: Optional[Move]) -> int:
+    """Codifica una mossa in 16 bit: partenza, arrivo (6 bit ciascuno) e promozione."""
+    if move is None:
+        return NO_MOVE
+    start = move.start[0] * BOARD_SIZE + move.start[1]
+    end = move.end[0] * BOARD_SIZE + move.end[1]
+    return start | (end << 6) | (_PROMOTION_CODES[move.promotion] << 12)
+
+
+def decode_move(code: int) -> Optional[Move]:
+    """Inverso di `encode_move`."""
+    if code == NO_MOVE:
+        return None
+    start, end, promotion = code & 0x3F, (code >> 6) & 0x3F, code >> 12
+    return Move(divmod(start, BOARD_SIZE), divmod(end, BOARD_SIZE), _PROMOTIONS_BY_CODE.get(promotion))
+
+
+class _Undo(NamedTuple):
+    """Informazioni necessarie per annullare una mossa (uso interno)."""
+    move: Move
+    piece: Piece
+    had_moved: bool
+    captured: Optional[Piece]
+    captured_pos: Optional[Tuple[int, int]]
+    castling: str
+    ep_square: Optional[Tuple[int, int]]
+    halfmove_clock: int
+    rook_move: Optional[Tuple[Tuple[int, int], Tuple[int, int], bool]]
+
+
+class Position:
+    """
+    Stato completo di una posizione: scacchiera, giocatore al tratto, diritti di
+    arrocco, casa en passant e contatori. Supporta la generazione delle mosse
+    legali e l'esecuzione/annullamento incrementale delle mosse sulla stessa
+    `Board`, senza ricostruirla.
+    """
+
+    def __init__(self,
+                 board: Optional[Board] = None,
+                 side_to_move: Color = Color.WHITE,
+                 castling: str = "KQkq",
+                 ep_square: Optional[Tuple[int, int]] = None,
+                 halfmove_clock: int = 0,
+                 fullmove_number: int = 1):
+        """
+        Inizializza una posizione. Senza argomenti rappresenta la posizione iniziale.
+
+        Args:
+            board: La scacchiera da usare (viene modificata in place dalle mosse).
+            side_to_move: Il colore che deve muovere.
+            castling: Diritti di arrocco residui, sottoinsieme di "KQkq".
+            ep_square: Casa di destinazione di una cattura en passant, se presente.
+            halfmove_clock: Semimosse dall'ultima cattura o mossa di pedone.
+            fullmove_number: Numero della mossa completa corrente.
+        """
+        self.board = board if board is not None else Board()
+        self.side_to_move = side_to_move
+        self.castling = castling
+        self.ep_square = ep_square
+        self.halfmove_clock = halfmove_clock
+        self.fullmove_number = fullmove_number
+        self._stack: List[_Undo] = []
+        self._kings: Dict[Color, Optional[Tuple[int, int]]] = {Color.WHITE: None, Color.BLACK: None}
+        for piece in self.board.get_all_pieces():
+            if isinstance(piece, King):
+                self._kings[piece.color] = piece.position
+
+    # --- FEN ---
+
+    @classmethod
+    def from_fen(cls, fen: str) -> 'Position':
+        """
+        Costruisce una posizione a partire da una stringa FEN.
+
+        Args:
+            fen: La stringa FEN (i campi dei contatori sono opzionali).
+
+        Returns:
+            La nuova Position.
+
+        Raises:
+            ValueError: Se la stringa FEN non è valida.
+        """
+        fields = fen.split()
+        if len(fields) < 2:
+            raise ValueError(f"FEN non valida: '{fen}'")
+        ranks = fields[0].split('/')
+        if len(ranks) != BOARD_SIZE:
+            raise ValueError(f"FEN non valida, servono {BOARD_SIZE} traverse: '{fen}'")
+
+        board = Board()
+        board.clear()
+        for rank_offset, rank_text in enumerate(ranks):
+            row = BOARD_SIZE - 1 - rank_offset
+            col = 0
+            for char in rank_text:
+                if char.isdigit():
+                    col += int(char)
+                    continue
+                piece_cls = FEN_TO_PIECE.get(char.lower())
+                if piece_cls is None or col >= BOARD_SIZE:
+                    raise ValueError(f"FEN non valida, carattere '{char}' inatteso: '{fen}'")
+                color = Color.WHITE if char.isupper() else Color.BLACK
+                piece = piece_cls(color, (row, col))
+                if isinstance(piece, Pawn):
+                    start_row = 1 if color == Color.WHITE else BOARD_SIZE - 2
+                    piece.has_moved = row != start_row
+                board.place_piece(piece, (row, col))
+                col += 1
+            if col != BOARD_SIZE:
+                raise ValueError(f"FEN non valida, traversa '{rank_text}' incompleta: '{fen}'")
+
+        if fields[1] not in ("w", "b"):
+            raise ValueError(f"FEN non valida, tratto '{fields[1]}' sconosciuto: '{fen}'")
+        side_to_move = Color.WHITE if fields[1] == "w" else Color.BLACK
+
+        castling_field = fields[2] if len(fields) > 2 else "-"
+        castling = "" if castling_field == "-" else castling_field
+        if any(char not in "KQkq" for char in castling):
+            raise ValueError(f"FEN non valida, arrocco '{castling_field}' sconosciuto: '{fen}'")
+
+        ep_field = fields[3] if len(fields) > 3 else "-"
+        ep_square = None
+        if ep_field != "-":
+            ep_square = algebraic_to_coords(ep_field)
+            if ep_square is None:
+                raise ValueError(f"FEN non valida, casa en passant '{ep_field}': '{fen}'")
+
+        try:
+            halfmove_clock = int(fields[4]) if len(fields) > 4 else 0
+            fullmove_number = int(fields[5]) if len(fields) > 5 else 1
+        except ValueError:
+            raise ValueError(f"FEN non valida, contatori non numerici: '{fen}'") from None
+
+        return cls(board, side_to_move, castling, ep_square, halfmove_clock, fullmove_number)
+
+    def to_fen(self) -> str:
+        """Restituisce la posizione corrente in notazione FEN."""
+        rank_texts = []
+        for row in range(BOARD_SIZE - 1, -1, -1):
+            rank_text = ""
+            empty = 0
+            for col in range(BOARD_SIZE):
+                piece = self.board.get_piece((row, col))
+                if piece is None:
+                    empty += 1
+                    continue
+                if empty:
+                    rank_text += str(empty)
+                    empty = 0
+                letter = PIECE_TO_FEN[type(piece)]
+                rank_text += letter.upper() if piece.color == Color.WHITE else letter
+            if empty:
+                rank_text += str(empty)
+            rank_texts.append(rank_text)
+
+        side = "w" if self.side_to_move == Color.WHITE else "b"
+        ep_text = coords_to_algebraic(self.ep_square) if self.ep_square else "-"
+        return (f"{'/'.join(rank_texts)} {side} {self.castling or '-'} {ep_text} "
+                f"{self.halfmove_clock} {self.fullmove_number}")
+
+    def copy(self) -> 'Position':
+        """Restituisce una copia indipendente della posizione (senza cronologia delle mosse)."""
+        return Position.from_fen(self.to_fen())
+
+    # --- Attacchi e scacco ---
+
+    def king_square(self, color: Color) -> Optional[Tuple[int, int]]:
+        """Restituisce la casa del Re del colore dato, o None se assente."""
+        return self._kings[color]
+
+    def is_square_attacked(self, square: Tuple[int, int], by_color: Color) -> bool:
+        """
+        Controlla se una casa è attaccata da almeno un pezzo del colore dato.
+
+        Args:
+            square: La casa (riga, colonna) da controllare.
+            by_color: Il colore degli attaccanti.
+
+        Returns:
+            True se la casa è attaccata, False altrimenti.
+        """
+        board = self.board
+        row, col = square
+
+        # Pedoni: attaccano in diagonale verso la direzione di avanzamento
+        pawn_row = row - 1 if by_color == Color.WHITE else row + 1
+        for pawn_col in (col - 1, col + 1):
+            piece = board.get_piece((pawn_row, pawn_col))
+            if piece is not None and piece.color == by_color and isinstance(piece, Pawn):
+                return True
+
+        for d_row, d_col in KNIGHT_OFFSETS:
+            piece = board.get_piece((row + d_row, col + d_col))
+            if piece is not None and piece.color == by_color and isinstance(piece, Knight):
+                return True
+
+        for d_row, d_col in KING_OFFSETS:
+            piece = board.get_piece((row + d_row, col + d_col))
+            if piece is not None and piece.color == by_color and isinstance(piece, King):
+                return True
+
+        for directions, slider_types in ((ROOK_DIRECTIONS, (Rook, Queen)), (BISHOP_DIRECTIONS, (Bishop, Queen))):
+            for d_row, d_col in directions:
+                target_row, target_col = row + d_row, col + d_col
+                while 0 <= target_row < BOARD_SIZE and 0 <= target_col < BOARD_SIZE:
+                    piece = board.get_piece((target_row, target_col))
+                    if piece is not None:
+                        if piece.color == by_color and isinstance(piece, slider_types):
+                            return True
+                        break
+                    target_row += d_row
+                    target_col += d_col
+        return False
+
+    def in_check(self, color: Optional[Color] = None) -> bool:
+        """Indica se il Re del colore dato (di default quello al tratto) è sotto scacco."""
+        color = color or self.side_to_move
+        king_pos = self._kings[color]
+        return king_pos is not None and self.is_square_attacked(king_pos, opponent(color))
+
+    # --- Generazione mosse ---
+
+    def pseudo_legal_moves(self) -> List[Move]:
+        """
+        Genera le mosse pseudo-legali del giocatore al tratto, a partire da
+        `Piece.get_valid_moves` con l'aggiunta di promozioni, en passant e arrocco.
+        Le mosse possono lasciare il proprio Re sotto scacco.
+        """
+        moves: List[Move] = []
+        for piece in self.board.get_pieces_by_color(self.side_to_move):
+            moves.extend(self._piece_moves(piece))
+        moves.extend(self.castling_moves(self.side_to_move))
+        return moves
+
+    def piece_moves(self, piece: Piece) -> List[Move]:
+        """
+        Genera le mosse pseudo-legali di un pezzo del giocatore al tratto, con
+        promozioni, en passant e, per il Re, gli arrocchi disponibili.
+        """
+        moves = self._piece_moves(piece)
+        if isinstance(piece, King):
+            moves.extend(self.castling_moves(piece.color))
+        return moves
+
+    def _piece_moves(self, piece: Piece) -> List[Move]:
+        """Le mosse pseudo-legali di un pezzo, arrocchi esclusi."""
+        moves: List[Move] = []
+        start = piece.position
+        is_pawn = isinstance(piece, Pawn)
+        last_row = BOARD_SIZE - 1 if piece.color == Color.WHITE else 0
+        for end in piece.get_valid_moves(self.board):
+            if is_pawn and end[0] == last_row:
+                moves.extend(Move(start, end, promotion) for promotion in PROMOTION_PIECES)
+            else:
+                moves.append(Move(start, end))
+
+        if is_pawn and self.ep_square is not None:
+            direction = 1 if piece.color == Color.WHITE else -1
+            ep_row, ep_col = self.ep_square
+            if ep_row == start[0] + direction and abs(ep_col - start[1]) == 1:
+                moves.append(Move(start, self.ep_square))
+        return moves
+
+    def castling_moves(self, color: Color) -> List[Move]:
+        """Genera gli arrocchi disponibili (le case attraversate non devono essere attaccate)."""
+        moves = []
+        enemy = opponent(color)
+        for right in self.castling:
+            rule_color, king_from, king_to, rook_from, _, must_be_empty = _CASTLING_RULES[right]
+            if rule_color != color:
+                continue
+            king = self.board.get_piece(king_from)
+            rook = self.board.get_piece(rook_from)
+            if not isinstance(king, King) or not isinstance(rook, Rook) or rook.color != color:
+                continue
+            if any(self.board.get_piece(square) is not None for square in must_be_empty):
+                continue
+            passing_square = ((king_from[0] + king_to[0]) // 2, (king_from[1] + king_to[1]) // 2)
+            if any(self.is_square_attacked(square, enemy) for square in (king_from, passing_square, king_to)):
+                continue
+            moves.append(Move(king_from, king_to))
+        return moves
+
+    def is_legal(self, move: Move) -> bool:
+        """Indica se una mossa pseudo-legale non lascia il proprio Re sotto scacco."""
+        color = self.side_to_move
+        self.make_move(move)
+        legal = not self.in_check(color)
+        self.unmake_move()
+        return legal
+
+    def legal_moves(self) -> List[Move]:
+        """Restituisce la lista delle mosse legali del giocatore al tratto."""
+        return [move for move in self.pseudo_legal_moves() if self.is_legal(move)]
+
+    def is_capture(self, move: Move) -> bool:
+        """Indica se la mossa cattura un pezzo (en passant incluso)."""
+        if self.board.get_piece(move.end) is not None:
+            return True
+        piece = self.board.get_piece(move.start)
+        return isinstance(piece, Pawn) and move.end == self.ep_square
+
+    def parse_uci(self, text: str) -> Optional[Move]:
+        """
+        Interpreta una mossa in notazione UCI e la confronta con le mosse legali.
+
+        Args:
+            text: La mossa (es. "e2e4", "e7e8q").
+
+        Returns:
+            La Move legale corrispondente, o None se non valida.
+        """
+        text = text.strip().lower()
+        if len(text) not in (4, 5):
+            return None
+        start = algebraic_to_coords(text[:2])
+        end = algebraic_to_coords(text[2:4])
+        promotion = text[4] if len(text) == 5 else None
+        if start is None or end is None or (promotion is not None and promotion not in PROMOTION_PIECES):
+            return None
+        candidate = Move(start, end, promotion)
+        return candidate if candidate in self.legal_moves() else None
+
+    # --- Stato della partita ---
+
+    def repetition_key(self) -> str:
+        """Chiave che identifica la posizione ai fini della ripetizione (FEN senza contatori)."""
+        return self.to_fen().rsplit(" ", 2)[0]
+
+    def zobrist_key(self) -> int:
+        """
+        Hash Zobrist a 64 bit della posizione: pezzi (mantenuti dalla Board), tratto,
+        diritti di arrocco e colonna en passant, quest'ultima solo se la presa è
+        possibile, così che le trasposizioni con spinte doppie coincidano.
+        """
+        key = self.board.zobrist_key
+        if self.side_to_move == Color.BLACK:
+            key ^= ZOBRIST_BLACK_TO_MOVE_KEY
+        for right in self.castling:
+            key ^= ZOBRIST_CASTLING_KEYS[right]
+        if self.ep_square is not None:
+            row, col = self.ep_square
+            pawn_row = row - 1 if self.side_to_move == Color.WHITE else row + 1
+            for side_col in (col - 1, col + 1):
+                piece = self.board.get_piece((pawn_row, side_col))
+                if isinstance(piece, Pawn) and piece.color == self.side_to_move:
+                    key ^= ZOBRIST_EP_FILE_KEYS[col]
+                    break
+        return key
+
+    def has_insufficient_material(self) -> bool:
+        """
+        Indica se nessuno dei due giocatori può dare matto: solo Re, Re e un pezzo
+        minore contro Re, oppure Alfieri tutti su case dello stesso colore.
+        """
+        minors = []
+        for piece in self.board.get_all_pieces():
+            if isinstance(piece, King):
+                continue
+            if isinstance(piece, (Pawn, Rook, Queen)):
+                return False
+            minors.append(piece)
+        if len(minors) <= 1:
+            return True
+        if all(isinstance(piece, Bishop) for piece in minors):
+            square_colors = {sum(piece.position) % 2 for piece in minors}
+            return len(square_colors) == 1
+        return False
+
+    def outcome(self) -> Optional[Tuple[str, str]]:
+        """
+        Determina se la partita è terminata per le regole della posizione corrente
+        (la ripetizione di mosse dipende dalla cronologia ed è gestita dal chiamante).
+
+        Returns:
+            Una coppia (risultato, motivo) se la partita è finita, altrimenti None.
+        """
+        if not self.legal_moves():
+            if self.in_check():
+                winner_result = BLACK_WINS if self.side_to_move == Color.WHITE else WHITE_WINS
+                return winner_result, "scacco matto"
+            return DRAW, "stallo"
+        if self.halfmove_clock >= 100:
+            return DRAW, "regola delle 50 mosse"
+        if self.has_insufficient_material():
+            return DRAW, "materiale insufficiente"
+        return None
+
+    # --- Esecuzione e annullamento ---
+
+    @property
+    def ply(self) -> int:
+        """Numero di mosse eseguite su questa Position e ancora annullabili."""
+        return len(self._stack)
+
+    @property
+    def move_stack(self) -> List[Move]:
+        """Le mosse eseguite su questa Position, dalla più vecchia alla più recente."""
+        return [undo.move for undo in self._stack]
+
+    def stack_token(self, index: int) -> object:
+        """
+        Identificatore opaco della mossa `index` dello stack (0 = la più vecchia): resta
+        lo stesso oggetto finché la mossa non viene annullata, quindi permette a chi
+        mantiene uno stato incrementale di riconoscere le mosse già viste.
+        """
+        return self._stack[index]
+
+    def piece_deltas(self, index: int) -> Tuple[List[Tuple[Color, type, Tuple[int, int]]],
+                                                List[Tuple[Color, type, Tuple[int, int]]]]:
+        """
+        Pezzi tolti e aggiunti sulla scacchiera dalla mossa `index` dello stack.
+
+        Args:
+            index: Indice della mossa nello stack (0 = la più vecchia).
+
+        Returns:
+            Le liste (rimossi, aggiunti) di terne (colore, tipo di pezzo, casa).
+        """
+        undo = self._stack[index]
+        move, piece = undo.move, undo.piece
+        removed = [(piece.color, type(piece), move.start)]
+        placed_type = PROMOTION_PIECES[move.promotion] if move.promotion is not None else type(piece)
+        added = [(piece.color, placed_type, move.end)]
+        if undo.captured is not None and undo.captured_pos is not None:
+            removed.append((undo.captured.color, type(undo.captured), undo.captured_pos))
+        if undo.rook_move is not None:
+            rook_from, rook_to, _ = undo.rook_move
+            removed.append((piece.color, Rook, rook_from))
+            added.append((piece.color, Rook, rook_to))
+        return removed, added
+
+    def make_move(self, move: Move):
+        """
+        Esegue una mossa (assunta pseudo-legale) aggiornando la scacchiera in place.
+
+        Args:
+            move: La mossa da eseguire.
+
+        Raises:
+            ValueError: Se non c'è un pezzo nella casa di partenza.
+        """
+        board = self.board
+        start, end = move.start, move.end
+        piece = board.get_piece(start)
+        if piece is None:
+            raise ValueError(f"Nessun pezzo trovato alla posizione di partenza {start}")
+
+        had_moved = piece.has_moved
+        captured = board.get_piece(end)
+        captured_pos = end if captured is not None else None
+        rook_move = None
+        is_pawn = isinstance(piece, Pawn)
+
+        if is_pawn and end == self.ep_square and captured is None:
+            captured_pos = (start[0], end[1])
+            captured = board.remove_piece(captured_pos)
+        elif isinstance(piece, King) and abs(end[1] - start[1]) == 2:
+            rook_from = (start[0], 7 if end[1] > start[1] else 0)
+            rook_to = (start[0], (start[1] + end[1]) // 2)
+            rook = board.get_piece(rook_from)
+            if rook is not None:
+                rook_move = (rook_from, rook_to, rook.has_moved)
+                board.move_piece(rook_from, rook_to)
+
+        self._stack.append(_Undo(move, piece, had_moved, captured, captured_pos, self.castling,
+                                 self.ep_square, self.halfmove_clock, rook_move))
+
+        board.move_piece(start, end)
+        if move.promotion is not None:
+            promoted = PROMOTION_PIECES[move.promotion](piece.color, end)
+            promoted.has_moved = True
+            board.place_piece(promoted, end)
+        if isinstance(piece, King):
+            self._kings[piece.color] = end
+        if isinstance(captured, King):
+            self._kings[captured.color] = None
+
+        if self.castling:
+            lost = _CASTLING_SQUARES.get(start, "") + _CASTLING_SQUARES.get(end, "")
+            if lost:
+                self.castling = "".join(right for right in self.castling if right not in lost)
+
+        self.ep_square = None
+        if is_pawn and abs(end[0] - start[0]) == 2:
+            self.ep_square = ((start[0] + end[0]) // 2, start[1])
+
+        self.halfmove_clock = 0 if is_pawn or captured is not None else self.halfmove_clock + 1
+        if self.side_to_move == Color.BLACK:
+            self.fullmove_number += 1
+        self.side_to_move = opponent(self.side_to_move)
+
+    def unmake_move(self) -> Move:
+        """
+        Annulla l'ultima mossa eseguita con `make_move`.
+
+        Returns:
+            La mossa annullata.
+
+        Raises:
+            IndexError: Se non ci sono mosse da annullare.
+        """
+        undo = self._stack.pop()
+        board = self.board
+        move = undo.move
+
+        board.remove_piece(move.end)
+        board.place_piece(undo.piece, move.start)
+        undo.piece.has_moved = undo.had_moved
+        if undo.captured is not None and undo.captured_pos is not None:
+            board.place_piece(undo.captured, undo.captured_pos)
+        if undo.rook_move is not None:
+            rook_from, rook_to, rook_had_moved = undo.rook_move
+            rook = board.remove_piece(rook_to)
+            if rook is not None:
+                board.place_piece(rook, rook_from)
+                rook.has_moved = rook_had_moved
+
+        if isinstance(undo.piece, King):
+            self._kings[undo.piece.color] = move.start
+        if isinstance(undo.captured, King):
+            self._kings[undo.captured.color] = undo.captured_pos
+
+        self.castling = undo.castling
+        self.ep_square = undo.ep_square
+        self.halfmove_clock = undo.halfmove_clock
+        self.side_to_move = opponent(self.side_to_move)
+        if self.side_to_move == Color.BLACK:
+            self.fullmove_number -= 1
+        return move
+
+
+def random_positions(start_fens: List[str], count: int, seed: int = 0, max_plies: int = 40) -> List[str]:
+    """
+    Posizioni FEN varie e riproducibili, per test e benchmark: la i-esima parte da
+    `start_fens[i % len(start_fens)]` e gioca un numero casuale (minore di `max_plies`)
+    di mosse legali scelte a caso, fermandosi prima se la partita finisce.
+
+    Args:
+        start_fens: Le posizioni di partenza, usate a turno.
+        count: Il numero di posizioni da generare.
+        seed: Il seme del generatore casuale.
+        max_plies: Limite (escluso) delle semimosse giocate da ogni posizione di partenza.
+
+    Returns:
+        Le posizioni generate in notazione FEN.
+    """
+    rng = random.Random(seed)  # nosec B311
+    fens: List[str] = []
+    for index in range(count if start_fens else 0):
+        position = Position.from_fen(start_fens[index % len(start_fens)])
+        for _ in range(rng.randrange(max_plies)):
+            moves = position.legal_moves()
+            if not moves:
+                break
+            position.make_move(rng.choice(moves))
+        fens.append(position.to_fen())
+    return fens
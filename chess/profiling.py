@@ -0,0 +1,231 @@
+# profiling.py
+"""
+Strumentazione a basso costo dei punti caldi del gioco.
+
+Quando il profiler è disattivato le funzioni strumentate sono quelle originali:
+i wrapper di misura vengono installati solo da `Profiler.enable()` e rimossi da
+`Profiler.disable()`, quindi il costo a profiler spento è nullo.
+"""
+
+import json
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Sotto-intervalli per ogni potenza di due nell'istogramma (risoluzione ~19%)
+_SUB_BUCKET_BITS = 2
+_SUB_BUCKETS = 1 << _SUB_BUCKET_BITS
+
+# Percentili riportati nei report
+REPORT_PERCENTILES = (50, 95, 99)
+
+
+class LatencyHistogram:
+    """
+    Istogramma logaritmico delle durate in nanosecondi: memoria costante e
+    registrazione con sole operazioni intere, percentili approssimati per eccesso.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+        self._buckets: Dict[int, int] = {}
+
+    @staticmethod
+    def _bucket_index(duration_ns: int) -> int:
+        bits = duration_ns.bit_length()
+        if bits <= _SUB_BUCKET_BITS:
+            return duration_ns
+        sub_bucket = (duration_ns >> (bits - 1 - _SUB_BUCKET_BITS)) & (_SUB_BUCKETS - 1)
+        return (bits << _SUB_BUCKET_BITS) | sub_bucket
+
+    @staticmethod
+    def _bucket_upper_bound(index: int) -> int:
+        bits = index >> _SUB_BUCKET_BITS
+        if bits <= _SUB_BUCKET_BITS:
+            return index
+        sub_bucket = index & (_SUB_BUCKETS - 1)
+        shift = bits - 1 - _SUB_BUCKET_BITS
+        return (((_SUB_BUCKETS | sub_bucket) + 1) << shift) - 1
+
+    def record(self, duration_ns: int):
+        """Registra una durata in nanosecondi."""
+        if self.count == 0 or duration_ns < self.min_ns:
+            self.min_ns = duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+        self.count += 1
+        self.total_ns += duration_ns
+        index = self._bucket_index(duration_ns)
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+
+    def percentile(self, percent: float) -> int:
+        """
+        Restituisce il percentile richiesto (0-100) in nanosecondi.
+        Il valore è il limite superiore del sotto-intervallo, limitato al massimo osservato.
+        """
+        if self.count == 0:
+            return 0
+        threshold = self.count * percent / 100.0
+        seen = 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen >= threshold:
+                return min(self._bucket_upper_bound(index), self.max_ns)
+        return self.max_ns
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Riassunto serializzabile in JSON (durate in microsecondi)."""
+        summary: Dict[str, Any] = {
+            "count": self.count,
+            "total_us": self.total_ns / 1000,
+            "mean_us": self.total_ns / self.count / 1000 if self.count else 0.0,
+            "min_us": self.min_ns / 1000,
+            "max_us": self.max_ns / 1000,
+        }
+        for percent in REPORT_PERCENTILES:
+            summary[f"p{percent}_us"] = self.percentile(percent) / 1000
+        return summary
+
+
+def command_label(user_input: str) -> str:
+    """Etichetta di latenza per un input utente: il comando ('/mosse') o 'mossa'."""
+    user_input = user_input.strip()
+    if not user_input:
+        return "vuoto"
+    return user_input.split()[0] if user_input.startswith('/') else "mossa"
+
+
+class Profiler:
+    """Raccoglie tempi per fase, latenze per comando e contatori di una sessione."""
+
+    def __init__(self):
+        self.enabled = False
+        self.stages: Dict[str, LatencyHistogram] = {}
+        self.commands: Dict[str, LatencyHistogram] = {}
+        self.counters: Dict[str, int] = {}
+        self._report_sources: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self._installed: List[Tuple[Any, str, Any]] = []
+
+    def reset(self):
+        """Azzera tutte le misure raccolte."""
+        self.stages = {}
+        self.commands = {}
+        self.counters = {}
+
+    def increment(self, name: str, amount: int = 1):
+        """Incrementa un contatore (ignorato se il profiler è spento)."""
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_report_source(self, name: str, source: Callable[[], Dict[str, Any]]):
+        """
+        Registra una sorgente di statistiche aggiuntive da includere nei report.
+
+        Args:
+            name: Nome della sezione nel report.
+            source: Funzione senza argomenti che restituisce un dizionario serializzabile.
+        """
+        self._report_sources[name] = source
+
+    def instrument(self, owner: Any, attribute: str, stage: str,
+                   label_fn: Optional[Callable[..., str]] = None):
+        """
+        Sostituisce `owner.attribute` con un wrapper che ne misura la durata.
+        L'originale viene ripristinato da `disable()`.
+
+        Args:
+            owner: Il modulo o la classe che contiene la funzione.
+            attribute: Il nome della funzione da strumentare.
+            stage: Il nome della fase nel report.
+            label_fn: Se indicata, la durata viene registrata anche nell'istogramma
+                per comando con l'etichetta calcolata dagli argomenti della chiamata.
+        """
+        original = owner.__dict__[attribute]
+        histogram = self.stages.setdefault(stage, LatencyHistogram())
+        commands = self.commands
+        clock = time.perf_counter_ns
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                elapsed = clock() - start
+                histogram.record(elapsed)
+                if label_fn is not None:
+                    label = label_fn(*args, **kwargs)
+                    commands.setdefault(label, LatencyHistogram()).record(elapsed)
+
+        timed.__wrapped__ = original  # type: ignore[attr-defined]
+        setattr(owner, attribute, timed)
+        self._installed.append((owner, attribute, original))
+
+    def enable(self):
+        """Attiva il profiler installando i wrapper sui punti caldi del gioco."""
+        if self.enabled:
+            return
+        # Import locali: il modulo resta importabile da board/game senza cicli
+        from . import game as game_module
+        from .board import Board
+        from .game import Game
+        from .ui import UI
+
+        self.enabled = True
+        self.instrument(game_module, "parse_algebraic_abbreviated", "utils.parse_move")
+        self.instrument(Game, "_validate_piece_and_move", "Game._validate_piece_and_move")
+        self.instrument(Board, "move_piece", "Board.move_piece")
+        self.instrument(UI, "display_board", "UI.display_board")
+        self.instrument(Game, "_process_user_input", "Game._process_user_input",
+                        label_fn=lambda game, user_input: command_label(user_input))
+
+    def disable(self):
+        """Disattiva il profiler ripristinando le funzioni originali."""
+        while self._installed:
+            owner, attribute, original = self._installed.pop()
+            setattr(owner, attribute, original)
+        self.enabled = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Report completo serializzabile in JSON."""
+        report: Dict[str, Any] = {
+            "stages": {name: hist.to_dict() for name, hist in self.stages.items()},
+            "commands": {name: hist.to_dict() for name, hist in self.commands.items()},
+            "counters": dict(self.counters),
+        }
+        for name, source in self._report_sources.items():
+            report[name] = source()
+        return report
+
+    def format_text(self) -> str:
+        """Report testuale con una riga per fase e per comando."""
+        def table(title: str, histograms: Dict[str, LatencyHistogram]) -> List[str]:
+            lines = [title, f"  {'nome':<32} {'chiamate':>9} {'media µs':>10} "
+                            f"{'p50 µs':>9} {'p95 µs':>9} {'p99 µs':>9} {'max µs':>9}"]
+            for name, hist in sorted(histograms.items()):
+                stats = hist.to_dict()
+                lines.append(f"  {name:<32} {stats['count']:>9} {stats['mean_us']:>10.1f} "
+                             f"{stats['p50_us']:>9.1f} {stats['p95_us']:>9.1f} "
+                             f"{stats['p99_us']:>9.1f} {stats['max_us']:>9.1f}")
+            return lines
+
+        lines = ["Report di profilazione"]
+        lines += table("Fasi:", self.stages)
+        lines += table("Latenza per comando:", self.commands)
+        if self.counters:
+            lines.append("Contatori:")
+            lines += [f"  {name:<32} {value:>9}" for name, value in sorted(self.counters.items())]
+        for name, source in self._report_sources.items():
+            lines.append(f"{name}:")
+            lines += [f"  {key:<32} {value}" for key, value in source().items()]
+        return "\n".join(lines)
+
+    def write_json(self, path: str):
+        """Salva il report in formato JSON."""
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(self.to_dict(), handle, indent=2)
+
+
+# Profiler condiviso dalla sessione di gioco
+PROFILER = Profiler()
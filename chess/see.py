@@ -0,0 +1,194 @@
+# see.py
+"""
+Valutazione statica degli scambi (SEE) su una casa.
+
+Gli attaccanti di una casa sono calcolati come bitmap a 64 bit (bit = riga * 8 + colonna):
+tabelle precalcolate per Cavallo, Re e pedoni, raggi con primo ostacolo per i pezzi
+a lungo raggio. La sequenza di catture usa sempre l'attaccante di minor valore e
+rivela i pezzi nascosti dietro a quelli che catturano (raggi X).
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from .constants import Color, BOARD_SIZE
+from .evaluation import PIECE_VALUES
+from .pieces import (
+    Piece, Pawn, Knight, Bishop, Rook, Queen, King,
+    KNIGHT_OFFSETS, KING_OFFSETS, ROOK_DIRECTIONS, BISHOP_DIRECTIONS,
+)
+from .position import Move, Position, PROMOTION_PIECES, opponent
+
+# Valori usati negli scambi: il Re "vale" più di tutto, così viene usato per ultimo
+SEE_VALUES = dict(PIECE_VALUES)
+SEE_VALUES[King] = 20000
+# Ordine di scelta dell'attaccante di minor valore
+_ATTACKER_ORDER = (Pawn, Knight, Bishop, Rook, Queen, King)
+
+
+def _square(row: int, col: int) -> int:
+    return row * BOARD_SIZE + col
+
+
+def _step_table(offsets) -> List[int]:
+    table = []
+    for index in range(64):
+        row, col = divmod(index, BOARD_SIZE)
+        mask = 0
+        for d_row, d_col in offsets:
+            if 0 <= row + d_row < BOARD_SIZE and 0 <= col + d_col < BOARD_SIZE:
+                mask |= 1 << _square(row + d_row, col + d_col)
+        table.append(mask)
+    return table
+
+
+def _ray_table(direction: Tuple[int, int]) -> List[int]:
+    table = []
+    for index in range(64):
+        row, col = divmod(index, BOARD_SIZE)
+        mask = 0
+        row, col = row + direction[0], col + direction[1]
+        while 0 <= row < BOARD_SIZE and 0 <= col < BOARD_SIZE:
+            mask |= 1 << _square(row, col)
+            row, col = row + direction[0], col + direction[1]
+        table.append(mask)
+    return table
+
+
+KNIGHT_ATTACKS = _step_table(KNIGHT_OFFSETS)
+KING_ATTACKS = _step_table(KING_OFFSETS)
+# PAWN_ATTACKERS[colore][casa]: case da cui un pedone di quel colore attacca la casa
+PAWN_ATTACKERS = {
+    Color.WHITE: _step_table(((-1, -1), (-1, 1))),
+    Color.BLACK: _step_table(((1, -1), (1, 1))),
+}
+# Raggi per direzione; "crescente" se gli indici delle case aumentano lungo il raggio
+_RAYS = {direction: _ray_table(direction) for direction in ROOK_DIRECTIONS + BISHOP_DIRECTIONS}
+_INCREASING = {direction: direction[0] * BOARD_SIZE + direction[1] > 0 for direction in _RAYS}
+
+
+def slider_attacks(square: int, occupied: int, directions) -> int:
+    """Case attaccate da un pezzo a lungo raggio in `square`, fermandosi al primo ostacolo (incluso)."""
+    attacks = 0
+    for direction in directions:
+        ray = _RAYS[direction][square]
+        blockers = ray & occupied
+        if blockers:
+            if _INCREASING[direction]:
+                first = (blockers & -blockers).bit_length() - 1
+            else:
+                first = blockers.bit_length() - 1
+            ray ^= _RAYS[direction][first]
+        attacks |= ray
+    return attacks
+
+
+class BoardMasks:
+    """Bitmap di occupazione e dei pezzi di una posizione, per tipo e colore."""
+
+    def __init__(self, position: Position):
+        self.occupied = 0
+        self.pieces: Dict[Tuple[Color, type], int] = {}
+        self.squares: Dict[int, Piece] = {}
+        for piece in position.board.get_all_pieces():
+            index = _square(*piece.position)
+            bit = 1 << index
+            self.occupied |= bit
+            key = (piece.color, type(piece))
+            self.pieces[key] = self.pieces.get(key, 0) | bit
+            self.squares[index] = piece
+
+    def mask(self, color: Color, *piece_types) -> int:
+        """Bitmap dei pezzi dei tipi dati del colore dato."""
+        result = 0
+        for piece_type in piece_types:
+            result |= self.pieces.get((color, piece_type), 0)
+        return result
+
+    def attackers_to(self, square: int, occupied: Optional[int] = None) -> int:
+        """
+        Bitmap di tutti i pezzi (di entrambi i colori) che attaccano la casa,
+        considerando come ostacoli solo i pezzi in `occupied` (default: tutti).
+        """
+        if occupied is None:
+            occupied = self.occupied
+        attackers = 0
+        for color in (Color.WHITE, Color.BLACK):
+            attackers |= PAWN_ATTACKERS[color][square] & self.mask(color, Pawn)
+            attackers |= KNIGHT_ATTACKS[square] & self.mask(color, Knight)
+            attackers |= KING_ATTACKS[square] & self.mask(color, King)
+            attackers |= slider_attacks(square, occupied, ROOK_DIRECTIONS) & self.mask(color, Rook, Queen)
+            attackers |= slider_attacks(square, occupied, BISHOP_DIRECTIONS) & self.mask(color, Bishop, Queen)
+        return attackers & occupied
+
+
+def square_attackers(position: Position, square: Tuple[int, int]) -> Tuple[int, int]:
+    """
+    Attaccanti e difensori di una casa.
+
+    Returns:
+        Le bitmap dei pezzi del giocatore al tratto e dell'avversario che attaccano la casa.
+    """
+    masks = BoardMasks(position)
+    attackers = masks.attackers_to(_square(*square))
+    own = masks.mask(position.side_to_move, *_ATTACKER_ORDER)
+    return attackers & own, attackers & ~own
+
+
+def see(position: Position, move: Move) -> int:
+    """
+    Guadagno materiale atteso (in centipedoni, per chi muove) della mossa seguita dalla
+    migliore sequenza di ricatture sulla casa di arrivo. Ogni giocatore può fermarsi
+    quando continuare lo scambio gli farebbe perdere materiale.
+
+    Args:
+        position: La posizione prima della mossa (non viene modificata).
+        move: La mossa (tipicamente una cattura).
+
+    Returns:
+        Il saldo materiale dello scambio; negativo se la mossa perde materiale.
+    """
+    masks = BoardMasks(position)
+    start, target = _square(*move.start), _square(*move.end)
+    mover = masks.squares.get(start)
+    if mover is None:
+        raise ValueError(f"Nessun pezzo trovato alla posizione di partenza {move.start}")
+    occupied = masks.occupied
+
+    victim = masks.squares.get(target)
+    gain = [SEE_VALUES[type(victim)] if victim is not None else 0]
+    if isinstance(mover, Pawn) and victim is None and move.end == position.ep_square:
+        gain[0] = SEE_VALUES[Pawn]
+        occupied ^= 1 << _square(move.start[0], move.end[1])
+    next_victim = SEE_VALUES[type(mover)]
+    if move.promotion is not None:
+        promoted_value = SEE_VALUES[PROMOTION_PIECES[move.promotion]]
+        gain[0] += promoted_value - SEE_VALUES[Pawn]
+        next_victim = promoted_value
+
+    occupied ^= 1 << start
+    side = opponent(mover.color)
+    attackers = masks.attackers_to(target, occupied)
+    while True:
+        side_attackers = attackers & masks.mask(side, *_ATTACKER_ORDER)
+        if not side_attackers:
+            break
+        for piece_type in _ATTACKER_ORDER:
+            candidates = side_attackers & masks.mask(side, piece_type)
+            if candidates:
+                break
+        if piece_type is King and attackers & ~side_attackers:
+            break  # il Re non può ricatturare su una casa ancora difesa
+        gain.append(next_victim - gain[-1])
+        occupied ^= candidates & -candidates
+        attackers = masks.attackers_to(target, occupied)
+        next_victim = SEE_VALUES[piece_type]
+        side = opponent(side)
+
+    for index in range(len(gain) - 1, 0, -1):
+        gain[index - 1] = -max(-gain[index - 1], gain[index])
+    return gain[0]
+
+
+def is_safe_capture(position: Position, move: Move) -> bool:
+    """Indica se una cattura non perde materiale secondo la valutazione statica degli scambi."""
+    return see(position, move) >= 0
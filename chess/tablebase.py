@@ -0,0 +1,538 @@
+# tablebase.py
+"""
+Tablebase di finale generate per analisi retrograda e interrogate via `mmap`.
+
+Ogni insieme di materiale (KQK, KRK, KPK, KBNK) è salvato come array denso di byte
+indirizzato dalla posizione: il lato forte è sempre il Bianco (le posizioni con il
+materiale al Nero vengono specchiate) e l'indice è
+
+    lato_al_tratto * 64^n + ((re_bianco * 64 + re_nero) * 64 + pezzo_1) * 64 + ...
+
+Ogni byte vale 0 (patta), 255 (posizione illegale), n < 128 (chi muove vince con
+matto in n semimosse) oppure 128 + n (chi muove subisce matto in n semimosse).
+
+La generazione richiede NumPy (dipendenza opzionale); l'interrogazione no.
+"""
+
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from .constants import Color, BOARD_SIZE
+from .pieces import Pawn, Rook, Knight, Bishop, Queen, King
+from .position import Position
+
+# Pezzi del lato forte oltre al Re, nell'ordine degli assi dell'indice
+MATERIALS: Dict[str, Tuple[str, ...]] = {
+    "KQK": ("Q",),
+    "KRK": ("R",),
+    "KPK": ("P",),
+    "KBNK": ("B", "N"),
+}
+# Tabelle necessarie prima di generarne un'altra (promozioni del pedone)
+DEPENDENCIES: Dict[str, Tuple[str, ...]] = {"KPK": ("KQK", "KRK")}
+# Tabella di arrivo per ogni promozione considerata (le altre portano a patte teoriche)
+_PROMOTION_TABLES = {"Q": "KQK", "R": "KRK"}
+
+VALUE_DRAW = 0
+VALUE_ILLEGAL = 255
+LOSS_BASE = 128
+
+TABLE_EXTENSION = ".sctb"
+_HEADER = struct.Struct("<4sHBB8s")
+_MAGIC = b"SCTB"
+_VERSION = 1
+HEADER_SIZE = _HEADER.size
+
+_LETTERS = {Queen: "Q", Rook: "R", Bishop: "B", Knight: "N", Pawn: "P"}
+_LETTER_ORDER = "QRBNP"
+_MATERIAL_BY_PIECES = {tuple(sorted(extra, key=_LETTER_ORDER.index)): name for name, extra in MATERIALS.items()}
+
+
+class ProbeResult(NamedTuple):
+    """Esito di un'interrogazione dal punto di vista del giocatore al tratto."""
+    wdl: int  # 1 vittoria, 0 patta, -1 sconfitta
+    dtm: Optional[int]  # semimosse al matto, None per le patte
+
+
+def table_size(material: str) -> int:
+    """Numero di posizioni per lato al tratto di un insieme di materiale."""
+    return 64 ** (2 + len(MATERIALS[material]))
+
+
+def table_path(directory: str, material: str) -> str:
+    """Percorso del file di una tabella."""
+    return os.path.join(directory, material + TABLE_EXTENSION)
+
+
+def decode_value(value: int) -> Optional[ProbeResult]:
+    """Converte un byte della tabella in ProbeResult (None per le posizioni illegali)."""
+    if value == VALUE_ILLEGAL:
+        return None
+    if value == VALUE_DRAW:
+        return ProbeResult(0, None)
+    if value < LOSS_BASE:
+        return ProbeResult(1, value)
+    return ProbeResult(-1, value - LOSS_BASE)
+
+
+# --- Interrogazione ---
+
+class Tablebase:
+    """
+    Accesso in sola lettura alle tabelle di una directory. Ogni file viene mappato
+    in memoria al primo uso; ogni interrogazione è un calcolo di indice e una
+    lettura di un byte dalla mappa, senza ulteriori accessi al file.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: La directory che contiene i file `.sctb`.
+        """
+        self.directory = directory
+        self._maps: Dict[str, Optional[mmap.mmap]] = {}
+
+    def _map(self, material: str) -> Optional[mmap.mmap]:
+        if material not in self._maps:
+            try:
+                with open(table_path(self.directory, material), "rb") as handle:
+                    mapped = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            except (FileNotFoundError, ValueError):
+                self._maps[material] = None
+            else:
+                magic, version, piece_count, _, _ = _HEADER.unpack_from(mapped)
+                expected = HEADER_SIZE + 2 * table_size(material)
+                if magic != _MAGIC or version != _VERSION or len(mapped) != expected:
+                    mapped.close()
+                    raise ValueError(f"Tabella {material} non valida in {self.directory}")
+                self._maps[material] = mapped
+        return self._maps[material]
+
+    def available(self) -> List[str]:
+        """Restituisce gli insiemi di materiale presenti nella directory."""
+        return [name for name in MATERIALS if os.path.exists(table_path(self.directory, name))]
+
+    def probe(self, position: Position) -> Optional[ProbeResult]:
+        """
+        Interroga le tabelle per la posizione data.
+
+        Args:
+            position: La posizione da valutare.
+
+        Returns:
+            Il ProbeResult, oppure None se il materiale non è coperto, la tabella
+            manca, ci sono diritti di arrocco o la posizione è illegale.
+        """
+        if position.castling:
+            return None
+        white, black = [], []
+        for piece in position.board.get_all_pieces():
+            (white if piece.color == Color.WHITE else black).append(piece)
+        if len(black) == 1:
+            strong, weak, strong_color = white, black, Color.WHITE
+        elif len(white) == 1:
+            strong, weak, strong_color = black, white, Color.BLACK
+        else:
+            return None
+
+        extra = [piece for piece in strong if not isinstance(piece, King)]
+        extra.sort(key=lambda piece: _LETTER_ORDER.index(_LETTERS[type(piece)]))
+        material = _MATERIAL_BY_PIECES.get(tuple(_LETTERS[type(piece)] for piece in extra))
+        strong_king = [piece for piece in strong if isinstance(piece, King)]
+        if material is None or len(strong_king) != 1 or not isinstance(weak[0], King):
+            return None
+        mapped = self._map(material)
+        if mapped is None:
+            return None
+
+        def square(piece) -> int:
+            row, col = piece.position
+            if strong_color == Color.BLACK:
+                row = BOARD_SIZE - 1 - row
+            return row * BOARD_SIZE + col
+
+        index = square(strong_king[0]) * 64 + square(weak[0])
+        for piece in extra:
+            index = index * 64 + square(piece)
+        if position.side_to_move != strong_color:
+            index += table_size(material)
+        return decode_value(mapped[HEADER_SIZE + index])
+
+    def close(self):
+        """Chiude tutte le mappe aperte."""
+        for mapped in self._maps.values():
+            if mapped is not None:
+                mapped.close()
+        self._maps = {}
+
+
+# --- Generazione (richiede NumPy) ---
+
+def _require_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("La generazione delle tablebase richiede NumPy: pip install numpy") from None
+    return numpy
+
+
+_KING_STEPS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+_KNIGHT_STEPS = ((2, 1), (2, -1), (-2, 1), (-2, -1), (1, 2), (1, -2), (-1, 2), (-1, -2))
+_ROOK_RAYS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+_BISHOP_RAYS = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+_SLIDER_RAYS = {"Q": _ROOK_RAYS + _BISHOP_RAYS, "R": _ROOK_RAYS, "B": _BISHOP_RAYS}
+
+
+class _Geometry:
+    """Tabelle 64x64 di attacchi e case intermedie, costruite una volta per processo."""
+
+    def __init__(self, np):
+        rows = np.arange(64) // 8
+        cols = np.arange(64) % 8
+        d_row = rows[:, None] - rows[None, :]
+        d_col = cols[:, None] - cols[None, :]
+        self.king = np.maximum(abs(d_row), abs(d_col)) == 1
+        self.knight = (abs(d_row) * abs(d_col)) == 2
+        # pawn[p, t]: un pedone bianco in p attacca t
+        self.pawn = (d_row == -1) & (abs(d_col) == 1)
+        same = np.eye(64, dtype=bool)
+        self.rook_line = ((d_row == 0) | (d_col == 0)) & ~same
+        self.bishop_line = (abs(d_row) == abs(d_col)) & ~same
+        self.bit = np.left_shift(np.uint64(1), np.arange(64, dtype=np.uint64))
+        between = np.zeros((64, 64), dtype=np.uint64)
+        for a in range(64):
+            for b in range(64):
+                dr, dc = int(d_row[b, a]), int(d_col[b, a])
+                if a == b or not (dr == 0 or dc == 0 or abs(dr) == abs(dc)):
+                    continue
+                step_r, step_c = (dr > 0) - (dr < 0), (dc > 0) - (dc < 0)
+                r, c = a // 8 + step_r, a % 8 + step_c
+                mask = 0
+                while (r, c) != (b // 8, b % 8):
+                    mask |= 1 << (r * 8 + c)
+                    r, c = r + step_r, c + step_c
+                between[a, b] = mask
+        self.between = between
+
+
+def _white_attacks(np, geo: _Geometry, target, kinds: Sequence[str], squares: Sequence, exclude: Optional[int] = None):
+    """
+    Indica (in forma vettoriale, con broadcasting) se `target` è attaccata dai pezzi bianchi.
+    `squares[0]` è il Re bianco, `squares[i]` il pezzo di tipo `kinds[i]`; il pezzo `exclude`
+    (catturato) viene ignorato sia come attaccante sia come ostacolo.
+    """
+    attacked = geo.king[squares[0], target]
+    for i in range(1, len(kinds)):
+        if i == exclude:
+            continue
+        kind, square = kinds[i], squares[i]
+        if kind == "N":
+            attacked = attacked | geo.knight[square, target]
+        elif kind == "P":
+            attacked = attacked | geo.pawn[square, target]
+        else:
+            line = np.zeros((64, 64), dtype=bool)
+            if kind in ("Q", "R"):
+                line = line | geo.rook_line
+            if kind in ("Q", "B"):
+                line = line | geo.bishop_line
+            blockers = np.uint64(0)
+            for j in range(len(kinds)):
+                if j != i and j != exclude:
+                    blockers = blockers | geo.bit[squares[j]]
+            clear = (geo.between[square, target] & blockers) == 0
+            attacked = attacked | (line[square, target] & clear)
+    return attacked
+
+
+def _step_targets(np, step: Tuple[int, int]):
+    """Per ogni casa, la casa raggiunta con lo spostamento (riga, colonna) o -1 se fuori."""
+    squares = np.arange(64)
+    rows, cols = squares // 8 + step[0], squares % 8 + step[1]
+    valid = (rows >= 0) & (rows < 8) & (cols >= 0) & (cols < 8)
+    return np.where(valid, rows * 8 + cols, -1)
+
+
+def generate_table(material: str, directory: str) -> Tuple[str, float]:
+    """
+    Genera una tabella per analisi retrograda e la salva in `directory`.
+    Le tabelle indicate in DEPENDENCIES devono essere già presenti.
+
+    Args:
+        material: Il nome dell'insieme di materiale (es. "KQK").
+        directory: La directory di destinazione.
+
+    Returns:
+        Il nome del materiale e i secondi impiegati.
+    """
+    np = _require_numpy()
+    start_time = time.monotonic()
+    geo = _Geometry(np)
+    kinds = ("K", "k") + MATERIALS[material]  # assi: Re bianco, Re nero, pezzi bianchi
+    white_kinds = ("K",) + MATERIALS[material]
+    n_axes = len(kinds)
+    shape = (64,) * n_axes
+    size = 64 ** n_axes
+
+    axes = [np.arange(64).reshape([64 if a == i else 1 for a in range(n_axes)]) for i in range(n_axes)]
+    wk, bk, pieces = axes[0], axes[1], axes[2:]
+    white_squares = [wk] + pieces
+
+    # --- Legalità delle posizioni ---
+    legal = np.ones(shape, dtype=bool)
+    for i in range(n_axes):
+        for j in range(i + 1, n_axes):
+            legal &= axes[i] != axes[j]
+    for kind, square in zip(MATERIALS[material], pieces):
+        if kind == "P":
+            legal &= (square >= 8) & (square < 56)
+    black_in_check = _white_attacks(np, geo, bk, white_kinds, white_squares)
+    legal_w = (legal & ~black_in_check).reshape(-1)
+    legal_b = (legal & ~geo.king[wk, bk]).reshape(-1)
+
+    # --- Mosse legali del Nero (solo Re): le catture portano a patte teoriche ---
+    count = np.zeros(shape, dtype=np.int8)
+    for step in _KING_STEPS:
+        targets = _step_targets(np, step)[bk]
+        valid = targets >= 0
+        target = np.where(valid, targets, 0)
+        occupied = target == wk
+        for square in pieces:
+            occupied = occupied | (target == square)
+        moves = valid & ~occupied & ~_white_attacks(np, geo, target, white_kinds, white_squares)
+        for i, square in enumerate(pieces, start=1):
+            moves = moves | (valid & (target == square)
+                             & ~_white_attacks(np, geo, target, white_kinds, white_squares, exclude=i))
+        count += moves.astype(np.int8)
+    count = np.broadcast_to(count, shape).reshape(-1).copy()
+    black_in_check = np.broadcast_to(black_in_check, shape).reshape(-1)
+
+    table_w = np.where(legal_w, VALUE_DRAW, VALUE_ILLEGAL).astype(np.uint8)
+    table_b = np.where(legal_b, VALUE_DRAW, VALUE_ILLEGAL).astype(np.uint8)
+    resolved_w = ~legal_w
+    resolved_b = ~legal_b
+    mated = legal_b & (count == 0) & black_in_check
+    table_b[mated] = LOSS_BASE
+    resolved_b |= mated
+    del legal, black_in_check
+
+    # --- Promozioni (KPK): vittorie ottenibili promuovendo, lette dalle tabelle già generate ---
+    promotion_win = np.zeros(size, dtype=np.int16)
+    for axis, kind in enumerate(MATERIALS[material], start=2):
+        if kind != "P":
+            continue
+        for promoted, dependency in _PROMOTION_TABLES.items():
+            with open(table_path(directory, dependency), "rb") as handle:
+                handle.seek(HEADER_SIZE + 64 ** 3)  # lato Nero al tratto
+                dependency_b = np.frombuffer(handle.read(64 ** 3), dtype=np.uint8)
+            candidates = np.flatnonzero(legal_w)
+            coords = np.unravel_index(candidates, shape)
+            pawn = coords[axis]
+            on_seventh = (pawn >= 48) & (pawn < 56)
+            target = pawn + 8
+            free = on_seventh & (target != coords[0]) & (target != coords[1])
+            index = np.ravel_multi_index((coords[0], coords[1], np.where(free, target, 0)), (64,) * 3)
+            value = dependency_b[index].astype(np.int16)
+            wins = free & (value >= LOSS_BASE) & (value != VALUE_ILLEGAL)
+            dtm = value - LOSS_BASE + 1
+            current = promotion_win[candidates]
+            better = wins & ((current == 0) | (dtm < current))
+            promotion_win[candidates[better]] = dtm[better]
+
+    # --- Analisi retrograda per livelli di distanza dal matto ---
+    lost_frontier = np.flatnonzero(mated)
+    ply = 0
+    max_promotion = int(promotion_win.max())
+    while lost_frontier.size or ply < max_promotion:
+        # Vittorie del Bianco in ply + 1: mosse che portano a una sconfitta del Nero in ply
+        predecessors = _white_unmoves(np, lost_frontier, shape, MATERIALS[material])
+        if max_promotion:
+            predecessors = np.concatenate([predecessors, np.flatnonzero(promotion_win == ply + 1)])
+        predecessors = np.unique(predecessors)
+        predecessors = predecessors[~resolved_w[predecessors]]
+        table_w[predecessors] = ply + 1
+        resolved_w[predecessors] = True
+
+        # Sconfitte del Nero in ply + 2: tutte le mosse portano a vittorie del Bianco
+        black_predecessors = _black_unmoves(np, predecessors, shape)
+        black_predecessors = black_predecessors[legal_b[black_predecessors] & ~resolved_b[black_predecessors]]
+        np.subtract.at(count, black_predecessors, 1)
+        candidates = np.unique(black_predecessors)
+        lost_frontier = candidates[count[candidates] == 0]
+        table_b[lost_frontier] = LOSS_BASE + ply + 2
+        resolved_b[lost_frontier] = True
+        ply += 2
+
+    os.makedirs(directory, exist_ok=True)
+    temp_path = table_path(directory, material) + ".tmp"
+    with open(temp_path, "wb") as handle:
+        handle.write(_HEADER.pack(_MAGIC, _VERSION, n_axes, 0, material.encode("ascii")))
+        table_w.tofile(handle)
+        table_b.tofile(handle)
+    os.replace(temp_path, table_path(directory, material))
+    return material, time.monotonic() - start_time
+
+
+def _on_board(row, col):
+    return (row >= 0) & (row < 8) & (col >= 0) & (col < 8)
+
+
+def _white_unmoves(np, frontier, shape: Tuple[int, ...], extra: Tuple[str, ...]):
+    """
+    Indici delle posizioni (Bianco al tratto) da cui una mossa bianca porta alle
+    posizioni di `frontier` (Nero al tratto). La legalità va verificata dal chiamante.
+    """
+    if frontier.size == 0:
+        return frontier
+    coords = list(np.unravel_index(frontier, shape))
+    results = []
+
+    def occupied(square, moving_axis):
+        hit = np.zeros(square.shape, dtype=bool)
+        for axis, other in enumerate(coords):
+            if axis != moving_axis:
+                hit |= other == square
+        return hit
+
+    def emit(moving_axis, origin, mask):
+        if mask.any():
+            new_coords = [c[mask] for c in coords]
+            new_coords[moving_axis] = origin[mask]
+            results.append(np.ravel_multi_index(new_coords, shape))
+
+    piece_kinds = ("K",) + extra
+    piece_axes = [0] + list(range(2, len(shape)))
+    for kind, axis in zip(piece_kinds, piece_axes):
+        square = coords[axis]
+        row, col = square // 8, square % 8
+        if kind in ("K", "N"):
+            for d_row, d_col in (_KING_STEPS if kind == "K" else _KNIGHT_STEPS):
+                origin_row, origin_col = row - d_row, col - d_col
+                origin = origin_row * 8 + origin_col
+                mask = _on_board(origin_row, origin_col)
+                mask &= ~occupied(np.where(mask, origin, -1), axis)
+                emit(axis, origin, mask)
+        elif kind == "P":
+            origin = square - 8
+            single = (origin >= 8) & ~occupied(origin, axis)
+            emit(axis, origin, single)
+            double = single & (square >= 24) & (square < 32) & ~occupied(square - 16, axis)
+            emit(axis, square - 16, double)
+        else:
+            for d_row, d_col in _SLIDER_RAYS[kind]:
+                open_ray = np.ones(square.shape, dtype=bool)
+                for distance in range(1, 8):
+                    origin_row, origin_col = row - distance * d_row, col - distance * d_col
+                    origin = origin_row * 8 + origin_col
+                    open_ray &= _on_board(origin_row, origin_col)
+                    open_ray &= ~occupied(np.where(open_ray, origin, -1), axis)
+                    if not open_ray.any():
+                        break
+                    emit(axis, origin, open_ray)
+    return np.concatenate(results) if results else frontier[:0]
+
+
+def _black_unmoves(np, frontier, shape: Tuple[int, ...]):
+    """
+    Indici (con ripetizioni, una per mossa) delle posizioni con il Nero al tratto da cui
+    una mossa del Re nero senza cattura porta alle posizioni di `frontier`.
+    """
+    if frontier.size == 0:
+        return frontier
+    coords = list(np.unravel_index(frontier, shape))
+    square = coords[1]
+    row, col = square // 8, square % 8
+    results = []
+    for d_row, d_col in _KING_STEPS:
+        origin_row, origin_col = row - d_row, col - d_col
+        origin = origin_row * 8 + origin_col
+        mask = _on_board(origin_row, origin_col)
+        for axis, other in enumerate(coords):
+            if axis != 1:
+                mask &= other != origin
+        if mask.any():
+            new_coords = [c[mask] for c in coords]
+            new_coords[1] = origin[mask]
+            results.append(np.ravel_multi_index(new_coords, shape))
+    return np.concatenate(results) if results else frontier[:0]
+
+
+def generate_all(directory: str, materials: Optional[List[str]] = None, jobs: int = 1,
+                 report=print) -> Dict[str, float]:
+    """
+    Genera le tabelle richieste (e le loro dipendenze) distribuendole su più processi,
+    un insieme di materiale per processo, rispettando l'ordine delle dipendenze.
+
+    Returns:
+        I secondi impiegati per ogni tabella generata.
+    """
+    _require_numpy()
+    pending = list(materials or MATERIALS)
+    for material in list(pending):
+        for dependency in DEPENDENCIES.get(material, ()):
+            if dependency not in pending and not os.path.exists(table_path(directory, dependency)):
+                pending.insert(0, dependency)
+    timings: Dict[str, float] = {}
+    done = set(name for name in MATERIALS if os.path.exists(table_path(directory, name)) and name not in pending)
+
+    with ProcessPoolExecutor(max_workers=max(jobs, 1)) as pool:
+        while pending:
+            ready = [name for name in pending if all(dep in done for dep in DEPENDENCIES.get(name, ()))]
+            if not ready:
+                raise ValueError(f"Dipendenze circolari o mancanti tra {pending}")
+            for material, elapsed in pool.map(generate_table, ready, [directory] * len(ready)):
+                timings[material] = elapsed
+                done.add(material)
+                report(f"{material}: generata in {elapsed:.1f}s")
+            pending = [name for name in pending if name not in done]
+    return timings
+
+
+def run_tablebase(argv: Optional[List[str]] = None) -> int:
+    """
+    Riga di comando: genera tabelle o interroga una posizione.
+
+    Returns:
+        Il codice di uscita del processo.
+    """
+    parser = argparse.ArgumentParser(prog="python -m chess tablebase",
+                                     description="Genera e interroga le tablebase di finale.")
+    parser.add_argument("materials", nargs="*", help=f"Materiali da generare (default: tutti): {', '.join(MATERIALS)}")
+    parser.add_argument("--dir", default="tablebase", help="Directory delle tabelle.")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Processi paralleli.")
+    parser.add_argument("--probe", metavar="FEN", help="Interroga la posizione invece di generare.")
+    args = parser.parse_args(argv)
+
+    if args.probe:
+        tablebase = Tablebase(args.dir)
+        try:
+            result = tablebase.probe(Position.from_fen(args.probe))
+        except ValueError as e:
+            print(f"Errore: {e}", file=sys.stderr)
+            return 2
+        finally:
+            tablebase.close()
+        if result is None:
+            print("Posizione non coperta dalle tabelle disponibili.")
+        elif result.wdl == 0:
+            print("Patta.")
+        else:
+            outcome = "vince" if result.wdl > 0 else "perde"
+            print(f"Chi muove {outcome}: matto in {result.dtm} semimosse.")
+        return 0
+
+    unknown = [name for name in args.materials if name not in MATERIALS]
+    if unknown:
+        parser.error(f"materiali sconosciuti: {', '.join(unknown)}")
+    try:
+        generate_all(args.dir, args.materials or None, args.jobs)
+    except ImportError as e:
+        print(f"Errore: {e}", file=sys.stderr)
+        return 1
+    return 0
@@ -0,0 +1,265 @@
+# uci.py
+"""Front-end per il protocollo UCI (Universal Chess Interface)."""
+
+import argparse
+import sys
+import threading
+from typing import Callable, List, Optional, TextIO
+
+from .constants import Color
+from .position import Position, STARTING_FEN
+from .engine import MATE_SCORE, MAX_DEPTH, SearchInfo, SearchLimits, Searcher
+from .evaluation import EVALUATORS, create_evaluator
+
+ENGINE_NAME = "Scacchi Terminal Edition"
+ENGINE_AUTHOR = "Chess-TUI"
+
+# Margine di sicurezza (secondi) sottratto al tempo disponibile per l'overhead di comunicazione
+MOVE_OVERHEAD = 0.03
+# Numero di mosse su cui distribuire il tempo residuo quando "movestogo" non è indicato
+DEFAULT_MOVES_TO_GO = 30
+
+
+def compute_move_time(time_left_ms: int, increment_ms: int = 0, moves_to_go: Optional[int] = None) -> float:
+    """
+    Calcola il tempo da dedicare a una mossa a partire dal tempo residuo.
+
+    Args:
+        time_left_ms: Tempo residuo sull'orologio in millisecondi.
+        increment_ms: Incremento per mossa in millisecondi.
+        moves_to_go: Mosse mancanti al prossimo controllo di tempo, se noto.
+
+    Returns:
+        Il tempo per la mossa in secondi (mai oltre il tempo residuo meno il margine).
+    """
+    time_left = max(time_left_ms / 1000.0 - MOVE_OVERHEAD, 0.001)
+    budget = time_left / max(moves_to_go or DEFAULT_MOVES_TO_GO, 1) + increment_ms / 1000.0 * 0.75
+    return max(min(budget, time_left), 0.001)
+
+
+def format_score(score: int) -> str:
+    """Formatta un punteggio per il comando UCI 'info' ("cp N" o "mate N")."""
+    if abs(score) >= MATE_SCORE - MAX_DEPTH:
+        plies = MATE_SCORE - abs(score)
+        moves = (plies + 1) // 2
+        return f"mate {moves if score > 0 else -moves}"
+    return f"cp {score}"
+
+
+class UCIEngine:
+    """
+    Interpreta i comandi UCI e gestisce la ricerca su un thread separato, così che
+    `stop` e `isready` ricevano risposta immediata anche durante la ricerca.
+    """
+
+    def __init__(self, output: TextIO = sys.stdout, evaluate_fn: Optional[Callable[[Position], int]] = None):
+        """
+        Args:
+            output: Flusso su cui scrivere le risposte del motore.
+            evaluate_fn: Funzione di valutazione usata dalla ricerca (None = quella predefinita di Searcher).
+        """
+        self._output = output
+        self._output_lock = threading.Lock()
+        self._searcher = Searcher(evaluate_fn)
+        self._position = Position.from_fen(STARTING_FEN)
+        self._base_fen = STARTING_FEN
+        self._applied_moves: List[str] = []
+        self._search_thread: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+
+    @property
+    def position(self) -> Position:
+        """La posizione corrente su cui il motore cerca."""
+        return self._position
+
+    def send(self, line: str):
+        """Scrive una riga sul flusso di uscita in modo thread-safe."""
+        with self._output_lock:
+            self._output.write(line + "\n")
+            self._output.flush()
+
+    def handle(self, line: str) -> bool:
+        """
+        Gestisce un singolo comando UCI.
+
+        Args:
+            line: La riga ricevuta dall'interfaccia.
+
+        Returns:
+            False se il motore deve terminare (comando 'quit'), True altrimenti.
+        """
+        tokens = line.split()
+        if not tokens:
+            return True
+        command, args = tokens[0], tokens[1:]
+
+        if command == "uci":
+            self.send(f"id name {ENGINE_NAME}")
+            self.send(f"id author {ENGINE_AUTHOR}")
+            self.send("uciok")
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "ucinewgame":
+            self.stop_search()
+            self._set_position(STARTING_FEN, [])
+        elif command == "position":
+            self.stop_search()
+            self._handle_position(args)
+        elif command == "go":
+            self.stop_search()
+            self._handle_go(args)
+        elif command == "stop":
+            self.stop_search()
+        elif command == "quit":
+            self.stop_search()
+            return False
+        elif command in ("debug", "setoption", "register", "ponderhit"):
+            pass  # Nessuna opzione configurabile al momento
+        else:
+            self.send(f"info string comando sconosciuto: {command}")
+        return True
+
+    def _handle_position(self, args: List[str]):
+        """Gestisce 'position [startpos | fen <FEN>] [moves <m1> ... <mN>]'."""
+        if not args:
+            return
+        moves_index = args.index("moves") if "moves" in args else len(args)
+        if args[0] == "startpos":
+            fen = STARTING_FEN
+        elif args[0] == "fen":
+            fen = " ".join(args[1:moves_index])
+        else:
+            self.send(f"info string posizione non valida: {' '.join(args)}")
+            return
+        self._set_position(fen, args[moves_index + 1:])
+
+    def _set_position(self, fen: str, moves: List[str]):
+        """
+        Porta la posizione a `fen` seguita da `moves`. Se la base coincide con quella
+        corrente, annulla solo le mosse divergenti e applica quelle nuove sulla stessa
+        Board, invece di ricostruirla da capo.
+        """
+        if fen != self._base_fen:
+            try:
+                self._position = Position.from_fen(fen)
+            except ValueError as e:
+                self.send(f"info string {e}")
+                return
+            self._base_fen = fen
+            self._applied_moves = []
+
+        common = 0
+        while (common < len(self._applied_moves) and common < len(moves)
+               and self._applied_moves[common] == moves[common]):
+            common += 1
+        while len(self._applied_moves) > common:
+            self._position.unmake_move()
+            self._applied_moves.pop()
+
+        for move_text in moves[common:]:
+            move = self._position.parse_uci(move_text)
+            if move is None:
+                self.send(f"info string mossa non valida: {move_text}")
+                return
+            self._position.make_move(move)
+            self._applied_moves.append(move_text)
+
+    def _handle_go(self, args: List[str]):
+        """Gestisce 'go' con wtime/btime/winc/binc/movestogo/movetime/depth/nodes/infinite."""
+        params = {}
+        infinite = False
+        i = 0
+        while i < len(args):
+            if args[i] == "infinite":
+                infinite = True
+            elif args[i] == "ponder":
+                pass  # Il ponder non è annunciato tra le opzioni: si cerca normalmente
+            elif args[i] == "searchmoves":
+                break  # Non supportato: si ignorano le mosse elencate
+            elif i + 1 < len(args):
+                try:
+                    params[args[i]] = int(args[i + 1])
+                except ValueError:
+                    pass
+                i += 1
+            i += 1
+
+        limits = SearchLimits(depth=params.get("depth"), nodes=params.get("nodes"))
+        if not infinite:
+            if "movetime" in params:
+                limits.movetime = max(params["movetime"] / 1000.0 - MOVE_OVERHEAD, 0.001)
+            else:
+                white = self._position.side_to_move == Color.WHITE
+                time_left = params.get("wtime" if white else "btime")
+                if time_left is not None:
+                    increment = params.get("winc" if white else "binc", 0)
+                    limits.movetime = compute_move_time(time_left, increment, params.get("movestogo"))
+
+        self._stop_event = threading.Event()
+        self._search_thread = threading.Thread(target=self._search_worker, args=(limits,), daemon=True)
+        self._search_thread.start()
+
+    def _search_worker(self, limits: SearchLimits):
+        """Esegue la ricerca sul thread dedicato e comunica 'bestmove' al termine."""
+        result = self._searcher.search(self._position, limits, self._stop_event, self._send_info)
+        self.send(f"bestmove {result.best_move.uci() if result.best_move else '0000'}")
+
+    def _send_info(self, info: SearchInfo):
+        """Invia una riga 'info' per un'iterazione completata."""
+        elapsed_ms = int(info.elapsed * 1000)
+        nps = int(info.nodes / info.elapsed) if info.elapsed > 0 else 0
+        pv_text = " ".join(move.uci() for move in info.pv)
+        self.send(f"info depth {info.depth} score {format_score(info.score)} nodes {info.nodes} "
+                  f"nps {nps} time {elapsed_ms} pv {pv_text}")
+
+    def is_searching(self) -> bool:
+        """Indica se una ricerca è in corso."""
+        return self._search_thread is not None and self._search_thread.is_alive()
+
+    def wait_for_search(self, timeout: Optional[float] = None) -> bool:
+        """
+        Attende che la ricerca in corso termini da sola (per profondità, nodi o tempo)
+        e che 'bestmove' sia stato inviato.
+
+        Returns:
+            True se non ci sono ricerche in corso, False se il timeout è scaduto prima.
+        """
+        if self._search_thread is not None:
+            self._search_thread.join(timeout)
+        return not self.is_searching()
+
+    def stop_search(self):
+        """Interrompe l'eventuale ricerca in corso e attende che il thread termini."""
+        if self._search_thread is not None:
+            self._stop_event.set()
+            self._search_thread.join()
+            self._search_thread = None
+
+
+def run_uci(argv: Optional[List[str]] = None, input_stream: TextIO = sys.stdin, output: TextIO = sys.stdout) -> int:
+    """
+    Avvia il loop del protocollo UCI leggendo i comandi da `input_stream`.
+
+    Args:
+        argv: Argomenti da riga di comando (--eval, --nnue-weights).
+        input_stream: Flusso dei comandi in ingresso.
+        output: Flusso delle risposte.
+
+    Returns:
+        Il codice di uscita del processo.
+    """
+    parser = argparse.ArgumentParser(prog="python -m chess uci", description="Motore in modalità UCI.")
+    parser.add_argument("--eval", choices=EVALUATORS, default="classic", help="Funzione di valutazione.")
+    parser.add_argument("--nnue-weights", metavar="FILE", help="File dei pesi per --eval nnue.")
+    args = parser.parse_args(argv or [])
+    try:
+        evaluate_fn = create_evaluator(args.eval, args.nnue_weights)
+    except (ImportError, OSError, ValueError) as error:
+        print(error, file=sys.stderr)
+        return 1
+    engine = UCIEngine(output, evaluate_fn)
+    for line in input_stream:
+        if not engine.handle(line):
+            break
+    engine.stop_search()
+    return 0
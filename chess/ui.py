@@ -1,6 +1,10 @@
 # ui.py
 """Gestisce l'interfaccia utente del gioco nel terminale."""
 
+import os
+import selectors
+import sys
+
 from rich import print as rprint
 from rich.panel import Panel
 from rich.table import Table
@@ -12,11 +16,71 @@ from .board import Board
 from .pieces import Piece # Import Piece per type hinting
 
 
+class LineReader:
+    """
+    Legge righe da un descrittore (lo standard input) senza bloccare: il ciclo della
+    partita attende l'input con un timeout e nel frattempo può aggiornare gli orologi.
+    I byte vengono letti direttamente dal descrittore, così le righe arrivate insieme
+    restano in un buffer proprio e nessuna si perde tra una `select` e l'altra.
+    """
+
+    def __init__(self, fd: int):
+        self._fd = fd
+        self._buffer = bytearray()
+        self._eof = False
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(fd, selectors.EVENT_READ)
+
+    @classmethod
+    def for_stdin(cls) -> Optional['LineReader']:
+        """Il lettore dello standard input, o None se non è selezionabile (es. Windows o stream sostituiti)."""
+        if os.name == "nt":
+            return None
+        try:
+            return cls(sys.stdin.fileno())
+        except (AttributeError, OSError, ValueError):
+            return None
+
+    def read_line(self, timeout: Optional[float] = None) -> Optional[str]:
+        """
+        Restituisce la prossima riga completa (senza terminatore), attendendo al più `timeout` secondi.
+
+        Returns:
+            La riga, o None se il timeout scade prima che sia completa.
+
+        Raises:
+            EOFError: Se l'input è terminato e non restano righe.
+        """
+        while True:
+            newline = self._buffer.find(b"\n")
+            if newline >= 0:
+                line = bytes(self._buffer[:newline])
+                del self._buffer[:newline + 1]
+                return line.decode("utf-8", errors="replace").rstrip("\r")
+            if self._eof:
+                if self._buffer:
+                    line = bytes(self._buffer)
+                    self._buffer.clear()
+                    return line.decode("utf-8", errors="replace")
+                raise EOFError()
+            if not self._selector.select(timeout):
+                return None
+            data = os.read(self._fd, 4096)
+            if data:
+                self._buffer += data
+            else:
+                self._eof = True
+
+    def close(self):
+        self._selector.close()
+
+
 class UI:
     """Definisce la configurazione e le funzioni per l'interfaccia utente del gioco."""
 
     def __init__(self):
         """Inizializza l'UI con impostazioni predefinite."""
+        self.input_reader: Optional[LineReader] = None  # Se impostato, l'input non blocca il ciclo di gioco
         self._accent_color: str = "blue"
         self._white_square_color: str = "bright_white"
         self._black_square_color: str = "grey50" 
@@ -178,7 +242,7 @@ class UI:
     def get_confirmation(self, prompt: str) -> bool:
         while True:
             rprint(f"[bold {self.get_accent_color()}]{prompt} (s/n):[/bold {self.get_accent_color()}] ", end="")
-            response = input().lower().strip()
+            response = self._read_line().lower().strip()
             if response in ['s', 'si', 'sì']:
                 return True
             if response in ['n', 'no']: 
@@ -200,6 +264,68 @@ class UI:
              move_number += 1
          rprint(Panel(move_panel_content, title="Mosse Giocate", border_style=self.get_accent_color()))
 
-    def get_user_input(self, prompt: str = "Inserisci comando o mossa") -> str:
+    def display_move_statistics(self, games: int, rows: List[Tuple[str, int, int, int, int]]):
+        """
+        Mostra le statistiche dell'esploratore di aperture.
+
+        Args:
+            games: Partite che hanno raggiunto la posizione.
+            rows: Per ogni mossa (SAN, partite, vittorie Bianco, patte, vittorie Nero).
+        """
+        if not rows:
+            self.display_message(f"Nessuna mossa successiva nelle partite indicizzate ({games} partite).", level="info")
+            return
+        table = Table(border_style=self.get_accent_color())
+        table.add_column("Mossa", style="bold")
+        table.add_column("Partite", justify="right")
+        table.add_column("1-0", justify="right")
+        table.add_column("½-½", justify="right")
+        table.add_column("0-1", justify="right")
+        for san, count, white_wins, draws, black_wins in rows:
+            table.add_row(san, str(count), *(f"{100 * value / count:.0f}%" for value in (white_wins, draws, black_wins)))
+        rprint(Panel(table, title=f"Esploratore ({games} partite)", border_style=self.get_accent_color()))
+
+    def _read_line(self) -> str:
+        """Legge una riga attendendo senza limiti (dal lettore non bloccante, se attivo)."""
+        if self.input_reader is None:
+            return input()
+        return self.input_reader.read_line()
+
+    def show_prompt(self, prompt: str):
+        """Mostra il prompt senza andare a capo."""
         rprint(f"[{self.get_accent_color()}]{prompt}[/{self.get_accent_color()}]", end="")
-        return input().strip()
\ No newline at end of file
+        sys.stdout.flush()
+
+    def get_user_input(self, prompt: str = "Inserisci comando o mossa") -> str:
+        self.show_prompt(prompt)
+        return self._read_line().strip()
+
+    def wait_for_input(self, timeout: Optional[float]) -> Optional[str]:
+        """
+        Attende una riga dopo `show_prompt` per al più `timeout` secondi.
+
+        Returns:
+            La riga senza spazi iniziali e finali, o None allo scadere del timeout.
+
+        Raises:
+            EOFError: Se l'input è terminato.
+        """
+        if self.input_reader is None:
+            return input().strip()
+        line = self.input_reader.read_line(timeout)
+        return line.strip() if line is not None else None
+
+    def display_clock(self, white: str, black: str, active: Optional[Color], refresh: bool = False):
+        """
+        Mostra gli orologi su una riga; il giocatore al tratto è indicato da una freccia.
+        Con `refresh` riscrive la riga sopra il prompt (solo su terminale), senza
+        toccare quanto l'utente sta digitando.
+        """
+        white_text = f"{'▶ ' if active == Color.WHITE else ''}Bianco {white}"
+        black_text = f"{'▶ ' if active == Color.BLACK else ''}Nero {black}"
+        if not refresh:
+            rprint(f"[bold {self.get_accent_color()}]{white_text}   {black_text}[/bold {self.get_accent_color()}]")
+        elif sys.stdout.isatty():
+            # Salva il cursore, sale di una riga, la cancella e la riscrive, poi torna al prompt
+            sys.stdout.write(f"\x1b7\x1b[1A\r\x1b[2K{white_text}   {black_text}\x1b8")
+            sys.stdout.flush()
\ No newline at end of file
@@ -0,0 +1,88 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from chess.analysis import AnalysisWorker, format_evaluation
+from chess.engine import MATE_SCORE
+from chess.game import Game
+from chess.position import Position
+from chess.ui import UI
+
+
+def wait_for_result(worker, min_depth=1, timeout=20.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        info = worker.latest()
+        if info is not None and info.depth >= min_depth:
+            return info
+        time.sleep(0.01)
+    raise AssertionError("Nessun risultato dall'analisi in background")
+
+
+class TestAnalysisWorker:
+    def test_analyse_and_restart(self):
+        worker = AnalysisWorker(max_depth=2)
+        try:
+            worker.analyse(Position())
+            info = wait_for_result(worker, min_depth=2)
+            assert info.fen == Position().to_fen()
+            assert Position().parse_uci(info.pv[0]) is not None
+
+            position = Position()
+            position.make_move(position.parse_uci("e2e4"))
+            worker.analyse(position)
+            assert worker.latest() is None or worker.latest().fen != info.fen
+            info = wait_for_result(worker)
+            assert " b " in info.fen and info.san_line()
+        finally:
+            worker.close()
+
+    def test_same_position_does_not_restart(self):
+        worker = AnalysisWorker(max_depth=1)
+        try:
+            worker.analyse(Position())
+            first = wait_for_result(worker)
+            worker.analyse(Position())
+            assert worker.latest() == first
+        finally:
+            worker.close()
+
+    def test_root_moves(self):
+        worker = AnalysisWorker(max_depth=2)
+        try:
+            position = Position()
+            root_moves = [position.parse_uci("a2a3"), position.parse_uci("h2h3")]
+            worker.analyse(position, root_moves)
+            assert position.parse_uci(wait_for_result(worker, min_depth=2).pv[0]) in root_moves
+        finally:
+            worker.close()
+
+    def test_format_evaluation(self):
+        assert format_evaluation(35) == "+0.35"
+        assert format_evaluation(-120) == "-1.20"
+        assert format_evaluation(MATE_SCORE - 3) == "matto in 2"
+        assert format_evaluation(-(MATE_SCORE - 2)) == "subisce matto in 1"
+
+
+class TestSuggestCommand:
+    def test_suggest_uses_background_line(self, capsys):
+        worker = AnalysisWorker(max_depth=1)
+        game = Game(UI(), analysis=worker)
+        try:
+            game.handle_command("/suggerisci")
+            assert "Nessuna partita" in capsys.readouterr().out
+            game.start_game()
+            game._update_analysis()
+            wait_for_result(worker)
+            capsys.readouterr()
+            game.handle_command("/suggerisci")
+            assert "Suggerimento:" in capsys.readouterr().out
+            assert game.position.parse_uci(worker.latest().pv[0]) in game.playable_moves()
+        finally:
+            worker.close()
+
+    def test_suggest_without_worker(self, capsys):
+        Game(UI()).handle_command("/suggerisci")
+        assert "--analysis" in capsys.readouterr().out
@@ -0,0 +1,127 @@
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from chess import annotate
+from chess.annotate import (AnnotationTask, BLUNDER_THRESHOLD, annotate_game, annotate_task, classify_loss,
+                            format_evaluation_tag, run_annotate)
+from chess.engine import MATE_SCORE, SearchLimits, Searcher, TranspositionTable
+from chess.main import CLI_MODE_RUNNERS
+from chess.pgn import parse_movetext, read_games
+from chess.position import Position
+
+# La seconda partita regala la Donna (3. Qxf7+?? Kxf7), la terza parte da una FEN e ha una mossa illegale
+SAMPLE_PGN = """[Event "Uno"]
+[White "Anna"]
+[Black "Bruno"]
+[Result "1-0"]
+
+1. e4 e5 2. Nf3 Nc6 1-0
+
+[Event "Due"]
+[White "Carla"]
+[Black "Dario"]
+[Result "0-1"]
+
+1. e4 e5 2. Qh5 Nc6 3. Qxf7+ Kxf7 0-1
+
+[Event "Tre"]
+[SetUp "1"]
+[FEN "6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1"]
+[Result "*"]
+
+1. Ra8# Kh8 *
+"""
+
+
+def load_games():
+    return list(read_games(io.BytesIO(SAMPLE_PGN.encode())))
+
+
+class TestTranspositionTable:
+    def test_warm_table_saves_nodes_with_same_result(self):
+        position = Position.from_fen("r1bqkbnr/pppp1ppp/2n5/4p3/4P3/5N2/PPPP1PPP/RNBQKB1R w KQkq - 2 3")
+        plain = Searcher().search(position, SearchLimits(depth=3))
+        searcher = Searcher(table=TranspositionTable(1 << 12))
+        cold = searcher.search(position, SearchLimits(depth=3))
+        warm = searcher.search(position, SearchLimits(depth=3))
+        assert cold.score == plain.score == warm.score
+        assert warm.best_move == cold.best_move
+        assert cold.nodes <= plain.nodes and warm.nodes < cold.nodes / 5
+        assert searcher.table.stats()["hits"] > 0
+
+    def test_mate_score_distance_from_root(self):
+        position = Position.from_fen("6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1")
+        searcher = Searcher(table=TranspositionTable(1 << 10))
+        for _ in range(2):
+            assert searcher.search(position, SearchLimits(depth=3)).score == MATE_SCORE - 1
+
+
+class TestAnnotation:
+    def test_formatting(self):
+        assert format_evaluation_tag(35) == "[%eval 0.35]"
+        assert format_evaluation_tag(-MATE_SCORE + 3) == "[%eval #-2]"
+        assert classify_loss(BLUNDER_THRESHOLD) == "??" and classify_loss(150) == "?" and classify_loss(20) == ""
+
+    def test_blunder_is_tagged_with_best_move(self):
+        game = load_games()[1]
+        annotated = annotate_game(game, 2, Searcher(table=TranspositionTable(1 << 12)))
+        assert [ply.san for ply in annotated.plies] == game.moves
+        queen_sac = annotated.plies[4]
+        assert queen_sac.nag == "??" and queen_sac.best_san != "Qxf7+"
+        assert annotated.plies[5].nag == "" and annotated.plies[5].evaluation < -BLUNDER_THRESHOLD
+        assert "Qxf7+?? {[%eval" in annotated.to_pgn(2)
+
+    def test_illegal_move_leaves_rest_unannotated(self):
+        game = load_games()[2]
+        annotated = annotate_task(AnnotationTask(2, game, 2, 1 << 10))
+        assert [ply.san for ply in annotated.plies] == ["Ra8#"] and annotated.unannotated == ["Kh8"]
+        assert annotated.plies[0].evaluation >= MATE_SCORE - 1
+        pgn = annotated.to_pgn(2)
+        assert '[FEN "6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1"]' in pgn
+        assert parse_movetext(pgn.split("\n\n")[1]) == (["Ra8#", "Kh8"], "*")
+
+
+class TestRunAnnotate:
+    def test_games_written_in_input_order(self, tmp_path):
+        source = tmp_path / "partite.pgn"
+        source.write_text(SAMPLE_PGN, encoding="utf-8")
+        target = tmp_path / "annotate.pgn"
+        report = io.StringIO()
+        assert CLI_MODE_RUNNERS["annotate"] is run_annotate
+        assert run_annotate([str(source), str(target), "--depth", "2", "--jobs", "2"], io.StringIO(), report) == 0
+        with open(target, "rb") as handle:
+            games = list(read_games(handle))
+        assert [game.headers["Event"] for game in games] == ["Uno", "Due", "Tre"]
+        # I simboli restano attaccati alle mosse, come nel PGN; san_to_move li ignora
+        assert [[san.rstrip("!?") for san in game.moves] for game in games] == [game.moves for game in load_games()]
+        assert all(game.headers["Annotator"] == "Scacchi (profondità 2)" for game in games)
+        assert "3 partite" in report.getvalue() and "partite/minuto" in report.getvalue()
+        assert "1 sviste" in report.getvalue()
+
+    def test_same_output_for_any_number_of_jobs(self, tmp_path):
+        source = tmp_path / "partite.pgn"
+        source.write_text(SAMPLE_PGN, encoding="utf-8")
+        outputs = []
+        for jobs in ("1", "3"):
+            output = io.StringIO()
+            assert run_annotate([str(source), "-", "--depth", "2", "--jobs", jobs], output, io.StringIO()) == 0
+            outputs.append(output.getvalue())
+        assert outputs[0] == outputs[1]
+
+    def test_input_closed_when_output_cannot_be_opened(self, tmp_path, monkeypatch):
+        source = tmp_path / "partite.pgn"
+        source.write_text(SAMPLE_PGN, encoding="utf-8")
+        opened = []
+
+        def recording_open(*args, **kwargs):
+            opened.append(open(*args, **kwargs))
+            return opened[-1]
+
+        monkeypatch.setattr(annotate, "open", recording_open, raising=False)
+        report = io.StringIO()
+        assert run_annotate([str(source), str(tmp_path / "assente" / "annotate.pgn")], io.StringIO(), report) == 2
+        assert "Errore" in report.getvalue()
+        assert len(opened) == 1 and opened[0].closed
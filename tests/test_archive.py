@@ -0,0 +1,178 @@
+import io
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from chess.archive import (ArchiveReader, ArchiveWriter, convert_pgn, decode_ranked_move, encode_ranked_move,
+                           read_varint, run_archive, write_varint)
+from chess.main import CLI_MODE_RUNNERS
+from chess.pgn import format_game, move_to_san, read_games
+from chess.position import Move, Position
+
+# Arrocco, en passant e promozione; la terza partita ha una mossa illegale
+SAMPLE_PGN = """[Event "Uno"]
+[White "Anna"]
+[Black "Bruno"]
+[Result "1-0"]
+
+1. e4 Nf6 2. e5 d5 3. exd6 Nc6 4. Nf3 Bg4 5. Be2 Qd7 6. O-O O-O-O 1-0
+
+[Event "Due"]
+[SetUp "1"]
+[FEN "8/P6k/8/8/8/8/6p1/K7 w - - 0 1"]
+[Result "*"]
+
+1. a8=Q g1=N 2. Qb7+ *
+
+[Event "Tre"]
+[Result "0-1"]
+
+1. e4 e5 2. Ke3 0-1
+"""
+
+
+def random_games(count, seed=7):
+    rng = random.Random(seed)
+    games = []
+    for number in range(count):
+        position = Position()
+        moves = []
+        for _ in range(rng.randint(10, 60)):
+            legal = position.legal_moves()
+            if not legal:
+                break
+            moves.append(rng.choice(legal))
+            position.make_move(moves[-1])
+        games.append(({"Event": f"Partita {number}", "White": "Ùmberto"}, moves))
+    return games
+
+
+class TestEncoding:
+    def test_varint(self):
+        buffer = bytearray()
+        for value in (0, 127, 128, 300, 1 << 40):
+            write_varint(buffer, value)
+        assert len(buffer) == 1 + 1 + 2 + 2 + 6
+        offset, values = 0, []
+        while offset < len(buffer):
+            value, offset = read_varint(buffer, offset)
+            values.append(value)
+        assert values == [0, 127, 128, 300, 1 << 40]
+        with pytest.raises(ValueError):
+            read_varint(b"\x80", 0)
+
+    def test_rank_does_not_depend_on_move_order(self):
+        # Stessa posizione raggiunta con ordini di mosse diversi: stessi codici
+        first, second = Position(), Position()
+        for uci in ("g1f3", "g8f6", "b1c3", "b8c6"):
+            first.make_move(first.parse_uci(uci))
+        for uci in ("b1c3", "b8c6", "g1f3", "g8f6"):
+            second.make_move(second.parse_uci(uci))
+        codes = [encode_ranked_move(first, move) for move in first.legal_moves()]
+        assert sorted(codes) == sorted(encode_ranked_move(second, move) for move in second.legal_moves())
+        assert [decode_ranked_move(second, code) for code in codes] == first.legal_moves()
+        assert all(code < 0x80 for code in codes)  # Nella posizione iniziale un byte per mossa
+
+    def test_invalid_move_or_code(self):
+        position = Position()
+        with pytest.raises(ValueError):
+            encode_ranked_move(position, Move((1, 4), (4, 4)))
+        with pytest.raises(ValueError):
+            decode_ranked_move(position, 15 << 4)
+
+    def test_more_than_sixteen_pieces_are_rejected(self):
+        position = Position.from_fen("k7/8/8/8/8/QQQQQQQQ/QQQQQQQQ/Q6K w - - 0 1")
+        for move in position.pseudo_legal_moves():
+            try:
+                code = encode_ranked_move(position, move)
+            except ValueError:
+                continue
+            assert decode_ranked_move(position, code) == move
+        with pytest.raises(ValueError):
+            encode_ranked_move(position, Move((2, 6), (3, 6)))
+        with pytest.raises(ValueError):
+            encode_ranked_move(position, Move((2, 7), (3, 7)))
+        game = "[Event \"Diciotto\"]\n[SetUp \"1\"]\n[FEN \"k7/8/8/8/8/QQQQQQQQ/QQQQQQQQ/Q6K w - - 0 1\"]\n\n1. Qg3g4 *\n"
+        with ArchiveWriter(os.devnull) as writer:
+            assert convert_pgn(io.BytesIO(game.encode()), writer) == (0, 1)
+
+
+class TestArchive:
+    def test_round_trip_and_random_access(self, tmp_path):
+        path = str(tmp_path / "partite.scar")
+        games = random_games(11)
+        with ArchiveWriter(path, block_games=4) as writer:
+            for headers, moves in games:
+                writer.add_game(headers, moves, "1/2-1/2")
+        with ArchiveReader(path) as reader:
+            assert len(reader) == 11
+            assert [(game.headers, game.moves) for game in reader] == games
+            for index in (9, 2, -1, 5):
+                assert reader[index].moves == games[index][1]
+            with pytest.raises(IndexError):
+                reader[11]
+
+    def test_pgn_conversion_keeps_special_moves(self, tmp_path):
+        path = str(tmp_path / "partite.scar")
+        with ArchiveWriter(path) as writer:
+            assert convert_pgn(io.BytesIO(SAMPLE_PGN.encode()), writer) == (2, 1)
+        with ArchiveReader(path) as reader:
+            assert reader[0].san_moves()[-2:] == ["O-O", "O-O-O"] and reader[0].result == "1-0"
+            assert reader[1].moves[:2] == [Move((6, 0), (7, 0), "q"), Move((1, 6), (0, 6), "n")]
+            games = list(read_games(io.BytesIO("".join(game.to_pgn() for game in reader).encode())))
+        assert [game.moves for game in games] == [game.moves for game in read_games(io.BytesIO(SAMPLE_PGN.encode()))][:2]
+        assert games[1].headers["FEN"] == "8/P6k/8/8/8/8/6p1/K7 w - - 0 1"
+
+    def test_smaller_than_pgn(self, tmp_path):
+        texts = []
+        for headers, moves in random_games(30):
+            position = Position()
+            sans = []
+            for move in moves:
+                sans.append(move_to_san(position, move))
+                position.make_move(move)
+            texts.append(format_game(headers, sans, "*"))
+        source = tmp_path / "partite.pgn"
+        source.write_text("".join(texts), encoding="utf-8")
+        target = tmp_path / "partite.scar"
+        with open(source, "rb") as handle, ArchiveWriter(str(target)) as writer:
+            assert convert_pgn(handle, writer) == (30, 0)
+        assert os.path.getsize(target) * 4 < os.path.getsize(source)
+
+    def test_invalid_files(self, tmp_path):
+        path = tmp_path / "non_archivio.scar"
+        path.write_bytes(b"[Event \"Uno\"]\n" * 4)
+        with pytest.raises(ValueError):
+            ArchiveReader(str(path))
+        writer = ArchiveWriter(str(tmp_path / "incompleto.scar"))
+        writer.add_game({}, [Move((1, 4), (3, 4))])
+        writer._handle.flush()
+        with pytest.raises(ValueError):
+            ArchiveReader(str(tmp_path / "incompleto.scar"))
+        with pytest.raises(ValueError):
+            writer.add_game({}, [Move((1, 4), (4, 4))])
+        writer.close()
+        with ArchiveReader(str(tmp_path / "incompleto.scar")) as reader:
+            assert len(reader) == 1
+
+
+class TestRunArchive:
+    def test_convert_and_extract(self, tmp_path):
+        source = tmp_path / "partite.pgn"
+        source.write_text(SAMPLE_PGN, encoding="utf-8")
+        target = tmp_path / "partite.scar"
+        report = io.StringIO()
+        assert CLI_MODE_RUNNERS["archive"] is run_archive
+        assert run_archive([str(source), str(target), "--block-games", "1"], io.StringIO(), report) == 0
+        assert "2 partite archiviate (1 scartate)" in report.getvalue()
+
+        output = io.StringIO()
+        assert run_archive([str(target), "-", "--to-pgn", "--game", "2"], output, io.StringIO()) == 0
+        games = list(read_games(io.BytesIO(output.getvalue().encode())))
+        assert [game.headers["Event"] for game in games] == ["Due"] and games[0].moves == ["a8=Q", "g1=N", "Qb7+"]
+        assert run_archive([str(target), "-", "--to-pgn", "--game", "3"], io.StringIO(), io.StringIO()) == 2
+        assert run_archive([str(source), "-", "--to-pgn"], io.StringIO(), io.StringIO()) == 2
@@ -0,0 +1,55 @@
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from chess.batch import attack_sets, batch_from_fens, legal_moves_batch, move_masks
+from chess.constants import Color
+from chess.position import Position, STARTING_FEN, random_positions
+
+# Posizioni con casi limite: en passant (anche inchiodato), promozioni, arrocchi attraverso case attaccate
+EDGE_CASES = [
+    "4k3/8/8/3Pp3/8/8/8/4K3 w - e6 0 1",
+    "8/8/8/K2Pp2r/8/8/8/7k w - e6 0 1",
+    "8/2P5/8/8/8/8/k6K/8 w - - 0 1",
+    "r3k2r/8/8/8/8/8/8/R3K2R b KQkq - 0 1",
+    "r3k2r/8/8/8/8/8/5b2/R3K2R w KQkq - 0 1",
+    "rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8",
+    "8/8/8/8/8/8/8/4K3 w - - 0 1",
+]
+
+
+def sample_positions(count, seed=0):
+    return random_positions([STARTING_FEN] + EDGE_CASES, count, seed)
+
+
+class TestBatchMoveGeneration:
+    def test_matches_scalar_generator(self):
+        fens = EDGE_CASES + sample_positions(150, seed=3)
+        result = legal_moves_batch(batch_from_fens(fens), chunk_size=37)
+        assert result.offsets[-1] == len(result.moves)
+        for index, fen in enumerate(fens):
+            expected = sorted(Position.from_fen(fen).legal_moves())
+            assert sorted(result.moves_for(index)) == expected, fen
+            assert result.counts[index] == len(expected)
+
+    def test_move_masks_and_attack_sets(self):
+        for fen in EDGE_CASES + sample_positions(20, seed=7):
+            position = Position.from_fen(fen)
+            batch = batch_from_fens([fen])
+            masks = move_masks(batch)[0]
+            expected = np.zeros(64, dtype=np.uint64)
+            for move in position.pseudo_legal_moves():
+                expected[move.start[0] * 8 + move.start[1]] |= np.uint64(1 << (move.end[0] * 8 + move.end[1]))
+            assert (masks == expected).all(), fen
+
+            for color_index, color in enumerate((Color.WHITE, Color.BLACK)):
+                attacked = int(attack_sets(batch, np.array([color_index]))[0])
+                for square in range(64):
+                    assert bool(attacked >> square & 1) == position.is_square_attacked(divmod(square, 8), color)
+
+    def test_empty_batch(self):
+        result = legal_moves_batch(batch_from_fens([]))
+        assert len(result.counts) == 0 and list(result.offsets) == [0]
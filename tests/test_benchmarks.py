@@ -0,0 +1,30 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from benchmarks.bench_batch import sample_positions, throughput
+from benchmarks.bench_core import BENCHMARKS
+from benchmarks.run import compare, load_baseline, measure, save_baseline
+
+
+class TestBenchmarks:
+    def test_every_benchmark_runs(self):
+        for factory in BENCHMARKS.values():
+            factory()()
+
+    def test_batch_throughput(self):
+        rates = throughput(sample_positions(40), chunk_size=16, scalar_limit=40)
+        assert rates["scalar"] > 0 and rates["batch"] > 0 and rates["moves"] > 0
+
+    def test_measure_returns_positive_time(self):
+        assert measure(lambda: None, repeats=2, min_time=0.001) > 0
+
+    def test_compare_flags_slowdown_over_threshold(self):
+        rows = compare({"a": 130.0, "b": 110.0, "c": 5.0}, {"a": 100.0, "b": 100.0}, 0.2)
+        assert rows == [("a", 130.0, 1.3, True), ("b", 110.0, 1.1, False)]
+
+    def test_baseline_round_trip(self, tmp_path):
+        path = str(tmp_path / "baseline.json")
+        save_baseline(path, {"board_init": 1234.5})
+        assert load_baseline(path) == {"board_init": 1234.5}
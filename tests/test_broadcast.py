@@ -0,0 +1,140 @@
+import os
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from chess.board import Board
+from chess.broadcast import (BroadcastServer, BroadcastViewer, FRAME_DELTA, FRAME_KEYFRAME, encode_delta,
+                             encode_keyframe, parse_address, read_frames)
+from chess.constants import Color
+from chess.game import Game
+from chess.position import Move
+from chess.ui import UI
+
+
+def play(game, moves):
+    for move in moves:
+        assert game.make_move(move), move
+
+
+def split_frame(frame):
+    return frame[0], frame[3:]
+
+
+class Spectator:
+    """Spettatore di prova: legge i frame in un socket con timeout."""
+
+    def __init__(self, address):
+        self.sock = socket.create_connection(address)
+        self.sock.settimeout(5)
+        self.frames = read_frames(self.sock)
+        self.viewer = BroadcastViewer()
+
+    def follow_until(self, ply):
+        for frame_type, payload in self.frames:
+            self.viewer.apply(frame_type, payload)
+            if self.viewer.synced and self.viewer.ply == ply:
+                return self.viewer
+        raise AssertionError("Trasmissione interrotta")
+
+    def close(self):
+        self.sock.close()
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "Condizione non raggiunta"
+        time.sleep(0.01)
+
+
+class TestFrames:
+    def test_keyframe_and_delta_rebuild_board(self):
+        board = Board()
+        viewer = BroadcastViewer()
+        assert viewer.apply(*split_frame(encode_keyframe(1, 0, board, Color.WHITE, (300.0, 299.5))))
+        assert viewer.board.to_bytes() == board.to_bytes() and viewer.clocks == (300.0, 299.5)
+
+        before = board.to_bytes()
+        board.move_piece((1, 4), (3, 4))
+        frame = encode_delta(2, 1, Move((1, 4), (3, 4)), before, board, Color.BLACK)
+        # Intestazione, campi fissi e due case cambiate: molto meno di un keyframe
+        assert frame[0] == FRAME_DELTA and len(frame) == 3 + 26 + 4
+        assert viewer.apply(*split_frame(frame))
+        assert viewer.board.to_bytes() == board.to_bytes()
+        assert viewer.side_to_move == Color.BLACK and viewer.ply == 1 and viewer.clocks is None
+        assert viewer.last_move == Move((1, 4), (3, 4))
+
+    def test_gap_or_hash_mismatch_waits_for_keyframe(self):
+        board = Board()
+        viewer = BroadcastViewer()
+        before = board.to_bytes()
+        board.move_piece((1, 3), (3, 3))
+        delta = encode_delta(2, 1, Move((1, 3), (3, 3)), before, board, Color.BLACK)
+        assert not viewer.apply(*split_frame(delta))  # Nessun keyframe ancora ricevuto
+
+        viewer.apply(*split_frame(encode_keyframe(5, 0, Board(), Color.WHITE)))
+        assert not viewer.apply(*split_frame(delta))  # Sequenza non consecutiva
+        assert not viewer.synced and viewer.desyncs == 1
+
+        keyframe = encode_keyframe(1, 0, Board(), Color.WHITE)
+        viewer.apply(*split_frame(keyframe))
+        corrupted = bytearray(delta)
+        corrupted[3 + 9] ^= 0xFF  # Hash alterato
+        assert not viewer.apply(corrupted[0], bytes(corrupted[3:]))
+        assert viewer.apply(FRAME_KEYFRAME, keyframe[3:])
+
+    def test_parse_address(self):
+        assert parse_address("localhost:9000") == ("localhost", 9000)
+        assert parse_address(":9000") == ("127.0.0.1", 9000)
+        for text in ("localhost", "host:porta", "host:70000"):
+            try:
+                parse_address(text)
+            except ValueError:
+                continue
+            raise AssertionError(text)
+
+
+class TestBroadcastServer:
+    def test_spectators_follow_game_and_late_joiner_catches_up(self):
+        with BroadcastServer(port=0, keyframe_interval=4) as server:
+            game = Game(UI(), broadcaster=server)
+            early = Spectator(server.address)
+            wait_for(lambda: server.subscriber_count == 1)
+            game.start_game()
+            play(game, ["e4", "e5", "d4", "d5", "c4", "c5"])
+            viewer = early.follow_until(6)
+            assert viewer.board.to_bytes() == game.board.to_bytes()
+            assert viewer.side_to_move == Color.WHITE and viewer.desyncs == 0
+
+            # Chi arriva dopo riceve il keyframe della semimossa 4 e i delta successivi
+            late = Spectator(server.address)
+            assert late.follow_until(6).board.to_bytes() == game.board.to_bytes()
+            play(game, ["a4"])
+            assert late.follow_until(7).board.to_bytes() == game.board.to_bytes()
+            assert early.follow_until(7).board.to_bytes() == game.board.to_bytes()
+            early.close()
+            late.close()
+            wait_for(lambda: server.subscriber_count == 0)
+            assert server.stats()["max_subscribers"] == 2 and server.stats()["dropped"] == 0
+
+    def test_publish_does_not_wait_for_many_spectators(self):
+        with BroadcastServer(port=0) as server:
+            spectators = [socket.create_connection(server.address) for _ in range(200)]
+            wait_for(lambda: server.subscriber_count == 200)
+            board = Board()
+            server.publish_keyframe(board, Color.WHITE, 0)
+            start = time.perf_counter()
+            side = Color.WHITE
+            for ply, (start_pos, end_pos) in enumerate([((1, 0), (2, 0)), ((6, 0), (5, 0))] * 10, 1):
+                board.move_piece(start_pos, end_pos)
+                side = Color.BLACK if side == Color.WHITE else Color.WHITE
+                server.publish_move(Move(start_pos, end_pos), board, side, ply)
+                board.move_piece(end_pos, start_pos)
+            # Il costo per mossa non dipende dal numero di spettatori: codifica e accodamento
+            assert (time.perf_counter() - start) / 20 < 0.005
+            wait_for(lambda: server.frames == 1 + 20 + 1)
+            for sock in spectators:
+                sock.close()
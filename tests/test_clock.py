@@ -0,0 +1,127 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from chess.clock import (ChessClock, INCREMENT_BRONSTEIN, TimeControl, format_clock, parse_time_control)
+from chess.constants import Color
+from chess.game import Game
+from chess.ui import UI, LineReader
+
+
+class FakeTime:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTimeControl:
+    def test_parse(self):
+        assert parse_time_control("300+2") == TimeControl(300.0, 2.0)
+        assert parse_time_control("10", INCREMENT_BRONSTEIN) == TimeControl(10.0, 0.0, INCREMENT_BRONSTEIN)
+        for text, mode in (("abc", "fischer"), ("0+1", "fischer"), ("60+2", "ritardo")):
+            with pytest.raises(ValueError):
+                parse_time_control(text, mode)
+
+    def test_format_clock(self):
+        assert format_clock(305.9) == "5:05"
+        assert format_clock(9.96) == "0:09.9"
+        assert format_clock(-1) == "0:00.0"
+
+
+class TestChessClock:
+    def test_fischer_adds_full_increment(self):
+        fake = FakeTime()
+        clock = ChessClock(TimeControl(60, 2), fake)
+        clock.start(Color.WHITE)
+        fake.now += 0.5
+        assert clock.press() == Color.BLACK
+        assert clock.time_left(Color.WHITE) == pytest.approx(61.5)
+        fake.now += 10
+        assert clock.time_left(Color.BLACK) == pytest.approx(50)
+        assert clock.time_left(Color.WHITE) == pytest.approx(61.5)
+
+    def test_bronstein_returns_at_most_the_increment(self):
+        fake = FakeTime()
+        clock = ChessClock(TimeControl(60, 2, INCREMENT_BRONSTEIN), fake)
+        clock.start(Color.WHITE)
+        fake.now += 0.5
+        clock.press()
+        assert clock.time_left(Color.WHITE) == pytest.approx(60)
+        fake.now += 5
+        clock.press()
+        assert clock.time_left(Color.BLACK) == pytest.approx(57)
+
+    def test_flag_and_timeouts(self):
+        fake = FakeTime()
+        clock = ChessClock(TimeControl(12.25), fake)
+        assert clock.seconds_until_flag() is None and clock.flagged() is None
+        clock.start(Color.WHITE)
+        assert clock.seconds_until_display_change() == pytest.approx(0.25)
+        fake.now += 3
+        assert clock.seconds_until_display_change() == pytest.approx(0.05)
+        fake.now += 9.25
+        assert clock.flagged() == Color.WHITE
+        clock.press()  # Chi ha già perso per tempo non riceve l'incremento
+        assert clock.time_left(Color.WHITE) <= 0
+        clock.stop()
+        fake.now += 5
+        assert clock.snapshot() == (pytest.approx(0), pytest.approx(12.25))
+
+
+class TestLineReader:
+    def test_lines_arriving_together_and_eof(self):
+        read_fd, write_fd = os.pipe()
+        reader = LineReader(read_fd)
+        try:
+            assert reader.read_line(0.01) is None
+            os.write(write_fd, b"e4\r\n/orologio\nd")
+            assert reader.read_line(1) == "e4"
+            assert reader.read_line(0) == "/orologio"
+            assert reader.read_line(0.01) is None
+            os.close(write_fd)
+            assert reader.read_line(1) == "d"
+            with pytest.raises(EOFError):
+                reader.read_line(1)
+        finally:
+            reader.close()
+            os.close(read_fd)
+
+
+class TestGameClock:
+    def test_clock_runs_only_for_player_to_move(self):
+        fake = FakeTime()
+        game = Game(UI(), clock=ChessClock(TimeControl(60, 1), fake))
+        game.start_game()
+        fake.now += 2
+        assert game.make_move("e4")
+        assert game.clock.active == Color.BLACK
+        assert game.clock.time_left(Color.WHITE) == pytest.approx(59)
+        fake.now += 61
+        assert not game.make_move("e5")
+        assert game.game_over and game.winner == Color.WHITE
+
+    def test_flag_while_waiting_for_input(self, capsys):
+        read_fd, write_fd = os.pipe()
+        ui = UI()
+        ui.input_reader = LineReader(read_fd)
+        game = Game(ui, clock=ChessClock(TimeControl(0.2)))
+        try:
+            game.start_game()
+            start = time.monotonic()
+            # Nessuna mossa in arrivo: l'attesa termina da sola alla caduta della bandierina
+            assert game._read_input("Bianco > ") == ""
+            assert time.monotonic() - start == pytest.approx(0.2, abs=0.05)
+            assert game.game_over and game.winner == Color.BLACK
+            assert "Tempo scaduto" in capsys.readouterr().out
+            os.write(write_fd, b"/mosse\n")
+            assert game._read_input("Scacchi > ") == "/mosse"
+        finally:
+            ui.input_reader.close()
+            os.close(read_fd)
+            os.close(write_fd)
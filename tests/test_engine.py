@@ -0,0 +1,75 @@
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from chess.engine import Searcher, SearchLimits, MATE_SCORE
+from chess.position import Position
+from chess.uci import UCIEngine, compute_move_time
+
+
+class TestSearcher:
+    def test_finds_mate_in_one(self):
+        position = Position.from_fen("6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1")
+        result = Searcher().search(position, SearchLimits(depth=3))
+        assert result.best_move is not None and result.best_move.uci() == "d1d8"
+        assert result.score == MATE_SCORE - 1
+        assert position.to_fen() == "6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1"
+
+    def test_node_limit_restores_position(self):
+        position = Position()
+        result = Searcher().search(position, SearchLimits(nodes=50))
+        assert result.best_move in position.legal_moves()
+        assert position.ply == 0
+
+
+class TestUCI:
+    def test_handshake_and_ready(self):
+        output = io.StringIO()
+        engine = UCIEngine(output)
+        engine.handle("uci")
+        engine.handle("isready")
+        lines = output.getvalue().splitlines()
+        assert "uciok" in lines
+        assert lines[-1] == "readyok"
+
+    def test_position_moves_are_applied_incrementally(self):
+        engine = UCIEngine(io.StringIO())
+        engine.handle("position startpos moves e2e4 e7e5")
+        board = engine.position.board
+        engine.handle("position startpos moves e2e4 e7e5 g1f3")
+        assert engine.position.board is board
+        assert engine.position.ply == 3
+        engine.handle("position startpos moves e2e4 c7c5")
+        assert engine.position.board is board
+        assert engine.position.move_stack[-1].uci() == "c7c5"
+
+    def test_go_depth_reports_bestmove(self):
+        output = io.StringIO()
+        engine = UCIEngine(output)
+        engine.handle("position fen 6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1")
+        engine.handle("go depth 2")
+        # Ferma la ricerca solo dopo che ha raggiunto la profondità richiesta
+        assert engine.wait_for_search(timeout=30)
+        engine.stop_search()
+        assert "bestmove d1d8" in output.getvalue()
+
+    def test_stop_interrupts_infinite_search(self):
+        output = io.StringIO()
+        engine = UCIEngine(output)
+        engine.handle("position startpos")
+        engine.handle("go infinite")
+        time.sleep(0.05)
+        engine.handle("isready")
+        assert "readyok" in output.getvalue()
+        start = time.monotonic()
+        engine.handle("stop")
+        assert time.monotonic() - start < 0.5
+        assert output.getvalue().splitlines()[-1].startswith("bestmove ")
+        assert engine.position.ply == 0
+
+    def test_compute_move_time_stays_within_clock(self):
+        assert compute_move_time(60000, 0, None) < 60.0 / 20
+        assert compute_move_time(10, 5000, None) <= 0.01
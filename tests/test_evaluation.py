@@ -0,0 +1,123 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from chess.board import Board
+from chess.engine import Searcher, SearchLimits
+from chess.evaluation import (
+    PAWN_HASH, PawnHashTable, create_evaluator, evaluate, evaluate_pieces, pawn_score, pawn_structure,
+    DOUBLED_PAWN_PENALTY, ISOLATED_PAWN_PENALTY, PASSED_PAWN_BONUS, PAWN_SHIELD_NEAR, PAWN_SHIELD_FAR,
+)
+from chess.pieces import Pawn
+from chess.position import Position
+from chess.profiling import Profiler, PROFILER
+
+KIWIPETE = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+MIDDLEGAME = "r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10"
+
+
+def recomputed_pawn_key(board: Board) -> int:
+    copy = Board.from_bytes(board.to_bytes())
+    return copy.pawn_key
+
+
+def pawns_of(position: Position):
+    white = [piece.position for piece in position.board.get_all_pieces()
+             if isinstance(piece, Pawn) and piece.color.name == "WHITE"]
+    black = [piece.position for piece in position.board.get_all_pieces()
+             if isinstance(piece, Pawn) and piece.color.name == "BLACK"]
+    return white, black
+
+
+class TestPawnKey:
+    def test_incremental_pawn_key(self):
+        position = Position.from_fen(KIWIPETE)
+        start_key = position.board.pawn_key
+        for move in position.legal_moves():
+            zobrist_before = position.board.zobrist_key
+            position.make_move(move)
+            assert position.board.pawn_key == recomputed_pawn_key(position.board)
+            position.unmake_move()
+            assert position.board.zobrist_key == zobrist_before
+        assert position.board.pawn_key == start_key
+
+    def test_only_pawns_change_the_key(self):
+        position = Position()
+        key = position.board.pawn_key
+        position.make_move(position.parse_uci("g1f3"))
+        assert position.board.pawn_key == key
+        position.make_move(position.parse_uci("e7e5"))
+        assert position.board.pawn_key != key
+        board = Board()
+        board.clear()
+        assert board.pawn_key == 0
+
+
+class TestPawnStructure:
+    def test_terms(self):
+        # Bianco: colonna c doppiata, d5 e c3 passati (c2 no, ha c3 davanti)
+        # Nero: f6, g7 e h7 passati; con il Re in g8 scudo da g7/h7 (vicini) e f6 (lontano)
+        entry = pawn_structure([(4, 3), (2, 2), (1, 2)], [(6, 7), (6, 6), (5, 5)])
+        assert entry.structure[0] == -DOUBLED_PAWN_PENALTY + PASSED_PAWN_BONUS[4] + PASSED_PAWN_BONUS[2]
+        assert entry.structure[1] == PASSED_PAWN_BONUS[1] * 2 + PASSED_PAWN_BONUS[2]
+        assert entry.shields[0][4] == 0 and entry.shields[0][2] == PAWN_SHIELD_NEAR
+        assert entry.shields[1][6] == PAWN_SHIELD_FAR + 2 * PAWN_SHIELD_NEAR
+
+    def test_isolated_pawns(self):
+        entry = pawn_structure([(1, 0), (1, 4)], [(6, 0), (6, 1)])
+        assert entry.structure[0] == -2 * ISOLATED_PAWN_PENALTY + PASSED_PAWN_BONUS[1]
+
+    def test_cached_score_matches_direct_computation(self):
+        table = PawnHashTable(64)
+        for fen in (KIWIPETE, MIDDLEGAME):
+            position = Position.from_fen(fen)
+            white, black = pawns_of(position)
+            direct = pawn_score(position, white, black, table=None)
+            assert pawn_score(position, white, black, table) == direct
+            assert pawn_score(position, white, black, table) == direct
+        assert table.stats()["hits"] == 2 and table.stats()["probes"] == 4
+        assert evaluate(Position()) == evaluate_pieces(Position()) == 0
+
+
+class TestPawnHashTable:
+    def test_size_memory_and_overwrite(self):
+        table = PawnHashTable(100)
+        assert len(table) == 128
+        assert table.memory_bytes() == 128 * (8 + 1 + 2 * 2 + 2 * 2 * 8)
+        entry = pawn_structure([(1, 0)], [])
+        table.store(5, entry)
+        table.store(5 + 128, entry)
+        assert table.get(5) is None and table.get(5 + 128) == entry
+        assert table.stats()["overwrites"] == 1
+
+    def test_search_hit_rate(self):
+        PAWN_HASH.clear()
+        searcher = Searcher()
+        searcher.search(Position.from_fen(MIDDLEGAME), SearchLimits(depth=3))
+        stats = searcher.evaluate.pawn_table.stats()
+        assert stats["probes"] > 100 and stats["hit_rate"] > 0.9
+
+    def test_each_searcher_has_its_own_table(self):
+        first, second = Searcher(), Searcher()
+        assert first.evaluate.pawn_table is not second.evaluate.pawn_table
+        assert create_evaluator("classic").pawn_table is not create_evaluator("classic").pawn_table
+        position = Position.from_fen(MIDDLEGAME)
+        assert first.evaluate(position) == evaluate(position) == evaluate(position, pawn_table=None)
+
+    def test_profile_reports_search_tables(self):
+        PROFILER.enable()
+        try:
+            searcher = Searcher()
+            searcher.search(Position.from_fen(MIDDLEGAME), SearchLimits(depth=3))
+            report = PROFILER.to_dict()["pawn_hash"]
+        finally:
+            PROFILER.disable()
+        assert report["probes"] >= searcher.evaluate.pawn_table.probes > 100
+        assert report["hits"] >= searcher.evaluate.pawn_table.hits and report["hit_rate"] > 0
+        assert report["memory_kb"] >= searcher.evaluate.pawn_table.memory_bytes() / 1024
+
+    def test_profiler_report(self):
+        assert "pawn_hash" in PROFILER.to_dict()
+        assert "hit_rate" in PROFILER.format_text()
+        assert "pawn_hash" not in Profiler().to_dict()
@@ -0,0 +1,137 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from chess.explorer import PositionIndex, build_index
+from chess.game import Game
+from chess.pgn import move_to_san, parse_movetext, read_games, san_to_move
+from chess.position import Position, STARTING_FEN
+from chess.ui import UI
+
+KIWIPETE = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+
+SAMPLE_PGN = """[Event "Uno"]
+[White "Anna"]
+[Black "Bruno"]
+[Result "1-0"]
+
+1. e4 e5 2. Nf3 {sviluppo} Nc6 (2... d6 3. d4) 3. Bb5 a6 1-0
+
+[Event "Due"]
+[White "Carla"]
+[Black "Dario"]
+[Result "1/2-1/2"]
+
+1. e4 c5 2. Nf3 d6 1/2-1/2
+
+[Event "Tre"]
+[White "Elena"]
+[Black "Fabio"]
+[Result "0-1"]
+
+1. d4 d5 2. c4 e6 0-1
+"""
+
+
+class TestZobrist:
+    def test_incremental_key_matches_recomputed(self):
+        position = Position.from_fen(KIWIPETE)
+        for move in position.legal_moves():
+            position.make_move(move)
+            assert position.zobrist_key() == Position.from_fen(position.to_fen()).zobrist_key()
+            position.unmake_move()
+        assert position.zobrist_key() == Position.from_fen(KIWIPETE).zobrist_key()
+
+    def test_transpositions_share_key(self):
+        first, second = Position(), Position()
+        for san in ("d4", "e6", "e4"):
+            first.make_move(san_to_move(first, san))
+        for san in ("e4", "e6", "d4"):
+            second.make_move(san_to_move(second, san))
+        assert first.zobrist_key() == second.zobrist_key()
+        assert first.zobrist_key() != Position().zobrist_key()
+
+    def test_game_position_keeps_en_passant(self):
+        game = Game(UI())
+        game.start_game()
+        expected = Position()
+        for san in ("e4", "a6", "e5", "d5"):
+            assert game.make_move(san)
+            expected.make_move(san_to_move(expected, san))
+        assert game.position.to_fen() == expected.to_fen() == game._position_at(4).to_fen()
+        assert " d6 " in expected.to_fen()
+        assert game.position.zobrist_key() != Position.from_fen(expected.to_fen().replace(" d6 ", " - ")).zobrist_key()
+
+
+class TestPGNReading:
+    def test_san_round_trip(self):
+        for fen in (STARTING_FEN, KIWIPETE, "8/2P5/8/8/8/8/k6K/8 w - - 0 1"):
+            position = Position.from_fen(fen)
+            for move in position.legal_moves():
+                assert san_to_move(position, move_to_san(position, move)) == move
+
+    def test_invalid_san(self):
+        for san in ("Nf6", "Qxh7", "e5", "O-O", "zz"):
+            try:
+                san_to_move(Position(), san)
+            except ValueError:
+                continue
+            raise AssertionError(f"{san} accettata")
+
+    def test_parse_movetext(self):
+        moves, result = parse_movetext("1. e4 {commento} e5 $1 (1... c5 2. Nf3) 2.Nf3 ; fine riga\n Nc6 *")
+        assert (moves, result) == (["e4", "e5", "Nf3", "Nc6"], "*")
+
+    def test_read_games_offsets(self, tmp_path):
+        path = tmp_path / "partite.pgn"
+        path.write_bytes(SAMPLE_PGN.encode("utf-8"))
+        with open(path, "rb") as handle:
+            games = list(read_games(handle))
+        assert [game.headers["Event"] for game in games] == ["Uno", "Due", "Tre"]
+        assert games[0].moves == ["e4", "e5", "Nf3", "Nc6", "Bb5", "a6"]
+        assert [game.result for game in games] == ["1-0", "1/2-1/2", "0-1"]
+        with open(path, "rb") as handle:
+            assert [game.headers["Event"] for game in read_games(handle, games[1].offset, games[2].offset)] == ["Due"]
+
+
+class TestPositionIndex:
+    def test_build_and_query(self, tmp_path):
+        pgn_path = tmp_path / "partite.pgn"
+        pgn_path.write_bytes(SAMPLE_PGN.encode("utf-8"))
+        index_path = str(tmp_path / "partite.idx")
+        summary = build_index(str(pgn_path), index_path, jobs=2, chunk_games=1)
+        assert summary == {"games": 3, "records": 7 + 5 + 5, "errors": 0}
+
+        index = PositionIndex(index_path)
+        try:
+            games, statistics = index.move_statistics(Position())
+            assert games == 3
+            assert [(stats.san, stats.games, stats.white_wins, stats.draws, stats.black_wins)
+                    for stats in statistics] == [("e4", 2, 1, 1, 0), ("d4", 1, 0, 0, 1)]
+
+            position = Position()
+            for san in ("e4", "e5", "Nf3"):
+                position.make_move(san_to_move(position, san))
+            games, statistics = index.move_statistics(position)
+            assert games == 1 and [stats.san for stats in statistics] == ["Nc6"]
+            entry = index.lookup(position.zobrist_key())[0]
+            assert index.game_headers(entry.offset)["White"] == "Anna"
+
+            assert index.move_statistics(Position.from_fen(KIWIPETE)) == (0, [])
+        finally:
+            index.close()
+
+    def test_multi_pass_merge(self, tmp_path):
+        pgn_path = tmp_path / "partite.pgn"
+        pgn_path.write_bytes((SAMPLE_PGN + "\n").encode("utf-8") * 3)
+        single_path, multi_path = str(tmp_path / "una.idx"), str(tmp_path / "piu.idx")
+        assert build_index(str(pgn_path), single_path) == build_index(str(pgn_path), multi_path, chunk_games=1,
+                                                                       merge_fanout=2)
+        with open(single_path, "rb") as single, open(multi_path, "rb") as multi:
+            assert single.read() == multi.read()
+        assert sorted(os.listdir(tmp_path)) == ["partite.pgn", "piu.idx", "una.idx"]
+        with pytest.raises(ValueError):
+            build_index(str(pgn_path), multi_path, merge_fanout=1)
@@ -0,0 +1,85 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from chess.board import Board
+from chess.game import Game
+from chess.history import PositionHistory
+from chess.ui import UI
+
+# Mosse di pedone alternate (partenza, arrivo) giocabili dalla posizione iniziale
+PAWN_MOVES = [((1, c), (2, c)) if i % 2 == 0 else ((6, c), (5, c)) for i, c in enumerate([0, 0, 1, 1, 2, 2, 3, 3, 4, 4])]
+
+
+class TestPositionHistory:
+    def test_board_at_every_ply(self):
+        history = PositionHistory(interval=3)
+        board = Board()
+        expected = [board.to_bytes()]
+        for start, end in PAWN_MOVES:
+            board.move_piece(start, end)
+            history.record(start, end, board)
+            expected.append(board.to_bytes())
+        assert history.checkpoint_count == 1 + len(PAWN_MOVES) // 3
+        for ply, packed in enumerate(expected):
+            assert history.board_at(ply).to_bytes() == packed
+
+    def test_checkpoints_rebuilt_lazily_after_load(self):
+        source = PositionHistory(interval=4)
+        board = Board()
+        for start, end in PAWN_MOVES:
+            board.move_piece(start, end)
+            source.record(start, end, board)
+        restored = PositionHistory(interval=4)
+        restored.load_moves(source.moves_bytes())
+        assert restored.checkpoint_count == 1
+        assert restored.board_at(len(PAWN_MOVES)).to_bytes() == board.to_bytes()
+        assert restored.checkpoint_count == 1 + len(PAWN_MOVES) // 4
+
+    def test_checkpoints_bounded_in_long_games(self):
+        # Cavalli avanti e indietro: 1000 semimosse con al più 8 checkpoint
+        shuffle = [((0, 6), (2, 5)), ((7, 6), (5, 5)), ((2, 5), (0, 6)), ((5, 5), (7, 6))]
+        history = PositionHistory(interval=2, max_checkpoints=8)
+        board = Board()
+        expected = [board.to_bytes()]
+        for ply in range(1000):
+            start, end = shuffle[ply % 4]
+            board.move_piece(start, end)
+            history.record(start, end, board)
+            expected.append(board.to_bytes())
+            assert history.checkpoint_count <= 8
+        assert history.spacing == 128
+        for ply in (0, 1, 255, 256, 513, 999, 1000):
+            assert history.board_at(ply).to_bytes() == expected[ply]
+        restored = PositionHistory(interval=2, max_checkpoints=8)
+        restored.load_moves(history.moves_bytes())
+        assert restored.board_at(1000).to_bytes() == expected[1000]
+        assert restored.checkpoint_count <= 8
+
+    def test_invalid_ply(self):
+        history = PositionHistory()
+        try:
+            history.board_at(1)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("Attesa ValueError per una semimossa non registrata")
+
+
+class TestGameNavigation:
+    def test_goto_and_step(self, capsys):
+        game = Game(UI(), checkpoint_interval=2)
+        game.start_game()
+        for move in ["e4", "e5", "d4"]:
+            assert game.make_move(move)
+        capsys.readouterr()
+        game.handle_command("/vai", ["1"])
+        assert "Semimossa 1 di 3" in capsys.readouterr().out
+        game.handle_command("/avanti")
+        assert "Semimossa 2 di 3" in capsys.readouterr().out
+        game.handle_command("/indietro")
+        game.handle_command("/indietro")
+        assert "Semimossa 0 di 3" in capsys.readouterr().out
+        game.handle_command("/vai", ["9"])
+        assert "non valida" in capsys.readouterr().out
@@ -0,0 +1,86 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from chess.board import Board
+from chess.constants import Color
+from chess.game import Game
+from chess.journal import GameJournal, RECORD_SIZE, decode_records, encode_record
+from chess.position import Position
+from chess.ui import UI
+
+
+def play(game: Game, moves):
+    for move in moves:
+        assert game.make_move(move)
+
+
+class TestJournal:
+    def test_board_bytes_round_trip(self):
+        board = Board()
+        board.move_piece((1, 4), (3, 4))
+        packed = board.to_bytes()
+        assert len(packed) == 64
+        restored = Board.from_bytes(packed)
+        assert restored.to_bytes() == packed
+        assert restored.get_piece((3, 4)).has_moved is True
+        assert restored.get_piece((1, 3)).has_moved is False
+
+    def test_torn_record_is_ignored(self):
+        data = encode_record(1, (1, 4), (3, 4)) + encode_record(2, (6, 4), (4, 4))
+        assert len(data) == 2 * RECORD_SIZE
+        records = decode_records(data[:-3])
+        assert [record.ply for record in records] == [1]
+        assert records[0].end == (3, 4)
+
+    def test_resume_replays_only_journal_tail(self, tmp_path):
+        directory = str(tmp_path)
+        game = Game(UI(), GameJournal(directory, snapshot_interval=4))
+        game.start_game()
+        play(game, ["e4", "e5", "d4", "d5", "c4"])
+        game.journal.close()
+
+        journal = GameJournal(directory, snapshot_interval=4)
+        snapshot, tail = journal.load()
+        assert snapshot.ply == 4
+        assert [record.ply for record in tail] == [5]
+
+        resumed = Game(UI(), journal)
+        assert resumed.resume_game()
+        assert resumed.board.to_bytes() == game.board.to_bytes()
+        assert resumed.move_history == game.move_history
+        assert resumed.current_player == Color.BLACK
+        play(resumed, ["c5"])
+        journal.close()
+
+    def test_long_game_resume_applies_only_tail(self, tmp_path, monkeypatch):
+        directory = str(tmp_path)
+        game = Game(UI(), GameJournal(directory, snapshot_interval=4))
+        game.start_game()
+        # 40 semimosse: l'ultimo snapshot cade dopo d5, con la casa en passant d6
+        play(game, ["Nf3", "Nf6", "Ng1", "Ng8"] * 9 + ["e4", "a6", "e5", "d5", "Nf3"])
+        game.journal.close()
+
+        applied = []
+        make_move = Position.make_move
+
+        def counting_make_move(position, move):
+            applied.append(move)
+            make_move(position, move)
+
+        monkeypatch.setattr(Position, "make_move", counting_make_move)
+        journal = GameJournal(directory, snapshot_interval=4)
+        resumed = Game(UI(), journal)
+        assert resumed.resume_game()
+        assert len(applied) == 1
+        monkeypatch.undo()
+        assert resumed.position.to_fen() == game.position.to_fen()
+        assert resumed.move_history == game.move_history
+        resumed.position.unmake_move()
+        assert " d6 " in resumed.position.to_fen()
+        journal.close()
+
+    def test_resume_without_saved_game(self, tmp_path):
+        game = Game(UI(), GameJournal(str(tmp_path / "vuota")))
+        assert game.resume_game() is False
@@ -0,0 +1,136 @@
+import io
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from chess import match
+from chess.match import (GameTask, MatchLimits, Player, _iter_results, elo_estimate, elo_from_score, play_game,
+                         run_match, sprt_llr, sprt_status)
+from chess.pgn import format_game, move_to_san, read_games
+from chess.position import Position, STARTING_FEN, WHITE_WINS, DRAW
+
+# Motore UCI di prova: registra nel file di log l'avvio e la ricezione di 'quit'
+FAKE_ENGINE = """
+import os
+import sys
+sys.path.insert(0, {root!r})
+from chess.uci import UCIEngine
+log = open({log!r}, "a")
+log.write("avvio %d\\n" % os.getpid())
+log.flush()
+engine = UCIEngine()
+for line in sys.stdin:
+    if not engine.handle(line):
+        log.write("quit %d\\n" % os.getpid())
+        break
+"""
+
+
+class TestSan:
+    def test_pawn_piece_and_castling_moves(self):
+        position = Position.from_fen("r3k2r/8/8/3p4/4P3/5N2/8/R3K2R w KQkq - 0 1")
+        assert move_to_san(position, position.parse_uci("e4d5")) == "exd5"
+        assert move_to_san(position, position.parse_uci("f3d4")) == "Nd4"
+        assert move_to_san(position, position.parse_uci("e1g1")) == "O-O"
+        assert move_to_san(position, position.parse_uci("a1a8")) == "Rxa8+"
+
+    def test_disambiguation_and_mate(self):
+        position = Position.from_fen("k7/8/8/8/8/7K/8/R6R w - - 0 1")
+        assert move_to_san(position, position.parse_uci("a1d1")) == "Rad1"
+        position = Position.from_fen("6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1")
+        assert move_to_san(position, position.parse_uci("d1d8")) == "Rd8#"
+
+    def test_format_game_from_fen_with_black_to_move(self):
+        fen = "rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1"
+        text = format_game({"White": "A"}, ["e5", "Nf3"], DRAW, fen)
+        assert '[FEN "' + fen + '"]' in text
+        assert "1... e5 2. Nf3 1/2-1/2" in text
+
+    def test_format_game_escapes_tag_values(self):
+        engine = 'motore --nome "Prova" C:\\motori\\'
+        text = format_game({"White": engine}, ["e4"], DRAW)
+        assert '[White "motore --nome \\"Prova\\" C:\\\\motori\\\\"]' in text
+        assert next(read_games(io.BytesIO(text.encode()))).headers["White"] == engine
+
+# Motore UCI bloccato: completa l'avvio ma non risponde mai a 'go'
+STUCK_ENGINE = """
+import sys
+for line in sys.stdin:
+    command = line.strip()
+    if command == "uci":
+        print("uciok", flush=True)
+    elif command == "isready":
+        print("readyok", flush=True)
+"""
+
+
+class TestMatch:
+    def test_play_game_adjudicates_checkmate(self):
+        task = GameTask(0, "6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1", "builtin", "builtin",
+                        True, MatchLimits(depth=2), 20, 0)
+        record = play_game(task)
+        assert record.result == WHITE_WINS
+        assert record.reason == "scacco matto"
+        assert record.san_moves == ["Rd8#"]
+        assert record.score_for_a() == 1.0
+
+    def test_seed_breaks_ties_reproducibly(self):
+        def moves(seed):
+            task = GameTask(0, STARTING_FEN, "builtin", "builtin", True, MatchLimits(depth=1), 8, seed)
+            return play_game(task).san_moves
+
+        assert moves(1) == moves(1)
+        assert len({tuple(moves(seed)) for seed in range(4)}) > 1
+
+    def test_stuck_uci_engine_loses_and_is_killed(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(match, "UCI_RESPONSE_MARGIN", 0.2)
+        script = tmp_path / "bloccato.py"
+        script.write_text(STUCK_ENGINE, encoding="utf-8")
+        spec = f"{sys.executable} {script}"
+        task = GameTask(0, STARTING_FEN, "builtin", spec, True, MatchLimits(depth=1, movetime=0.1), 20, 0)
+        try:
+            record = play_game(task)
+            assert record.result == WHITE_WINS
+            assert record.reason == "mossa illegale o motore non risponde"
+            assert record.plies == 1
+            assert not match._PLAYER_CACHE[spec].is_alive()
+        finally:
+            match.close_players()
+
+    def test_player_requires_choose_move(self):
+        class Silent(Player):
+            pass
+
+        with pytest.raises(TypeError):
+            Silent()
+
+    def test_elo_and_sprt(self):
+        assert elo_from_score(0.5) == 0.0
+        elo, margin = elo_estimate(60, 20, 20)
+        assert elo > 0 and margin > 0
+        assert sprt_status(sprt_llr(600, 200, 200, 0, 5), 0.05, 0.05) == "PASS"
+        assert sprt_status(sprt_llr(200, 200, 600, 0, 5), 0.05, 0.05) == "FAIL"
+
+
+class TestRunMatch:
+    def test_parallel_games_come_back_as_they_finish(self):
+        long_game = GameTask(0, STARTING_FEN, "builtin", "builtin", True, MatchLimits(depth=2), 16, 0)
+        short_game = GameTask(1, STARTING_FEN, "builtin", "builtin", True, MatchLimits(depth=1), 1, 1)
+        records = list(_iter_results([long_game, short_game], jobs=2))
+        assert [record.index for record in records] == [1, 0]
+        assert records[1].plies == 16
+
+    def test_engines_in_pool_workers_receive_quit(self, tmp_path):
+        log = tmp_path / "motore.log"
+        script = tmp_path / "motore.py"
+        root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+        script.write_text(FAKE_ENGINE.format(root=root, log=str(log)), encoding="utf-8")
+        argv = ["--engine-b", f"{sys.executable} {script}", "--games", "2", "--jobs", "2",
+                "--depth", "1", "--max-plies", "4"]
+        assert run_match(argv, io.StringIO(), io.StringIO()) == 0
+        events = [line.split() for line in log.read_text().splitlines()]
+        started = {pid for event, pid in events if event == "avvio"}
+        assert started and started == {pid for event, pid in events if event == "quit"}
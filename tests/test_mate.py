@@ -0,0 +1,108 @@
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from chess.main import CLI_MODE_RUNNERS
+from chess.mate import (MateSolver, ProofTable, PuzzleTask, STATUS_ERROR, STATUS_MATE, STATUS_NO_MATE,
+                        STATUS_UNSOLVED, iter_puzzle_results, run_mate, solve_mate, solve_puzzle)
+from chess.position import Position
+
+BACK_RANK_MATE = "6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1"
+SCHOLARS_MATE = "r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4"
+# 1.Ra6 bxa6 2.b7# oppure 1...Bc7 2.Rxa7#
+MATE_IN_TWO = "kbK5/pp6/1P6/8/8/8/8/R7 w - - 0 1"
+NO_MATE = "6k1/5ppp/8/8/8/8/5PPP/3R2K1 b - - 0 1"
+
+
+def _ends_in_mate(fen, pv):
+    position = Position.from_fen(fen)
+    for move in pv:
+        assert move in position.legal_moves()
+        position.make_move(move)
+    return not position.legal_moves() and position.in_check()
+
+
+class TestProofTable:
+    def test_store_and_get_by_remaining_plies(self):
+        table = ProofTable(entries=100)
+        assert len(table) == 128
+        table.store(12345, 3, 0, 1 << 30)
+        assert table.get(12345, 3) == (0, 1 << 30)
+        assert table.get(12345, 5) is None
+        table.clear()
+        assert table.stats()["probes"] == 0
+        assert table.get(12345, 3) is None
+
+
+class TestMateSolver:
+    def test_mate_in_one(self):
+        for fen in (BACK_RANK_MATE, SCHOLARS_MATE):
+            result = solve_mate(Position.from_fen(fen), max_moves=3)
+            assert result.solved and result.mate_in == 1
+            assert _ends_in_mate(fen, result.pv)
+
+    def test_shortest_mate_with_longest_defence(self):
+        position = Position.from_fen(MATE_IN_TWO)
+        result = solve_mate(position, max_moves=3)
+        assert result.mate_in == 2 and len(result.pv) == 3
+        assert [move.uci() for move in result.pv[:2]] == ["a1a6", "b8c7"]
+        assert _ends_in_mate(MATE_IN_TWO, result.pv)
+        assert position.to_fen() == MATE_IN_TWO
+
+    def test_refutes_when_no_mate_within_depth(self):
+        result = solve_mate(Position.from_fen(MATE_IN_TWO), max_moves=1)
+        assert result.solved and result.mate_in is None
+        result = solve_mate(Position.from_fen(NO_MATE), max_moves=2)
+        assert result.solved and result.mate_in is None and result.pv == []
+
+    def test_node_limit_leaves_position_untouched(self):
+        position = Position.from_fen(MATE_IN_TWO)
+        result = MateSolver(max_nodes=5).solve(position, 3)
+        assert not result.solved and result.mate_in is None
+        assert position.to_fen() == MATE_IN_TWO
+
+    def test_small_table_still_proves(self):
+        result = solve_mate(Position.from_fen(MATE_IN_TWO), max_moves=2, tt_entries=4)
+        assert result.mate_in == 2 and _ends_in_mate(MATE_IN_TWO, result.pv)
+
+
+class TestPuzzleBatch:
+    def test_solve_puzzle_statuses(self):
+        assert solve_puzzle(PuzzleTask(1, BACK_RANK_MATE, 2, None, 1024)).status == STATUS_MATE
+        assert solve_puzzle(PuzzleTask(2, NO_MATE, 1, None, 1024)).status == STATUS_NO_MATE
+        assert solve_puzzle(PuzzleTask(3, MATE_IN_TWO, 3, 5, 1024)).status == STATUS_UNSOLVED
+        error = solve_puzzle(PuzzleTask(4, "non una fen", 2, None, 1024))
+        assert error.status == STATUS_ERROR and "FEN non valida" in error.format_line()
+
+    def test_run_mate_streams_one_line_per_puzzle(self, tmp_path):
+        puzzles = tmp_path / "puzzles.fen"
+        puzzles.write_text(f"# problemi\n{BACK_RANK_MATE}\n\n{MATE_IN_TWO}\n{NO_MATE}\n", encoding="utf-8")
+        output, report = io.StringIO(), io.StringIO()
+        assert CLI_MODE_RUNNERS["mate"] is run_mate
+        assert run_mate(["--fen-file", str(puzzles), "--max-depth", "2", "--jobs", "2"], output, report) == 0
+        lines = [line.split("\t") for line in output.getvalue().splitlines() if not line.startswith("#")]
+        assert [line[0] for line in lines] == ["1", "2", "3"]
+        assert [line[1:3] for line in lines] == [[STATUS_MATE, "1"], [STATUS_MATE, "2"], [STATUS_NO_MATE, "-"]]
+        assert lines[0][3] == "a1a8" and lines[1][3].split()[0] == "a1a6"
+        assert lines[1][6] == MATE_IN_TWO
+        assert "3 problemi" in report.getvalue() and "2 matti" in report.getvalue()
+
+    def test_parallel_results_read_tasks_lazily(self):
+        read = []
+
+        def tasks():
+            for index in range(1, 31):
+                read.append(index)
+                yield PuzzleTask(index, BACK_RANK_MATE, 1, None, 1024)
+
+        results = iter_puzzle_results(tasks(), jobs=2)
+        first = next(results)
+        assert first.index == 1 and len(read) == 2 * 4
+        assert [result.index for result in results] == list(range(2, 31))
+
+    def test_missing_file(self, tmp_path):
+        report = io.StringIO()
+        assert run_mate(["--fen-file", str(tmp_path / "assente.fen")], io.StringIO(), report) == 2
+        assert "Errore" in report.getvalue()
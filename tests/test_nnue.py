@@ -0,0 +1,92 @@
+import io
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from chess.engine import Searcher, SearchLimits
+from chess.evaluation import create_evaluator, evaluate_pieces
+from chess.nnue import NNUEEvaluator, classical_weights, load_weights, run_nnue, save_weights
+from chess.pgn import san_to_move
+from chess.position import Position
+from chess.uci import run_uci
+
+KIWIPETE = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+PROMOTION = "r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1"
+
+
+class TestNNUEEvaluator:
+    def test_incremental_matches_refresh(self):
+        rng = random.Random(11)
+        evaluator = NNUEEvaluator()
+        for fen in (KIWIPETE, PROMOTION, "4k3/8/8/3Pp3/8/8/8/4K3 w - e6 0 1"):
+            position = Position.from_fen(fen)
+            for _ in range(200):
+                moves = position.legal_moves()
+                if moves and (position.ply < 6 and rng.random() < 0.7 or position.ply == 0):
+                    position.make_move(rng.choice(moves))
+                elif position.ply:
+                    position.unmake_move()
+                incremental = evaluator.accumulators(position)
+                assert (incremental == evaluator.refresh(position)).all(), position.to_fen()
+        assert evaluator.refreshes == 3
+
+    def test_classical_network_tracks_classical_evaluation(self):
+        evaluator = NNUEEvaluator(classical_weights())
+        for fen in (KIWIPETE, PROMOTION, "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1"):
+            position = Position.from_fen(fen)
+            for move in position.legal_moves():
+                position.make_move(move)
+                assert abs(evaluator(position) - evaluate_pieces(position)) <= 30
+                position.unmake_move()
+        positions = [Position.from_fen(fen) for fen in (KIWIPETE, PROMOTION)]
+        assert list(evaluator.evaluate_many(positions)) == [evaluator(position) for position in positions]
+
+    def test_weights_round_trip(self, tmp_path):
+        path = str(tmp_path / "rete.nnue")
+        save_weights(classical_weights(), path)
+        weights = load_weights(path)
+        position = Position.from_fen(KIWIPETE)
+        assert NNUEEvaluator(weights)(position) == NNUEEvaluator()(position)
+        with open(path, "ab") as handle:
+            handle.write(b"\0")
+        for data in (None, b"XXXX"):
+            if data is not None:
+                with open(path, "wb") as handle:
+                    handle.write(data)
+            try:
+                load_weights(path)
+            except ValueError:
+                continue
+            raise AssertionError("File dei pesi non valido accettato")
+
+
+class TestNNUEBackend:
+    def test_search_with_nnue(self):
+        position = Position.from_fen("6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1")
+        evaluator = create_evaluator("nnue")
+        result = Searcher(evaluator).search(position, SearchLimits(depth=2))
+        assert result.best_move == san_to_move(position, "Rd8#")
+        assert evaluator.evaluations > 0
+
+    def test_unknown_evaluator(self):
+        try:
+            create_evaluator("magia")
+        except ValueError:
+            return
+        raise AssertionError("Valutazione sconosciuta accettata")
+
+    def test_uci_eval_option(self):
+        output = io.StringIO()
+        commands = io.StringIO("position fen 6k1/5ppp/8/8/8/8/5PPP/3R2K1 w - - 0 1\ngo depth 1\nisready\n")
+        assert run_uci(["--eval", "nnue"], commands, output) == 0
+        assert "bestmove" in output.getvalue()
+
+    def test_export_and_benchmark_cli(self, tmp_path):
+        path = str(tmp_path / "rete.nnue")
+        output = io.StringIO()
+        assert run_nnue(["--export", path], output) == 0
+        assert run_nnue(["--weights", path, "--min-time", "0.01"], output) == 0
+        text = output.getvalue()
+        assert "classic" in text and "nnue" in text and "valutazioni/s" in text
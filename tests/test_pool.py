@@ -0,0 +1,39 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from chess.pool import TASKS_IN_FLIGHT_PER_JOB, pool_map
+
+
+def _square(value):
+    return value * value
+
+
+def _sleep(seconds):
+    time.sleep(seconds)
+    return seconds
+
+
+class TestPoolMap:
+    def test_sequential_and_parallel_keep_task_order(self):
+        expected = [value * value for value in range(20)]
+        assert list(pool_map(_square, range(20), jobs=1)) == expected
+        assert list(pool_map(_square, range(20), jobs=2)) == expected
+
+    def test_tasks_are_read_within_the_window(self):
+        read = []
+
+        def tasks():
+            for value in range(30):
+                read.append(value)
+                yield value
+
+        results = pool_map(_square, tasks(), jobs=2)
+        assert next(results) == 0
+        assert len(read) == 2 * TASKS_IN_FLIGHT_PER_JOB
+        assert list(results) == [value * value for value in range(1, 30)]
+
+    def test_unordered_results_come_back_as_they_finish(self):
+        assert list(pool_map(_sleep, [0.5, 0.0, 0.0], jobs=2, ordered=False)) == [0.0, 0.0, 0.5]
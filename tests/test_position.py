@@ -0,0 +1,66 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from chess.constants import Color
+from chess.pieces import Queen
+from chess.position import Position, Move, STARTING_FEN, decode_move, encode_move
+
+KIWIPETE_FEN = "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1"
+
+
+def perft(position: Position, depth: int) -> int:
+    """Conta le foglie dell'albero delle mosse legali a profondità `depth`."""
+    if depth == 0:
+        return 1
+    total = 0
+    for move in position.legal_moves():
+        position.make_move(move)
+        total += perft(position, depth - 1)
+        position.unmake_move()
+    return total
+
+
+class TestPosition:
+    def test_fen_round_trip(self):
+        for fen in (STARTING_FEN, KIWIPETE_FEN, "8/8/8/4k3/8/8/4P3/4K3 b - - 12 40"):
+            assert Position.from_fen(fen).to_fen() == fen
+
+    def test_perft_starting_position(self):
+        position = Position()
+        assert [perft(position, depth) for depth in (1, 2, 3)] == [20, 400, 8902]
+        assert position.to_fen() == STARTING_FEN
+
+    def test_perft_kiwipete(self):
+        # Arrocchi, en passant e promozioni
+        position = Position.from_fen(KIWIPETE_FEN)
+        assert perft(position, 2) == 2039
+        assert position.to_fen() == KIWIPETE_FEN
+
+    def test_make_unmake_promotion(self):
+        position = Position.from_fen("8/4P3/8/8/8/8/k7/4K3 w - - 0 1")
+        move = position.parse_uci("e7e8q")
+        assert move == Move((6, 4), (7, 4), 'q')
+        position.make_move(move)
+        assert isinstance(position.board.get_piece((7, 4)), Queen)
+        position.unmake_move()
+        assert position.to_fen() == "8/4P3/8/8/8/8/k7/4K3 w - - 0 1"
+
+    def test_checkmate_has_no_legal_moves(self):
+        position = Position()
+        for move_text in ("f2f3", "e7e5", "g2g4", "d8h4"):
+            position.make_move(position.parse_uci(move_text))
+        assert position.side_to_move == Color.WHITE
+        assert position.in_check()
+        assert position.legal_moves() == []
+
+    def test_parse_uci_rejects_illegal_moves(self):
+        position = Position()
+        assert position.parse_uci("e2e5") is None
+        assert position.parse_uci("zz") is None
+
+    def test_move_code_round_trip(self):
+        for move in Position.from_fen("8/2P5/8/8/8/8/k6K/8 w - - 0 1").legal_moves():
+            assert decode_move(encode_move(move)) == move
+        assert decode_move(encode_move(None)) is None
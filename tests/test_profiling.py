@@ -0,0 +1,47 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from chess.board import Board
+from chess.profiling import LatencyHistogram, Profiler, command_label
+
+
+class TestLatencyHistogram:
+    def test_percentiles_are_close_upper_bounds(self):
+        histogram = LatencyHistogram()
+        for duration in range(1, 1001):
+            histogram.record(duration * 1000)
+        assert histogram.count == 1000
+        for percent in (50, 95, 99):
+            exact = percent * 1000 * 1000 / 100
+            assert exact <= histogram.percentile(percent) <= exact * 1.25
+        assert histogram.percentile(100) == histogram.max_ns == 1_000_000
+
+    def test_empty_histogram(self):
+        assert LatencyHistogram().percentile(99) == 0
+
+
+class TestProfiler:
+    def test_enable_wraps_and_disable_restores(self):
+        original = Board.__dict__["move_piece"]
+        profiler = Profiler()
+        profiler.enable()
+        try:
+            assert Board.__dict__["move_piece"] is not original
+            Board().move_piece((1, 4), (3, 4))
+        finally:
+            profiler.disable()
+        assert Board.__dict__["move_piece"] is original
+        assert profiler.stages["Board.move_piece"].count == 1
+        assert profiler.to_dict()["stages"]["Board.move_piece"]["count"] == 1
+
+    def test_counters_ignored_when_disabled(self):
+        profiler = Profiler()
+        profiler.increment("mosse")
+        assert profiler.counters == {}
+
+    def test_command_label(self):
+        assert command_label("/mosse") == "/mosse"
+        assert command_label("e4") == "mossa"
+        assert command_label("  ") == "vuoto"
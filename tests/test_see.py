@@ -0,0 +1,100 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from chess.engine import Searcher, SearchLimits
+from chess.game import Game
+from chess.pgn import san_to_move
+from chess.pieces import Pawn
+from chess.position import Position
+from chess.see import see, square_attackers, is_safe_capture
+from chess.ui import UI
+
+# (FEN, mossa, saldo atteso dello scambio)
+EXCHANGES = [
+    ("1k1r4/1pp4p/p7/4p3/8/P5P1/1PP4P/2K1R3 w - - 0 1", "Rxe5", 100),
+    ("1k1r3q/1ppn3p/p4b2/4p3/8/P2N2P1/1PP1R1BP/2K1Q3 w - - 0 1", "Nxe5", -220),
+    ("4k3/8/2p5/3p4/8/8/3Q4/4K3 w - - 0 1", "Qxd5", -800),
+    ("3rk3/8/8/3q4/8/8/3R4/3RK3 w - - 0 1", "Rxd5", 900),
+    ("3rk3/3r4/8/3n4/8/8/3R4/3RK3 w - - 0 1", "Rxd5", -180),
+    ("4k3/8/8/3Pp3/8/8/8/4K3 w - e6 0 1", "dxe6", 100),
+    ("4k3/3P4/8/8/8/8/8/4K3 w - - 0 1", "d8=Q+", -100),
+    ("4k3/8/8/3p4/4K3/8/8/8 w - - 0 1", "Kxd5", 100),
+]
+
+
+class TestStaticExchange:
+    def test_exchanges(self):
+        for fen, san, expected in EXCHANGES:
+            position = Position.from_fen(fen)
+            fen_before = position.to_fen()
+            assert see(position, san_to_move(position, san)) == expected, (fen, san)
+            assert position.to_fen() == fen_before
+
+    def test_square_attackers(self):
+        # Casa d5: attaccata dal pedone e4 e dalla Donna d2 (raggi X esclusi), difesa dal pedone c6
+        position = Position.from_fen("4k3/8/2p5/3p4/4P3/8/3Q4/4K3 w - - 0 1")
+        own, enemy = square_attackers(position, (4, 3))
+        assert own == (1 << (3 * 8 + 4)) | (1 << (1 * 8 + 3))
+        assert enemy == 1 << (5 * 8 + 2)
+        assert is_safe_capture(position, san_to_move(position, "exd5"))
+        assert not is_safe_capture(position, san_to_move(position, "Qxd5"))
+
+
+class TestQuiescence:
+    def test_avoids_poisoned_capture_at_depth_one(self):
+        position = Position.from_fen("4k3/8/2p5/3p4/8/8/3Q4/4K3 w - - 0 1")
+        plain = Searcher(quiescence=False).search(position, SearchLimits(depth=1))
+        assert plain.best_move == san_to_move(position, "Qxd5")
+        result = Searcher().search(position, SearchLimits(depth=1))
+        assert result.best_move != san_to_move(position, "Qxd5")
+
+    def test_fewer_nodes_than_plain_search_for_same_verdict(self):
+        # Per scartare Qxd5 la ricerca senza quiescenza deve arrivare a profondità 2
+        position = Position.from_fen("4k3/8/2p5/3p4/8/8/3Q4/4K3 w - - 0 1")
+        plain = Searcher(quiescence=False).search(position, SearchLimits(depth=2))
+        quiet = Searcher().search(position, SearchLimits(depth=1))
+        assert plain.best_move != san_to_move(position, "Qxd5")
+        assert quiet.nodes < plain.nodes
+
+
+class TestCaptureHints:
+    def test_game_capture_hints(self, capsys):
+        game = Game(UI())
+        game.start_game()
+        game.position = Position.from_fen("4k3/8/2p5/3p4/4P3/8/3Q4/4K3 w - - 0 1")
+        game.board = game.position.board
+        assert game.capture_hints() == [("exd5", 100), ("Qxd5", -700)]
+        capsys.readouterr()
+        game.handle_command("/catture")
+        output = capsys.readouterr().out
+        assert "exd5: sicura" in output and "Qxd5: perde materiale" in output
+        assert isinstance(game.board.get_piece((3, 4)), Pawn)
+
+    def test_play_hinted_captures(self, capsys):
+        game = Game(UI())
+        game.start_game()
+        for move in ("e4", "d5"):
+            assert game.make_move(move)
+        assert game.capture_hints() == [("exd5", 0)]
+        assert game.make_move("exd5")
+        assert [san for san, _ in game.capture_hints()] == ["Qxd5"]
+        assert game.make_move("Qxd5") and game.make_move("b1c3")
+        assert game.capture_hints() == [("Qxa2", -800), ("Qxd2+", -800), ("Qxg2", -800)]
+        assert game.move_history[:3] == ["e4", "d5", "exd5"] and len(game.move_history) == 5
+        assert game.history.board_at(len(game.history)).to_bytes() == game.board.to_bytes()
+
+    def test_special_and_illegal_moves_are_refused(self, capsys):
+        game = Game(UI())
+        game.start_game()
+        for move in ("e4", "a6", "e5", "d5"):
+            assert game.make_move(move)
+        assert game.position.parse_uci("e5d6") not in game.playable_moves()
+        capsys.readouterr()
+        assert not game.make_move("exd6")
+        assert "en passant" in capsys.readouterr().out
+        for move in ("Qh5", "a5", "Qxf7+"):
+            assert game.make_move(move)
+        assert not game.make_move("b8c6")
+        assert "sotto scacco" in capsys.readouterr().out
@@ -0,0 +1,69 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from chess.engine import MATE_SCORE, Searcher, SearchLimits
+from chess.match import GameTask, MatchLimits, play_game
+from chess.position import Position, WHITE_WINS, DRAW
+from chess.tablebase import Tablebase, ProbeResult, generate_all, decode_value
+
+pytest.importorskip("numpy")
+
+
+@pytest.fixture(scope="module")
+def tablebase_dir(tmp_path_factory):
+    directory = str(tmp_path_factory.mktemp("tablebase"))
+    # KPK richiede KQK e KRK: vengono generate prima, in parallelo
+    timings = generate_all(directory, ["KPK"], jobs=2, report=lambda line: None)
+    assert set(timings) == {"KQK", "KRK", "KPK"}
+    return directory
+
+
+class TestTablebase:
+    def test_decode_value(self):
+        assert decode_value(0) == ProbeResult(0, None)
+        assert decode_value(7) == ProbeResult(1, 7)
+        assert decode_value(128 + 4) == ProbeResult(-1, 4)
+        assert decode_value(255) is None
+
+    def test_known_positions(self, tablebase_dir):
+        tablebase = Tablebase(tablebase_dir)
+        try:
+            # Stallo, matto in una (anche a colori invertiti), patta e vittoria di KPK
+            assert tablebase.probe(Position.from_fen("7k/5Q2/6K1/8/8/8/8/8 b - - 0 1")) == ProbeResult(0, None)
+            assert tablebase.probe(Position.from_fen("7k/8/6K1/8/8/8/8/1Q6 w - - 0 1")) == ProbeResult(1, 1)
+            assert tablebase.probe(Position.from_fen("8/8/8/8/8/6k1/r7/7K b - - 0 1")) == ProbeResult(1, 1)
+            assert tablebase.probe(Position.from_fen("8/8/8/8/8/4k3/4P3/4K3 w - - 0 1")) == ProbeResult(0, None)
+            assert tablebase.probe(Position.from_fen("4k3/8/4K3/4P3/8/8/8/8 w - - 0 1")).wdl == 1
+            # Materiale non coperto o tabella mancante
+            assert tablebase.probe(Position.from_fen("4k3/8/8/8/8/8/8/2B1KN2 w - - 0 1")) is None
+            assert tablebase.probe(Position()) is None
+        finally:
+            tablebase.close()
+
+    def test_dtm_matches_search(self, tablebase_dir):
+        tablebase = Tablebase(tablebase_dir)
+        searcher = Searcher()
+        try:
+            for fen in ("8/8/8/8/8/2k5/8/K6Q w - - 0 1", "8/8/8/3k4/8/8/8/KR6 b - - 0 1",
+                        "8/4P3/8/8/8/8/8/k1K5 w - - 0 1"):
+                position = Position.from_fen(fen)
+                probe = tablebase.probe(position)
+                if probe.dtm > 5:
+                    continue
+                result = searcher.search(position, SearchLimits(depth=probe.dtm + 1))
+                assert result.score == probe.wdl * (MATE_SCORE - probe.dtm)
+        finally:
+            tablebase.close()
+
+    def test_match_adjudication(self, tablebase_dir):
+        task = GameTask(0, "4k3/8/4K3/4P3/8/8/8/8 w - - 0 1", "builtin", "builtin", True,
+                        MatchLimits(depth=1), 10, 0, tablebase_dir)
+        record = play_game(task)
+        assert (record.result, record.reason, record.plies) == (WHITE_WINS, "tablebase", 0)
+
+        task = task._replace(opening_fen="8/8/8/8/8/4k3/4P3/4K3 w - - 0 1")
+        assert play_game(task).result == DRAW